@@ -1,9 +1,12 @@
-# analyze_backdata.py — 저장된 pkl 데이터로 4대 엔진 상세 분석
+# analyze_backdata.py — 저장된 패널 데이터로 4대 엔진 상세 분석
 import sys
 import os
 import pandas as pd
 sys.path.append(os.path.join(os.path.dirname(__file__), "engine"))
 
+from piona_data.market_data import MarketDataLoader
+from piona_data.analysis_cache import AnalysisCache
+
 from inflection_engine import ShinInflectionEngine
 from pattern_engine import ShinPatternEngine
 from support_resistance_engine import VolumeProfileSR
@@ -484,38 +487,62 @@ def generate_interpretation(code, price, inf, pat, sr, fib):
     return "\n".join(lines)
 
 
+_loader = None
+_cache = None
+
+
+def get_loader():
+    global _loader
+    if _loader is None:
+        _loader = MarketDataLoader("data")
+    return _loader
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = AnalysisCache(os.path.join("data", "cache"))
+    return _cache
+
+
+def cached(engine, method, code, fingerprint, df):
+    """엔진 결과 캐시 (같은 데이터로 다시 실행하면 재계산 없이 반환)"""
+    return get_cache().fetch(engine, code, fingerprint, lambda: getattr(engine, method)(df), method)
+
+
 def run_analysis(code, simple=False):
-    # pkl 파일에서 데이터 로드
-    pkl_path = f"data/{code}_100days.pkl"
-    if not os.path.exists(pkl_path):
-        print(f"파일 없음: {pkl_path}")
-        return None
-    
-    df = pd.read_pickle(pkl_path)
-    if df.empty:
-        print("데이터 없음")
+    """
+    4대 엔진 분석 (simple=True 면 전체 스캔용 — 변곡 엔진 lean 모드로 설명 문구 생략,
+    리포트를 출력할 종목은 simple=False 로 다시 분석해 generate_interpretation 근거 생성)
+    """
+    # 패널 저장소에서 데이터 로드 (캐시 지문과 같은 스냅샷)
+    with get_loader().pinned() as snapshot:
+        df = get_loader().load(code)
+        fingerprint = snapshot.fingerprint(code)
+    if df is None or df.empty:
+        print(f"데이터 없음: {code}")
         return None
     
     price = df['close'].iloc[-1]
     
     # 4대 엔진 실행
     try:
-        inf = ShinInflectionEngine().analyze(df)
+        inf = cached(ShinInflectionEngine(lean=simple), "analyze", code, fingerprint, df)
     except Exception as e:
         inf = {"error": str(e)}
     
     try:
-        pat = ShinPatternEngine().run_all_patterns(df)
+        pat = cached(ShinPatternEngine(), "run_all_patterns", code, fingerprint, df)
     except Exception as e:
         pat = {}
     
     try:
-        sr = VolumeProfileSR().analyze(df)
+        sr = cached(VolumeProfileSR(), "analyze", code, fingerprint, df)
     except Exception as e:
         sr = {}
     
     try:
-        fib = CreonFibonacci().analyze(df)
+        fib = cached(CreonFibonacci(), "analyze", code, fingerprint, df)
     except Exception as e:
         fib = {}
     
@@ -550,14 +577,14 @@ def main():
     print("    PIONA 4대 엔진 분석기 (상세 리포트)")
     print("=" * 70)
     
-    # data 폴더의 pkl 파일 목록
+    # 패널 저장소의 종목 목록
     if not os.path.exists("data"):
         print("data 폴더가 없습니다!")
         input("Press Enter...")
         return
     
-    pkl_files = [f for f in os.listdir("data") if f.endswith("_100days.pkl")]
-    print(f"\n수집된 데이터: {len(pkl_files)}종목")
+    stored_codes = get_loader().get_codes(include_index=True)
+    print(f"\n수집된 데이터: {len(stored_codes)}종목")
     
     codes = input("\n분석할 종목코드 (ex: 005930,000660 또는 all): ").strip()
     if not codes:
@@ -566,17 +593,18 @@ def main():
         return
     
     if codes.lower() == "all":
-        code_list = [f.replace("_100days.pkl", "") for f in pkl_files]
+        code_list = stored_codes
         
         # 전체 스캔 모드
         print(f"\n{len(code_list)}종목 스캔 중...")
         results = []
-        for i, code in enumerate(code_list):
-            if (i+1) % 20 == 0:
-                print(f"  {i+1}/{len(code_list)} 완료...")
-            result = run_analysis(code, simple=True)
-            if result:
-                results.append(result)
+        with get_loader().pinned():
+            for i, code in enumerate(code_list):
+                if (i+1) % 20 == 0:
+                    print(f"  {i+1}/{len(code_list)} 완료...")
+                result = run_analysis(code, simple=True)
+                if result:
+                    results.append(result)
         
         # 결과 정렬 (삼위일체 수, BUY 신호 우선)
         buy_list = [r for r in results if r['trinity'] >= 2 or 'BUY' in str(r['inflection'])]
@@ -0,0 +1,71 @@
+# benchmark_offline.py — 가짜 CREON 으로 수집 → 분석 전체 경로 벤치마크 (Linux 가능)
+# 사용: python benchmark_offline.py [종목수] [응답지연초] [--virtual]
+#   --virtual: 조회 한도 대기/응답 지연을 가상 시계로 계산 (CPU 시간만 실제)
+#   PIONA_CREON_DATA=<패널 경로> 를 주면 기록 데이터를 재생
+import os
+import sys
+import tempfile
+import time
+
+from piona_data import creon_com
+from piona_data.fake_creon import FakeCreon, FakeClock, SystemClock
+from piona_data.panel_store import PanelStore
+from piona_data.request_scheduler import set_scheduler
+from piona_data.trading_calendar import KRXCalendar
+
+
+def run(n_symbols=50, latency=creon_com.DEFAULT_LATENCY, virtual=False, init_days=100, workers=4):
+    """
+    빈 저장소에서 DailyPipeline 1회 실행 (CREON 은 FakeCreon)
+
+    Returns:
+        dict: 파이프라인 통계 + 요청 수 / CREON 시간 / 실제 소요 시간
+    """
+    from data_merger import DataMerger
+    from piona_main import PIONASystem
+    from pipeline_daily import DailyPipeline
+    from universe import UniverseManager
+
+    clock = FakeClock() if virtual else SystemClock()
+    until = KRXCalendar().last_closed_trading_day()
+    recorded = os.environ.get("PIONA_CREON_DATA")
+    if recorded:
+        session = FakeCreon.from_snapshot(PanelStore(recorded).open(), clock=clock, latency=latency)
+        codes = [c[1:] if c.startswith("A") else c for c in session.chart][:n_symbols]
+        until = max(int(df["date"].iloc[-1]) for df in session.chart.values())
+    else:
+        codes = UniverseManager().get_symbols_only()[:n_symbols]  # 지수 U001/U201 포함
+        session = FakeCreon.synthetic(codes, until, days=init_days, clock=clock, latency=latency)
+
+    creon_com.configure(session=session)
+    set_scheduler(None)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # 수집/지수 엔진/결과 캐시 모두 임시 저장소 사용
+            piona = PIONASystem(mode="simulation", data_path=tmp, analysis_only=True)
+            pipeline = DailyPipeline(piona, DataMerger(), workers=workers, init_days=init_days)
+            t0 = time.perf_counter()
+            clock_start = clock.time()
+            pipeline.run(codes, until=until)
+            wall = time.perf_counter() - t0
+            creon_seconds = clock.time() - clock_start
+    finally:
+        set_scheduler(None)
+        creon_com.configure()
+
+    return dict(pipeline.stats, requests=session.total_requests,
+                creon_seconds=round(creon_seconds, 2), real_seconds=round(wall, 2))
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    n = int(args[0]) if args else 50
+    latency = float(args[1]) if len(args) > 1 else creon_com.DEFAULT_LATENCY
+    virtual = "--virtual" in sys.argv
+
+    result = run(n, latency, virtual)
+    print(f"\n{'='*60}")
+    print(f"가짜 CREON 벤치마크: {result['symbols']}종목, 요청 {result['requests']}건")
+    print(f"  수집 {result['collect_seconds']}초 / 분석 {result['analyze_seconds']}초 / 전체 {result['wall_seconds']}초")
+    print(f"  CREON 시간 {result['creon_seconds']}초 ({'가상' if virtual else '실제'}), 실제 소요 {result['real_seconds']}초")
+    print(f"{'='*60}")
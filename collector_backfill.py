@@ -0,0 +1,34 @@
+# collector_backfill.py — 장기 이력 백필 (페이지 조회 + 체크포인트 재개)
+import os
+import sys
+import pandas as pd
+from universe import UniverseManager
+from piona_data.market_data import MarketDataLoader
+from piona_data.backfill import Backfill
+from piona_data.trading_calendar import KRXCalendar
+
+print("=" * 60)
+print("      PIONA_CREON - Multi-year Backfill")
+print("=" * 60)
+
+YEARS = int(sys.argv[1]) if len(sys.argv) > 1 else 3  # 기본 3년 (MA300 + 백테스트)
+
+um = UniverseManager()
+symbols = um.get_symbols_only()
+
+os.makedirs("data", exist_ok=True)
+loader = MarketDataLoader("data")
+calendar = KRXCalendar.from_snapshot(loader.snapshot())
+
+end_date = calendar.last_closed_trading_day()
+start_date = int((pd.Timestamp(str(end_date)) - pd.DateOffset(years=YEARS)).strftime("%Y%m%d"))
+print(f"구간: {start_date} ~ {end_date} ({len(symbols)}종목)")
+
+# 중단되면 같은 명령으로 다시 실행 → 체크포인트부터 이어서 조회
+backfill = Backfill(loader)
+merged = backfill.run(symbols, start_date, end_date)
+
+print("\n======================================================================")
+print(f"           백필 완료: {len(merged)}종목 병합, {backfill.pages}페이지 조회")
+print("======================================================================")
+input("엔터 누르면 종료...")
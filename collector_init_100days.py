@@ -1,8 +1,8 @@
-# collector_init_100days.py — 13컬럼 + skip logic
+# collector_init_100days.py — 13컬럼 + skip logic (패널 저장소 저장)
 import os
-import pandas as pd
 from data_merger import DataMerger
 from universe import UniverseManager
+from piona_data.market_data import MarketDataLoader
 
 print("START merger")
 print("=" * 60)
@@ -14,37 +14,41 @@ symbols = um.get_symbols_only()
 
 merger = DataMerger()
 os.makedirs("data", exist_ok=True)
+loader = MarketDataLoader("data")
+snapshot = loader.snapshot()
+
+FLUSH_EVERY = 20  # 20종목마다 저장소에 반영 (중단 시 진행분 보존)
 
 success = 0
 fail = 0
+pending = {}
 
 for code in symbols:
     print(f"\n[{code}] 100일치 수집 중...")
 
-    save_path = f"data/{code}_100days.pkl"
-
     # 이미 있으면 건너뛰기
-    if os.path.exists(save_path):
-        try:
-            df_old = pd.read_pickle(save_path)
-            if len(df_old) >= 100:
-                print(f"건너뜀 → 이미 100일 있음")
-                success += 1
-                continue
-        except Exception as e:
-            print(f"  [파일 읽기 오류: {e}]")
-            pass
+    if snapshot.count(code) >= 100:
+        print(f"건너뜀 → 이미 100일 있음")
+        success += 1
+        continue
 
     df = merger.get_full_data(code, days=100)
 
     if not df.empty:
-        df.to_pickle(save_path)
-        print(f"성공 → {save_path} ({len(df)}일)")
+        pending[code] = df
+        print(f"성공 → {code} ({len(df)}일)")
         success += 1
     else:
         print("실패")
         fail += 1
 
+    if len(pending) >= FLUSH_EVERY:
+        loader.store.write_frames(pending)
+        pending = {}
+
+if pending:
+    loader.store.write_frames(pending)
+
 print("\n======================================================================")
 print(f"           초기 데이터 수집 완료!")
 print(f"           총 성공: {success}")
@@ -1,8 +1,11 @@
-# collector_update_daily.py — 안정판
+# collector_update_daily.py — 안정판 (MarketEye 일괄 갱신 + 패널 저장소 저장)
 import os
-import pandas as pd
 from data_merger import DataMerger
 from universe import UniverseManager
+from piona_data.market_data import MarketDataLoader
+from piona_data.marketeye import BulkDailyUpdater
+from piona_data.request_scheduler import get_scheduler
+from trading_system.auto_trader import AutoTrader
 
 print("PIONA_CREON - Daily Updater")
 
@@ -11,35 +14,21 @@ symbols = um.get_symbols_only()
 
 merger = DataMerger()
 os.makedirs("data", exist_ok=True)
-
-for code in symbols:
-    print(f"\n[{code}] 최신 1일 업데이트 중...")
-
-    save_path = f"data/{code}_100days.pkl"
-
-    if not os.path.exists(save_path):
-        print("기존 파일 없음 → Skip")
-        continue
-
-    df_old = pd.read_pickle(save_path)
-
-    df_new = merger.get_full_data(code, days=2)
-    if df_new.empty:
-        print("오늘 데이터 없음 → Skip")
-        continue
-
-    last_date = df_old["date"].iloc[-1]
-    new_rows = df_new[df_new["date"] > last_date]
-
-    if len(new_rows) == 0:
-        print("이미 최신임 → Skip")
-        continue
-
-    df_final = pd.concat([df_old, new_rows], ignore_index=True)
-    df_final = df_final.tail(100)
-    df_final.to_pickle(save_path)
-
-    print(f"업데이트 완료 → 총 {len(df_final)}일")
-
-print("\n모든 종목 업데이트 완료.")
+loader = MarketDataLoader("data")
+
+# 이력이 이어진 종목은 MarketEye 일괄 조회 (200종목/1회),
+# 공백 종목과 지수는 KRX 달력 기준 빠진 거래일만 기간 조회 (보유 종목 → 지수 → 유니버스 순)
+scheduler = get_scheduler()
+held = set(AutoTrader().get_open_positions())
+
+updater = BulkDailyUpdater(loader, merger)
+result = updater.run(symbols, positions=held)
+
+print(f"\nMarketEye 일괄 갱신: {result['bulk']}종목 ({result['marketeye_requests']}회 요청)")
+print(f"종목별 보충 조회: {len(result['fallback'])}종목")
+incomplete = [code for code, r in result['report'].items() if not r['complete']]
+if incomplete:
+    print(f"미완결 종목 {len(incomplete)}개: {incomplete}")
+print(f"\n모든 종목 업데이트 완료. ({result['updated']}종목 갱신)")
+print(f"CREON 요청 {scheduler.stats['requests']}건, 한도 대기 {scheduler.stats['waits']}회 ({scheduler.stats['wait_seconds']:.1f}초)")
 input("엔터 누르면 종료...")
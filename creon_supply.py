@@ -1,17 +1,22 @@
 # creon_supply.py — 13컬럼 안정판
-import win32com.client
 import pandas as pd
 
+from piona_data.creon_com import dispatch
+from piona_data.request_scheduler import get_scheduler, CreonRequestScheduler
+
 class CreonSupply:
     def __init__(self):
-        self.inst = win32com.client.Dispatch("CpSysDib.CpSvr7244")
+        self.inst = dispatch("CpSysDib.CpSvr7244")
 
-    def get_investor(self, code, days=100):
+    def get_investor(self, code, days=100, lane=None):
+        if lane is None:
+            lane = CreonRequestScheduler.lane_for(code)
         try:
             self.inst.SetInputValue(0, code)
             self.inst.SetInputValue(1, ord('1'))  # 일별
             self.inst.SetInputValue(2, days)
-            self.inst.BlockRequest()
+            with get_scheduler().slot(lane):
+                self.inst.BlockRequest()
 
             status = self.inst.GetDibStatus()
             if status != 0:
@@ -1,20 +1,23 @@
 # data_merger.py — 12컬럼 통합 수집기 (Margin 제외)
-import win32com.client
-import pythoncom
-import time
 import pandas as pd
 
+from piona_data.creon_com import dispatch, co_initialize
+from piona_data.request_scheduler import get_scheduler, CreonRequestScheduler
+from piona_data.com_decoder import (
+    CHART_FIELDS, INVESTOR_COLUMNS,
+    chart_columns, decode_columns, concat_pages, chart_frame, investor_frame
+)
+from piona_data.schema import to_bar_frame
+
 print("START merger", flush=True)
 
-_last_request = 0.0
 
-def _rate_limit():
-    global _last_request
-    now = time.time()
-    elapsed = now - _last_request
-    if elapsed < 1.1:
-        time.sleep(1.1 - elapsed)
-    _last_request = time.time()
+def _block_request(obj, code, lane=None):
+    """CREON 잔여 한도 기반 요청 1건 (한도 확인 ~ BlockRequest 를 한 구간으로 발행)"""
+    if lane is None:
+        lane = CreonRequestScheduler.lane_for(code)
+    with get_scheduler().slot(lane):
+        obj.BlockRequest()
 
 
 class CreonOHLCV:
@@ -25,8 +28,8 @@ class CreonOHLCV:
 
     def _connect(self):
         try:
-            pythoncom.CoInitialize()
-            cp = win32com.client.Dispatch("CpUtil.CpCybos")
+            co_initialize()
+            cp = dispatch("CpUtil.CpCybos")
             if cp.IsConnect == 1:
                 self.connected = True
             else:
@@ -34,11 +37,10 @@ class CreonOHLCV:
         except Exception as e:
             print(f"[OHLCV] Error: {e}", flush=True)
 
-    def get_data(self, code, days=100):
+    def get_data(self, code, days=100, lane=None):
         if not self.connected:
             return pd.DataFrame()
-        obj = win32com.client.Dispatch("CpSysDib.StockChart")
-        _rate_limit()
+        obj = dispatch("CpSysDib.StockChart")
         # 지수는 U로 시작, 종목은 A 붙임
         if code.startswith("U"):
             full_code = code  # U001, U201 그대로
@@ -47,32 +49,45 @@ class CreonOHLCV:
         obj.SetInputValue(0, full_code)
         obj.SetInputValue(1, ord('2'))
         obj.SetInputValue(4, days)
-        obj.SetInputValue(5, (0, 2, 3, 4, 5, 8, 9))
+        obj.SetInputValue(5, CHART_FIELDS)
         obj.SetInputValue(6, ord('D'))
         obj.SetInputValue(9, ord('1'))
-        obj.BlockRequest()
+        _block_request(obj, code, lane)
         count = obj.GetHeaderValue(3)
         if count == 0:
             return pd.DataFrame()
-        rows = []
-        for i in range(count):
-            rows.append([
-                obj.GetDataValue(0, i),
-                obj.GetDataValue(1, i),
-                obj.GetDataValue(2, i),
-                obj.GetDataValue(3, i),
-                obj.GetDataValue(4, i),
-                obj.GetDataValue(5, i),
-                obj.GetDataValue(6, i)
-            ])
-        df = pd.DataFrame(rows, columns=["date","open","high","low","close","volume","amount"])
-        df = df.iloc[::-1].reset_index(drop=True)
-        df["date"] = pd.to_datetime(df["date"], format="%Y%m%d")
-        df["code"] = code
-        df["range"] = df["high"] - df["low"]
-        df["gap"] = df["open"] - df["close"].shift(1)
-        df["gap"] = df["gap"].fillna(0).astype(int)
-        return df
+        # 필드별 배열로 바로 디코딩 (날짜 오름차순)
+        return chart_frame(code, decode_columns(obj, count, chart_columns(code)))
+
+    def get_range(self, code, start, end, lane=None):
+        """
+        기간 조회 (start ~ end, YYYYMMDD) — 응답이 잘리면 Continue 로 이어받기
+
+        Returns:
+            DataFrame (날짜 오름차순)
+        """
+        if not self.connected:
+            return pd.DataFrame()
+        obj = dispatch("CpSysDib.StockChart")
+        full_code = code if code.startswith("U") else "A" + code
+        obj.SetInputValue(0, full_code)
+        obj.SetInputValue(1, ord('1'))  # 기간
+        obj.SetInputValue(2, int(end))
+        obj.SetInputValue(3, int(start))
+        obj.SetInputValue(5, CHART_FIELDS)
+        obj.SetInputValue(6, ord('D'))
+        obj.SetInputValue(9, ord('1'))
+        pages = []
+        while True:
+            _block_request(obj, code, lane)
+            count = obj.GetHeaderValue(3)
+            if count:
+                pages.append(decode_columns(obj, count, chart_columns(code)))
+            if count == 0 or not obj.Continue:
+                break
+        if not pages:
+            return pd.DataFrame()
+        return chart_frame(code, concat_pages(pages))
 
 
 class CreonSupply:
@@ -83,42 +98,58 @@ class CreonSupply:
 
     def _connect(self):
         try:
-            pythoncom.CoInitialize()
-            cp = win32com.client.Dispatch("CpUtil.CpCybos")
+            co_initialize()
+            cp = dispatch("CpUtil.CpCybos")
             if cp.IsConnect == 1:
                 self.connected = True
         except Exception as e:
             print(f"[Supply] Connection error: {e}", flush=True)
 
-    def get_investor(self, code, days=100):
+    def get_investor(self, code, days=100, lane=None):
         if not self.connected:
             return pd.DataFrame()
         try:
-            obj = win32com.client.Dispatch("CpSysDib.CpSvr7254")
-            _rate_limit()
+            obj = dispatch("CpSysDib.CpSvr7254")
             obj.SetInputValue(0, "A" + code)
             obj.SetInputValue(1, 6)  # 일별
             obj.SetInputValue(2, days)
             obj.SetInputValue(3, 0)  # 순매수
-            obj.BlockRequest()
+            _block_request(obj, code, lane)
             count = obj.GetHeaderValue(1)
             if count == 0:
                 return pd.DataFrame()
-            rows = []
-            for i in range(count):
-                rows.append({
-                    "date": obj.GetDataValue(0, i),
-                    "frgn_net_buy": obj.GetDataValue(2, i),
-                    "inst_net_buy": obj.GetDataValue(1, i),
-                })
-            df = pd.DataFrame(rows)
-            df = df.iloc[::-1].reset_index(drop=True)
-            df["date"] = pd.to_datetime(df["date"], format="%Y%m%d")
-            return df
+            return investor_frame(decode_columns(obj, count, INVESTOR_COLUMNS))
         except Exception as e:
             print(f"[Supply] Error getting investor data: {e}", flush=True)
             return pd.DataFrame()
 
+    def get_investor_range(self, code, start, end, lane=None):
+        """기간 조회 (start ~ end, YYYYMMDD) — Continue 로 이어받기"""
+        if not self.connected:
+            return pd.DataFrame()
+        try:
+            obj = dispatch("CpSysDib.CpSvr7254")
+            obj.SetInputValue(0, "A" + code)
+            obj.SetInputValue(1, 0)  # 기간선택
+            obj.SetInputValue(2, int(start))
+            obj.SetInputValue(3, int(end))
+            obj.SetInputValue(4, ord('0'))  # 순매수
+            obj.SetInputValue(5, 0)  # 전체 투자자
+            pages = []
+            while True:
+                _block_request(obj, code, lane)
+                count = obj.GetHeaderValue(1)
+                if count:
+                    pages.append(decode_columns(obj, count, INVESTOR_COLUMNS))
+                if count == 0 or not obj.Continue:
+                    break
+            if not pages:
+                return pd.DataFrame()
+            return investor_frame(concat_pages(pages))
+        except Exception as e:
+            print(f"[Supply] Error getting investor range: {e}", flush=True)
+            return pd.DataFrame()
+
 
 class DataMerger:
     """OHLCV + Supply 통합 (12컬럼)"""
@@ -131,11 +162,11 @@ class DataMerger:
         else:
             print("[Merger] CREON not connected!", flush=True)
 
-    def get_full_data(self, code, days=100):
-        """12컬럼 통합 데이터 반환"""
+    def get_full_data(self, code, days=100, lane=None):
+        """12컬럼 통합 데이터 반환 (lane: 스케줄러 우선순위, 기본은 코드로 판별)"""
         # 1) OHLCV (기본)
         try:
-            df = self.ohlcv.get_data(code, days)
+            df = self.ohlcv.get_data(code, days, lane)
         except Exception as e:
             print(f"[Merger] {code} OHLCV 오류: {e}", flush=True)
             return pd.DataFrame()
@@ -143,10 +174,30 @@ class DataMerger:
             print(f"[Merger] {code} OHLCV 실패", flush=True)
             return pd.DataFrame()
 
+        return self._attach_investor(code, df, lambda: self.supply.get_investor(code, days, lane))
+
+    def get_range(self, code, start, end, lane=None):
+        """
+        기간 지정 12컬럼 데이터 (start ~ end, YYYYMMDD, 양끝 포함)
+
+        빠진 거래일만 정확히 요청할 때 사용 (응답이 길면 Continue 로 이어받음)
+        """
+        try:
+            df = self.ohlcv.get_range(code, start, end, lane)
+        except Exception as e:
+            print(f"[Merger] {code} OHLCV 기간조회 오류: {e}", flush=True)
+            return pd.DataFrame()
+        if df.empty:
+            return pd.DataFrame()
+
+        return self._attach_investor(code, df, lambda: self.supply.get_investor_range(code, start, end, lane))
+
+    def _attach_investor(self, code, df, fetch_investor):
+        """OHLCV 에 외인/기관 순매수 병합 후 표준 스키마로 정리"""
         # 2) Investor (외인/기관) - 지수는 스킵
         if not code.startswith("U"):
             try:
-                inv_df = self.supply.get_investor(code, days)
+                inv_df = fetch_investor()
                 if not inv_df.empty:
                     df = pd.merge(df, inv_df, on="date", how="left")
                 else:
@@ -161,13 +212,8 @@ class DataMerger:
             df["frgn_net_buy"] = None
             df["inst_net_buy"] = None
 
-        # 컬럼 순서 정리 (12개)
-        cols = ["date", "code", "open", "high", "low", "close", "volume", "amount",
-                "range", "gap", "frgn_net_buy", "inst_net_buy"]
-        for c in cols:
-            if c not in df.columns:
-                df[c] = None
-        df = df[cols]
+        # 표준 스키마 12컬럼 (int32 가격, nullable 순매수, category 종목코드)
+        df = to_bar_frame(df)
 
         print(f"[Merger] {code} 완료 → {len(df)}일, {len(df.columns)}컬럼", flush=True)
         return df
@@ -10,12 +10,18 @@ try:
     from .fibonacci_engine import CreonFibonacci
     from .support_resistance_engine import VolumeProfileSR
     from .inflection_engine import ShinInflectionEngine
+    from .pivot_index import pivot_index
+    from .pipeline import Pipeline
 except ImportError:
     # 상대 임포트 실패 시 절대 임포트 시도
     from pattern_engine import ShinPatternEngine
     from fibonacci_engine import CreonFibonacci
     from support_resistance_engine import VolumeProfileSR
     from inflection_engine import ShinInflectionEngine
+    from pivot_index import pivot_index
+    from pipeline import Pipeline
+
+from piona_data.feature_store import features
 
 
 class PIONA_CompoundSignal:
@@ -28,12 +34,27 @@ class PIONA_CompoundSignal:
     를 모두 통합하여 최종 매매 신호를 생성합니다.
     """
 
-    def __init__(self):
+    def __init__(self, threads: int = 4):
         self.pattern_engine = ShinPatternEngine()
         self.fibonacci_engine = CreonFibonacci()
         self.sr_engine = VolumeProfileSR()
         self.inflection_engine = ShinInflectionEngine()
 
+        # 엔진 DAG: 공용 중간 결과(지표 저장소/피벗) 생성 후 네 엔진 동시 실행, 실패한 엔진은 {"error": ...}
+        self.pipeline = Pipeline(threads)
+        self.pipeline.add("features", features, ("df",))
+        self.pipeline.add("pivots", pivot_index, ("df",))
+        engines = {
+            "pattern": lambda df: self.pattern_engine.run_all_patterns(df),
+            "fibonacci": lambda df: self.fibonacci_engine.analyze(df),
+            "support_resistance": lambda df: self.sr_engine.analyze(df),
+            "inflection": lambda df: self.inflection_engine.analyze(df)
+        }
+        for name, run in engines.items():
+            self.pipeline.add(name, lambda df, _f, _p, run=run: run(df), ("df", "features", "pivots"),
+                              threaded=True, fallback=lambda e: {"error": str(e)})
+        self.last_timings = {}
+
     def analyze(self, df) -> Dict:
         """
         모든 엔진을 실행하고 종합 신호를 생성
@@ -50,26 +71,13 @@ class PIONA_CompoundSignal:
                 "data_length": len(df)
             }
 
-        # 각 엔진 실행
-        try:
-            pattern_result = self.pattern_engine.run_all_patterns(df)
-        except Exception as e:
-            pattern_result = {"error": str(e)}
-
-        try:
-            fibonacci_result = self.fibonacci_engine.analyze(df)
-        except Exception as e:
-            fibonacci_result = {"error": str(e)}
-
-        try:
-            sr_result = self.sr_engine.analyze(df)
-        except Exception as e:
-            sr_result = {"error": str(e)}
-
-        try:
-            inflection_result = self.inflection_engine.analyze(df)
-        except Exception as e:
-            inflection_result = {"error": str(e)}
+        # 각 엔진 실행 (DAG)
+        run = self.pipeline.run(df=df)
+        self.last_timings = run.timings
+        pattern_result = run["pattern"]
+        fibonacci_result = run["fibonacci"]
+        sr_result = run["support_resistance"]
+        inflection_result = run["inflection"]
 
         # 신호 점수 계산
         buy_score = 0
@@ -3,18 +3,22 @@ import numpy as np
 from typing import List, Dict
 from datetime import datetime
 
+try:
+    from .pivot_index import PivotIndex, pivot_index
+except ImportError:
+    # 상대 임포트 실패 시 절대 임포트 시도
+    from pivot_index import PivotIndex, pivot_index
+
+from piona_data.feature_store import features
+
 class CreonFibonacci:
     FIBO_RETRACEMENT = [0.236, 0.382, 0.5, 0.618, 0.786]
     FIBO_EXTENSION = [1.0, 1.272, 1.414, 1.618, 2.0, 2.618]
 
-    def _find_swing_points(self, high: List[float], low: List[float], window: int = 10) -> Dict:
-        highs_idx = []
-        lows_idx = []
-        for i in range(window, len(high) - window):
-            if high[i] == max(high[i-window:i+window+1]):
-                highs_idx.append((i, high[i]))
-            if low[i] == min(low[i-window:i+window+1]):
-                lows_idx.append((i, low[i]))
+    def _find_swing_points(self, high: List[float], low: List[float], window: int = 10, pivots: PivotIndex = None) -> Dict:
+        pivots = pivots or PivotIndex(high, low)
+        highs_idx = pivots.highs(window)
+        lows_idx = pivots.lows(window)
         result = {
             "swing_highs": highs_idx[-5:] if highs_idx else [],
             "swing_lows": lows_idx[-5:] if lows_idx else [],
@@ -51,12 +55,13 @@ class CreonFibonacci:
                 levels[f"ext_{e}"] = round(high_pt - diff * e)
         return levels
 
-    def _determine_trend(self, close: List[float]) -> str:
-        if len(close) < 50:
+    def _determine_trend(self, df) -> str:
+        if len(df) < 50:
             return "unknown"
-        ma20 = np.mean(close[-20:])
-        ma50 = np.mean(close[-50:])
-        current = close[-1]
+        f = features(df)
+        ma20 = f.ma(20).iloc[-1]
+        ma50 = f.ma(50).iloc[-1]
+        current = df['close'].iloc[-1]
         if current > ma20 > ma50:
             return "uptrend"
         elif current < ma20 < ma50:
@@ -79,8 +84,8 @@ class CreonFibonacci:
         close = df['close'].tolist()
         current = close[-1]
 
-        swings = self._find_swing_points(high, low)
-        trend = self._determine_trend(close)
+        swings = self._find_swing_points(high, low, pivots=pivot_index(df))
+        trend = self._determine_trend(df)
 
         result = {
             "timestamp": datetime.now().isoformat(),
@@ -145,5 +150,17 @@ class CreonFibonacci:
 
         return result
 
+    def analyze_panel(self, panel) -> List[Dict]:
+        """
+        여러 종목 분석 (panel.codes 순서)
+
+        스윙 고저점은 종목 전체 이력 기준이라 스냅샷의 종목별 DataFrame 으로 실행한다.
+        """
+        return [self.analyze(panel.frame(code)) for code in panel.codes]
+
+# PIONASystem / test_system 에서 사용하는 공통 이름
+FibonacciEngine = CreonFibonacci
+
+
 if __name__ == "__main__":
     print("Fibonacci Engine Test - need data", flush=True)
\ No newline at end of file
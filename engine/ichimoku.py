@@ -0,0 +1,119 @@
+# engine/ichimoku.py
+# 일목균형표 전체 시계열 엔진 - 종목 하나(1차원) 또는 거래일 × 종목 패널(2차원)을 한 번에 계산
+# 구간 최고/최저는 블록 누적 극값(van Herk/Gil-Werman)으로 창 크기와 무관하게 O(N)
+
+import numpy as np
+import pandas as pd
+from typing import Dict
+
+CONVERSION_PERIOD = 9    # 전환선
+BASE_PERIOD = 26         # 기준선 / 후행스팬 위치
+LEAD2_PERIOD = 52        # 선행스팬2
+
+SERIES_COLUMNS = ["conversion", "base", "lead1", "lead2", "lagging", "lagging_position", "cloud_red"]
+
+
+def _rolling(x: np.ndarray, window: int, op, fill: float) -> np.ndarray:
+    """
+    0번 축(거래일) 방향 window 구간 극값 (구간이 모자라면 NaN, 구간 안 NaN 은 그대로 NaN)
+
+    window 크기 블록마다 앞→뒤 누적, 뒤→앞 누적을 구해 두면
+    [i, i+window-1] 구간 극값은 op(뒤→앞 누적[i], 앞→뒤 누적[i+window-1]) 이다.
+    """
+    n = x.shape[0]
+    out = np.full(x.shape, np.nan)
+    if n < window:
+        return out
+    rest = x.shape[1:]
+    pad = (-n) % window
+    xp = np.concatenate([x, np.full((pad,) + rest, fill)]) if pad else x
+    blocks = xp.reshape((-1, window) + rest)
+    prefix = op.accumulate(blocks, axis=1).reshape(xp.shape)
+    suffix = op.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(xp.shape)
+    out[window - 1:] = op(suffix[:n - window + 1], prefix[window - 1:n])
+    return out
+
+
+def rolling_max(x, window: int) -> np.ndarray:
+    return _rolling(np.asarray(x, dtype=float), window, np.maximum, -np.inf)
+
+
+def rolling_min(x, window: int) -> np.ndarray:
+    return _rolling(np.asarray(x, dtype=float), window, np.minimum, np.inf)
+
+
+def _shift(x: np.ndarray, periods: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if periods < x.shape[0]:
+        out[periods:] = x[:x.shape[0] - periods]
+    return out
+
+
+def ichimoku_series(high, low, close) -> Dict[str, np.ndarray]:
+    """
+    일목균형표 전 구간 시계열
+
+    Parameters:
+        high, low, close: (거래일,) 또는 (거래일, 종목) 배열 — 패널은 결측 없이 정렬된 값
+
+    Returns:
+        dict: 각 거래일 시점 기준 값 (analyze 를 그 날까지의 데이터로 부른 것과 같음)
+            conversion / base / lead1 / lead2: 전환선, 기준선, 선행스팬1, 선행스팬2 (기간 부족 시 NaN)
+            lagging: 후행스팬 (당일 종가), lagging_position: 26일 전 종가
+            cloud_red: 양운 여부 (bool)
+    """
+    h = np.asarray(high, dtype=float)
+    l = np.asarray(low, dtype=float)
+    c = np.asarray(close, dtype=float)
+
+    conv = (rolling_max(h, CONVERSION_PERIOD) + rolling_min(l, CONVERSION_PERIOD)) / 2
+    base = (rolling_max(h, BASE_PERIOD) + rolling_min(l, BASE_PERIOD)) / 2
+    lead2 = (rolling_max(h, LEAD2_PERIOD) + rolling_min(l, LEAD2_PERIOD)) / 2
+
+    # 전환선/기준선이 0 이면 값 없음으로 본다 (단일 시점 계산과 동일)
+    with np.errstate(invalid="ignore"):
+        lead1 = np.where((conv != 0) & (base != 0), (conv + base) / 2, np.nan)
+        cloud_red = (lead1 != 0) & (lead2 != 0) & (lead1 > lead2)
+
+    return {
+        "conversion": conv,
+        "base": base,
+        "lead1": lead1,
+        "lead2": lead2,
+        "lagging": c,
+        "lagging_position": _shift(c, BASE_PERIOD - 1),
+        "cloud_red": cloud_red,
+    }
+
+
+def ichimoku_frame(df) -> pd.DataFrame:
+    """종목 DataFrame → 일목균형표 시계열 DataFrame (백테스트용, date 컬럼 포함)"""
+    series = ichimoku_series(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy())
+    frame = pd.DataFrame(series)
+    frame["cloud_color"] = np.where(frame["cloud_red"], "양운", "음운")
+    if 'date' in df.columns:
+        frame.insert(0, "date", df['date'].to_numpy())
+    return frame
+
+
+def _rounded(value):
+    """NaN/0 → None, 그 외 정수 반올림 (단일 시점 계산의 round(x) if x else None)"""
+    if value is None or np.isnan(value) or value == 0:
+        return None
+    return round(float(value))
+
+
+def ichimoku_at(series: Dict[str, np.ndarray], i: int = -1) -> Dict:
+    """시계열의 i 번째 거래일 값 (ShinInflectionEngine 결과 형식)"""
+    cloud_red = bool(series["cloud_red"][i])
+    cloud_color = "양운" if cloud_red else "음운"
+    return {
+        "conversion": _rounded(series["conversion"][i]),
+        "base": _rounded(series["base"][i]),
+        "lead1": _rounded(series["lead1"][i]),
+        "lead2": _rounded(series["lead2"][i]),
+        "lagging": _rounded(series["lagging"][i]),
+        "lagging_position": _rounded(series["lagging_position"][i]),
+        "cloud_color": cloud_color,
+        "cloud_ahead_red": cloud_red
+    }
@@ -3,9 +3,20 @@
 # 2025-11-22 대폭 업그레이드 + None 에러 수정
 
 import numpy as np
+import pandas as pd
+from bisect import bisect_right
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 
+try:
+    from .ichimoku import ichimoku_series, ichimoku_frame, ichimoku_at, LEAD2_PERIOD
+except ImportError:
+    # 상대 임포트 실패 시 절대 임포트 시도
+    from ichimoku import ichimoku_series, ichimoku_frame, ichimoku_at, LEAD2_PERIOD
+
+from piona_data.bar_panel import window
+from piona_data.feature_store import features
+
 class ShinInflectionEngine:
     """
     신창환 변곡점 이론 완전판
@@ -29,47 +40,56 @@ class ShinInflectionEngine:
     # 가변수 vs 대수
     VARIABLE_DAYS = [9, 13, 33, 42]  # 가변수 (작은 변곡)
     MAJOR_DAYS = [26, 51, 65, 77]    # 대수 (큰 변곡)
+
+    # 특수 변곡 설명 / 경고 (lean 모드에서는 생략)
+    DAY_NOTES = {
+        9: ("전환선 변곡 — 최초 상승 징후", None),
+        13: ("단기 조정 끝 — 골든크로스 확률 최고", None),
+        26: ("기준선 변곡 — 정배열 진입 마디", None),
+        33: ("선행스팬1 괴리 — 추세 확정 구간", None),
+        42: ("회귀 위험 경계 — 속임수 구간", "60일 신고가 미갱신 시 제자리 회귀 위험"),
+        51: ("불가항력 변곡 — 추세 방향 거스르기 불가", None),
+        65: ("고점 확률 최고 — 소멸갭 주의", "51~65일 구간 대량거래+도지 출현 시 매도"),
+        77: ("최종 대마디 — 추세의 변역(變易)", "괴장년 구간 시작 — 변동성 극대화"),
+        88: ("괴장년 변곡 — 구름변곡 최종 확정", "77~88일 사이 구름변곡 발생 → 판이냐 시냐"),
+        100: ("100일 대변곡 — 장기 추세 확정", None)
+    }
     
-    def __init__(self):
+    def __init__(self, lean=False):
+        """
+        Parameters:
+            lean: True 면 변곡일 날짜 문자열/설명/경고 생략 — 점수/신호 판정 값만
+        """
         self.name = "ShinChangHwan_Complete_2025"
+        self.lean = lean
 
     # ========================================
     # 1. 일목균형표 5선 계산
     # ========================================
     def _calc_ichimoku(self, high: List[float], low: List[float], close: List[float]) -> Dict:
-        """일목균형표 5선 계산 (신창환 원본)"""
-        h, l, c = np.array(high), np.array(low), np.array(close)
-        n = len(h)
-        
-        # 전환선 (9일) — 최근 9일 고저 중간값
-        conv = (h[-9:].max() + l[-9:].min()) / 2 if n >= 9 else None
-        
-        # 기준선 (26일) — 최근 26일 고저 중간값
-        base = (h[-26:].max() + l[-26:].min()) / 2 if n >= 26 else None
-        
-        # 선행스팬 1 (26일 후) — 전환선+기준선 중간값
-        lead1 = (conv + base) / 2 if conv and base else None
-        
-        # 선행스팬 2 (26일 후) — 최근 52일 고저 중간값
-        lead2 = (h[-52:].max() + l[-52:].min()) / 2 if n >= 52 else None
-        
-        # 후행스팬 — 현재 종가를 26일 전에 기입 (26일 전 종가와 비교)
-        lagging = c[-1] if n >= 1 else None  # 현재 종가
-        lagging_position = c[-26] if n >= 26 else None  # 26일 전 종가
-        
-        # 구름 색상: lead1 > lead2 → 양운(붉은구름), lead1 < lead2 → 음운(검은구름)
-        cloud_color = "양운" if lead1 and lead2 and lead1 > lead2 else "음운"
-        
-        return {
-            "conversion": round(conv) if conv else None,
-            "base": round(base) if base else None,
-            "lead1": round(lead1) if lead1 else None,
-            "lead2": round(lead2) if lead2 else None,
-            "lagging": round(lagging) if lagging else None,
-            "lagging_position": round(lagging_position) if lagging_position else None,
-            "cloud_color": cloud_color,
-            "cloud_ahead_red": cloud_color == "양운"
-        }
+        """
+        일목균형표 5선 계산 (신창환 원본)
+
+        - 전환선 (9일) / 기준선 (26일) / 선행스팬2 (52일): 구간 고저 중간값
+        - 선행스팬1: 전환선+기준선 중간값
+        - 후행스팬: 현재 종가, 비교 위치는 26일 전 종가
+        - 구름 색상: lead1 > lead2 → 양운(붉은구름), 그 외 음운(검은구름)
+
+        전체 시계열(ichimoku.ichimoku_series)의 마지막 행을 읽는다.
+        """
+        if len(close) == 0:
+            return ichimoku_at(ichimoku_series([np.nan], [np.nan], [np.nan]))
+        return ichimoku_at(ichimoku_series(high, low, close))
+
+    def ichimoku_series(self, df):
+        """
+        일목균형표 전 구간 시계열 (백테스트, "삼위일체 구름 조건이 언제 성립했나" 조회용)
+
+        Returns:
+            DataFrame: date, conversion, base, lead1, lead2, lagging, lagging_position,
+                       cloud_red, cloud_color — 각 행은 그 날까지의 데이터로 analyze 한 값
+        """
+        return ichimoku_frame(df)
 
     # ========================================
     # 2. 전환선/기준선 폭 분석 (신창환 핵심)
@@ -111,7 +131,7 @@ class ShinInflectionEngine:
     # 3. 후행스팬 관통 체크 (신창환 필수조건)
     # ========================================
     def _check_lagging_penetration(self, high: List[float], low: List[float], 
-                                    close: List[float], ichimoku: Dict) -> Dict:
+                                    close: List[float], ichimoku: Dict, ma10) -> Dict:
         """
         후행스팬 관통 체크 (신창환 3대 매매기법 중 하나)
         - 후행스팬이 26일 전 캔들(고가)을 위로 관통 → 강력 매수
@@ -120,23 +140,20 @@ class ShinInflectionEngine:
         if len(close) < 52:
             return {"penetrated": False, "above_ma10": False, "signal": "데이터부족"}
         
-        current_close = close[-1]
-        
         # 26일 전 캔들의 고가 (후행스팬이 관통해야 할 대상)
         past_high = max(high[-52:-26]) if len(high) >= 52 else high[-26]
-        past_candle_high = high[-26]
         
+        # 10일 이평 계산 (26일 전 시점의 10일 이평, ma10 = 공용 지표 저장소의 10일 이평 Series)
+        ma10_at_lagging = ma10.iloc[-27]
+        
+        return self._lagging_signal(close[-1], past_high, high[-26], ma10_at_lagging)
+
+    def _lagging_signal(self, current_close, past_high, past_candle_high, ma10_at_lagging) -> Dict:
+        """후행스팬 관통 판단 (현재 종가 vs 26일 전 고가/10일 이평)"""
         # 후행스팬 관통 여부: 현재 종가 > 26일 전 고가
         penetrated = current_close > past_high
         candle_penetrated = current_close > past_candle_high
-        
-        # 10일 이평 계산 (26일 전 시점의 10일 이평)
-        if len(close) >= 36:
-            ma10_at_lagging = np.mean(close[-36:-26])
-            above_ma10 = current_close > ma10_at_lagging
-        else:
-            ma10_at_lagging = None
-            above_ma10 = False
+        above_ma10 = ma10_at_lagging is not None and current_close > ma10_at_lagging
         
         # 신호 판단
         if penetrated and above_ma10:
@@ -177,6 +194,11 @@ class ShinInflectionEngine:
         # 현재 시점의 SS2
         ss2_now = (h[-52:].max() + l[-52:].min()) / 2
         
+        return self._ss2_signal(ss2_77, ss2_now, h[-52:].max(), l[-52:].min(), h[-1], l[-1], days_back)
+
+    def _ss2_signal(self, ss2_77, ss2_now, high_52, low_52, current_high, current_low,
+                    days_back: int = 77) -> Dict:
+        """SS2 빗각 판단 (77일 전/현재 SS2, 52일 고저 대비 당일 고저)"""
         # 빗각 (기울기)
         slope = (ss2_now - ss2_77) / days_back
         if ss2_77 > 0:
@@ -185,11 +207,6 @@ class ShinInflectionEngine:
             slope_pct = 0
         
         # 52일 신고가/신저가 체크
-        high_52 = h[-52:].max()
-        low_52 = l[-52:].min()
-        current_high = h[-1]
-        current_low = l[-1]
-        
         new_52_high = current_high >= high_52 * 0.99  # 1% 이내
         new_52_low = current_low <= low_52 * 1.01
         
@@ -218,9 +235,9 @@ class ShinInflectionEngine:
     # ========================================
     # 5. 300일 이평선 절대 금기 체크
     # ========================================
-    def _check_ma300_rule(self, close: List[float], cloud_color: str) -> Dict:
+    def _check_ma300_rule(self, close: List[float], cloud_color: str, ma300=None) -> Dict:
         """
-        300일 이평선 절대 금기 규칙
+        300일 이평선 절대 금기 규칙 (ma300 = 공용 지표 저장소의 300일 이평, 300봉 이상일 때)
         - 300일선 아래 + 음운 → 절대 매수 금지 (폭락 위험)
         - 300일선 위 + 양운 → 매수 가능
         """
@@ -228,9 +245,10 @@ class ShinInflectionEngine:
             # 데이터 부족해도 기본값 반환
             return {"ma300": None, "above_ma300": None, "distance_pct": 0, "position": "데이터부족", "signal": "판단불가"}
         
-        ma300 = np.mean(close[-300:])
-        current = close[-1]
-        
+        return self._ma300_signal(ma300, close[-1], cloud_color)
+
+    def _ma300_signal(self, ma300, current, cloud_color: str) -> Dict:
+        """300일 이평 대비 현재가 + 구름 색 판단"""
         above_ma300 = current > ma300
         distance_pct = ((current - ma300) / ma300) * 100
         
@@ -266,21 +284,27 @@ class ShinInflectionEngine:
         if len(dates) < 100:
             return []
         
+        # 날짜 매칭 (거래일 기준으로 근사): target_date 이전 마지막 거래일
+        return self._inflection_signals(
+            dates[-1], lambda target_date: bisect_right(dates, target_date) - 1,
+            close, lagging_result, cloud_color
+        )
+
+    def _inflection_signals(self, today, locate, close: List[float],
+                            lagging_result: Dict, cloud_color: str) -> List[Dict]:
+        """
+        변곡일별 신호
+
+        Parameters:
+            today: 마지막 거래일 (datetime)
+            locate: 날짜 → 그 날 이전 마지막 거래일의 close 위치 (없으면 -1)
+        """
         inflections = []
-        today = dates[-1]
-        
         for days in self.INFLECTION_DAYS:
             target_date = today - timedelta(days=days)
             
-            # 날짜 매칭 (거래일 기준으로 근사)
-            idx = None
-            for i, d in enumerate(dates):
-                if d <= target_date:
-                    idx = i
-                elif d > target_date:
-                    break
-            
-            if idx is None or idx < 0:
+            idx = locate(target_date)
+            if idx < 0:
                 continue
                 
             price_then = close[idx]
@@ -298,59 +322,34 @@ class ShinInflectionEngine:
             else:
                 node_type = "변곡"
             
-            signal = {
-                "days": days,
-                "date": target_date.strftime("%Y-%m-%d") if hasattr(target_date, 'strftime') else str(target_date),
+            # 특수 변곡 강도 (삼위일체 51/77 판정에 사용)
+            strength = None
+            if days == 26 and cloud_color == "양운":
+                strength = "★★★ 정배열 확정"
+            elif days == 51 and abs(change_pct) > 10 and lagging_result.get("penetrated"):
+                strength = "★★★★★ 불가항력 발동"
+            elif days == 77 and cloud_color == "양운" and lagging_result.get("penetrated"):
+                strength = "★★★★★ 대마디 삼위일체"
+
+            signal = {"days": days}
+            if not self.lean:
+                signal["date"] = target_date.strftime("%Y-%m-%d") if hasattr(target_date, 'strftime') else str(target_date)
+            signal.update({
                 "price_then": round(price_then),
                 "change_pct": round(change_pct, 2),
                 "is_irresistible": days in self.IRRESISTIBLE,
                 "is_major": days in self.MAJOR_DAYS,
                 "node_type": node_type,
-                "strength": None,
-                "warning": None
-            }
-            
-            # 특수 변곡 처리
-            if days == 9:
-                signal["description"] = "전환선 변곡 — 최초 상승 징후"
-            
-            elif days == 13:
-                signal["description"] = "단기 조정 끝 — 골든크로스 확률 최고"
-            
-            elif days == 26:
-                signal["description"] = "기준선 변곡 — 정배열 진입 마디"
-                if cloud_color == "양운":
-                    signal["strength"] = "★★★ 정배열 확정"
-            
-            elif days == 33:
-                signal["description"] = "선행스팬1 괴리 — 추세 확정 구간"
-            
-            elif days == 42:
-                signal["description"] = "회귀 위험 경계 — 속임수 구간"
-                signal["warning"] = "60일 신고가 미갱신 시 제자리 회귀 위험"
-            
-            elif days == 51:
-                signal["description"] = "불가항력 변곡 — 추세 방향 거스르기 불가"
-                if abs(change_pct) > 10 and lagging_result.get("penetrated"):
-                    signal["strength"] = "★★★★★ 불가항력 발동"
-            
-            elif days == 65:
-                signal["description"] = "고점 확률 최고 — 소멸갭 주의"
-                signal["warning"] = "51~65일 구간 대량거래+도지 출현 시 매도"
-            
-            elif days == 77:
-                signal["description"] = "최종 대마디 — 추세의 변역(變易)"
-                signal["warning"] = "괴장년 구간 시작 — 변동성 극대화"
-                if cloud_color == "양운" and lagging_result.get("penetrated"):
-                    signal["strength"] = "★★★★★ 대마디 삼위일체"
-            
-            elif days == 88:
-                signal["description"] = "괴장년 변곡 — 구름변곡 최종 확정"
-                signal["warning"] = "77~88일 사이 구름변곡 발생 → 판이냐 시냐"
-            
-            elif days == 100:
-                signal["description"] = "100일 대변곡 — 장기 추세 확정"
-            
+                "strength": strength
+            })
+
+            # 특수 변곡 설명
+            if not self.lean:
+                description, warning = self.DAY_NOTES.get(days, (None, None))
+                signal["warning"] = warning
+                if description is not None:
+                    signal["description"] = description
+
             inflections.append(signal)
         
         return inflections
@@ -431,19 +430,82 @@ class ShinInflectionEngine:
         conv_base = self._calc_conv_base_width(ichimoku, close)
         
         # 3. 후행스팬 관통
-        lagging = self._check_lagging_penetration(high, low, close, ichimoku)
+        f = features(df)
+        lagging = self._check_lagging_penetration(high, low, close, ichimoku, f.ma(10))
         
         # 4. SS2 빗각
         ss2 = self._calc_ss2_slope(high, low)
         
         # 5. 300일 이평 체크
-        ma300 = self._check_ma300_rule(close, ichimoku["cloud_color"])
+        ma300 = self._check_ma300_rule(close, ichimoku["cloud_color"],
+                                       f.ma(300).iloc[-1] if len(close) >= 300 else None)
         
         # 6. 변곡일 분석
         inflections = self._analyze_inflection_days(
             dates, close, lagging, ichimoku["cloud_color"]
         )
         
+        return self._decide(code, close[-1], ichimoku, conv_base, lagging, ss2, ma300, inflections)
+
+    def analyze_panel(self, panel) -> List[Dict]:
+        """
+        여러 종목 변곡 분석 (일목균형표/후행스팬/SS2/300일선 지표를 종목 축으로 한 번에 계산)
+
+        Parameters:
+            panel: piona_data.bar_panel.BarPanel
+
+        Returns:
+            list: 종목별 analyze(df) 결과 (panel.codes 순서)
+        """
+        high, low, close = panel.high, panel.low, panel.close
+        with np.errstate(invalid="ignore"):
+            ichimoku = ichimoku_series(window(high, LEAD2_PERIOD), window(low, LEAD2_PERIOD),
+                                       window(close, LEAD2_PERIOD))
+        past_high = window(high, 26, lag=26).max(axis=0)
+        past_candle_high = window(high, 1, lag=25)[0]
+        f = features(panel)
+        ma10_at_lagging = f.ma(10, lag=26)
+        high_52, low_52 = window(high, 52).max(axis=0), window(low, 52).min(axis=0)
+        ss2_77 = (window(high, 52, lag=77).max(axis=0) + window(low, 52, lag=77).min(axis=0)) / 2
+        ss2_now = (high_52 + low_52) / 2
+        ma300 = f.ma(300)
+
+        results = []
+        for j, count in enumerate(panel.counts):
+            if count < 100:
+                results.append({"error": "데이터 부족 (최소 100일 필요)"})
+                continue
+            current = close[-1, j]
+            ichimoku_j = ichimoku_at({k: v[-1:, j] for k, v in ichimoku.items()})
+            cloud_color = ichimoku_j["cloud_color"]
+
+            lagging = self._lagging_signal(current, past_high[j], past_candle_high[j], ma10_at_lagging[j])
+            if count >= 77 + 52:
+                ss2 = self._ss2_signal(ss2_77[j], ss2_now[j], high_52[j], low_52[j], high[-1, j], low[-1, j])
+            else:
+                ss2 = self._calc_ss2_slope([], [])
+            if count >= 300:
+                ma300_rule = self._ma300_signal(ma300[j], current, cloud_color)
+            else:
+                ma300_rule = self._check_ma300_rule([], cloud_color)
+
+            # 변곡일: 종목의 거래일(YYYYMMDD) 에서 이진 탐색
+            dates = panel.dates[-min(count, panel.depth):, j]
+            closes = close[-len(dates):, j]
+            inflections = self._inflection_signals(
+                pd.Timestamp(str(dates[-1])),
+                lambda target: int(np.searchsorted(dates, int(target.strftime("%Y%m%d")), side="right")) - 1,
+                closes, lagging, cloud_color
+            )
+
+            conv_base = self._calc_conv_base_width(ichimoku_j, [current])
+            results.append(self._decide(panel.codes[j], current, ichimoku_j, conv_base, lagging,
+                                        ss2, ma300_rule, inflections))
+        return results
+
+    def _decide(self, code, current_price, ichimoku: Dict, conv_base: Dict, lagging: Dict,
+                ss2: Dict, ma300: Dict, inflections: List[Dict]) -> Dict:
+        """삼위일체 체크 + 최종 신호 (지표 계산 결과만 사용)"""
         # 7. 삼위일체 체크
         trinity = self._check_trinity(
             lagging, ichimoku["cloud_color"], inflections, ss2
@@ -466,7 +528,7 @@ class ShinInflectionEngine:
         return {
             "timestamp": datetime.now().isoformat(),
             "code": code,
-            "current_price": close[-1],
+            "current_price": current_price,
             
             # 일목균형표
             "ichimoku": ichimoku,
@@ -495,6 +557,10 @@ class ShinInflectionEngine:
         }
 
 
+# PIONASystem / test_system 에서 사용하는 공통 이름
+InflectionEngine = ShinInflectionEngine
+
+
 # 테스트용
 if __name__ == "__main__":
     print("ShinInflectionEngine 테스트")
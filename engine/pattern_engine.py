@@ -4,23 +4,26 @@ from typing import List, Dict
 from collections import defaultdict
 from datetime import datetime
 
+try:
+    from .pivot_index import PivotIndex, pivot_index
+    from .pattern_scanner import pattern_events
+except ImportError:
+    # 상대 임포트 실패 시 절대 임포트 시도
+    from pivot_index import PivotIndex, pivot_index
+    from pattern_scanner import pattern_events
+
 class ShinPatternEngine:
     def __init__(self):
         self.pattern_db = defaultdict(list)
 
-    def _find_pivots(self, prices: List[float], window: int = 5) -> Dict:
-        highs = []
-        lows = []
-        for i in range(window, len(prices) - window):
-            if prices[i] == max(prices[i-window:i+window+1]):
-                highs.append((i, prices[i]))
-            if prices[i] == min(prices[i-window:i+window+1]):
-                lows.append((i, prices[i]))
-        return {"highs": highs, "lows": lows}
-
-    def detect_double_bottom(self, low: List[float], high: List[float], close: List[float]) -> Dict:
-        pivots = self._find_pivots(low)
-        lows = pivots["lows"]
+    PIVOT_WINDOW = 5
+
+    def _find_pivots(self, prices: List[float], window: int = PIVOT_WINDOW) -> Dict:
+        index = PivotIndex(prices, prices)
+        return {"highs": index.highs(window), "lows": index.lows(window)}
+
+    def detect_double_bottom(self, low: List[float], high: List[float], close: List[float], pivots: PivotIndex = None) -> Dict:
+        lows = (pivots or PivotIndex(high, low)).lows(self.PIVOT_WINDOW)
         if len(lows) < 2:
             return {"detected": False}
         last_two = lows[-2:]
@@ -33,9 +36,8 @@ class ShinPatternEngine:
             return {"detected": True, "pattern": "double_bottom", "confidence": 85, "target": round(target), "signal": "BUY"}
         return {"detected": False}
 
-    def detect_double_top(self, high: List[float], low: List[float], close: List[float]) -> Dict:
-        pivots = self._find_pivots(high)
-        highs = pivots["highs"]
+    def detect_double_top(self, high: List[float], low: List[float], close: List[float], pivots: PivotIndex = None) -> Dict:
+        highs = (pivots or PivotIndex(high, low)).highs(self.PIVOT_WINDOW)
         if len(highs) < 2:
             return {"detected": False}
         last_two = highs[-2:]
@@ -47,9 +49,8 @@ class ShinPatternEngine:
             return {"detected": True, "pattern": "double_top", "confidence": 85, "signal": "SELL"}
         return {"detected": False}
 
-    def detect_triple_bottom(self, low: List[float], high: List[float], close: List[float]) -> Dict:
-        pivots = self._find_pivots(low)
-        lows = pivots["lows"]
+    def detect_triple_bottom(self, low: List[float], high: List[float], close: List[float], pivots: PivotIndex = None) -> Dict:
+        lows = (pivots or PivotIndex(high, low)).lows(self.PIVOT_WINDOW)
         if len(lows) < 3:
             return {"detected": False}
         last_three = lows[-3:]
@@ -63,9 +64,8 @@ class ShinPatternEngine:
                 return {"detected": True, "pattern": "triple_bottom", "confidence": 90, "signal": "STRONG_BUY"}
         return {"detected": False}
 
-    def detect_triple_top(self, high: List[float], low: List[float], close: List[float]) -> Dict:
-        pivots = self._find_pivots(high)
-        highs = pivots["highs"]
+    def detect_triple_top(self, high: List[float], low: List[float], close: List[float], pivots: PivotIndex = None) -> Dict:
+        highs = (pivots or PivotIndex(high, low)).highs(self.PIVOT_WINDOW)
         if len(highs) < 3:
             return {"detected": False}
         last_three = highs[-3:]
@@ -79,9 +79,8 @@ class ShinPatternEngine:
                 return {"detected": True, "pattern": "triple_top", "confidence": 90, "signal": "STRONG_SELL"}
         return {"detected": False}
 
-    def detect_head_shoulders(self, high: List[float], low: List[float], close: List[float]) -> Dict:
-        pivots = self._find_pivots(high)
-        highs = pivots["highs"]
+    def detect_head_shoulders(self, high: List[float], low: List[float], close: List[float], pivots: PivotIndex = None) -> Dict:
+        highs = (pivots or PivotIndex(high, low)).highs(self.PIVOT_WINDOW)
         if len(highs) < 3:
             return {"detected": False}
         last_three = highs[-3:]
@@ -92,9 +91,8 @@ class ShinPatternEngine:
                 return {"detected": True, "pattern": "head_shoulders", "confidence": 92, "signal": "STRONG_SELL"}
         return {"detected": False}
 
-    def detect_inverse_head_shoulders(self, low: List[float], high: List[float], close: List[float]) -> Dict:
-        pivots = self._find_pivots(low)
-        lows = pivots["lows"]
+    def detect_inverse_head_shoulders(self, low: List[float], high: List[float], close: List[float], pivots: PivotIndex = None) -> Dict:
+        lows = (pivots or PivotIndex(high, low)).lows(self.PIVOT_WINDOW)
         if len(lows) < 3:
             return {"detected": False}
         last_three = lows[-3:]
@@ -265,6 +263,7 @@ class ShinPatternEngine:
         low = df['low'].tolist()
         open_p = df['open'].tolist()
         volume = df['volume'].tolist()
+        pivots = pivot_index(df)
 
         results = {
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M"),
@@ -275,12 +274,12 @@ class ShinPatternEngine:
         }
 
         patterns = [
-            self.detect_double_bottom(low, high, close),
-            self.detect_double_top(high, low, close),
-            self.detect_triple_bottom(low, high, close),
-            self.detect_triple_top(high, low, close),
-            self.detect_head_shoulders(high, low, close),
-            self.detect_inverse_head_shoulders(low, high, close),
+            self.detect_double_bottom(low, high, close, pivots),
+            self.detect_double_top(high, low, close, pivots),
+            self.detect_triple_bottom(low, high, close, pivots),
+            self.detect_triple_top(high, low, close, pivots),
+            self.detect_head_shoulders(high, low, close, pivots),
+            self.detect_inverse_head_shoulders(low, high, close, pivots),
             self.detect_ascending_triangle(high, low, close),
             self.detect_descending_triangle(high, low, close),
             self.detect_bullish_engulfing(open_p, close),
@@ -322,5 +321,29 @@ class ShinPatternEngine:
 
         return results
 
+    # 다른 엔진과 같은 analyze(df) 인터페이스
+    analyze = run_all_patterns
+
+    def scan_history(self, df):
+        """
+        전 구간 패턴 이벤트 (적중률 분석/백테스트용)
+
+        각 행 = 그 날까지의 데이터로 run_all_patterns 를 불렀을 때 감지된 패턴 (bool 열 20개)
+        """
+        return pattern_events(df, pivot_index(df))
+
+    def analyze_panel(self, panel) -> List[Dict]:
+        """
+        여러 종목 분석 (panel.codes 순서)
+
+        피벗 패턴은 종목 전체 이력 기준이라 스냅샷의 종목별 DataFrame 으로 실행한다.
+        """
+        return [self.analyze(panel.frame(code)) for code in panel.codes]
+
+
+# PIONASystem / test_system 에서 사용하는 공통 이름
+PatternEngine = ShinPatternEngine
+
+
 if __name__ == "__main__":
     print("Pattern Engine Test - need data", flush=True)
\ No newline at end of file
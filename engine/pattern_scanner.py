@@ -0,0 +1,202 @@
+# engine/pattern_scanner.py
+# 패턴 전 구간 스캐너 - ShinPatternEngine 의 20개 detect_* 를 모든 거래일에 대해 한 번에 평가
+# 결과는 (거래일, 패턴) bool 행렬: t 행 = 그 날까지의 데이터로 run_all_patterns 를 부른 것과 같음
+
+import numpy as np
+import pandas as pd
+from typing import Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    from .pivot_index import PivotIndex
+except ImportError:
+    # 상대 임포트 실패 시 절대 임포트 시도
+    from pivot_index import PivotIndex
+
+PIVOT_WINDOW = 5         # ShinPatternEngine.PIVOT_WINDOW
+TRIANGLE_PERIOD = 20
+VOLUME_PERIOD = 20
+
+# run_all_patterns 의 패턴 순서 (행렬 열 순서)
+PATTERN_NAMES: Tuple[str, ...] = (
+    "double_bottom", "double_top", "triple_bottom", "triple_top",
+    "head_shoulders", "inverse_head_shoulders",
+    "ascending_triangle", "descending_triangle",
+    "bullish_engulfing", "bearish_engulfing", "morning_star", "evening_star",
+    "hammer", "shooting_star", "doji", "three_white_soldiers", "three_black_crows",
+    "gap_up", "gap_down", "volume_spike",
+)
+
+
+def _lag(x: np.ndarray, k: int) -> np.ndarray:
+    """k 봉 전 값 (앞쪽은 NaN)"""
+    out = np.full(x.shape, np.nan)
+    if k < len(x):
+        out[k:] = x[:len(x) - k]
+    return out
+
+
+def _pivot_pairs(pivots: np.ndarray, n: int, count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    각 거래일에 확정된 피벗 중 마지막 count 개의 시작 위치
+
+    t 일까지의 데이터에서 피벗 j 는 j + PIVOT_WINDOW <= t 일 때만 보이므로
+    전체 피벗 목록을 t - PIVOT_WINDOW 까지 자른 것과 같다.
+
+    Returns:
+        (first, valid): first[t] = 마지막 count 개 중 첫 피벗의 목록 위치, valid[t] = count 개 이상 확정
+    """
+    confirmed = np.searchsorted(pivots, np.arange(n) - PIVOT_WINDOW, side="right")
+    valid = confirmed >= count
+    return np.where(valid, confirmed - count, 0), valid
+
+
+def _span_extreme(values: np.ndarray, pivots: np.ndarray, reduce) -> np.ndarray:
+    """연속 피벗 쌍 구간 [pivots[i], pivots[i+1]] 극값 (양 끝 포함)"""
+    if len(pivots) < 2:
+        return np.empty(0)
+    inner = reduce.reduceat(values[:pivots[-1]], pivots[:-1])
+    return reduce(inner, values[pivots[1:]])
+
+
+def _double(prices, pivots, close, neck, first, valid, breakout):
+    """쌍바닥/쌍봉: 두 피벗 가격 차 5% 미만 + 넥라인 돌파"""
+    if len(pivots) < 2:
+        return np.zeros(len(close), dtype=bool)
+    p0, p1 = prices[pivots[:-1]], prices[pivots[1:]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pair_ok = (p0 != 0) & (p1 != 0) & (np.abs(p0 - p1) / p0 < 0.05)
+    return valid & pair_ok[first] & breakout(close, neck[first])
+
+
+def _triple(prices, pivots, close, neck, first, valid, breakout):
+    """삼중바닥/삼중천장: 세 피벗이 평균 대비 3% 이내 + 넥라인 돌파"""
+    if len(pivots) < 3:
+        return np.zeros(len(close), dtype=bool)
+    p0, p1, p2 = prices[pivots[:-2]], prices[pivots[1:-1]], prices[pivots[2:]]
+    avg = (p0 + p1 + p2) / 3
+    with np.errstate(divide="ignore", invalid="ignore"):
+        near = [np.abs(p - avg) / avg < 0.03 for p in (p0, p1, p2)]
+    triple_ok = (np.minimum(np.minimum(p0, p1), p2) != 0) & (avg > 0) & near[0] & near[1] & near[2]
+    return valid & triple_ok[first] & breakout(close, neck[first])
+
+
+def _shoulders(prices, pivots, close, neck, first, valid, inverse):
+    """머리어깨(역머리어깨): 가운데 피벗이 가장 높고(낮고) 양 어깨 차 5% 미만 + 넥라인 돌파"""
+    if len(pivots) < 3:
+        return np.zeros(len(close), dtype=bool)
+    left, head, right = prices[pivots[:-2]], prices[pivots[1:-1]], prices[pivots[2:]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        even = np.abs(left - right) / left < 0.05
+    if inverse:
+        shape_ok = (left > 0) & (head < left) & (head < right) & even
+        return valid & shape_ok[first] & (close > neck[first])
+    shape_ok = (left > 0) & (head > left) & (head > right) & even
+    return valid & shape_ok[first] & (close < neck[first])
+
+
+def scan_patterns(open_p, high, low, close, volume, pivots: PivotIndex = None) -> np.ndarray:
+    """
+    20개 패턴 전 구간 이벤트 행렬
+
+    Parameters:
+        open_p, high, low, close, volume: 종목 하나의 (거래일,) 배열
+        pivots: 같은 고가/저가의 PivotIndex (없으면 생성)
+
+    Returns:
+        np.ndarray: (거래일, len(PATTERN_NAMES)) bool — [t, k] = t 일 기준 PATTERN_NAMES[k] 감지
+    """
+    o = np.asarray(open_p, dtype=float)
+    h = np.asarray(high, dtype=float)
+    l = np.asarray(low, dtype=float)
+    c = np.asarray(close, dtype=float)
+    v = np.asarray(volume, dtype=float)
+    n = len(c)
+    t = np.arange(n)
+    pivots = pivots or PivotIndex(high, low)
+    events = np.zeros((n, len(PATTERN_NAMES)), dtype=bool)
+    col = {name: k for k, name in enumerate(PATTERN_NAMES)}
+
+    # ---- 피벗 기반 (쌍/삼중 바닥·천장, 머리어깨) ----
+    low_piv = pivots.low_index(PIVOT_WINDOW)
+    high_piv = pivots.high_index(PIVOT_WINDOW)
+    low_neck = _span_extreme(h, low_piv, np.maximum)     # 저점 쌍 사이 최고가
+    high_neck = _span_extreme(l, high_piv, np.minimum)   # 고점 쌍 사이 최저가
+    low_neck3 = np.maximum(low_neck[:-1], low_neck[1:])
+    high_neck3 = np.minimum(high_neck[:-1], high_neck[1:])
+    above, below = np.greater, np.less
+
+    first, valid = _pivot_pairs(low_piv, n, 2)
+    events[:, col["double_bottom"]] = _double(l, low_piv, c, low_neck, first, valid, above)
+    first, valid = _pivot_pairs(high_piv, n, 2)
+    events[:, col["double_top"]] = _double(h, high_piv, c, high_neck, first, valid, below)
+
+    first, valid = _pivot_pairs(low_piv, n, 3)
+    events[:, col["triple_bottom"]] = _triple(l, low_piv, c, low_neck3, first, valid, above)
+    events[:, col["inverse_head_shoulders"]] = _shoulders(l, low_piv, c, low_neck3, first, valid, True)
+    first, valid = _pivot_pairs(high_piv, n, 3)
+    events[:, col["triple_top"]] = _triple(h, high_piv, c, high_neck3, first, valid, below)
+    events[:, col["head_shoulders"]] = _shoulders(h, high_piv, c, high_neck3, first, valid, False)
+
+    # ---- 삼각형 (최근 20일 고가/저가 평탄도 + 추세 기울기) ----
+    if n >= TRIANGLE_PERIOD:
+        hw = sliding_window_view(h, TRIANGLE_PERIOD)
+        lw = sliding_window_view(l, TRIANGLE_PERIOD)
+        # polyfit 1차 기울기 부호 = 중심화한 x 와의 내적 부호
+        x = 2 * np.arange(TRIANGLE_PERIOD) - (TRIANGLE_PERIOD - 1)
+        end = c[TRIANGLE_PERIOD - 1:]
+        h_mean, l_mean = hw.mean(axis=1), lw.mean(axis=1)
+        events[TRIANGLE_PERIOD - 1:, col["ascending_triangle"]] = (
+            (hw.std(axis=1) < h_mean * 0.02) & (lw @ x > 0) & (end > h_mean))
+        events[TRIANGLE_PERIOD - 1:, col["descending_triangle"]] = (
+            (lw.std(axis=1) < l_mean * 0.02) & (hw @ x < 0) & (end < l_mean))
+
+    # ---- 캔들 ----
+    o1, c1, h1, l1 = _lag(o, 1), _lag(c, 1), _lag(h, 1), _lag(l, 1)
+    o2, c2 = _lag(o, 2), _lag(c, 2)
+    bull, bear = c > o, c < o
+    bull1, bear1 = c1 > o1, c1 < o1
+    bull2, bear2 = c2 > o2, c2 < o2
+
+    events[:, col["bullish_engulfing"]] = (t >= 2) & bear1 & bull & (o < c1) & (c > o1)
+    events[:, col["bearish_engulfing"]] = (t >= 2) & bull1 & bear & (o > c1) & (c < o1)
+
+    small1 = np.abs(c1 - o1) < (h1 - l1) * 0.3
+    mid2 = (o2 + c2) / 2
+    events[:, col["morning_star"]] = (t >= 3) & bear2 & small1 & (o1 < c2) & bull & (c > mid2)
+    events[:, col["evening_star"]] = (t >= 3) & bull2 & small1 & (o1 > c2) & bear & (c < mid2)
+
+    body = np.abs(c - o)
+    upper = h - np.maximum(o, c)
+    lower = np.minimum(o, c) - l
+    rng = h - l
+    events[:, col["hammer"]] = (t >= 1) & (body > 0) & (lower > body * 2) & (upper < body * 0.5)
+    events[:, col["shooting_star"]] = (t >= 1) & (body > 0) & (upper > body * 2) & (lower < body * 0.5)
+    events[:, col["doji"]] = (t >= 1) & (rng > 0) & (body < rng * 0.1)
+
+    events[:, col["three_white_soldiers"]] = ((t >= 3) & bull2 & bull1 & bull
+                                              & (c > c1) & (c1 > c2) & (o1 > o2) & (o > o1))
+    events[:, col["three_black_crows"]] = ((t >= 3) & bear2 & bear1 & bear
+                                           & (c < c1) & (c1 < c2) & (o1 < o2) & (o < o1))
+
+    # ---- 갭 / 거래량 ----
+    with np.errstate(divide="ignore", invalid="ignore"):
+        events[:, col["gap_up"]] = (l > h1) & ((l - h1) / h1 * 100 > 1)
+        events[:, col["gap_down"]] = (h < l1) & ((l1 - h) / l1 * 100 > 1)
+
+    if n > VOLUME_PERIOD:
+        avg_vol = sliding_window_view(v[:-1], VOLUME_PERIOD).mean(axis=1)
+        spike = v[VOLUME_PERIOD:]
+        events[VOLUME_PERIOD:, col["volume_spike"]] = (avg_vol > 0) & (spike > avg_vol * 2)
+
+    return events
+
+
+def pattern_events(df, pivots: PivotIndex = None) -> pd.DataFrame:
+    """종목 DataFrame → 패턴 이벤트 DataFrame (열 = PATTERN_NAMES, date 컬럼 포함)"""
+    events = scan_patterns(df['open'].to_numpy(), df['high'].to_numpy(), df['low'].to_numpy(),
+                           df['close'].to_numpy(), df['volume'].to_numpy(), pivots)
+    frame = pd.DataFrame(events, columns=list(PATTERN_NAMES))
+    if 'date' in df.columns:
+        frame.insert(0, "date", df['date'].to_numpy())
+    return frame
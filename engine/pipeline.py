@@ -0,0 +1,162 @@
+# engine/pipeline.py
+# 엔진 DAG 파이프라인 - 노드마다 입력(앞 노드 출력/소스 이름)과 출력(노드 이름)을 선언
+# 입력이 모두 준비된 노드부터 실행: threaded 노드는 스레드 풀에서 동시에 (NumPy/pandas 연산은 GIL 을 놓는다),
+# 나머지는 스케줄러 스레드에서 바로 실행. 각 출력은 한 번만 계산해 모든 후속 노드가 함께 쓴다.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+class Node:
+    """파이프라인 노드: func(*inputs 값) → 출력 (이름 = name)"""
+
+    def __init__(self, name: str, func: Callable, inputs: Tuple[str, ...] = (),
+                 threaded: bool = False, fallback: Optional[Callable] = None):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.threaded = threaded
+        self.fallback = fallback    # 예외 → 대체 출력 (None 이면 예외를 그대로 올림)
+
+
+class PipelineResult(dict):
+    """
+    파이프라인 실행 결과 (소스 + 노드 이름 → 값)
+
+    Attributes:
+        timings: 노드별 실행 시간 (초, 실행한 노드만)
+    """
+
+    def __init__(self, values: Dict, timings: Dict[str, float]):
+        super().__init__(values)
+        self.timings = timings
+
+
+class Pipeline:
+    """
+    엔진 DAG 파이프라인
+
+    사용 예:
+        pipeline = Pipeline()
+        pipeline.add('macro', macro.analyze, ('df',), threaded=True)
+        pipeline.add('volatility', volatility.analyze, ('df',), threaded=True)
+        pipeline.add('signals', lambda m, v: {'macro': m, 'volatility': v}, ('macro', 'volatility'))
+        result = pipeline.run(df=df)
+        result['signals'], result.timings
+    """
+
+    def __init__(self, max_workers: int = 4):
+        """
+        Parameters:
+            max_workers: threaded 노드 스레드 수 (0 이면 모든 노드를 추가 순서대로 현재 스레드에서 실행)
+        """
+        self.max_workers = max_workers
+        self.nodes: Dict[str, Node] = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def add(self, name: str, func: Callable, inputs: Iterable[str] = (),
+            threaded: bool = False, fallback: Optional[Callable] = None) -> "Pipeline":
+        """노드 추가 (입력은 나중에 추가할 노드나 run 의 소스 이름이어도 된다)"""
+        if name in self.nodes:
+            raise ValueError(f"중복 노드: {name}")
+        self.nodes[name] = Node(name, func, tuple(inputs), threaded, fallback)
+        return self
+
+    def run(self, targets: Optional[Iterable[str]] = None, **sources) -> PipelineResult:
+        """
+        파이프라인 실행 (여러 스레드에서 동시에 호출해도 된다)
+
+        Parameters:
+            targets: 필요한 노드 이름 (None 이면 전체, 지정하면 그 노드와 선행 노드만 실행)
+            **sources: 소스 값 (노드 입력 이름)
+
+        Returns:
+            PipelineResult
+        """
+        needed = self._needed(targets, sources)
+        values = dict(sources)
+        timings = {}
+
+        # 입력 대기 수 / 후속 노드
+        waiting = {name: {i for i in self.nodes[name].inputs if i not in sources} for name in needed}
+        dependents = {name: [] for name in needed}
+        for name in needed:
+            for i in waiting[name]:
+                dependents[i].append(name)
+        ready = [name for name in needed if not waiting[name]]
+        running = {}
+        executor = self._pool()
+
+        def finish(name, value, seconds):
+            values[name] = value
+            timings[name] = seconds
+            for d in dependents[name]:
+                waiting[d].discard(name)
+                if not waiting[d]:
+                    ready.append(d)
+
+        while ready or running:
+            # 추가 순서대로 (스레드 노드 먼저 넘기고 가벼운 노드는 그동안 여기서 실행)
+            batch = sorted(ready, key=list(self.nodes).index)
+            ready.clear()
+            for name in batch:
+                node = self.nodes[name]
+                args = [values[i] for i in node.inputs]
+                if node.threaded and executor is not None:
+                    running[executor.submit(self._call, node, args)] = name
+            for name in batch:
+                node = self.nodes[name]
+                if not (node.threaded and executor is not None):
+                    finish(name, *self._call(node, [values[i] for i in node.inputs]))
+            if ready or not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                finish(running.pop(future), *future.result())
+
+        return PipelineResult(values, timings)
+
+    def _needed(self, targets, sources):
+        """실행할 노드 (추가 순서) — 없는 입력/순환 검사"""
+        names = list(self.nodes) if targets is None else list(targets)
+        needed, visiting = set(), set()
+
+        def visit(name, path):
+            if name in needed:
+                return
+            if name not in self.nodes:
+                raise KeyError(f"입력 없음: {name} ({' → '.join(path)})")
+            if name in visiting:
+                raise ValueError(f"순환 의존: {' → '.join(path + (name,))}")
+            visiting.add(name)
+            for i in self.nodes[name].inputs:
+                if i not in sources:
+                    visit(i, path + (name,))
+            visiting.discard(name)
+            needed.add(name)
+
+        for name in names:
+            visit(name, ())
+        return [name for name in self.nodes if name in needed]
+
+    def _pool(self):
+        if self.max_workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="pipeline")
+            return self._executor
+
+    @staticmethod
+    def _call(node: Node, args):
+        start = time.perf_counter()
+        try:
+            value = node.func(*args)
+        except Exception as e:
+            if node.fallback is None:
+                raise
+            value = node.fallback(e)
+        return value, time.perf_counter() - start
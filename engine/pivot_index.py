@@ -0,0 +1,78 @@
+# engine/pivot_index.py
+# 공용 피벗(스윙 고점/저점) 인덱스 - 패턴/지지저항/피보나치 엔진이 함께 사용
+# numpy 슬라이딩 창 극값으로 한 번에 계산, 창 크기별 캐시
+
+import weakref
+import numpy as np
+from typing import Dict, List, Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class PivotIndex:
+    """
+    종목 하나의 고가/저가 배열에 대한 피벗 인덱스
+
+    i 번째 봉이 [i-window, i+window] 구간의 최고가(최저가)와 같으면 피벗 고점(저점).
+    (기존 엔진 루프의 prices[i] == max(prices[i-w:i+w+1]) 와 동일, 동률은 모두 피벗)
+    창 크기별 결과는 한 번 계산 후 재사용한다.
+    """
+
+    def __init__(self, high, low):
+        self.high = np.asarray(high)
+        self.low = np.asarray(low)
+        self._highs = {}
+        self._lows = {}
+
+    def __len__(self):
+        return len(self.high)
+
+    def high_index(self, window: int) -> np.ndarray:
+        """피벗 고점 봉 번호 배열 (고가 기준)"""
+        if window not in self._highs:
+            self._highs[window] = self._extrema(self.high, window, np.max)
+        return self._highs[window]
+
+    def low_index(self, window: int) -> np.ndarray:
+        """피벗 저점 봉 번호 배열 (저가 기준)"""
+        if window not in self._lows:
+            self._lows[window] = self._extrema(self.low, window, np.min)
+        return self._lows[window]
+
+    def highs(self, window: int) -> List[Tuple[int, float]]:
+        """[(봉 번호, 고가), ...] (기존 엔진 형식)"""
+        idx = self.high_index(window)
+        return list(zip(idx.tolist(), self.high[idx].tolist()))
+
+    def lows(self, window: int) -> List[Tuple[int, float]]:
+        """[(봉 번호, 저가), ...] (기존 엔진 형식)"""
+        idx = self.low_index(window)
+        return list(zip(idx.tolist(), self.low[idx].tolist()))
+
+    @staticmethod
+    def _extrema(prices: np.ndarray, window: int, reduce) -> np.ndarray:
+        size = 2 * window + 1
+        if len(prices) < size:
+            return np.empty(0, dtype=np.intp)
+        rolling = reduce(sliding_window_view(prices, size), axis=1)
+        return np.flatnonzero(prices[window:len(prices) - window] == rolling) + window
+
+
+# DataFrame 별 인덱스 캐시 (DataFrame 이 사라지면 함께 제거)
+_cache: Dict[int, tuple] = {}
+
+
+def pivot_index(df) -> PivotIndex:
+    """
+    DataFrame 의 공용 피벗 인덱스
+
+    같은 DataFrame 을 분석하는 엔진들은 같은 인덱스를 받으므로
+    유니버스 스캔에서 종목당 극값 계산은 창 크기별 한 번뿐이다.
+    """
+    key = id(df)
+    entry = _cache.get(key)
+    if entry is not None and entry[0]() is df and len(entry[1]) == len(df):
+        return entry[1]
+
+    index = PivotIndex(df['high'].to_numpy(), df['low'].to_numpy())
+    _cache[key] = (weakref.ref(df, lambda _, k=key: _cache.pop(k, None)), index)
+    return index
@@ -0,0 +1,28 @@
+"""
+근거 문자열 목록 (Reasons)
+- 엔진 결과의 reasons/details (사람이 읽는 설명) 를 모으는 목록
+- lean 모드면 문자열을 만들지 않는다: add 는 포맷 전에 돌아가고 items 는 빈 리스트
+  (점수/신호 코드는 lean 과 상관없이 같다)
+"""
+
+
+class Reasons:
+    """
+    근거 목록
+
+    사용 예:
+        reasons = Reasons(self.lean)
+        reasons.add("RSI 과매도 {:.1f} → 강력 매수 (+8점)", rsi)
+        return {"score": score, "reasons": reasons.items}
+    """
+
+    __slots__ = ("lean", "items")
+
+    def __init__(self, lean=False):
+        self.lean = lean
+        self.items = []
+
+    def add(self, template, *args):
+        """근거 추가 (template.format(*args) 는 lean 이 아닐 때만)"""
+        if not self.lean:
+            self.items.append(template.format(*args) if args else template)
@@ -1,51 +1,135 @@
 import sys
+import threading
 import numpy as np
 from typing import List, Dict
 from datetime import datetime
 
+try:
+    from .pivot_index import PivotIndex, pivot_index
+except ImportError:
+    # 상대 임포트 실패 시 절대 임포트 시도
+    from pivot_index import PivotIndex, pivot_index
+
+from piona_data.feature_store import features
+
 class VolumeProfileSR:
     def __init__(self, price_bins: int = 100):
         self.price_bins = price_bins
-
-    def _build_volume_profile(self, high: List[float], low: List[float], close: List[float], volume: List[float]) -> Dict:
-        if not high or not low or min(low) >= max(high):
-            return {"poc": 0, "vah": 0, "val": 0}
-        prices = np.linspace(min(low), max(high), self.price_bins)
-        profile = np.zeros(self.price_bins)
-        for h, l, c, v in zip(high, low, close, volume):
-            idx_low = max(0, np.searchsorted(prices, l, side='right') - 1)
-            idx_high = min(self.price_bins - 1, np.searchsorted(prices, h, side='right') - 1)
-            if idx_low == idx_high:
-                profile[idx_low] += v
-            else:
-                portion = v / max(1, (idx_high - idx_low + 1))
-                profile[idx_low:idx_high+1] += portion
-        poc_idx = np.argmax(profile)
-        poc_price = prices[poc_idx]
+        # 종목별 누적 매물대 (증분 갱신용): code -> {"lo", "hi", "n", "first", "last", "last_bar", "base", "profile"}
+        # 상태 dict 는 만든 뒤 고치지 않고 통째로 교체 (잠금은 조회/교체에만)
+        self._profiles = {}
+        self._lock = threading.Lock()
+
+    def _bar_bins(self, prices: np.ndarray, high, low, volume):
+        """봉별 (시작 bin, 끝 bin + 1, bin 당 거래량)"""
+        high = np.asarray(high, dtype=float)
+        low = np.asarray(low, dtype=float)
+        volume = np.asarray(volume, dtype=float)
+        bins = len(prices)
+        idx_low = np.maximum(np.searchsorted(prices, low, side='right') - 1, 0)
+        idx_high = np.minimum(np.searchsorted(prices, high, side='right') - 1, bins - 1)
+        width = idx_high - idx_low + 1
+        portion = np.where(width > 0, volume / np.maximum(width, 1), 0.0)
+        return idx_low, np.maximum(idx_high + 1, idx_low), portion
+
+    def _edges(self, prices: np.ndarray, high, low, volume):
+        """차분 배열의 더하는 쪽 / 빼는 쪽 (bincount 는 입력 순서대로 더한다)"""
+        start, stop, portion = self._bar_bins(prices, high, low, volume)
+        bins = len(prices)
+        return np.bincount(start, portion, bins + 1), np.bincount(stop, portion, bins + 1)
+
+    def _add_bar(self, edges, prices: np.ndarray, bar):
+        """
+        차분 배열에 봉 1개 추가 (복사본)
+
+        bincount 가 봉을 순서대로 더하는 것과 같은 연산이라 전체 재계산과 비트 단위로 같다.
+        """
+        start, stop, portion = self._bar_bins(prices, [bar[0]], [bar[1]], [bar[2]])
+        up, down = edges[0].copy(), edges[1].copy()
+        up[start[0]] += portion[0]
+        down[stop[0]] += portion[0]
+        return up, down
+
+    def _accumulate(self, prices: np.ndarray, high, low, volume) -> np.ndarray:
+        """봉별 거래량을 고가~저가 구간 bin 에 균등 분배 (차분 배열 + 누적합, 한 번에)"""
+        up, down = self._edges(prices, high, low, volume)
+        return np.cumsum((up - down)[:len(prices)])
+
+    def _summarize(self, prices: np.ndarray, profile: np.ndarray, lo: float, hi: float) -> Dict:
+        """POC + 거래량 70% 가치영역 (내림차순 누적합으로 한 번에)"""
+        poc_price = prices[np.argmax(profile)]
         total_vol = profile.sum()
         if total_vol == 0:
-            return {"poc": round(poc_price, 2), "vah": round(max(high), 2), "val": round(min(low), 2)}
+            return {"poc": round(poc_price, 2), "vah": round(hi, 2), "val": round(lo, 2)}
         sorted_indices = np.argsort(profile)[::-1]
-        cumsum = 0
-        va_indices = []
-        for idx in sorted_indices:
-            cumsum += profile[idx]
-            va_indices.append(idx)
-            if cumsum >= total_vol * 0.7:
-                break
-        vah_price = prices[max(va_indices)]
-        val_price = prices[min(va_indices)]
+        cumsum = np.cumsum(profile[sorted_indices])
+        count = min(np.searchsorted(cumsum, total_vol * 0.7), len(cumsum) - 1) + 1
+        va_indices = sorted_indices[:count]
+        vah_price = prices[va_indices.max()]
+        val_price = prices[va_indices.min()]
         return {"poc": round(poc_price, 2), "vah": round(vah_price, 2), "val": round(val_price, 2)}
 
-    def _find_support_resistance(self, high: List[float], low: List[float], close: List[float], window: int = 10) -> Dict:
-        supports = []
-        resistances = []
-        for i in range(window, len(high) - window):
-            if low[i] == min(low[i-window:i+window+1]):
-                supports.append({"level": low[i], "strength": "pivot", "index": i})
-            if high[i] == max(high[i-window:i+window+1]):
-                resistances.append({"level": high[i], "strength": "pivot", "index": i})
-        return {"supports": supports[-5:], "resistances": resistances[-5:]}
+    def _build_volume_profile(self, high: List[float], low: List[float], close: List[float], volume: List[float]) -> Dict:
+        if len(high) == 0 or len(low) == 0 or np.min(low) >= np.max(high):
+            return {"poc": 0, "vah": 0, "val": 0}
+        lo, hi = np.min(low).item(), np.max(high).item()
+        prices = np.linspace(lo, hi, self.price_bins)
+        return self._summarize(prices, self._accumulate(prices, high, low, volume), lo, hi)
+
+    def _volume_profile(self, df) -> Dict:
+        """
+        종목 매물대 (저장된 누적 매물대에 최신 봉만 반영)
+
+        마지막 봉을 뺀 차분 배열(base)을 저장해 두고,
+        가격 범위(전체 최저가~최고가)가 그대로이고 이전 분석 이후 봉이 하나 늘었으면
+        이전 마지막 봉을 base 에 더하고, 마지막 봉만 바뀌었으면(장중 갱신) base 를 그대로 쓴다.
+        빼기 없이 더하기만 하므로 전체 재계산과 같은 값이 나온다.
+        그 밖의 경우(범위 변경, 이력 보충 등)는 전체를 다시 만든다.
+        """
+        high = df['high'].to_numpy()
+        low = df['low'].to_numpy()
+        volume = df['volume'].to_numpy()
+        if 'code' not in df.columns or 'date' not in df.columns or len(df) < 2:
+            return self._build_volume_profile(high, low, None, volume)
+        lo, hi = low.min().item(), high.max().item()
+        if lo >= hi:
+            return {"poc": 0, "vah": 0, "val": 0}
+
+        code = df['code'].iloc[0]
+        dates = df['date'].to_numpy()
+        n = len(df)
+        last_bar = (high[-1], low[-1], volume[-1])
+        with self._lock:
+            state = self._profiles.get(code)
+
+        base = None
+        if (state is not None and state["lo"] == lo and state["hi"] == hi
+                and state["bins"] == self.price_bins and state["first"] == dates[0]):
+            prices = state["prices"]
+            if (n == state["n"] + 1 and dates[-2] == state["last"]
+                    and (high[-2], low[-2], volume[-2]) == state["last_bar"]):
+                base = self._add_bar(state["base"], prices, state["last_bar"])
+            elif n == state["n"] and dates[-1] == state["last"]:
+                base = state["base"]
+
+        if base is None:
+            prices = np.linspace(lo, hi, self.price_bins)
+            base = self._edges(prices, high[:-1], low[:-1], volume[:-1])
+
+        up, down = self._add_bar(base, prices, last_bar)
+        profile = np.cumsum((up - down)[:self.price_bins])
+
+        with self._lock:
+            self._profiles[code] = {"lo": lo, "hi": hi, "bins": self.price_bins, "prices": prices,
+                                    "n": n, "first": dates[0], "last": dates[-1],
+                                    "last_bar": last_bar, "base": base, "profile": profile}
+        return self._summarize(prices, profile, lo, hi)
+
+    def _find_support_resistance(self, high: List[float], low: List[float], close: List[float], window: int = 10, pivots: PivotIndex = None) -> Dict:
+        pivots = pivots or PivotIndex(high, low)
+        supports = [{"level": p, "strength": "pivot", "index": i} for i, p in pivots.lows(window)[-5:]]
+        resistances = [{"level": p, "strength": "pivot", "index": i} for i, p in pivots.highs(window)[-5:]]
+        return {"supports": supports, "resistances": resistances}
 
     def _detect_gaps(self, high: List[float], low: List[float]) -> List[Dict]:
         gaps = []
@@ -56,14 +140,11 @@ class VolumeProfileSR:
                 gaps.append({"type": "gap_down", "level": low[i-1], "size": low[i-1] - high[i], "index": i})
         return gaps[-10:]
 
-    def _calc_atr(self, high: List[float], low: List[float], close: List[float], period: int = 14) -> float:
-        if len(high) < period + 1:
+    def _calc_atr(self, df, period: int = 14) -> float:
+        # 첫 봉(전일 종가 없음)이 창에 들지 않도록 period + 1 봉부터 (공용 지표 저장소의 ATR 과 같음)
+        if len(df) < period + 1:
             return 0
-        tr_list = []
-        for i in range(1, len(high)):
-            tr = max(high[i] - low[i], abs(high[i] - close[i-1]), abs(low[i] - close[i-1]))
-            tr_list.append(tr)
-        return np.mean(tr_list[-period:])
+        return features(df).atr(period).iloc[-1]
 
     def analyze(self, df) -> Dict:
         high = df['high'].tolist()
@@ -72,10 +153,10 @@ class VolumeProfileSR:
         volume = df['volume'].tolist()
         current_price = close[-1]
 
-        profile = self._build_volume_profile(high, low, close, volume)
-        pivots = self._find_support_resistance(high, low, close)
+        profile = self._volume_profile(df)
+        pivots = self._find_support_resistance(high, low, close, pivots=pivot_index(df))
         gaps = self._detect_gaps(high, low)
-        atr = self._calc_atr(high, low, close)
+        atr = self._calc_atr(df)
 
         supports = []
         resistances = []
@@ -147,5 +228,17 @@ class VolumeProfileSR:
             "signal": signal
         }
 
+    def analyze_panel(self, panel) -> List[Dict]:
+        """
+        여러 종목 분석 (panel.codes 순서)
+
+        매물대/피벗은 종목 전체 이력 기준이라 스냅샷의 종목별 DataFrame 으로 실행한다.
+        """
+        return [self.analyze(panel.frame(code)) for code in panel.codes]
+
+# PIONASystem / test_system 에서 사용하는 공통 이름
+SupportResistanceEngine = VolumeProfileSR
+
+
 if __name__ == "__main__":
     print("Support/Resistance Engine Test - need data", flush=True)
\ No newline at end of file
@@ -1,6 +1,7 @@
 import sys
 import os
 from data_merger import DataMerger
+from piona_data.market_data import MarketDataLoader
 
 print("=" * 60, flush=True)
 print("    PIONA_CREON - Data Collector (15 columns)", flush=True)
@@ -43,6 +44,7 @@ print("-" * 60, flush=True)
 merger = DataMerger()
 
 os.makedirs("data", exist_ok=True)
+loader = MarketDataLoader("data")
 
 success_count = 0
 fail_count = 0
@@ -51,9 +53,8 @@ for code in code_list:
     print(f"\n[{code}] Collecting...", flush=True)
     df = merger.get_full_data(code, days=days)
     if not df.empty:
-        path = f"data/{code}_{days}days.pkl"
-        df.to_pickle(path)
-        print(f"Saved -> {path}", flush=True)
+        loader.store.write_frames({code: df})
+        print(f"Saved -> panel store ({code})", flush=True)
         print(f"  Days: {len(df)}, Cols: {len(df.columns)}", flush=True)
         success_count += 1
     else:
@@ -0,0 +1,24 @@
+"""
+PIONA_DATA 패키지
+시세 저장소 + 로더 + CREON 요청 스케줄러 + 일일 갱신/이력 동기화/백필
+"""
+from .panel_store import PanelStore, PanelSnapshot
+from .market_data import MarketDataLoader
+from .request_scheduler import CreonRequestScheduler, get_scheduler
+from .marketeye import MarketEyeClient, BulkDailyUpdater
+from .trading_calendar import KRXCalendar
+from .history_sync import HistorySync
+from .backfill import Backfill
+
+__all__ = [
+    'PanelStore',
+    'PanelSnapshot',
+    'MarketDataLoader',
+    'CreonRequestScheduler',
+    'get_scheduler',
+    'MarketEyeClient',
+    'BulkDailyUpdater',
+    'KRXCalendar',
+    'HistorySync',
+    'Backfill'
+]
@@ -0,0 +1,271 @@
+"""
+엔진 분석 결과 캐시 (AnalysisCache)
+- 키 = 엔진(클래스 + 소스 해시 + 파라미터) × 계산 경로(method) × 종목 × 데이터 지문 (PanelSnapshot.fingerprint)
+- 소스 해시 = 엔진 모듈 + 저장소 패키지(engine/piona_ml/piona_data) 전체 — 공용 헬퍼 수정도 자동 무효화
+- 수집기가 봉을 추가/수정하면 지문이 바뀌어 자동으로 새로 계산 (옛 항목은 용량 초과 시 정리)
+- 1단: 프로세스 내 LRU (pickle 바이트 — 꺼낼 때마다 새 객체라 호출 쪽 수정이 캐시에 번지지 않음)
+- 2단: 디스크 {cache_dir}/{키 앞 2자}/{키}.pkl, 총 용량 상한 초과 시 오래 안 쓴 파일부터 삭제
+- 분석 DAG 의 엔진 스레드가 함께 쓰므로 메모리 LRU/용량 집계는 잠금 안에서 갱신
+"""
+import hashlib
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+
+
+# 저장 형식(결과 구조, 키 구성)을 바꾸면 올린다 (엔진/헬퍼 소스 변경은 소스 해시로 자동 반영)
+CACHE_VERSION = 2
+
+# 엔진 계산이 기대는 저장소 패키지 (피벗/일목/패널/지표 저장소/사유 문구 등 헬퍼 포함)
+SOURCE_PACKAGES = ("engine", "piona_ml", "piona_data")
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MEMORY_BYTES = 64 * 1024 * 1024
+DISK_BYTES = 512 * 1024 * 1024
+
+# 디스크 정리 시 상한의 이 비율까지 줄인다 (정리가 매번 일어나지 않도록)
+EVICT_RATIO = 0.8
+
+_SOURCE_HASH = {}
+_PACKAGE_HASH = None
+
+
+def source_hash(root=SOURCE_ROOT, packages=SOURCE_PACKAGES):
+    """
+    패키지 소스 해시 (패키지별 .py 파일 이름/내용, 이름 순 — test_ 파일 제외)
+
+    엔진이 함수 안에서 가져오는 헬퍼까지 놓치지 않도록 import 추적 대신 패키지 전체를 해시한다.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for package in packages:
+        folder = os.path.join(root, package)
+        try:
+            names = sorted(os.listdir(folder))
+        except OSError:
+            continue
+        for name in names:
+            if not name.endswith(".py") or name.startswith("test_"):
+                continue
+            with open(os.path.join(folder, name), "rb") as f:
+                digest.update(f"{package}/{name}\0".encode("utf-8"))
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def engine_tag(engine):
+    """엔진 식별자: 클래스 이름 + 모듈 소스 해시 + 패키지 소스 해시 + 스칼라 파라미터"""
+    global _PACKAGE_HASH
+    cls = type(engine)
+    module = cls.__module__
+    if module not in _SOURCE_HASH:
+        path = getattr(sys.modules.get(module), "__file__", None)
+        try:
+            with open(path, "rb") as f:
+                _SOURCE_HASH[module] = hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+        except (OSError, TypeError):
+            _SOURCE_HASH[module] = "nosource"
+    if _PACKAGE_HASH is None:
+        _PACKAGE_HASH = source_hash()
+    params = sorted((k, v) for k, v in vars(engine).items()
+                    if k != "name" and isinstance(v, (int, float, str, bool, tuple)))
+    return f"{cls.__qualname__}:{_SOURCE_HASH[module]}:{_PACKAGE_HASH}:{params!r}"
+
+
+class AnalysisCache:
+    """
+    2단 (메모리 LRU + 디스크) 엔진 결과 캐시
+
+    사용 예:
+        cache = AnalysisCache("data/cache")
+        result = cache.fetch(engine, code, snapshot.fingerprint(code), lambda: engine.analyze(df))
+    """
+
+    def __init__(self, cache_dir=None, memory_bytes=MEMORY_BYTES, disk_bytes=DISK_BYTES):
+        """
+        Parameters:
+            cache_dir: 디스크 캐시 디렉토리 (None 이면 메모리만)
+            memory_bytes: 메모리 LRU 상한 (pickle 바이트 합)
+            disk_bytes: 디스크 상한 (파일 크기 합)
+        """
+        self.name = "Analysis Cache"
+        self.cache_dir = cache_dir
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._memory_used = 0
+        self._disk_used = None
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    # ========================================
+    # 공개 API
+    # ========================================
+    @staticmethod
+    def key(engine, code, fingerprint, method="analyze"):
+        """캐시 키 (hex) — 엔진/메서드/종목/데이터 지문 중 하나라도 바뀌면 다른 키"""
+        text = f"{CACHE_VERSION}|{engine_tag(engine)}|{method}|{code}|{fingerprint}"
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, key):
+        """
+        캐시 조회
+
+        Returns:
+            저장된 결과 (새 객체) 또는 None
+        """
+        return self.get_first((key,))
+
+    def get_first(self, keys):
+        """
+        여러 키 중 먼저 찾은 결과 (메모리 → 디스크 순, 각 단계는 키 순서대로)
+
+        적중/실패 통계는 키 묶음당 한 번만 센다.
+
+        Returns:
+            저장된 결과 (새 객체) 또는 None
+        """
+        for key in keys:
+            with self._lock:
+                blob = self._memory.get(key)
+                if blob is not None:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+            if blob is not None:
+                return pickle.loads(blob)
+
+        for key in keys:
+            blob = self._read_disk(key)
+            if blob is not None:
+                with self._lock:
+                    self.stats["disk_hits"] += 1
+                    self._remember(key, blob)
+                return pickle.loads(blob)
+
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def put(self, key, value):
+        """결과 저장 (메모리 + 디스크)"""
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._remember(key, blob)
+        self._write_disk(key, blob)
+
+    def fetch(self, engine, code, fingerprint, compute, method="analyze"):
+        """
+        캐시에 있으면 꺼내고, 없으면 compute() 결과를 저장해 반환
+
+        Parameters:
+            engine: 분석 엔진 인스턴스 (키에 클래스/소스/파라미터 반영)
+            code: 종목코드
+            fingerprint: 데이터 지문 (None 이면 캐시 없이 compute())
+            compute: 인자 없는 계산 함수
+            method: 같은 엔진의 다른 계산 구분 (예: run_all_patterns)
+        """
+        if fingerprint is None:
+            return compute()
+        key = self.key(engine, code, fingerprint, method)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """메모리 캐시 비우기 (디스크는 유지)"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+
+    # ========================================
+    # 메모리 LRU
+    # ========================================
+    def _remember(self, key, blob):
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_used -= len(old)
+        if len(blob) > self.memory_bytes:
+            return
+        self._memory[key] = blob
+        self._memory_used += len(blob)
+        while self._memory_used > self.memory_bytes:
+            _, dropped = self._memory.popitem(last=False)
+            self._memory_used -= len(dropped)
+
+    # ========================================
+    # 디스크
+    # ========================================
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pkl")
+
+    def _read_disk(self, key):
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+            os.utime(path)  # 최근 사용 표시 (정리 순서)
+            return blob
+        except OSError:
+            return None
+
+    def _write_disk(self, key, blob):
+        if self.cache_dir is None:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, path)
+        except OSError:
+            # 캐시 기록 실패는 분석 결과에 영향 없음
+            return
+
+        with self._lock:
+            if self._disk_used is None:
+                self._disk_used = sum(size for _, size, _ in self._scan())
+            else:
+                self._disk_used += len(blob)
+            if self._disk_used > self.disk_bytes:
+                self._evict()
+
+    def _scan(self):
+        """디스크 캐시 파일 (경로, 크기, 수정 시각)"""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        for sub in os.listdir(self.cache_dir):
+            folder = os.path.join(self.cache_dir, sub)
+            if not os.path.isdir(folder):
+                continue
+            for name in os.listdir(folder):
+                if not name.endswith(".pkl"):
+                    continue
+                path = os.path.join(folder, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        """오래 안 쓴 파일부터 삭제해 상한의 EVICT_RATIO 까지 줄임 (다른 프로세스가 먼저 지운 파일은 무시)"""
+        entries = sorted(self._scan(), key=lambda e: e[2])
+        used = sum(size for _, size, _ in entries)
+        target = self.disk_bytes * EVICT_RATIO
+        for path, size, _ in entries:
+            if used <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            used -= size
+        self._disk_used = used
@@ -0,0 +1,281 @@
+"""
+장기 이력 백필 (Backfill)
+- StockChart / CpSvr7254 기간 조회를 Continue 로 목표 시작일까지 페이지 단위 조회
+- 페이지마다 필드별 numpy 배열로 바로 읽어 종목별 스풀 파일에 추가 (행 리스트 없음)
+- 페이지마다 체크포인트 기록 → 중단 후 재실행하면 이어서 조회
+- 종목 조회가 끝나면 스풀을 패널 저장소에 한 번에 병합
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from . import creon_com
+from .com_decoder import (
+    CHART_FIELDS, INVESTOR_COLUMNS, chart_columns, decode_columns, dates_to_datetime
+)
+from .request_scheduler import get_scheduler, CreonRequestScheduler
+
+
+# 스풀 파일 → dtype (일봉은 종목코드별 chart_columns, 투자자 날짜는 inv_date 로 따로 보관)
+SPOOL_INVESTOR = {("inv_date" if name == "date" else name): dtype for name, dtype in INVESTOR_COLUMNS}
+
+
+def _day_before(date_int):
+    d = pd.Timestamp(str(date_int)) - pd.Timedelta(days=1)
+    return int(d.strftime("%Y%m%d"))
+
+
+class Backfill:
+    """
+    페이지 단위 장기 이력 백필
+
+    스풀/체크포인트 위치: {panel}/.backfill/
+        checkpoint.json     종목별 진행 상황 (가장 오래된 수신일, 완료 여부)
+        {code}/{field}.bin  페이지마다 이어 붙이는 필드별 배열
+    """
+
+    def __init__(self, loader, dispatch=None, scheduler=None, work_dir=None):
+        """
+        Parameters:
+            loader: MarketDataLoader
+            dispatch: progid → COM 객체 함수 (기본 creon_com.dispatch)
+            scheduler: CreonRequestScheduler (기본 공용 스케줄러)
+            work_dir: 스풀/체크포인트 디렉토리 (기본 패널 아래 .backfill)
+        """
+        self.name = "Backfill"
+        self.loader = loader
+        self.dispatch = dispatch or creon_com.dispatch
+        self.scheduler = scheduler
+        self.work_dir = work_dir or os.path.join(loader.store.root, ".backfill")
+        self.checkpoint_path = os.path.join(self.work_dir, "checkpoint.json")
+        self.checkpoint = self._load_checkpoint()
+        self.pages = 0
+
+    # ========================================
+    # 공개 API
+    # ========================================
+    def run(self, codes, start_date, end_date, positions=None):
+        """
+        종목별 백필 실행 (중단 후 같은 인자로 다시 부르면 이어서 진행)
+
+        Parameters:
+            codes: 종목 리스트 (지수 포함 가능)
+            start_date: 목표 시작일 (YYYYMMDD)
+            end_date: 마지막 날짜 (YYYYMMDD)
+            positions: 보유 종목코드 집합 (먼저 조회)
+
+        Returns:
+            dict: {종목코드: 저장된 거래일 수}
+        """
+        scheduler = self.scheduler or get_scheduler()
+        start_date, end_date = int(start_date), int(end_date)
+
+        for code in scheduler.prioritize(codes, positions):
+            state = self._state(code, start_date, end_date)
+            if state["merged"]:
+                continue
+            lane = CreonRequestScheduler.lane_for(code, positions)
+
+            if not state["chart_done"]:
+                self._page_chart(code, state, lane, scheduler)
+            if not state["inv_done"]:
+                self._page_investor(code, state, lane, scheduler)
+
+        return self.merge()
+
+    def merge(self):
+        """
+        조회가 끝난 종목의 스풀을 패널 저장소에 한 번에 병합
+
+        Returns:
+            dict: {종목코드: 병합한 거래일 수}
+        """
+        frames = {}
+        for code, state in self.checkpoint.items():
+            if state["merged"] or not (state["chart_done"] and state["inv_done"]):
+                continue
+            df = self._read_spool(code)
+            if df is not None:
+                frames[code] = df
+
+        self.loader.store.write_frames(frames)
+
+        for code in frames:
+            self.checkpoint[code]["merged"] = True
+            shutil.rmtree(self._spool_dir(code), ignore_errors=True)
+        self._save_checkpoint()
+
+        return {code: len(df) for code, df in frames.items()}
+
+    # ========================================
+    # 페이지 조회
+    # ========================================
+    def _page_chart(self, code, state, lane, scheduler):
+        """StockChart 기간 조회 → 페이지마다 스풀 추가"""
+        obj = self.dispatch("CpSysDib.StockChart")
+        full_code = code if code.startswith("U") else "A" + code
+        end = _day_before(state["chart_oldest"]) if state["chart_oldest"] else state["end"]
+        if end < state["start"]:
+            state["chart_done"] = True
+            self._save_checkpoint()
+            return
+
+        obj.SetInputValue(0, full_code)
+        obj.SetInputValue(1, ord('1'))  # 기간
+        obj.SetInputValue(2, end)
+        obj.SetInputValue(3, state["start"])
+        obj.SetInputValue(5, CHART_FIELDS)
+        obj.SetInputValue(6, ord('D'))
+        obj.SetInputValue(9, ord('1'))
+
+        while True:
+            with scheduler.slot(lane):
+                obj.BlockRequest()
+            self.pages += 1
+            count = obj.GetHeaderValue(3)
+            if count:
+                columns = decode_columns(obj, count, chart_columns(code))
+                self._append_spool(code, columns, state["chart_rows"])
+                state["chart_rows"] += count
+                state["chart_oldest"] = int(columns["date"][0])
+                self._save_checkpoint()
+            if count == 0 or not obj.Continue:
+                break
+
+        state["chart_done"] = True
+        self._save_checkpoint()
+
+    def _page_investor(self, code, state, lane, scheduler):
+        """CpSvr7254 기간 조회 → 페이지마다 스풀 추가 (지수는 없음)"""
+        if code.startswith("U"):
+            state["inv_done"] = True
+            self._save_checkpoint()
+            return
+
+        obj = self.dispatch("CpSysDib.CpSvr7254")
+        end = _day_before(state["inv_oldest"]) if state["inv_oldest"] else state["end"]
+        if end < state["start"]:
+            state["inv_done"] = True
+            self._save_checkpoint()
+            return
+
+        obj.SetInputValue(0, "A" + code)
+        obj.SetInputValue(1, 0)  # 기간선택
+        obj.SetInputValue(2, state["start"])
+        obj.SetInputValue(3, end)
+        obj.SetInputValue(4, ord('0'))  # 순매수
+        obj.SetInputValue(5, 0)  # 전체 투자자
+
+        while True:
+            with scheduler.slot(lane):
+                obj.BlockRequest()
+            self.pages += 1
+            count = obj.GetHeaderValue(1)
+            if count:
+                columns = decode_columns(obj, count, INVESTOR_COLUMNS)
+                columns["inv_date"] = columns.pop("date")
+                self._append_spool(code, columns, state["inv_rows"])
+                state["inv_rows"] += count
+                state["inv_oldest"] = int(columns["inv_date"][0])
+                self._save_checkpoint()
+            if count == 0 or not obj.Continue:
+                break
+
+        state["inv_done"] = True
+        self._save_checkpoint()
+
+    # ========================================
+    # 스풀 / 체크포인트
+    # ========================================
+    def _spool_dir(self, code):
+        return os.path.join(self.work_dir, code)
+
+    def _append_spool(self, code, columns, rows):
+        """
+        페이지 배열을 필드별 스풀 파일 끝에 추가
+
+        체크포인트에 기록된 행 수(rows) 뒤의 잔여 바이트(중단된 페이지)는 먼저 잘라낸다.
+        """
+        path = self._spool_dir(code)
+        os.makedirs(path, exist_ok=True)
+        for name, values in columns.items():
+            file = os.path.join(path, f"{name}.bin")
+            with open(file, "r+b" if os.path.exists(file) else "w+b") as f:
+                f.truncate(rows * values.itemsize)
+                f.seek(0, os.SEEK_END)
+                values.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _read_spool(self, code):
+        """스풀 → 12컬럼 DataFrame (중복 페이지는 날짜 기준 제거)"""
+        path = self._spool_dir(code)
+        state = self.checkpoint[code]
+        spool_chart = dict(chart_columns(code))
+
+        def read(name):
+            if name in SPOOL_INVESTOR:
+                rows, dtype = state["inv_rows"], SPOOL_INVESTOR[name]
+            else:
+                rows, dtype = state["chart_rows"], spool_chart[name]
+            file = os.path.join(path, f"{name}.bin")
+            if not os.path.exists(file):
+                return np.empty(0, dtype=dtype)
+            return np.fromfile(file, dtype=dtype, count=rows)
+
+        dates = read("date")
+        if not len(dates):
+            return None
+
+        df = pd.DataFrame({name: read(name) for name in spool_chart})
+        df = df.drop_duplicates("date").sort_values("date")
+
+        inv_dates = read("inv_date")
+        if len(inv_dates):
+            inv = pd.DataFrame({name: read(name) for name in SPOOL_INVESTOR})
+            inv = inv.drop_duplicates("inv_date").rename(columns={"inv_date": "date"})
+            df = df.merge(inv, on="date", how="left")
+
+        df["date"] = dates_to_datetime(df["date"]).to_numpy()
+        df["code"] = code
+        return df.reset_index(drop=True)
+
+    def _state(self, code, start_date, end_date):
+        state = self.checkpoint.get(code)
+        if state is None or state["start"] != start_date or state["end"] != end_date:
+            # 새 작업 (목표 구간이 바뀌면 처음부터)
+            shutil.rmtree(self._spool_dir(code), ignore_errors=True)
+            state = {
+                "start": start_date,
+                "end": end_date,
+                "chart_oldest": None,
+                "chart_rows": 0,
+                "chart_done": False,
+                "inv_oldest": None,
+                "inv_rows": 0,
+                "inv_done": False,
+                "merged": False
+            }
+            self.checkpoint[code] = state
+        return state
+
+    def _load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return {}
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save_checkpoint(self):
+        os.makedirs(self.work_dir, exist_ok=True)
+        tmp = self.checkpoint_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.checkpoint_path)
@@ -0,0 +1,157 @@
+"""
+종목별 최근 봉 패널 (BarPanel)
+- 스냅샷에서 종목마다 존재하는 봉만 모아 마지막 봉이 같은 행에 오도록 오른쪽 정렬
+- column j 의 마지막 counts[j] 행 = 종목 j 를 loader.load 한 DataFrame 의 끝부분 (앞쪽 빈칸은 NaN)
+- 엔진 analyze_panel(panel) 이 종목 반복 없이 (봉, 종목) 2차원 배열로 지표를 한 번에 계산
+"""
+import numpy as np
+
+from . import schema
+
+
+# 엔진 지표 중 가장 긴 조회 구간 (MA300) — 이보다 짧게 자르면 결과가 달라진다
+DEFAULT_DEPTH = 300
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume", "amount")
+FLOW_FIELDS = ("frgn_net_buy", "inst_net_buy")
+
+
+def window(values, k, lag=0):
+    """
+    마지막에서 lag 봉 앞까지의 k 봉 (k, 종목) — df.iloc[-k-lag:len(df)-lag] 에 해당
+
+    depth 가 모자라면 앞쪽을 빈칸 값(실수 NaN, 정수 0)으로 채운다.
+    """
+    end = values.shape[0] - lag
+    if end >= k:
+        return values[end - k:end]
+    fill = np.nan if values.dtype.kind == "f" else 0
+    out = np.full((k,) + values.shape[1:], fill, dtype=values.dtype)
+    if end > 0:
+        out[k - end:] = values[:end]
+    return out
+
+
+def shifted(values):
+    """1봉 전 값 (첫 행 NaN) — pandas shift()"""
+    out = np.full(values.shape, np.nan)
+    out[1:] = values[:-1]
+    return out
+
+
+class BarPanel:
+    """
+    오른쪽 정렬 (봉, 종목) 패널
+
+    Attributes:
+        codes: 종목코드 리스트 (열 순서)
+        counts: 종목별 전체 봉 수 (len(df) 와 같음, depth 로 잘려도 그대로)
+        dates: (depth, 종목) int32 YYYYMMDD (빈칸 0)
+        open/high/low/close/volume/amount: (depth, 종목) float64 (빈칸 NaN)
+        frgn_net_buy/inst_net_buy: (depth, 종목) int64 (빈칸/결측 0 — SupplyEngine 의 fillna(0))
+    """
+
+    def __init__(self, snapshot, codes, counts, dates, fields):
+        self.snapshot = snapshot
+        self.codes = list(codes)
+        self.counts = counts
+        self.dates = dates
+        self.fields = tuple(fields)
+        self._index = {c: j for j, c in enumerate(self.codes)}
+        self._frames = {}
+        for name, values in fields.items():
+            setattr(self, name, values)
+
+    @property
+    def depth(self):
+        return self.dates.shape[0]
+
+    @property
+    def n_symbols(self):
+        return len(self.codes)
+
+    def index(self, code):
+        return self._index[code]
+
+    def frame(self, code):
+        """
+        종목 DataFrame (스냅샷 전체 이력, 종목별 캐시)
+
+        피벗/매물대처럼 전체 이력이 필요한 엔진과 분석 결과의 df 에 사용한다.
+        """
+        if code not in self._frames:
+            self._frames[code] = self.snapshot.frame(code)
+        return self._frames[code]
+
+    def release(self, codes):
+        """종목 DataFrame 캐시 해제 (스트리밍 스캔에서 분석이 끝난 종목 — 결과가 잡고 있는 df 는 그대로)"""
+        for code in codes:
+            self._frames.pop(code, None)
+
+    def columns(self, start, stop):
+        """종목 열 [start, stop) 만 담은 BarPanel (배열은 복사 없이 뷰)"""
+        return self._subset(slice(start, stop), lambda values: values)
+
+    def take(self, indices):
+        """지정한 종목 열만 담은 BarPanel (indices 순서, 배열 복사)"""
+        # 열 fancy index 결과는 F 순서 → 봉 축 합계 순서(마지막 자리)가 달라지므로 C 순서로 복사
+        return self._subset(np.asarray(indices, dtype=np.intp), np.ascontiguousarray)
+
+    def _subset(self, cols, layout):
+        fields = {name: layout(getattr(self, name)[:, cols]) for name in self.fields}
+        codes = np.asarray(self.codes, dtype=object)[cols].tolist()
+        panel = BarPanel(self.snapshot, codes, self.counts[cols], self.dates[:, cols], fields)
+        panel._frames = self._frames  # 같은 스냅샷이므로 종목 DataFrame 캐시 공유
+        return panel
+
+
+def bar_panel(snapshot, codes, depth=DEFAULT_DEPTH):
+    """
+    스냅샷 → BarPanel
+
+    Parameters:
+        snapshot: PanelSnapshot
+        codes: 종목 리스트 (스냅샷에 없는 종목은 봉 0개)
+        depth: 종목별 최근 봉 수 (None 이면 전체)
+
+    Returns:
+        BarPanel
+    """
+    index = {c: j for j, c in enumerate(snapshot.codes)}
+    cols = np.array([index.get(c, -1) for c in codes], dtype=np.intp)
+    present = cols >= 0
+    n = len(codes)
+
+    valid = np.zeros((snapshot.n_days, n), dtype=bool)
+    valid[:, present] = snapshot.field("valid")[:, cols[present]]
+    counts = valid.sum(axis=0)
+    if depth is None:
+        depth = int(counts.max()) if n else 0
+
+    # 종목별 봉 순번 → 오른쪽 정렬 행 번호 (마지막 봉 = depth-1)
+    rank = np.cumsum(valid, axis=0) - 1
+    row = depth - counts + rank
+    src_day, src_col = np.nonzero(valid & (row >= 0))
+    dst_row = row[src_day, src_col]
+    snap_col = cols[src_col]
+
+    dates = np.zeros((depth, n), dtype=np.int32)
+    dates[dst_row, src_col] = snapshot.dates[src_day]
+
+    # 지수 가격은 ×INDEX_PRICE_SCALE 정수로 저장되어 있으므로 배율을 되돌린다
+    scale = np.array([schema.price_scale(c) for c in codes], dtype=np.float64)[src_col]
+
+    fields = {}
+    for name in PRICE_FIELDS:
+        out = np.full((depth, n), np.nan)
+        values = snapshot.field(name)[src_day, snap_col]
+        out[dst_row, src_col] = values / scale if name in schema.PRICE_FIELDS else values
+        fields[name] = out
+
+    flow_valid = snapshot.field("flow_valid")[src_day, snap_col]
+    for name in FLOW_FIELDS:
+        out = np.zeros((depth, n), dtype=np.int64)
+        out[dst_row, src_col] = np.where(flow_valid, snapshot.field(name)[src_day, snap_col], 0)
+        fields[name] = out
+
+    return BarPanel(snapshot, codes, counts, dates, fields)
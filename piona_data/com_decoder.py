@@ -0,0 +1,110 @@
+"""
+CREON COM 응답 컬럼 디코더
+- GetDataValue 를 필드별로 돌며 미리 타입이 정해진 numpy 배열에 바로 채움
+  (행 리스트/딕셔너리, 중간 DataFrame, iloc[::-1] 복사 없음)
+- CREON 응답은 최신 날짜부터이므로 역순으로 읽어 날짜 오름차순 배열 생성
+- range/gap 파생 컬럼은 벡터 연산
+- dtype 은 표준 스키마(schema.FIELD_DTYPES) 와 동일 (가격 int32, 거래량/대금 int64)
+  단, 지수 가격은 소수점이 있으므로 float64 (저장 시 schema.to_typed 가 배율 정수로 변환)
+
+CREON COM 에는 필드 전체를 한 번에 돌려주는 API 가 없어 셀 단위 GetDataValue 호출 수는 같다.
+"""
+import numpy as np
+import pandas as pd
+
+from .schema import DATE_DTYPE, FIELD_DTYPES, PRICE_FIELDS, from_date_int, price_scale
+
+
+# StockChart 일봉 필드 (요청 필드 번호 오름차순 = 응답 순서)
+CHART_FIELDS = (0, 2, 3, 4, 5, 8, 9)
+CHART_COLUMNS = (("date", DATE_DTYPE),) + tuple(
+    (name, FIELD_DTYPES[name]) for name in ("open", "high", "low", "close", "volume", "amount")
+)
+INDEX_CHART_COLUMNS = tuple(
+    (name, np.float64 if name in PRICE_FIELDS else dtype) for name, dtype in CHART_COLUMNS
+)
+
+# CpSvr7254 일별 순매수 (데이터 인덱스 순)
+INVESTOR_COLUMNS = (
+    ("date", DATE_DTYPE),
+    ("inst_net_buy", FIELD_DTYPES["inst_net_buy"]),
+    ("frgn_net_buy", FIELD_DTYPES["frgn_net_buy"]),
+)
+
+
+def chart_columns(code):
+    """종목코드에 맞는 일봉 컬럼 정의 (지수는 가격 float64)"""
+    return INDEX_CHART_COLUMNS if price_scale(code) != 1 else CHART_COLUMNS
+
+
+def decode_columns(obj, count, columns):
+    """
+    응답 1페이지를 컬럼별 배열로 디코딩 (날짜 오름차순)
+
+    Parameters:
+        obj: CREON 조회 객체 (BlockRequest 완료 상태)
+        count: 응답 행 수
+        columns: ((컬럼명, dtype), ...) — GetDataValue 인덱스 순서
+
+    Returns:
+        dict: {컬럼명: np.ndarray}
+    """
+    get = obj.GetDataValue
+    rows = range(count - 1, -1, -1)
+    return {
+        name: np.fromiter((get(k, i) for i in rows), dtype=dtype, count=count)
+        for k, (name, dtype) in enumerate(columns)
+    }
+
+
+def concat_pages(pages):
+    """
+    Continue 로 받은 페이지들 연결
+
+    페이지는 최신 구간부터 도착하므로 역순으로 이어 붙여 전체를 날짜 오름차순으로 만든다.
+    """
+    if not pages:
+        return {}
+    if len(pages) == 1:
+        return pages[0]
+    ordered = pages[::-1]
+    return {name: np.concatenate([p[name] for p in ordered]) for name in pages[0]}
+
+
+# YYYYMMDD 정수 배열 → datetime64 (문자열 변환 없이)
+dates_to_datetime = from_date_int
+
+
+def chart_frame(code, cols):
+    """
+    디코딩된 일봉 컬럼 → 기존 형식 DataFrame (range/gap 포함)
+
+    Parameters:
+        code: 종목코드
+        cols: decode_columns/concat_pages 결과 (날짜 오름차순)
+    """
+    close = cols["close"]
+    gap = np.zeros(len(close), dtype=close.dtype)
+    gap[1:] = cols["open"][1:] - close[:-1]
+
+    return pd.DataFrame({
+        "date": dates_to_datetime(cols["date"]),
+        "open": cols["open"],
+        "high": cols["high"],
+        "low": cols["low"],
+        "close": close,
+        "volume": cols["volume"],
+        "amount": cols["amount"],
+        "code": code,
+        "range": cols["high"] - cols["low"],
+        "gap": gap
+    })
+
+
+def investor_frame(cols):
+    """디코딩된 투자자 컬럼 → DataFrame(date, frgn_net_buy, inst_net_buy)"""
+    return pd.DataFrame({
+        "date": dates_to_datetime(cols["date"]),
+        "frgn_net_buy": cols["frgn_net_buy"],
+        "inst_net_buy": cols["inst_net_buy"]
+    })
@@ -0,0 +1,119 @@
+"""
+CREON COM 연결 선택
+- live (기본): win32com.client.Dispatch — Windows + CREON Plus 로그인 필요
+- fake: fake_creon.FakeCreon — Linux 등에서 수집 → 분석 전체 경로 테스트/벤치마크
+
+환경 변수 (configure() 를 부르지 않았을 때 첫 사용 시 읽음):
+    PIONA_CREON          live | fake
+    PIONA_CREON_DATA     fake 응답으로 재생할 패널 저장소 경로 (없으면 합성 데이터)
+    PIONA_CREON_CODES    합성 데이터 종목 (쉼표 구분, 기본 universe.py 유니버스)
+    PIONA_CREON_END      합성 데이터 마지막 거래일 (YYYYMMDD, 기본 최근 마감 거래일)
+    PIONA_CREON_LATENCY  요청 1건 응답 시간 (초, 기본 0.05)
+    PIONA_CREON_LIMIT    조회 한도 건수 (기본 60)
+    PIONA_CREON_WINDOW   조회 한도 창 (초, 기본 15)
+"""
+import os
+import threading
+import time
+
+
+MODE_LIVE = "live"
+MODE_FAKE = "fake"
+
+DEFAULT_LATENCY = 0.05
+
+_mode = None
+_session = None
+_lock = threading.Lock()
+
+
+def configure(mode=None, session=None):
+    """
+    연결 방식 지정 (테스트/벤치마크용)
+
+    Parameters:
+        mode: "live" / "fake" (None 이면 session 유무로 결정)
+        session: FakeCreon (fake 모드, None 이면 환경 변수로 생성)
+    """
+    global _mode, _session
+    with _lock:
+        _mode = mode or (MODE_FAKE if session is not None else MODE_LIVE)
+        _session = session if _mode == MODE_FAKE else None
+
+
+def mode():
+    """현재 연결 방식 (live / fake)"""
+    global _mode
+    with _lock:
+        if _mode is None:
+            _mode = os.environ.get("PIONA_CREON", MODE_LIVE).lower()
+            if _mode not in (MODE_LIVE, MODE_FAKE):
+                raise ValueError(f"PIONA_CREON 은 live 또는 fake: {_mode}")
+        return _mode
+
+
+def get_session():
+    """fake 모드의 FakeCreon 세션 (live 모드면 None)"""
+    global _session
+    if mode() != MODE_FAKE:
+        return None
+    with _lock:
+        if _session is None:
+            _session = _session_from_env()
+        return _session
+
+
+def dispatch(progid):
+    """win32com.client.Dispatch 또는 가짜 세션의 객체"""
+    session = get_session()
+    if session is not None:
+        return session.dispatch(progid)
+    import win32com.client
+    return win32com.client.Dispatch(progid)
+
+
+def co_initialize():
+    """스레드 COM 초기화 (fake 모드는 불필요)"""
+    if mode() == MODE_FAKE:
+        return
+    import pythoncom
+    pythoncom.CoInitialize()
+
+
+def clock():
+    """
+    스케줄러용 (시각 함수, 대기 함수)
+
+    fake 세션이 가상 시계(FakeClock)를 쓰면 그 시계를 따른다.
+    """
+    session = get_session()
+    if session is not None:
+        return session.clock.time, session.clock.sleep
+    return time.monotonic, time.sleep
+
+
+def _session_from_env():
+    from .fake_creon import FakeCreon
+
+    options = {
+        "latency": float(os.environ.get("PIONA_CREON_LATENCY", DEFAULT_LATENCY)),
+        "limit": int(os.environ.get("PIONA_CREON_LIMIT", 60)),
+        "window": float(os.environ.get("PIONA_CREON_WINDOW", 15.0)),
+    }
+
+    data = os.environ.get("PIONA_CREON_DATA")
+    if data:
+        from .panel_store import PanelStore
+        print(f"[CREON] fake 모드: 기록 데이터 재생 ({data})", flush=True)
+        return FakeCreon.from_snapshot(PanelStore(data).open(), **options)
+
+    from .trading_calendar import KRXCalendar
+    codes = os.environ.get("PIONA_CREON_CODES")
+    if codes:
+        codes = [c.strip() for c in codes.split(",") if c.strip()]
+    else:
+        from universe import UniverseManager
+        codes = UniverseManager().get_symbols_only()
+    end = int(os.environ.get("PIONA_CREON_END") or KRXCalendar().last_closed_trading_day())
+    print(f"[CREON] fake 모드: 합성 데이터 {len(codes)}종목 (~{end})", flush=True)
+    return FakeCreon.synthetic(codes, end, **options)
@@ -0,0 +1,398 @@
+"""
+가짜 CREON COM 객체 (오프라인 테스트/벤치마크용)
+- FakeClock: 가상 시계 (sleep 하면 시각만 진행) / SystemClock: 실제 시계
+- FakeCpCybos: 15초당 60건 조회 한도 + 요청당 응답 지연 흉내
+- FakeMarketEye: CpSysDib.MarketEye 다종목 현재가 응답 흉내
+- FakeStockChart / FakeCpSvr7254: 일봉/투자자 조회 (Continue 페이지 나눔 포함)
+- FakeCreon: 위 객체를 progid 로 내주는 가짜 CREON 세션 (기록 데이터 재생 / 합성 데이터)
+"""
+import math
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+class FakeClock:
+    """가상 시계"""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(seconds, 0)
+
+
+class SystemClock:
+    """실제 시계 (FakeClock 과 같은 인터페이스)"""
+
+    def time(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(max(seconds, 0))
+
+
+class QuotaExceeded(Exception):
+    """조회 한도 초과 요청"""
+
+
+class FakeCpCybos:
+    """
+    CpUtil.CpCybos 흉내
+
+    첫 요청 시점부터 window 초 동안 limit 건까지 허용하고,
+    창이 끝나면 한도가 전부 회복된다.
+    latency 초는 요청 1건의 응답 시간 (clock.sleep 으로 흉내).
+    """
+
+    def __init__(self, clock, limit=60, window=15.0, latency=0.0):
+        self.clock = clock
+        self.limit = limit
+        self.window = window
+        self.latency = latency
+        self.IsConnect = 1
+
+        self._window_start = None
+        self._count = 0
+        self._lock = threading.Lock()
+        self.total_requests = 0
+
+    def _roll(self):
+        now = self.clock.time()
+        if self._window_start is None or now - self._window_start >= self.window:
+            self._window_start = now
+            self._count = 0
+
+    def GetLimitRemainCount(self, limit_type):
+        self._roll()
+        return self.limit - self._count
+
+    @property
+    def LimitRequestRemainTime(self):
+        self._roll()
+        remain = self._window_start + self.window - self.clock.time()
+        return math.ceil(max(remain, 0) * 1000)
+
+    def request(self):
+        """BlockRequest 1건 소비 (한도 초과 시 예외, 응답 지연만큼 대기)"""
+        with self._lock:
+            self._roll()
+            if self._count >= self.limit:
+                raise QuotaExceeded(f"{self.limit}건/{self.window}초 한도 초과")
+            self._count += 1
+            self.total_requests += 1
+        if self.latency:
+            self.clock.sleep(self.latency)
+
+
+class FakeMarketEye:
+    """
+    CpSysDib.MarketEye 흉내
+
+    bars: {"A005930": {4: 현재가, 5: 시가, ...}} — 필드 번호별 값
+    응답 데이터는 실제와 같이 요청 필드를 번호 오름차순으로 정렬해 돌려준다.
+    """
+
+    def __init__(self, bars, cybos=None):
+        self.bars = bars
+        self.cybos = cybos
+        self.requests = 0
+        self._inputs = {}
+        self._fields = []
+        self._codes = []
+
+    def SetInputValue(self, index, value):
+        self._inputs[index] = value
+
+    def BlockRequest(self):
+        if self.cybos is not None:
+            self.cybos.request()
+        self.requests += 1
+        self._fields = sorted(self._inputs[0])
+        codes = self._inputs[1]
+        if len(codes) > 200:
+            raise ValueError("MarketEye 는 1회 200종목까지 조회 가능")
+        # 상장되지 않은 코드는 응답에서 빠진다
+        self._codes = [c for c in codes if c in self.bars]
+
+    def GetHeaderValue(self, index):
+        if index == 0:
+            return len(self._fields)
+        if index == 2:
+            return len(self._codes)
+        return None
+
+    def GetDataValue(self, field_pos, code_pos):
+        code = self._codes[code_pos]
+        field = self._fields[field_pos]
+        if field == 0:
+            return code
+        return self.bars[code].get(field, 0)
+
+
+class _FakePagedRequest:
+    """
+    페이지 단위 응답 공통 구현
+
+    입력값이 그대로인 상태에서 BlockRequest 를 다시 부르면 다음 페이지를 돌려준다
+    (실제 CREON 의 Continue 동작). 응답은 최신 날짜부터.
+    """
+
+    COUNT_HEADER = 3
+
+    def __init__(self, history, page_size, cybos=None):
+        self.history = history
+        self.page_size = page_size
+        self.cybos = cybos
+        self.requests = 0
+        self.fail_after = None  # n번째 요청 후 예외 (중단/재개 테스트용)
+        self._inputs = {}
+        self._dirty = True
+        self._rows = None
+        self._offset = 0
+        self._page = None
+
+    def SetInputValue(self, index, value):
+        self._inputs[index] = value
+        self._dirty = True
+
+    def BlockRequest(self):
+        if self.fail_after is not None and self.requests >= self.fail_after:
+            raise RuntimeError("가짜 통신 장애")
+        if self.cybos is not None:
+            self.cybos.request()
+        self.requests += 1
+
+        if self._dirty:
+            self._rows = self._select()
+            self._offset = 0
+            self._dirty = False
+        self._page = self._rows.iloc[self._offset:self._offset + self.page_size]
+        self._offset += len(self._page)
+
+    @property
+    def Continue(self):
+        return int(self._rows is not None and self._offset < len(self._rows))
+
+    def GetHeaderValue(self, index):
+        if index == self.COUNT_HEADER:
+            return len(self._page)
+        return None
+
+    def GetDibStatus(self):
+        return 0
+
+    def _select(self):
+        raise NotImplementedError
+
+
+class FakeStockChart(_FakePagedRequest):
+    """
+    CpSysDib.StockChart 일봉 흉내
+
+    history: {"A005930": DataFrame(date(YYYYMMDD), open, high, low, close, volume, amount)}
+    """
+
+    # 필드 번호 → 컬럼
+    FIELDS = {0: "date", 2: "open", 3: "high", 4: "low", 5: "close", 8: "volume", 9: "amount"}
+
+    def __init__(self, history, page_size=2856, cybos=None):
+        super().__init__(history, page_size, cybos)
+
+    def _select(self):
+        df = self.history.get(self._inputs[0])
+        if df is None:
+            return pd.DataFrame(columns=list(self.FIELDS.values()))
+        if self._inputs.get(1) == ord('1'):
+            end, start = self._inputs[2], self._inputs[3]
+            df = df[(df["date"] >= start) & (df["date"] <= end)]
+        else:
+            df = df.tail(self._inputs[4])
+        return df.iloc[::-1].reset_index(drop=True)
+
+    def GetDataValue(self, field_pos, row):
+        fields = sorted(self._inputs[5])
+        return self._page[self.FIELDS[fields[field_pos]]].iloc[row]
+
+
+class FakeCpSvr7254(_FakePagedRequest):
+    """
+    CpSysDib.CpSvr7254 투자자별 순매수 흉내
+
+    history: {"A005930": DataFrame(date(YYYYMMDD), inst_net_buy, frgn_net_buy)}
+    """
+
+    COUNT_HEADER = 1
+    COLUMNS = {0: "date", 1: "inst_net_buy", 2: "frgn_net_buy"}
+
+    def __init__(self, history, page_size=200, cybos=None):
+        super().__init__(history, page_size, cybos)
+
+    def _select(self):
+        df = self.history.get(self._inputs[0])
+        if df is None:
+            return pd.DataFrame(columns=list(self.COLUMNS.values()))
+        if self._inputs.get(1, 0) == 0:
+            start, end = self._inputs[2], self._inputs[3]
+            df = df[(df["date"] >= start) & (df["date"] <= end)]
+        else:
+            df = df.tail(self._inputs[2])  # 일별 최근 n일
+        return df.iloc[::-1].reset_index(drop=True)
+
+    def GetDataValue(self, column, row):
+        return self._page[self.COLUMNS[column]].iloc[row]
+
+
+class FakeCreon:
+    """
+    가짜 CREON 세션
+
+    dispatch(progid) 로 win32com.client.Dispatch 를 대신한다.
+    CpCybos 는 세션에 하나 (한도 공유), 조회 객체는 Dispatch 마다 새로 만든다.
+
+    데이터:
+        chart:    {"A005930": DataFrame(date(YYYYMMDD), open, high, low, close, volume, amount)}
+        investor: {"A005930": DataFrame(date(YYYYMMDD), inst_net_buy, frgn_net_buy)}
+        MarketEye 현재가는 chart 의 마지막 거래일 봉
+    """
+
+    def __init__(self, chart, investor=None, clock=None, limit=60, window=15.0, latency=0.0):
+        """
+        Parameters:
+            chart: 종목별 일봉 (위 형식)
+            investor: 종목별 투자자 순매수 (없으면 빈 응답)
+            clock: FakeClock (가상 시간) 또는 SystemClock (기본, 실제 시간)
+            limit / window: 조회 한도 (window 초당 limit 건)
+            latency: 요청 1건 응답 시간 (초)
+        """
+        self.chart = chart
+        self.investor = investor or {}
+        self.clock = clock or SystemClock()
+        self.cybos = FakeCpCybos(self.clock, limit=limit, window=window, latency=latency)
+        self._bars = None
+
+    @classmethod
+    def from_snapshot(cls, snapshot, **options):
+        """
+        기록 데이터 재생: 패널 스냅샷(실제 CREON 에서 수집한 이력)을 응답으로 사용
+        """
+        chart, investor = {}, {}
+        for code in snapshot.codes:
+            df = snapshot.frame(code)
+            if df is None:
+                continue
+            key = code if code.startswith("U") else "A" + code
+            dates = snapshot.dates[np.asarray(snapshot.valid(code))]
+            chart[key] = pd.DataFrame({
+                "date": dates,
+                "open": df["open"].to_numpy(), "high": df["high"].to_numpy(),
+                "low": df["low"].to_numpy(), "close": df["close"].to_numpy(),
+                "volume": df["volume"].to_numpy(), "amount": df["amount"].to_numpy()
+            })
+            flows = df["frgn_net_buy"].notna().to_numpy()
+            if flows.any():
+                investor[key] = pd.DataFrame({
+                    "date": dates[flows],
+                    "inst_net_buy": df["inst_net_buy"].to_numpy()[flows].astype(np.int64),
+                    "frgn_net_buy": df["frgn_net_buy"].to_numpy()[flows].astype(np.int64)
+                })
+        return cls(chart, investor, **options)
+
+    @classmethod
+    def synthetic(cls, codes, end, days=750, seed=0, **options):
+        """
+        합성 데이터: 종목별 랜덤워크 일봉 + 투자자 순매수 (KRX 거래일 기준)
+
+        Parameters:
+            codes: 종목코드 리스트 (지수는 U 로 시작, 투자자 데이터 없음)
+            end: 마지막 거래일 (YYYYMMDD)
+            days: 종목당 거래일 수
+            seed: 난수 시드
+        """
+        from .trading_calendar import KRXCalendar
+
+        calendar = KRXCalendar()
+        dates = calendar.trading_days(calendar.sessions_back(end, days), end)
+        rng = np.random.default_rng(seed)
+        chart, investor = {}, {}
+        for code in codes:
+            key = code if code.startswith("U") else "A" + code
+            n = len(dates)
+            close = np.maximum(rng.integers(5000, 200000) * np.exp(np.cumsum(rng.normal(0, 0.02, n))), 100)
+            close = close.astype(np.int64)
+            spread = np.maximum(close // 50, 1)
+            volume = rng.integers(10 ** 5, 10 ** 7, n)
+            chart[key] = pd.DataFrame({
+                "date": dates, "open": close - spread // 2, "high": close + spread,
+                "low": close - spread, "close": close, "volume": volume, "amount": volume * close
+            })
+            if not code.startswith("U"):
+                investor[key] = pd.DataFrame({
+                    "date": dates,
+                    "inst_net_buy": rng.integers(-10 ** 5, 10 ** 5, n),
+                    "frgn_net_buy": rng.integers(-10 ** 5, 10 ** 5, n)
+                })
+        return cls(chart, investor, **options)
+
+    def dispatch(self, progid):
+        """win32com.client.Dispatch 대체"""
+        if progid == "CpUtil.CpCybos":
+            return self.cybos
+        if progid == "CpSysDib.StockChart":
+            return FakeStockChart(self.chart, cybos=self.cybos)
+        if progid == "CpSysDib.CpSvr7254":
+            return FakeCpSvr7254(self.investor, cybos=self.cybos)
+        if progid == "CpSysDib.MarketEye":
+            return FakeMarketEye(self._last_bars(), self.cybos)
+        raise ValueError(f"가짜 CREON 에 없는 객체: {progid}")
+
+    @property
+    def total_requests(self):
+        return self.cybos.total_requests
+
+    def _last_bars(self):
+        """MarketEye 응답용 마지막 거래일 봉 (필드 번호별 값)"""
+        if self._bars is None:
+            self._bars = {}
+            for key, df in self.chart.items():
+                if len(df):
+                    last = df.iloc[-1]
+                    self._bars[key] = {4: last["close"], 5: last["open"], 6: last["high"],
+                                       7: last["low"], 10: last["volume"], 11: last["amount"]}
+        return self._bars
+
+
+def benchmark(n_requests=404):
+    """
+    고정 1.1초 대기 vs 스케줄러 소요 시간 비교 (가상 시계)
+
+    기본 404건 = 유니버스 202종목 × (OHLCV + 투자자)
+    """
+    from .request_scheduler import CreonRequestScheduler
+
+    fixed = (n_requests - 1) * 1.1
+
+    clock = FakeClock()
+    cybos = FakeCpCybos(clock)
+    scheduler = CreonRequestScheduler(cybos, clock=clock.time, sleep=clock.sleep)
+    for _ in range(n_requests):
+        scheduler.request(cybos.request)
+
+    return {
+        "requests": n_requests,
+        "fixed_seconds": round(fixed, 1),
+        "scheduler_seconds": round(clock.time(), 1),
+        "waits": scheduler.stats["waits"]
+    }
+
+
+if __name__ == "__main__":
+    result = benchmark()
+    print(f"요청 {result['requests']}건")
+    print(f"  고정 1.1초 대기: {result['fixed_seconds']}초")
+    print(f"  스케줄러:        {result['scheduler_seconds']}초 (대기 {result['waits']}회)")
@@ -0,0 +1,122 @@
+"""
+공용 지표 저장소 (FeatureStore / PanelFeatures)
+- 여러 엔진이 같은 종목에 대해 따로 계산하던 이동평균/TR/ATR/N일 수익률을 한 번만 계산
+  (RSI 는 심리 엔진만 쓰며 psychology_engine.oscillators 가 고정 순서 합으로 계산)
+- 지표 이름 + 파라미터별로 메모 (처음 요청한 엔진이 계산, 이후 엔진은 같은 결과를 받는다)
+- features(df): 종목 DataFrame 별 저장소 (analyze(df) 경로)
+- features(panel): BarPanel 별 저장소 (analyze_panel 경로, 마지막 봉 기준 종목 벡터)
+
+저장소가 돌려주는 Series/배열은 엔진끼리 공유하므로 수정하지 않는다.
+"""
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from .bar_panel import BarPanel, window
+
+
+class FeatureStore:
+    """
+    종목 하나의 지표 저장소 (DataFrame 행 순서와 같은 Series)
+
+    사용 예:
+        f = features(df)
+        ma300 = f.ma(300).iloc[-1]
+    """
+
+    def __init__(self, df):
+        # DataFrame 자체는 잡아 두지 않는다 (DataFrame 이 사라지면 캐시에서 제거되도록)
+        self.high = df['high']
+        self.low = df['low']
+        self.close = df['close']
+        self._memo = {}
+
+    def __len__(self):
+        return len(self.close)
+
+    def _get(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def ma(self, period):
+        """종가 단순 이동평균 (close.rolling(period).mean())"""
+        return self._get(("ma", period), lambda: self.close.rolling(period).mean())
+
+    def true_range(self):
+        """True Range (첫 봉은 전일 종가가 없어 고가 - 저가)"""
+        def compute():
+            high, low = self.high.to_numpy(dtype=float), self.low.to_numpy(dtype=float)
+            prev = self.close.shift().to_numpy(dtype=float)
+            tr = np.fmax(high - low, np.fmax(np.abs(high - prev), np.abs(low - prev)))
+            return pd.Series(tr, index=self.close.index)
+        return self._get(("true_range",), compute)
+
+    def atr(self, period=14):
+        """ATR (TR 의 period 일 단순 이동평균)"""
+        return self._get(("atr", period), lambda: self.true_range().rolling(window=period).mean())
+
+    def change_pct(self, period):
+        """
+        최근 period 봉 수익률 (%) — close.iloc[-1] / close.iloc[-period] - 1
+
+        Returns:
+            float 또는 None (봉 수 부족)
+        """
+        def compute():
+            if len(self.close) < period:
+                return None
+            return (self.close.iloc[-1] / self.close.iloc[-period] - 1) * 100
+        return self._get(("change_pct", period), compute)
+
+
+class PanelFeatures:
+    """
+    BarPanel 의 지표 저장소 (마지막 봉 기준, 종목별 값 벡터)
+
+    값은 window(...) 로 자른 (봉, 종목) 배열에서 계산하므로 봉 수가 모자란 종목은 NaN 이다.
+    """
+
+    def __init__(self, panel):
+        self.panel = weakref.proxy(panel)
+        self._memo = {}
+
+    def _get(self, key, compute):
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def ma(self, period, lag=0, field="close"):
+        """lag 봉 전 시점의 period 일 평균 (종목별) — window(values, period, lag).mean(axis=0)"""
+        return self._get(("ma", period, lag, field),
+                         lambda: window(getattr(self.panel, field), period, lag).mean(axis=0))
+
+    def change_pct(self, period):
+        """최근 period 봉 수익률 (%) (종목별) — FeatureStore.change_pct"""
+        def compute():
+            close = self.panel.close
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return (close[-1] / window(close, 1, lag=period - 1)[0] - 1) * 100
+        return self._get(("change_pct", period), compute)
+
+
+# DataFrame/BarPanel 별 저장소 (대상이 사라지면 함께 제거)
+_cache = {}
+
+
+def features(data):
+    """
+    DataFrame 또는 BarPanel 의 공용 지표 저장소
+
+    같은 DataFrame(패널)을 분석하는 엔진들은 같은 저장소를 받으므로
+    종목당 지표 계산은 지표 + 파라미터별 한 번뿐이다.
+    """
+    key = id(data)
+    entry = _cache.get(key)
+    if entry is not None and entry[0]() is data and (isinstance(data, BarPanel) or len(entry[1]) == len(data)):
+        return entry[1]
+
+    store = PanelFeatures(data) if isinstance(data, BarPanel) else FeatureStore(data)
+    _cache[key] = (weakref.ref(data, lambda _, k=key: _cache.pop(k, None)), store)
+    return store
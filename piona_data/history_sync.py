@@ -0,0 +1,111 @@
+"""
+이력 동기화
+- KRX 거래일 달력 기준으로 종목별 빠진 거래일 계산
+- 빠진 구간만 기간 조회 (Continue 로 이어받기) 후 한 번에 저장
+- 종목별 완결성 리포트
+"""
+import numpy as np
+
+from .panel_store import to_date_int
+from .request_scheduler import get_scheduler
+from .trading_calendar import KRXCalendar
+
+
+class HistorySync:
+    """종목별 빠진 거래일 보충"""
+
+    def __init__(self, loader, fetcher, calendar=None, init_days=100):
+        """
+        Parameters:
+            loader: MarketDataLoader
+            fetcher: get_range(code, start, end, lane) 제공 객체 (DataMerger)
+            calendar: KRXCalendar (None 이면 저장소 지수 거래일 기반으로 생성)
+            init_days: 이력 없는 종목의 수집 거래일 수
+        """
+        self.name = "History Sync"
+        self.loader = loader
+        self.fetcher = fetcher
+        self.calendar = calendar
+        self.init_days = init_days
+
+    def plan(self, codes, until):
+        """
+        종목별 요청 구간 계산
+
+        Returns:
+            dict: {종목코드: 빠진 거래일 배열} (빠진 날이 없는 종목 제외)
+        """
+        snapshot = self.loader.snapshot()
+        calendar = self.calendar or KRXCalendar.from_snapshot(snapshot)
+
+        plan = {}
+        for code in codes:
+            last = snapshot.last_date(code)
+            if last is None:
+                start = calendar.sessions_back(until, self.init_days)
+                expected = calendar.trading_days(start, until)
+            else:
+                expected = calendar.missing_days(last, until)
+            if len(expected):
+                plan[code] = expected
+        return plan
+
+    def sync(self, codes, until=None, positions=None, commit=True):
+        """
+        빠진 거래일 보충
+
+        Parameters:
+            codes: 종목 리스트 (지수 포함 가능)
+            until: 마지막 거래일 (기본: 장 마감이 끝난 최근 거래일)
+            positions: 보유 종목코드 집합 (먼저 요청)
+            commit: False 면 저장하지 않고 frames 만 반환
+
+        Returns:
+            (frames, report)
+            frames: {종목코드: 신규 DataFrame}
+            report: {종목코드: {expected, received, missing, complete}}
+        """
+        calendar = self.calendar or KRXCalendar.from_snapshot(self.loader.snapshot())
+        until = int(until) if until is not None else calendar.last_closed_trading_day()
+
+        plan = self.plan(codes, until)
+        scheduler = get_scheduler()
+
+        frames = {}
+        report = {}
+        for code in scheduler.prioritize(list(plan), positions):
+            expected = plan[code]
+            df = self.fetcher.get_range(code, int(expected[0]), int(expected[-1]),
+                                        lane=scheduler.lane_for(code, positions))
+
+            received = np.empty(0, dtype=np.int64)
+            if df is not None and not df.empty:
+                dates = to_date_int(df["date"])
+                keep = np.isin(dates, expected)
+                df = df[keep]
+                received = dates[keep]
+                if len(df):
+                    frames[code] = df
+
+            missing = np.setdiff1d(expected, received)
+            report[code] = {
+                "expected": int(len(expected)),
+                "received": int(len(received)),
+                "missing": [int(d) for d in missing],
+                "complete": len(missing) == 0
+            }
+
+        for code in codes:
+            if code not in report:
+                report[code] = {"expected": 0, "received": 0, "missing": [], "complete": True}
+
+        if commit:
+            self.loader.store.write_frames(frames)
+
+        return frames, report
+
+    @staticmethod
+    def summary(report):
+        """리포트 요약: (완결 종목 수, 미완결 종목 목록)"""
+        incomplete = [code for code, r in report.items() if not r["complete"]]
+        return len(report) - len(incomplete), incomplete
@@ -0,0 +1,119 @@
+"""
+시세 데이터 로더
+- 패널 저장소 단일 진입점 (종목별 pkl 파일 직접 로드 대체)
+- 기존 data/*.pkl 자동 이관
+- 반환 DataFrame 은 표준 스키마 (piona_data.schema)
+- 스캔 동안 스냅샷 고정 (pinned) → 수집기가 동시에 써도 일관된 시점
+"""
+import os
+from contextlib import contextmanager
+
+from .panel_store import PanelStore
+from .bar_panel import bar_panel, DEFAULT_DEPTH
+
+
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+class MarketDataLoader:
+    """통합 시세 로더"""
+
+    def __init__(self, data_path=None):
+        self.name = "Market Data Loader"
+        self.data_path = data_path or DEFAULT_DATA_PATH
+        self.store = PanelStore(os.path.join(self.data_path, 'panel'))
+
+        self._snapshot = None
+        self._snapshot_version = None
+        self._pinned = None
+
+        self._migrate_legacy()
+
+    def snapshot(self):
+        """
+        최신 스냅샷 반환 (manifest 버전이 바뀌었을 때만 다시 연다, 고정 중이면 고정 스냅샷)
+
+        Returns:
+            PanelSnapshot
+        """
+        if self._pinned is not None:
+            return self._pinned
+        version = self.store.version()
+        if self._snapshot is None or version != self._snapshot_version:
+            self._snapshot = self.store.open()
+            self._snapshot_version = version
+        return self._snapshot
+
+    @contextmanager
+    def pinned(self, snapshot=None):
+        """
+        블록 안의 load/get_codes 를 한 스냅샷으로 고정
+
+        Parameters:
+            snapshot: 고정할 PanelSnapshot (None 이면 최신 — 다른 프로세스가 고정한 시점을 이어받을 때 지정)
+
+        사용 예:
+            with loader.pinned():
+                for code in loader.get_codes():
+                    df = loader.load(code)
+        """
+        if self._pinned is not None:
+            yield self._pinned
+            return
+        self._pinned = self.snapshot() if snapshot is None else snapshot
+        try:
+            yield self._pinned
+        finally:
+            self._pinned = None
+
+    def load(self, code):
+        """
+        종목 데이터 로드
+
+        Parameters:
+            code: 종목코드 (지수는 U001/U201)
+
+        Returns:
+            DataFrame (12컬럼) 또는 None
+        """
+        return self.snapshot().frame(code)
+
+    def load_panel(self, codes=None, depth=DEFAULT_DEPTH):
+        """
+        여러 종목을 오른쪽 정렬 패널로 로드 (엔진 analyze_panel 입력)
+
+        Parameters:
+            codes: 종목 리스트 (None 이면 지수 제외 전체)
+            depth: 종목별 최근 봉 수 (None 이면 전체)
+
+        Returns:
+            BarPanel
+        """
+        snapshot = self.snapshot()
+        if codes is None:
+            codes = [c for c in snapshot.codes if not c.startswith('U')]
+        return bar_panel(snapshot, codes, depth)
+
+    def get_codes(self, include_index=False):
+        """
+        저장된 종목코드 목록
+
+        Parameters:
+            include_index: True 면 지수(U로 시작) 포함
+        """
+        codes = self.snapshot().codes
+        if include_index:
+            return list(codes)
+        return [c for c in codes if not c.startswith('U')]
+
+    def _migrate_legacy(self):
+        """패널이 없고 기존 pkl 파일이 있으면 한 번 이관 (이전 형식 패널은 변환)"""
+        if self.store.upgrade():
+            print("[Loader] 패널 저장소 → 정수 스키마 변환 완료", flush=True)
+        if self.store.exists() or not os.path.isdir(self.data_path):
+            return
+        if not any(f.endswith('days.pkl') for f in os.listdir(self.data_path)):
+            return
+
+        count = self.store.import_pickles(self.data_path)
+        print(f"[Loader] 기존 pkl {count}종목 → 패널 저장소 이관 완료", flush=True)
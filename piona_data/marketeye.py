@@ -0,0 +1,168 @@
+"""
+MarketEye 일괄 갱신
+- CpSysDib.MarketEye 1회 요청으로 최대 200종목 당일 OHLCV/거래대금 조회
+- 이력 공백이 있는 종목/지수만 종목별 기간 조회로 보충 (HistorySync)
+"""
+import pandas as pd
+
+from . import creon_com
+from .history_sync import HistorySync
+from .request_scheduler import get_scheduler, LANE_UNIVERSE
+from .trading_calendar import KRXCalendar
+
+
+# MarketEye 필드 번호 → 컬럼 (응답은 필드 번호 오름차순)
+MARKETEYE_FIELDS = {
+    0: "code",
+    4: "close",
+    5: "open",
+    6: "high",
+    7: "low",
+    10: "volume",
+    11: "amount"
+}
+
+MAX_CODES = 200  # MarketEye 1회 요청 최대 종목 수
+
+
+class MarketEyeClient:
+    """CpSysDib.MarketEye 다종목 현재가 조회"""
+
+    def __init__(self, dispatch=None, scheduler=None):
+        """
+        Parameters:
+            dispatch: progid → COM 객체 함수 (기본 creon_com.dispatch)
+            scheduler: CreonRequestScheduler (기본 공용 스케줄러)
+        """
+        self.name = "MarketEye Client"
+        self.dispatch = dispatch or creon_com.dispatch
+        self.scheduler = scheduler
+        self.requests = 0
+
+    def get_bars(self, codes, lane=LANE_UNIVERSE):
+        """
+        당일 시고저종/거래량/거래대금 일괄 조회
+
+        Parameters:
+            codes: 종목코드 리스트 (A 접두어 없이)
+
+        Returns:
+            DataFrame: code, open, high, low, close, volume, amount
+        """
+        scheduler = self.scheduler or get_scheduler()
+        fields = sorted(MARKETEYE_FIELDS)
+        frames = []
+
+        for start in range(0, len(codes), MAX_CODES):
+            chunk = codes[start:start + MAX_CODES]
+            obj = self.dispatch("CpSysDib.MarketEye")
+            obj.SetInputValue(0, fields)
+            obj.SetInputValue(1, ["A" + c for c in chunk])
+            with scheduler.slot(lane):
+                obj.BlockRequest()
+            self.requests += 1
+
+            count = obj.GetHeaderValue(2)
+            data = {
+                MARKETEYE_FIELDS[f]: [obj.GetDataValue(k, i) for i in range(count)]
+                for k, f in enumerate(fields)
+            }
+            frames.append(pd.DataFrame(data))
+
+        if not frames:
+            return pd.DataFrame(columns=list(MARKETEYE_FIELDS.values()))
+
+        df = pd.concat(frames, ignore_index=True)
+        df["code"] = df["code"].str.lstrip("A")
+        return df
+
+
+class BulkDailyUpdater:
+    """
+    일일 갱신 (MarketEye 일괄 + 기간 조회 보충)
+
+    직전 거래일까지 이력이 이어진 종목은 MarketEye 로 당일 봉만 채우고,
+    공백이 있거나 처음 수집하는 종목과 지수는 HistorySync 로 빠진 구간만 조회한다.
+    MarketEye 로 채운 당일 외국인/기관 순매수는 비워둔다 (NaN).
+    """
+
+    def __init__(self, loader, merger, client=None, calendar=None, init_days=100):
+        """
+        Parameters:
+            loader: MarketDataLoader
+            merger: DataMerger (get_range 로 종목별 보충 조회)
+            client: MarketEyeClient
+            calendar: KRXCalendar (None 이면 저장소 지수 거래일 기반)
+            init_days: 이력 없는 종목 수집 거래일 수
+        """
+        self.name = "Bulk Daily Updater"
+        self.loader = loader
+        self.merger = merger
+        self.client = client or MarketEyeClient()
+        self.calendar = calendar
+        self.init_days = init_days
+
+    def run(self, codes, trade_date=None, positions=None):
+        """
+        당일 봉 갱신
+
+        Parameters:
+            codes: 종목 리스트 (지수 포함 가능)
+            trade_date: 당일 거래일 (기본: 장 마감이 끝난 최근 거래일)
+            positions: 보유 종목코드 집합 (보충 조회 우선순위)
+
+        Returns:
+            dict: bulk (일괄 갱신 종목 수), fallback (보충 조회 종목), updated,
+                  marketeye_requests, report (종목별 완결성)
+        """
+        snapshot = self.loader.snapshot()
+        calendar = self.calendar or KRXCalendar.from_snapshot(snapshot)
+        if trade_date is None:
+            trade_int = calendar.last_closed_trading_day()
+        else:
+            trade_int = int(pd.Timestamp(trade_date).strftime("%Y%m%d"))
+        trade_date = pd.Timestamp(str(trade_int))
+        previous = calendar.previous_trading_day(trade_int)
+
+        bulk, fallback = [], []
+        for code in codes:
+            last = snapshot.last_date(code)
+            if last is not None and last >= trade_int:
+                continue
+            if code.startswith("U") or last != previous or not calendar.is_trading_day(trade_int):
+                fallback.append(code)
+            else:
+                bulk.append(code)
+
+        frames = {}
+        requests_before = self.client.requests
+
+        # 1) MarketEye 일괄 조회
+        if bulk:
+            bars = self.client.get_bars(bulk)
+            valid = bars[(bars["close"] > 0) & (bars["volume"] > 0)]
+            for row in valid.itertuples(index=False):
+                frames[row.code] = pd.DataFrame([{
+                    "date": trade_date,
+                    "open": row.open, "high": row.high, "low": row.low, "close": row.close,
+                    "volume": row.volume, "amount": row.amount
+                }])
+            # 거래정지 등 응답이 비정상인 종목은 종목별 조회로 보충
+            fallback += [c for c in bulk if c not in frames]
+        bulk_filled = len(frames)
+
+        # 2) 공백 종목 / 지수는 빠진 거래일 구간만 조회
+        sync = HistorySync(self.loader, self.merger, calendar, init_days=self.init_days)
+        synced, report = sync.sync(fallback, until=trade_int, positions=positions, commit=False)
+        frames.update(synced)
+
+        # 3) 한 번에 저장 (manifest 교체로 원자적 반영)
+        self.loader.store.write_frames(frames)
+
+        return {
+            "bulk": bulk_filled,
+            "fallback": fallback,
+            "updated": len(frames),
+            "marketeye_requests": self.client.requests - requests_before,
+            "report": report
+        }
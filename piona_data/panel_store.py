@@ -0,0 +1,589 @@
+"""
+패널 저장소 (Panel Store)
+- 종목 × 거래일 × 필드 컬럼형 저장소
+- 필드별 연속 배열 파일 (mmap 으로 열기, 복사 없는 컬럼 뷰)
+- 버전별 manifest + 세그먼트 디렉토리: 게시된 바이트는 수정하지 않음
+- 읽기는 잠금 없이 최신 manifest 하나로 일관된 스냅샷, 쓰기는 writer 잠금으로 직렬화
+- 필드별 고정 폭 정수 (schema.FIELD_DTYPES) + 결측 대신 유효 마스크
+- 지수 가격은 ×INDEX_PRICE_SCALE 정수로 저장 (소수 둘째 자리 보존)
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+
+from .schema import (
+    SCHEMA_VERSION, FIELD_DTYPES, MASK_FIELDS, FRAME_COLUMNS, PRICE_FIELDS,
+    to_date_int, from_date_int, to_typed, build_frame, price_scale
+)
+
+
+# 저장 필드 (range/gap 은 로드 시 계산)
+FIELDS = list(FIELD_DTYPES)
+
+# 저장 파일 → dtype (필드 + 유효 마스크)
+FILE_DTYPES = dict(FIELD_DTYPES, **{name: np.bool_ for name in MASK_FIELDS})
+
+# schema 1 패널 (모든 필드 float64, 결측 NaN)
+LEGACY_DTYPE = np.float64
+
+# 최신 manifest 외에 남겨 둘 이전 버전 수 / 보존 시간 (열려 있는 스냅샷 보호)
+KEEP_VERSIONS = 8
+RETAIN_SECONDS = 3600
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class WriterLock:
+    """
+    프로세스 간 writer 잠금 (fcntl.flock / msvcrt.locking)
+
+    OS 잠금이라 프로세스가 죽으면 자동 해제된다. 읽기 쪽은 잠그지 않는다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._fh = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX)
+        else:
+            self._fh.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._fh.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK 은 10초 후 실패하므로 다른 writer 가 끝날 때까지 반복
+                    continue
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+        else:
+            self._fh.seek(0)
+            msvcrt.locking(self._fh.fileno(), msvcrt.LK_UNLCK, 1)
+        self._fh.close()
+        self._fh = None
+        return False
+
+
+def _date_weights(dates):
+    """거래일별 64비트 홀수 가중치 (splitmix64 — 날짜 값만으로 결정, 행 위치와 무관)"""
+    z = np.asarray(dates, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return (z ^ (z >> np.uint64(31))) | np.uint64(1)
+
+
+class PanelSnapshot:
+    """
+    특정 시점의 패널 읽기 전용 뷰
+
+    manifest 에 기록된 거래일 수/종목 수까지만 매핑하므로,
+    이후 writer 가 파일 뒤에 추가한 행은 보이지 않는다.
+    세그먼트 파일은 생성 시점에 모두 매핑해 두므로 이후 정리(GC)로
+    파일이 지워져도 스냅샷은 그대로 읽힌다.
+    """
+
+    def __init__(self, root, manifest):
+        self.root = root
+        self.manifest = manifest
+        self.version = manifest.get("version", 0)
+        self.segment_dir = os.path.join(root, manifest.get("segment", ""))
+        self.dates = np.asarray(manifest["dates"], dtype=np.int32)
+        self.codes = list(manifest["codes"])
+        self._index = {c: j for j, c in enumerate(self.codes)}
+        self._arrays = {}
+        if manifest.get("schema", 1) == SCHEMA_VERSION:
+            for name in FILE_DTYPES:
+                self.field(name)
+
+    @property
+    def n_days(self):
+        return len(self.dates)
+
+    @property
+    def n_symbols(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return code in self._index
+
+    def field(self, name):
+        """필드 전체 (거래일 × 종목) 읽기 전용 mmap 배열 (필드 dtype 그대로, 지수 가격은 배율 적용 값)"""
+        if name not in self._arrays:
+            shape = (self.n_days, self.n_symbols)
+            dtype = FILE_DTYPES[name]
+            if self.n_days == 0 or self.n_symbols == 0:
+                arr = np.zeros(shape, dtype=dtype)
+            else:
+                path = os.path.join(self.segment_dir, f"{name}.bin")
+                arr = np.memmap(path, dtype=dtype, mode="r", shape=shape)
+            self._arrays[name] = arr
+        return self._arrays[name]
+
+    def column(self, name, code):
+        """종목 하나의 필드 시계열 (복사 없는 뷰, 결측 자리는 0 — valid 로 구분)"""
+        return self.field(name)[:, self._index[code]]
+
+    def valid(self, code):
+        """종목의 데이터 존재 거래일 마스크"""
+        return self.column("valid", code)
+
+    def flow_valid(self, code):
+        """종목의 외인/기관 순매수 존재 거래일 마스크"""
+        return self.column("flow_valid", code)
+
+    def nbytes(self):
+        """패널 전체 배열 크기 (바이트, 날짜 포함)"""
+        cells = self.n_days * self.n_symbols
+        size = sum(cells * np.dtype(dtype).itemsize for dtype in FILE_DTYPES.values())
+        return size + self.dates.nbytes
+
+    def frame(self, code):
+        """
+        표준 스키마 12컬럼 DataFrame 생성 (schema.build_frame)
+
+        Returns:
+            DataFrame 또는 None (종목 없음)
+        """
+        if code not in self._index:
+            return None
+
+        mask = np.asarray(self.valid(code))
+        if not mask.any():
+            return None
+
+        columns = {name: self.column(name, code)[mask] for name in FIELDS}
+        return build_frame(code, self.dates[mask], columns, self.flow_valid(code)[mask])
+
+    def last_date(self, code):
+        """종목의 마지막 저장 거래일 (YYYYMMDD, 없으면 None)"""
+        if code not in self._index:
+            return None
+        idx = np.flatnonzero(self.valid(code))
+        return int(self.dates[idx[-1]]) if len(idx) else None
+
+    def count(self, code):
+        """종목의 저장 거래일 수"""
+        if code not in self._index:
+            return 0
+        return int(self.valid(code).sum())
+
+    def fingerprint(self, code):
+        """
+        종목 데이터 내용 지문 (봉이 추가/수정되면 바뀜 — 분석 캐시 키)
+
+        Returns:
+            str (32자 hex) 또는 None (종목 없음)
+        """
+        return self.fingerprints([code])[0]
+
+    def fingerprints(self, codes):
+        """
+        여러 종목 데이터 지문 (종목 열 반복 없이 필드별 거래일 가중합 한 번)
+
+        가중치는 날짜 값에서 정해지므로 앞쪽 이력이 채워져 행 위치가 밀려도
+        내용이 같으면 지문이 같다.
+
+        Returns:
+            list: 종목별 str (32자 hex) 또는 None (종목 없음)
+        """
+        cols = np.array([self._index.get(c, -1) for c in codes], dtype=np.intp)
+        present = np.flatnonzero(cols >= 0)
+        out = [None] * len(codes)
+        if not len(present):
+            return out
+
+        sel = cols[present]
+        weights = _date_weights(self.dates)
+        valid = np.asarray(self.field("valid")[:, sel])
+        sums = [weights @ valid.astype(np.uint64)]
+        for name in FIELDS + ["flow_valid"]:
+            values = np.where(valid, self.field(name)[:, sel], 0)
+            if values.dtype.kind == "f":
+                values = values.view(np.uint64)
+            else:
+                values = values.astype(np.int64).view(np.uint64)
+            sums.append(weights @ values)
+
+        table = np.ascontiguousarray(np.stack(sums, axis=1))
+        for k, j in enumerate(present):
+            out[j] = hashlib.blake2b(table[k].tobytes(), digest_size=16).hexdigest()
+        return out
+
+
+class PanelStore:
+    """
+    종목 × 거래일 컬럼형 패널 저장소
+
+    디렉토리 구성:
+        manifest-{버전}.json  거래일 목록, 종목 목록, 세그먼트, 스키마 버전 (커밋 지점)
+        seg-{버전}/           세그먼트 (manifest 가 가리키는 필드 파일 묶음)
+            {field}.bin       필드별 (거래일 × 종목) 연속 배열 (dtype 은 schema.FIELD_DTYPES)
+            valid.bin         봉 존재 마스크 (bool)
+            flow_valid.bin    외인/기관 순매수 존재 마스크 (bool)
+        writer.lock           writer 직렬화용 잠금 파일
+
+    게시 규칙:
+        - manifest 는 임시 파일에 쓴 뒤 새 이름으로 rename 한다 (덮어쓰기 없음).
+          읽기는 번호가 가장 큰 manifest 하나만 읽으면 되므로 잠금/재시도가 없다.
+        - 거래일 추가는 현재 세그먼트의 게시된 행 뒤에만 쓴다.
+          게시된 바이트는 바뀌지 않으므로 열려 있는 mmap 과 충돌하지 않는다.
+        - 과거 수정/신규 종목은 새 세그먼트를 만들어 통째로 쓴다.
+        - 이전 manifest/세그먼트는 KEEP_VERSIONS 개, RETAIN_SECONDS 초 보존 후 정리.
+
+    이전 형식 (루트의 manifest.json + {field}.bin) 은 버전 0 으로 읽는다.
+    """
+
+    LEGACY_MANIFEST = "manifest.json"
+    MANIFEST_PREFIX = "manifest-"
+    SEGMENT_PREFIX = "seg-"
+    LOCK = "writer.lock"
+
+    def __init__(self, root):
+        self.root = root
+
+    # ========================================
+    # 읽기
+    # ========================================
+    def exists(self):
+        return self.version() is not None
+
+    def version(self):
+        """
+        게시된 최신 manifest 버전
+
+        Returns:
+            int (이전 형식은 0) 또는 None (저장소 없음)
+        """
+        versions = self._manifest_versions()
+        if versions:
+            return versions[-1]
+        if os.path.exists(os.path.join(self.root, self.LEGACY_MANIFEST)):
+            return 0
+        return None
+
+    def _manifest_versions(self):
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return []
+        versions = []
+        for name in names:
+            if name.startswith(self.MANIFEST_PREFIX) and name.endswith(".json"):
+                try:
+                    versions.append(int(name[len(self.MANIFEST_PREFIX):-5]))
+                except ValueError:
+                    continue
+        return sorted(versions)
+
+    def _manifest_path(self, version):
+        if version == 0:
+            return os.path.join(self.root, self.LEGACY_MANIFEST)
+        return os.path.join(self.root, f"{self.MANIFEST_PREFIX}{version:08d}.json")
+
+    def _read_manifest(self):
+        version = self.version()
+        if version is None:
+            return {"version": 0, "segment": "", "dates": [], "codes": [], "fields": FIELDS,
+                    "schema": SCHEMA_VERSION}
+        with open(self._manifest_path(version), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        manifest.setdefault("version", version)
+        manifest.setdefault("segment", "")
+        return manifest
+
+    def open(self):
+        """현재 manifest 기준 스냅샷 열기"""
+        return PanelSnapshot(self.root, self._read_manifest())
+
+    def needs_upgrade(self):
+        """이전 스키마 패널 여부 (schema 1: float64/NaN, schema 2: 지수 가격 배율 없음)"""
+        return self.exists() and self._read_manifest().get("schema", 1) < SCHEMA_VERSION
+
+    def upgrade(self):
+        """
+        이전 스키마 패널 → 현재 형식으로 변환
+
+        schema 1 (float64/NaN) 은 정수 필드 + 유효 마스크로,
+        schema 2 는 지수 가격 열에 배율을 곱한다 (이미 잘린 소수점은 복구되지 않음).
+
+        Returns:
+            bool: 변환 여부
+        """
+        if not self.needs_upgrade():
+            return False
+
+        with self._lock():
+            if not self.needs_upgrade():
+                return False
+            self._upgrade()
+        return True
+
+    def _upgrade(self):
+        manifest = self._read_manifest()
+        segment = manifest["segment"]
+        shape = (len(manifest["dates"]), len(manifest["codes"]))
+        scales = np.array([price_scale(c) for c in manifest["codes"]], dtype=np.int64)
+
+        def read(name, dtype):
+            if shape[0] and shape[1]:
+                return np.fromfile(self._path(segment, name), dtype=dtype, count=shape[0] * shape[1])
+            return np.empty(0, dtype=dtype)
+
+        arrays = {}
+        if manifest.get("schema", 1) == 1:
+            for f in FIELDS:
+                # 평탄화 배열은 종목 축이 가장 빠르므로 배율을 거래일 수만큼 반복
+                scale = np.tile(scales, shape[0]) if f in PRICE_FIELDS else 1
+                values, mask = to_typed(read(f, LEGACY_DTYPE), FIELD_DTYPES[f], scale)
+                arrays[f] = values.reshape(shape)
+                for name, source in MASK_FIELDS.items():
+                    if source == f:
+                        arrays[name] = mask.reshape(shape)
+        else:
+            for f, dtype in FILE_DTYPES.items():
+                arrays[f] = read(f, dtype).reshape(shape)
+            for f in PRICE_FIELDS:
+                arrays[f] = (arrays[f] * scales).astype(FIELD_DTYPES[f])
+
+        segment = self._write_segment(manifest["version"] + 1, arrays)
+        self._publish(dict(manifest, segment=segment, fields=FIELDS, schema=SCHEMA_VERSION))
+
+    # ========================================
+    # 쓰기
+    # ========================================
+    def write_frames(self, frames):
+        """
+        종목별 DataFrame 병합 저장
+
+        Parameters:
+            frames: {종목코드: DataFrame(date, open, ..., inst_net_buy)}
+
+        기존 거래일 뒤에 붙는 신규 거래일만 있으면 파일 끝에 추가(append)하고,
+        과거 거래일 수정이나 신규 종목이 있으면 전체를 다시 쓴다.
+        """
+        incoming = {}
+        for code, df in frames.items():
+            if df is None or df.empty:
+                continue
+            incoming[code] = self._frame_to_arrays(code, df)
+        if not incoming:
+            return
+
+        self._commit(incoming)
+
+    def append_day(self, date, rows):
+        """
+        하루치 데이터 원자적 추가
+
+        Parameters:
+            date: 거래일 (datetime 또는 YYYYMMDD 정수)
+            rows: {종목코드: {필드: 값}}
+        """
+        if isinstance(date, (int, np.integer)):
+            date_int = int(date)
+        else:
+            date_int = int(to_date_int([date])[0])
+        dates = np.array([date_int], dtype=np.int32)
+        incoming = {
+            code: self._frame_to_arrays(code, pd.DataFrame([values]).assign(date=from_date_int(dates)))
+            for code, values in rows.items()
+        }
+        self._commit(incoming)
+
+    def import_pickles(self, data_dir):
+        """
+        기존 data/{code}_*days.pkl 파일을 패널로 이관
+
+        Returns:
+            int: 이관한 종목 수
+        """
+        frames = {}
+        for name in sorted(os.listdir(data_dir)):
+            if not name.endswith("days.pkl"):
+                continue
+            code = name.split("_")[0]
+            try:
+                df = pd.read_pickle(os.path.join(data_dir, name))
+            except Exception as e:
+                print(f"[Store] {name} 읽기 실패: {e}", flush=True)
+                continue
+            if code in frames:
+                df = pd.concat([frames[code], df]).drop_duplicates("date", keep="last")
+            frames[code] = df.sort_values("date")
+        self.write_frames(frames)
+        return len(frames)
+
+    # ========================================
+    # 내부 구현
+    # ========================================
+    def _frame_to_arrays(self, code, df):
+        """DataFrame → (날짜 배열, {파일: 필드 dtype 배열}) (결측은 0 + 마스크 False, 지수 가격은 배율 적용)"""
+        dates = to_date_int(df["date"])
+        scale = price_scale(code)
+        values = {}
+        for f in FIELDS:
+            if f in df.columns:
+                values[f], mask = to_typed(df[f], FIELD_DTYPES[f], scale if f in PRICE_FIELDS else 1)
+            else:
+                values[f], mask = np.zeros(len(df), dtype=FIELD_DTYPES[f]), np.zeros(len(df), dtype=bool)
+            for name, source in MASK_FIELDS.items():
+                if source == f:
+                    values[name] = mask
+        order = np.argsort(dates, kind="stable")
+        return dates[order], {f: v[order] for f, v in values.items()}
+
+    def _lock(self):
+        return WriterLock(os.path.join(self.root, self.LOCK))
+
+    def _commit(self, incoming):
+        with self._lock():
+            if self.needs_upgrade():
+                self._upgrade()
+            self._commit_locked(incoming)
+
+    def _commit_locked(self, incoming):
+        manifest = self._read_manifest()
+        old_dates = manifest["dates"]
+        known = set(manifest["codes"])
+
+        only_new_days = bool(old_dates) and all(
+            (dates > old_dates[-1]).all() for dates, _ in incoming.values()
+        )
+        if only_new_days and all(code in known for code in incoming):
+            self._append_rows(manifest, incoming)
+        else:
+            self._rewrite(manifest, incoming)
+
+    def _path(self, segment, name):
+        return os.path.join(self.root, segment, f"{name}.bin")
+
+    def _append_rows(self, manifest, incoming):
+        """신규 거래일 행을 현재 세그먼트의 게시된 행 뒤에 쓰고 새 manifest 게시"""
+        codes = manifest["codes"]
+        col = {c: j for j, c in enumerate(codes)}
+        n_old = len(manifest["dates"])
+        new_dates = np.unique(np.concatenate([d for d, _ in incoming.values()]))
+
+        block = {f: np.zeros((len(new_dates), len(codes)), dtype=dtype) for f, dtype in FILE_DTYPES.items()}
+        for code, (dates, values) in incoming.items():
+            rows = np.searchsorted(new_dates, dates)
+            for f in FILE_DTYPES:
+                block[f][rows, col[code]] = values[f]
+
+        for f, dtype in FILE_DTYPES.items():
+            row_bytes = len(codes) * np.dtype(dtype).itemsize
+            path = self._path(manifest["segment"], f)
+            with open(path, "r+b" if os.path.exists(path) else "w+b") as fh:
+                # 게시된 행 바로 뒤부터 덮어쓴다 (중단된 쓰기의 잔여 바이트는 게시 범위 밖).
+                # truncate 는 다른 프로세스가 매핑 중인 파일에서 실패할 수 있으므로 쓰지 않는다.
+                fh.seek(n_old * row_bytes)
+                fh.write(block[f].tobytes())
+                fh.flush()
+                os.fsync(fh.fileno())
+
+        manifest = dict(manifest)
+        manifest["dates"] = list(manifest["dates"]) + new_dates.tolist()
+        self._publish(manifest)
+
+    def _rewrite(self, manifest, incoming):
+        """새 세그먼트에 전체 패널 재작성 (과거 거래일 수정, 신규 종목 추가)"""
+        old = self.open() if self.exists() else None
+        old_dates = np.asarray(manifest["dates"], dtype=np.int32)
+        codes = list(manifest["codes"])
+        for code in incoming:
+            if code not in codes:
+                codes.append(code)
+        col = {c: j for j, c in enumerate(codes)}
+
+        all_dates = [old_dates] + [d for d, _ in incoming.values()]
+        dates = np.unique(np.concatenate(all_dates)).astype(np.int32)
+
+        arrays = {f: np.zeros((len(dates), len(codes)), dtype=dtype) for f, dtype in FILE_DTYPES.items()}
+        if old is not None and old.n_days and old.n_symbols:
+            rows = np.searchsorted(dates, old_dates)
+            for f in FILE_DTYPES:
+                arrays[f][rows, :old.n_symbols] = old.field(f)
+        for code, (d, values) in incoming.items():
+            rows = np.searchsorted(dates, d)
+            for f in FILE_DTYPES:
+                arrays[f][rows, col[code]] = values[f]
+        old = None
+
+        segment = self._write_segment(manifest["version"] + 1, arrays)
+        self._publish({"dates": dates.tolist(), "codes": codes, "segment": segment,
+                       "version": manifest["version"], "fields": FIELDS, "schema": SCHEMA_VERSION})
+
+    def _write_segment(self, version, arrays):
+        """새 세그먼트 디렉토리에 필드 파일 기록 (아직 어떤 manifest 도 가리키지 않음)"""
+        segment = f"{self.SEGMENT_PREFIX}{version:08d}"
+        seg_dir = os.path.join(self.root, segment)
+        # 게시 전에 중단된 같은 번호의 세그먼트 잔여물
+        shutil.rmtree(seg_dir, ignore_errors=True)
+        os.makedirs(seg_dir)
+        for f, arr in arrays.items():
+            with open(self._path(segment, f), "wb") as fh:
+                fh.write(np.ascontiguousarray(arr).tobytes())
+                fh.flush()
+                os.fsync(fh.fileno())
+        return segment
+
+    def _publish(self, manifest):
+        """다음 버전 manifest 게시 (새 파일명으로 rename, 기존 manifest 는 덮어쓰지 않음)"""
+        os.makedirs(self.root, exist_ok=True)
+        manifest = dict(manifest, version=manifest["version"] + 1)
+        path = self._manifest_path(manifest["version"])
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self._collect_garbage(manifest["version"])
+
+    def _collect_garbage(self, current):
+        """
+        오래된 manifest 와 어떤 manifest 도 가리키지 않는 세그먼트 정리
+
+        삭제 실패 (Windows 에서 다른 프로세스가 매핑 중) 는 무시하고 다음 커밋에서 다시 시도한다.
+        """
+        cutoff = time.time() - RETAIN_SECONDS
+        for version in self._manifest_versions():
+            if version > current - KEEP_VERSIONS:
+                continue
+            path = self._manifest_path(version)
+            try:
+                if os.stat(path).st_mtime < cutoff:
+                    os.remove(path)
+            except OSError:
+                continue
+
+        live = set()
+        for version in self._manifest_versions():
+            try:
+                with open(self._manifest_path(version), "r", encoding="utf-8") as f:
+                    live.add(json.load(f).get("segment", ""))
+            except (OSError, ValueError):
+                return
+        for name in os.listdir(self.root):
+            if name.startswith(self.SEGMENT_PREFIX) and name not in live:
+                seg_dir = os.path.join(self.root, name)
+                if int(name[len(self.SEGMENT_PREFIX):]) > current:
+                    continue
+                shutil.rmtree(seg_dir, ignore_errors=True)
@@ -0,0 +1,211 @@
+"""
+CREON 요청 스케줄러
+- 고정 1.1초 대기(_rate_limit) 대체
+- CpCybos 잔여 조회 한도(GetLimitRemainCount)만큼 연속 요청, 소진 시에만 대기
+- 우선순위 레인: 보유 종목 → 지수 → 유니버스
+- 한도 확인과 BlockRequest 를 한 구간(slot)으로 묶어 레인 간 동시 발행 방지
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+
+# 우선순위 레인 (숫자가 작을수록 먼저)
+LANE_POSITION = 0
+LANE_INDEX = 1
+LANE_UNIVERSE = 2
+
+LANES = (LANE_POSITION, LANE_INDEX, LANE_UNIVERSE)
+
+# CpCybos.GetLimitRemainCount 요청 유형 (1: 시세 조회)
+LT_NONTRADE_REQUEST = 1
+
+# CREON 미연결 시 기본 한도 (15초당 60건)
+FALLBACK_LIMIT = 60
+FALLBACK_WINDOW = 15.0
+
+
+class CreonRequestScheduler:
+    """
+    CREON 조회 요청 스케줄러
+
+    모든 BlockRequest 는 slot() 구간 안에서 호출한다.
+    잔여 한도가 있으면 즉시 통과하고, 0 이면 LimitRequestRemainTime 만큼만 대기한다.
+    한도 확인부터 BlockRequest 완료까지 구간을 점유하므로, 다른 스레드가
+    같은 잔여 한도를 보고 동시에 요청하는 일이 없다.
+    여러 스레드가 동시에 대기하면 우선순위가 높은 레인부터 통과시킨다.
+    """
+
+    def __init__(self, cybos=None, clock=time.monotonic, sleep=time.sleep,
+                 limit_type=LT_NONTRADE_REQUEST):
+        """
+        Parameters:
+            cybos: CpUtil.CpCybos 객체 (None 이면 15초당 60건 자체 계산)
+            clock: 현재 시각 함수 (초)
+            sleep: 대기 함수 (초)
+            limit_type: GetLimitRemainCount 요청 유형
+        """
+        self.name = "CREON Request Scheduler"
+        self.cybos = cybos
+        self.clock = clock
+        self.sleep = sleep
+        self.limit_type = limit_type
+
+        self._cond = threading.Condition()
+        self._waiting = {lane: 0 for lane in LANES}
+        self._busy = False
+
+        # CREON 미연결 시 자체 한도 기록
+        self._window_start = None
+        self._window_count = 0
+
+        self.stats = {
+            "requests": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "by_lane": {lane: 0 for lane in LANES}
+        }
+
+    # ========================================
+    # 공개 API
+    # ========================================
+    @contextmanager
+    def slot(self, lane=LANE_UNIVERSE):
+        """
+        요청 1건 발행 구간 (한도 소진 시 회복될 때까지 대기)
+
+        with scheduler.slot(lane):
+            obj.BlockRequest()
+
+        Parameters:
+            lane: LANE_POSITION / LANE_INDEX / LANE_UNIVERSE
+        """
+        with self._cond:
+            self._waiting[lane] += 1
+            try:
+                while self._busy or self._has_higher_waiter(lane):
+                    self._cond.wait()
+                self._busy = True
+            finally:
+                self._waiting[lane] -= 1
+
+        try:
+            self._wait_for_quota()
+            self.stats["requests"] += 1
+            self.stats["by_lane"][lane] += 1
+            yield
+        finally:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def request(self, fn, lane=LANE_UNIVERSE):
+        """
+        slot() 구간 안에서 fn() 실행
+
+        Returns:
+            fn() 결과
+        """
+        with self.slot(lane):
+            return fn()
+
+    def run(self, tasks):
+        """
+        작업 목록을 레인 순서대로 실행
+
+        Parameters:
+            tasks: [(lane, key, fn), ...] — fn 은 CREON 요청 1건을 수행하는 함수
+
+        Returns:
+            dict: {key: fn() 결과}
+        """
+        results = {}
+        for lane, key, fn in sorted(tasks, key=lambda t: t[0]):
+            results[key] = self.request(fn, lane)
+        return results
+
+    @staticmethod
+    def lane_for(code, positions=None):
+        """
+        종목코드의 레인 결정
+
+        Parameters:
+            code: 종목코드
+            positions: 보유 종목코드 집합
+        """
+        if positions and code in positions:
+            return LANE_POSITION
+        if code.startswith("U"):
+            return LANE_INDEX
+        return LANE_UNIVERSE
+
+    def prioritize(self, codes, positions=None):
+        """종목 목록을 레인 순서로 정렬 (레인 내 순서 유지)"""
+        return sorted(codes, key=lambda c: self.lane_for(c, positions))
+
+    # ========================================
+    # 내부 구현
+    # ========================================
+    def _has_higher_waiter(self, lane):
+        return any(self._waiting[l] > 0 for l in LANES if l < lane)
+
+    def _wait_for_quota(self):
+        while True:
+            remain, remain_ms = self._quota()
+            if remain > 0:
+                return
+            delay = max(remain_ms, 1) / 1000.0
+            self.stats["waits"] += 1
+            self.stats["wait_seconds"] += delay
+            self.sleep(delay)
+
+    def _quota(self):
+        """(잔여 요청 수, 한도 회복까지 남은 ms)"""
+        if self.cybos is not None:
+            remain = self.cybos.GetLimitRemainCount(self.limit_type)
+            if remain > 0:
+                return remain, 0
+            return 0, self.cybos.LimitRequestRemainTime
+
+        # CREON 객체가 없으면 15초당 60건 창을 자체 계산
+        now = self.clock()
+        if self._window_start is None or now - self._window_start >= FALLBACK_WINDOW:
+            self._window_start = now
+            self._window_count = 0
+        if self._window_count < FALLBACK_LIMIT:
+            self._window_count += 1
+            return FALLBACK_LIMIT - self._window_count + 1, 0
+        return 0, int((self._window_start + FALLBACK_WINDOW - now) * 1000)
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """
+    프로세스 공용 스케줄러 (CpUtil.CpCybos 연결 시 실제 한도 사용)
+
+    Returns:
+        CreonRequestScheduler
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            from . import creon_com
+
+            cybos = None
+            try:
+                cybos = creon_com.dispatch("CpUtil.CpCybos")
+            except Exception as e:
+                print(f"[Scheduler] CpCybos 연결 실패, 자체 한도 사용: {e}", flush=True)
+            clock, sleep = creon_com.clock()
+            _scheduler = CreonRequestScheduler(cybos, clock=clock, sleep=sleep)
+        return _scheduler
+
+
+def set_scheduler(scheduler):
+    """공용 스케줄러 교체 (테스트/벤치마크용)"""
+    global _scheduler
+    with _scheduler_lock:
+        _scheduler = scheduler
@@ -0,0 +1,165 @@
+"""
+일봉 표준 스키마 (DataMerger / 패널 저장소 / 로더 공통)
+- 가격: int32 (KRX 가격은 원 단위 정수, 지수는 소수 둘째 자리까지 ×100 정수)
+- 거래량/거래대금: int64
+- 외국인/기관 순매수: int32 + 유효 마스크 (DataFrame 에서는 nullable Int32)
+- 날짜: 저장은 int32 YYYYMMDD, DataFrame 에서는 datetime64
+- 종목코드: 행마다 문자열 대신 종목 사전 (DataFrame 에서는 category)
+"""
+import numpy as np
+import pandas as pd
+
+
+SCHEMA_VERSION = 3
+
+DATE_DTYPE = np.int32
+
+# 저장 필드 → dtype (range/gap 은 로드 시 계산)
+FIELD_DTYPES = {
+    "open": np.int32,
+    "high": np.int32,
+    "low": np.int32,
+    "close": np.int32,
+    "volume": np.int64,
+    "amount": np.int64,
+    "frgn_net_buy": np.int32,
+    "inst_net_buy": np.int32,
+}
+
+PRICE_FIELDS = ("open", "high", "low", "close")
+
+# 지수(U로 시작) 가격 저장 배율 (2655.77 → 265577)
+INDEX_PRICE_SCALE = 100
+FLOW_FIELDS = ("frgn_net_buy", "inst_net_buy")
+
+# 유효 마스크 필드 (bool): 봉 존재 여부, 투자자 순매수 존재 여부
+MASK_FIELDS = {
+    "valid": "close",
+    "flow_valid": "frgn_net_buy",
+}
+
+# 기존 pkl 과 동일한 12컬럼 순서
+FRAME_COLUMNS = ["date", "code", "open", "high", "low", "close", "volume", "amount",
+                 "range", "gap", "frgn_net_buy", "inst_net_buy"]
+
+
+def to_date_int(dates):
+    """datetime 시리즈/배열 → YYYYMMDD 정수 배열"""
+    dates = pd.to_datetime(pd.Series(dates))
+    return (dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day).to_numpy(DATE_DTYPE)
+
+
+def from_date_int(values):
+    """YYYYMMDD 정수 배열 → datetime64 배열"""
+    values = np.asarray(values, dtype=np.int64)
+    return pd.to_datetime(pd.DataFrame({
+        "year": values // 10000,
+        "month": values // 100 % 100,
+        "day": values % 100
+    }))
+
+
+def price_scale(code):
+    """종목코드의 가격 저장 배율 (지수 INDEX_PRICE_SCALE, 종목 1)"""
+    return INDEX_PRICE_SCALE if str(code).startswith("U") else 1
+
+
+def to_typed(values, dtype, scale=1):
+    """
+    숫자/None/NaN 이 섞인 컬럼 → (정수 배열, 유효 마스크)
+
+    결측은 0 으로 채우고 마스크 False.
+    scale 을 곱한 뒤 반올림해 저장한다 (지수 가격, 스칼라 또는 값별 배열).
+    """
+    floats = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    mask = ~np.isnan(floats)
+    return np.rint(np.where(mask, floats * scale, 0)).astype(dtype), mask
+
+
+def build_frame(code, dates, columns, flow_mask):
+    """
+    표준 12컬럼 DataFrame 생성
+
+    Parameters:
+        code: 종목코드
+        dates: YYYYMMDD 정수 배열
+        columns: {필드: 정수 배열} (FIELD_DTYPES 의 필드, 지수 가격은 ×INDEX_PRICE_SCALE)
+        flow_mask: 투자자 순매수 유효 마스크
+
+    지수 가격/range/gap 은 배율을 되돌린 float64, 종목은 int32.
+    """
+    n = len(dates)
+    scale = price_scale(code)
+    if scale == 1:
+        prices = {name: columns[name].astype(np.int32, copy=False) for name in PRICE_FIELDS}
+    else:
+        prices = {name: columns[name] / scale for name in PRICE_FIELDS}
+    high, low, close, open_ = prices["high"], prices["low"], prices["close"], prices["open"]
+
+    gap = np.zeros(n, dtype=close.dtype)
+    gap[1:] = open_[1:] - close[:-1]
+
+    df = pd.DataFrame({
+        "date": from_date_int(dates),
+        "code": pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), categories=[code]),
+        "open": open_,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": columns["volume"].astype(np.int64, copy=False),
+        "amount": columns["amount"].astype(np.int64, copy=False),
+        "range": high - low,
+        "gap": gap,
+    })
+    for name in FLOW_FIELDS:
+        values = columns[name].astype(np.int32, copy=False)
+        df[name] = pd.arrays.IntegerArray(values, ~np.asarray(flow_mask, dtype=bool))
+    return df[FRAME_COLUMNS]
+
+
+def to_bar_frame(df):
+    """
+    수집 결과 DataFrame → 표준 스키마 (DataMerger 출력 정리용)
+
+    Returns:
+        DataFrame (12컬럼, 표준 dtype)
+    """
+    if df is None or df.empty:
+        return df
+    code = str(df["code"].iloc[0])
+    dates = to_date_int(df["date"])
+    scale = price_scale(code)
+
+    columns = {}
+    for name, dtype in FIELD_DTYPES.items():
+        if name in df.columns:
+            columns[name], mask = to_typed(df[name], dtype, scale if name in PRICE_FIELDS else 1)
+        else:
+            columns[name], mask = np.zeros(len(df), dtype=dtype), np.zeros(len(df), dtype=bool)
+        if name == "frgn_net_buy":
+            flow_mask = mask
+
+    return build_frame(code, dates, columns, flow_mask)
+
+
+def legacy_memory_bytes(n_symbols, n_days):
+    """
+    기존 pkl 형식 (행마다 code 문자열, object 순매수) 으로 보관했을 때 예상 메모리
+
+    비교 기준 측정용
+    """
+    df = pd.DataFrame({
+        "date": pd.bdate_range("2020-01-02", periods=n_days),
+        "code": pd.Series(["005930"] * n_days, dtype=object),
+        "open": np.zeros(n_days, dtype=np.int64),
+        "high": np.zeros(n_days, dtype=np.int64),
+        "low": np.zeros(n_days, dtype=np.int64),
+        "close": np.zeros(n_days, dtype=np.int64),
+        "volume": np.zeros(n_days, dtype=np.int64),
+        "amount": np.zeros(n_days, dtype=np.int64),
+        "range": np.zeros(n_days, dtype=np.int64),
+        "gap": np.zeros(n_days, dtype=np.int64),
+        "frgn_net_buy": pd.Series([12345] * n_days, dtype=object),
+        "inst_net_buy": pd.Series([-12345] * n_days, dtype=object),
+    })
+    return int(df.memory_usage(deep=True).sum()) * n_symbols
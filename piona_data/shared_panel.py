@@ -0,0 +1,94 @@
+"""
+공유 메모리 패널 (SharedPanel)
+- BarPanel 의 (봉, 종목) 배열을 multiprocessing.shared_memory 한 블록에 한 번만 복사
+- 작업자 프로세스는 작은 명세(spec)만 받아 같은 메모리에 배열 뷰로 붙는다 (종목 데이터 pickle 없음)
+- 종목 전체 이력(frame)은 명세의 manifest 로 같은 시점 스냅샷을 다시 열어 mmap 으로 읽는다
+"""
+import sys
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .panel_store import PanelSnapshot
+from .bar_panel import BarPanel
+
+
+# 필드 시작 위치 정렬 (바이트)
+ALIGN = 64
+
+
+class SharedPanel:
+    """
+    BarPanel → 공유 메모리 블록 (생성한 프로세스가 close 로 해제)
+
+    사용 예:
+        with SharedPanel(panel) as shared:
+            pool = Pool(initializer=init, initargs=(shared.spec,))
+    """
+
+    def __init__(self, panel):
+        arrays = {"dates": panel.dates}
+        arrays.update((name, getattr(panel, name)) for name in panel.fields)
+
+        layout = {}
+        size = 0
+        for name, values in arrays.items():
+            size = -(-size // ALIGN) * ALIGN
+            layout[name] = (size, values.shape, values.dtype.str)
+            size += values.nbytes
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for name, values in arrays.items():
+            offset, shape, dtype = layout[name]
+            np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)[...] = values
+
+        self.spec = {
+            "name": self.shm.name,
+            "layout": layout,
+            "codes": list(panel.codes),
+            "counts": np.asarray(panel.counts).tolist(),
+            "root": panel.snapshot.root,
+            "manifest": panel.snapshot.manifest,
+        }
+
+    def close(self):
+        """공유 메모리 해제 (작업자가 모두 끝난 뒤 호출)"""
+        if self.shm is None:
+            return
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach(spec):
+    """
+    작업자 프로세스에서 공유 패널에 붙기
+
+    Parameters:
+        spec: SharedPanel.spec
+
+    Returns:
+        (BarPanel, SharedMemory): 패널 배열은 공유 메모리 뷰 — 패널을 쓰는 동안 SharedMemory 를 살려 둘 것
+    """
+    if sys.version_info >= (3, 13):
+        # 해제는 생성한 프로세스 몫 (작업자 종료 시 resource_tracker 가 지우지 않도록)
+        shm = shared_memory.SharedMemory(name=spec["name"], track=False)
+    else:
+        shm = shared_memory.SharedMemory(name=spec["name"])
+
+    arrays = {}
+    for name, (offset, shape, dtype) in spec["layout"].items():
+        values = np.ndarray(tuple(shape), dtype=dtype, buffer=shm.buf, offset=offset)
+        values.flags.writeable = False
+        arrays[name] = values
+
+    snapshot = PanelSnapshot(spec["root"], spec["manifest"])
+    dates = arrays.pop("dates")
+    panel = BarPanel(snapshot, spec["codes"], np.asarray(spec["counts"], dtype=np.int64), dates, arrays)
+    return panel, shm
@@ -0,0 +1,134 @@
+"""
+KRX 거래일 달력
+- 주말 + KRX 휴장일 (고정 공휴일, 설/추석, 대체공휴일, 선거일, 연말 휴장)
+- 저장소에 있는 지수(U001) 거래일이 있으면 그 구간은 실제 거래일을 그대로 사용
+- 휴장일 표가 없는 해(지수 관측 구간 밖)는 주말만 빼므로 RuntimeWarning 으로 알린다 — 표를 매년 추가할 것
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+# KRX 휴장일 (YYYYMMDD)
+KRX_HOLIDAYS = {
+    # 2024
+    20240101, 20240209, 20240212, 20240301, 20240410, 20240501, 20240506, 20240515,
+    20240606, 20240815, 20240916, 20240917, 20240918, 20241001, 20241003, 20241009,
+    20241225, 20241231,
+    # 2025
+    20250101, 20250127, 20250128, 20250129, 20250130, 20250303, 20250501, 20250505,
+    20250506, 20250603, 20250606, 20250815, 20251003, 20251006, 20251007, 20251008,
+    20251009, 20251225, 20251231,
+    # 2026
+    20260101, 20260216, 20260217, 20260218, 20260302, 20260501, 20260505, 20260525,
+    20260603, 20260817, 20260924, 20260925, 20261005, 20261009, 20261225, 20261231,
+    # 2027
+    20270101, 20270208, 20270209, 20270301, 20270505, 20270513, 20270816, 20270914,
+    20270915, 20270916, 20271004, 20271011, 20271227, 20271231,
+}
+
+MARKET_CLOSE = "15:30"
+
+
+def _to_int(date):
+    if isinstance(date, (int, np.integer)):
+        return int(date)
+    return int(pd.Timestamp(date).strftime("%Y%m%d"))
+
+
+class KRXCalendar:
+    """KRX 거래일 달력"""
+
+    def __init__(self, holidays=None, observed=None):
+        """
+        Parameters:
+            holidays: 휴장일 집합 (YYYYMMDD, 기본 KRX_HOLIDAYS)
+            observed: 실제 거래일 배열 (YYYYMMDD, 지수 데이터 기준)
+        """
+        self.name = "KRX Calendar"
+        self.holidays = set(KRX_HOLIDAYS if holidays is None else holidays)
+        self.observed = np.unique(np.asarray(observed if observed is not None else [], dtype=np.int64))
+        # 휴장일 표가 있는 마지막 해 (이후는 주말만 제외)
+        self.last_year = max(self.holidays) // 10000 if self.holidays else None
+        self._warned = set()
+
+    @classmethod
+    def from_snapshot(cls, snapshot, index_code="U001"):
+        """패널 스냅샷의 지수 거래일을 실제 거래일로 사용"""
+        observed = None
+        if index_code in snapshot:
+            observed = snapshot.dates[snapshot.valid(index_code)]
+        return cls(observed=observed)
+
+    def trading_days(self, start, end):
+        """
+        start ~ end (양끝 포함) 거래일 목록
+
+        Returns:
+            np.ndarray: YYYYMMDD 정수 배열
+        """
+        start, end = _to_int(start), _to_int(end)
+        if start > end:
+            return np.empty(0, dtype=np.int64)
+
+        days = pd.bdate_range(str(start), str(end))
+        ints = (days.year * 10000 + days.month * 100 + days.day).to_numpy(np.int64)
+        ints = ints[~np.isin(ints, list(self.holidays))]
+
+        # 지수 관측 구간 안에서는 실제 거래일 사용
+        if len(self.observed):
+            lo, hi = self.observed[0], self.observed[-1]
+            inside = (ints >= lo) & (ints <= hi)
+            seen = self.observed[(self.observed >= start) & (self.observed <= end)]
+            ints = np.union1d(ints[~inside], seen)
+
+        self._check_coverage(ints)
+        return ints
+
+    def _check_coverage(self, ints):
+        """휴장일 표 밖(지수 관측 이후) 날짜가 섞이면 해마다 한 번 경고"""
+        if self.last_year is None or not len(ints) or ints[-1] // 10000 <= self.last_year:
+            return
+        beyond = ints[ints // 10000 > self.last_year]
+        if len(self.observed):
+            beyond = beyond[beyond > self.observed[-1]]
+        for year in np.unique(beyond // 10000):
+            if year not in self._warned:
+                self._warned.add(year)
+                warnings.warn(f"KRX 휴장일 표에 {year}년이 없습니다 — 주말만 제외한 거래일 사용 "
+                              f"(trading_calendar.KRX_HOLIDAYS 추가 필요)", RuntimeWarning, stacklevel=3)
+
+    def is_trading_day(self, date):
+        d = _to_int(date)
+        return len(self.trading_days(d, d)) == 1
+
+    def previous_trading_day(self, date):
+        """date 직전 거래일 (date 제외)"""
+        d = pd.Timestamp(str(_to_int(date)))
+        days = self.trading_days(d - pd.Timedelta(days=30), d - pd.Timedelta(days=1))
+        return int(days[-1])
+
+    def last_closed_trading_day(self, now=None):
+        """
+        장 마감이 끝난 가장 최근 거래일
+
+        Parameters:
+            now: 기준 시각 (기본 현재)
+        """
+        now = pd.Timestamp(now or pd.Timestamp.now())
+        today = _to_int(now)
+        if self.is_trading_day(today) and now.strftime("%H:%M") >= MARKET_CLOSE:
+            return today
+        return self.previous_trading_day(today)
+
+    def missing_days(self, last_date, until):
+        """last_date 다음 날 ~ until 사이 거래일 (저장 후 빠진 거래일)"""
+        start = pd.Timestamp(str(_to_int(last_date))) + pd.Timedelta(days=1)
+        return self.trading_days(start, until)
+
+    def sessions_back(self, until, n):
+        """until 포함 직전 n 거래일의 첫 거래일"""
+        end = pd.Timestamp(str(_to_int(until)))
+        days = self.trading_days(end - pd.Timedelta(days=int(n * 1.6) + 20), end)
+        return int(days[-n]) if len(days) >= n else int(days[0])
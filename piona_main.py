@@ -13,6 +13,8 @@ import pandas as pd
 import numpy as np
 import os
 import sys
+import copy
+import multiprocessing
 from datetime import datetime
 
 # 엔진 임포트
@@ -20,6 +22,8 @@ from engine.inflection_engine import InflectionEngine
 from engine.pattern_engine import PatternEngine
 from engine.support_resistance_engine import SupportResistanceEngine
 from engine.fibonacci_engine import FibonacciEngine
+from engine.pivot_index import pivot_index
+from engine.pipeline import Pipeline
 
 from piona_ml.macro_engine import MacroEngine
 from piona_ml.psychology_engine import PsychologyEngine
@@ -29,45 +33,116 @@ from piona_ml.dart_engine import DartEngine
 from piona_ml.index_engine import IndexEngine
 from piona_ml.ai_decision_engine import AIDecisionEngine
 
-from trading_system.score_calculator import ScoreCalculator
+from trading_system.score_calculator import ScoreCalculator, CREON_RANGES
+from trading_system.candidate_ranking import CandidateRanking
+from trading_system.analysis_record import AnalysisRecord, RecordTable
 from trading_system.auto_trader import AutoTrader
 from trading_system.learning_system import LearningSystem
+from trading_system.universe_screen import UniverseScreen
+
+from piona_data.market_data import MarketDataLoader
+from piona_data.shared_panel import SharedPanel, attach
+from piona_data.analysis_cache import AnalysisCache
+from piona_data.feature_store import features
+
+# 병렬 스캔: 작업자당 덩어리 수 (먼저 끝난 작업자가 남은 덩어리를 가져가도록 잘게 나눔)
+CHUNKS_PER_WORKER = 4
+
+# 순차 스캔: 덩어리 종목 수 (덩어리마다 결과를 내보내고 DataFrame 해제)
+SCAN_CHUNK = 64
+
+# 자동매매 1회 매수 종목 수 (스캔은 상위 후보 이만큼만 보관)
+MAX_BUYS = 5
+
+# 분석 DAG 엔진 스레드 수 (0 이면 현재 스레드에서 순서대로)
+PIPELINE_THREADS = 4
+
+# 분석 엔진 노드 — 새 엔진은 여기에만 추가 (analyze_frame / analyze_panel DAG 가 이 표로 만들어진다)
+#   (결과 이름, 그룹, PIONASystem 속성, analyze 인자, 캐시 지문)
+#   analyze 인자: 'df' → analyze(df), 'code_df' → analyze(code, df), 'code' → analyze(code) (패널은 모두 analyze_panel(panel))
+#   캐시 지문: 'data' 종목 데이터, 'index' 종목 + 지수 데이터, None 캐시 안 함
+ENGINE_NODES = (
+    ('inflection', 'creon', 'inflection_engine', 'df', 'data'),
+    ('pattern', 'creon', 'pattern_engine', 'df', 'data'),
+    ('support_resistance', 'creon', 'sr_engine', 'df', 'data'),
+    ('fibonacci', 'creon', 'fibo_engine', 'df', 'data'),
+    ('macro', 'ml', 'macro_engine', 'df', 'data'),
+    ('psychology', 'ml', 'psychology_engine', 'df', 'data'),
+    ('supply', 'ml', 'supply_engine', 'df', 'data'),
+    ('volatility', 'ml', 'volatility_engine', 'df', 'data'),
+    ('dart', 'ml', 'dart_engine', 'code', None),        # 공시는 데이터가 아닌 시점에 따라 바뀐다
+    ('index', 'ml', 'index_engine', 'code_df', 'index')
+)
+FINGERPRINT_INPUTS = {'data': 'fingerprint', 'index': 'index_fingerprint'}
+PANEL_FINGERPRINT_INPUTS = {'data': 'fingerprints', 'index': 'index_fingerprints'}
+
+# lean 모드에서 근거 문자열(reasons/details/설명)을 생략하는 엔진 (PIONASystem 속성)
+LEAN_ENGINES = ('inflection_engine', 'macro_engine', 'psychology_engine', 'supply_engine',
+                'volatility_engine', 'index_engine', 'score_calculator')
 
 
 class PIONASystem:
     """PIONA 통합 자동매매 시스템"""
 
-    def __init__(self, mode='simulation'):
+    def __init__(self, mode='simulation', data_path=None, analysis_only=False, use_cache=True,
+                 threads=PIPELINE_THREADS, lean=False):
         """
         Parameters:
             mode: 'simulation' (모의매매) 또는 'real' (실전매매)
+            data_path: 데이터 디렉토리 (None 이면 스크립트 옆 data)
+            analysis_only: True 면 분석 엔진만 준비 (병렬 스캔 작업자용, 매매/학습/안내 출력 없음)
+            use_cache: 엔진 결과 캐시 사용 ({data_path}/cache, 종목 데이터가 바뀌면 자동 무효)
+            threads: 분석 DAG 엔진 스레드 수 (0 이면 순서대로)
+            lean: True 면 엔진이 근거 문자열 없이 점수/신호만 반환 (백테스트/대량 스캔)
+                  — 근거는 explainer() 로 필요한 종목만 다시 분석
         """
         self.mode = mode
-        self.data_path = os.path.join(os.path.dirname(__file__), 'data')
-
-        print("=" * 60)
-        print("PIONA 통합 자동매매 시스템 초기화 중...")
-        print("=" * 60)
+        self.threads = threads
+        self.lean = lean
+        self._explainer = None
+        self.data_path = data_path or os.path.join(os.path.dirname(__file__), 'data')
+        self.loader = MarketDataLoader(self.data_path)
+        self.cache = AnalysisCache(os.path.join(self.data_path, 'cache')) if use_cache else None
+
+        if not analysis_only:
+            print("=" * 60)
+            print("PIONA 통합 자동매매 시스템 초기화 중...")
+            print("=" * 60)
 
         # PIONA_CREON 엔진 (4대 기술분석)
-        self.inflection_engine = InflectionEngine()
+        self.inflection_engine = InflectionEngine(lean=lean)
         self.pattern_engine = PatternEngine()
         self.sr_engine = SupportResistanceEngine()
         self.fibo_engine = FibonacciEngine()
 
         # PIONA_ML 엔진 (6대 시장분석)
-        self.macro_engine = MacroEngine()
-        self.psychology_engine = PsychologyEngine()
-        self.supply_engine = SupplyEngine()
-        self.volatility_engine = VolatilityEngine()
+        self.macro_engine = MacroEngine(lean=lean)
+        self.psychology_engine = PsychologyEngine(lean=lean)
+        self.supply_engine = SupplyEngine(lean=lean)
+        self.volatility_engine = VolatilityEngine(lean=lean)
         self.dart_engine = DartEngine()
-        self.index_engine = IndexEngine()
+        self.index_engine = IndexEngine(lean=lean)
+        # 지수도 같은 로더 → 스캔 동안 종목과 같은 시점으로 고정
+        self.index_engine.loader = self.loader
 
         # AI 의사결정
         self.ai_engine = AIDecisionEngine()
 
         # 통합 점수 계산
-        self.score_calculator = ScoreCalculator()
+        self.score_calculator = ScoreCalculator(lean=lean)
+
+        # 1단계 유니버스 스크린 (scan_universe(screen=True) 일 때만, 정책상 제외 규칙)
+        self.universe_screen = UniverseScreen()
+        self.last_screen = None
+
+        # 분석 DAG (엔진 노드는 ENGINE_NODES 표에서 생성)
+        self.frame_pipeline = self._build_frame_pipeline()
+        self.panel_pipelines = {bounded: self._build_panel_pipeline(bounded) for bounded in (False, True)}
+        self.last_timings = {}
+        self.last_records = RecordTable()
+
+        if analysis_only:
+            return
 
         # 자동매매
         self.trader = AutoTrader(mode=mode)
@@ -95,48 +170,67 @@ class PIONASystem:
         print(f"종목 분석 시작: {code}")
         print(f"{'='*60}")
 
-        # 1) 데이터 로드
-        df = self._load_data(code)
-        if df is None or len(df) < 60:
-            print(f"✗ 데이터 부족: {code}")
-            return None
+        # 1) 데이터 로드 (캐시 키 지문과 같은 스냅샷)
+        with self.loader.pinned() as snapshot:
+            df = self._load_data(code)
+            if df is None or len(df) < 60:
+                print(f"✗ 데이터 부족: {code}")
+                return None
+
+            print(f"✓ 데이터 로드 완료: {len(df)}일")
+
+            return self.analyze_frame(code, df, fingerprint=snapshot.fingerprint(code))
+
+    def analyze_frame(self, code, df, verbose=True, fingerprint=None):
+        """
+        이미 확보한 데이터로 종목 분석 (수집 파이프라인 작업자에서 호출)
+
+        Parameters:
+            code: 종목코드
+            df: 12컬럼 DataFrame
+            verbose: False 면 단계별 출력 생략
+            fingerprint: df 의 저장소 데이터 지문 (있으면 엔진 결과 캐시 사용)
 
-        print(f"✓ 데이터 로드 완료: {len(df)}일")
-
-        # 2) PIONA_CREON 분석 (4대 기술분석)
-        print(f"\n[PIONA_CREON] 4대 기술분석 실행 중...")
-        creon_signals = self._run_creon_analysis(df)
-        print(f"✓ 변곡이론: {creon_signals['inflection']['final_signal']}")
-        print(f"✓ 패턴분석: {creon_signals['pattern']['final_signal']}")
-        print(f"✓ 지지저항: {creon_signals['support_resistance']['signal']}")
-        print(f"✓ 피보나치: {creon_signals['fibonacci']['signal']}")
-
-        # 3) PIONA_ML 분석 (6대 시장분석)
-        print(f"\n[PIONA_ML] 6대 시장분석 실행 중...")
-        ml_signals = self._run_ml_analysis(code, df)
-        print(f"✓ 거시: {ml_signals['macro']['signal']} (점수: {ml_signals['macro']['score']})")
-        print(f"✓ 심리: {ml_signals['psychology']['signal']} (점수: {ml_signals['psychology']['score']})")
-        print(f"✓ 수급: {ml_signals['supply']['signal']} (점수: {ml_signals['supply']['score']})")
-        print(f"✓ 변동성: {ml_signals['volatility']['signal']} (점수: {ml_signals['volatility']['score']})")
-        print(f"✓ DART: {ml_signals['dart']['signal']} (점수: {ml_signals['dart']['score']})")
-        print(f"✓ 지수: {ml_signals['index']['signal']} (점수: {ml_signals['index']['score']})")
-
-        # 4) AI 의사결정
-        print(f"\n[AI] 의사결정 실행 중...")
-        ai_result = self.ai_engine.analyze(code, creon_signals, ml_signals)
-        print(f"✓ ML 점수: {ai_result['ml_score']['total']}")
-        print(f"✓ 승률: {ai_result['win_rate']['win_rate']*100:.1f}%")
-        print(f"✓ 추천 스타일: {ai_result['trading_style']}")
-
-        # 5) 통합 점수 계산
-        print(f"\n[통합] 최종 점수 계산 중...")
-        final_decision = self.score_calculator.calculate(creon_signals, ml_signals, ai_result)
-        print(f"✓ CREON 점수: {final_decision['creon_score']['total']}")
-        print(f"✓ ML 점수: {final_decision['ml_score']['total']}")
-        print(f"✓ AI 점수: {final_decision['ai_score']}")
-        print(f"✓ 총합 점수: {final_decision['total_score']}")
-        print(f"✓ 매매 모드: {final_decision['trading_mode']}")
-        print(f"✓ 최종 신호: {final_decision['final_signal']['action']}")
+        Returns:
+            dict: 전체 분석 결과
+        """
+        # 2) 엔진 DAG 실행 (독립 엔진은 동시에, AI/통합 점수는 엔진 결과가 모이면)
+        run = self.frame_pipeline.run(code=code, df=df, fingerprint=fingerprint)
+        creon_signals, ml_signals = run['creon_signals'], run['ml_signals']
+        ai_result, final_decision = run['ai_result'], run['final_decision']
+
+        if verbose:
+            # PIONA_CREON 결과 (4대 기술분석)
+            print(f"\n[PIONA_CREON] 4대 기술분석")
+            print(f"✓ 변곡이론: {creon_signals['inflection']['final_signal']}")
+            print(f"✓ 패턴분석: {creon_signals['pattern']['final_signal']}")
+            print(f"✓ 지지저항: {creon_signals['support_resistance']['signal']}")
+            print(f"✓ 피보나치: {creon_signals['fibonacci']['signal']}")
+
+            # PIONA_ML 결과 (6대 시장분석)
+            print(f"\n[PIONA_ML] 6대 시장분석")
+            print(f"✓ 거시: {ml_signals['macro']['signal']} (점수: {ml_signals['macro']['score']})")
+            print(f"✓ 심리: {ml_signals['psychology']['signal']} (점수: {ml_signals['psychology']['score']})")
+            print(f"✓ 수급: {ml_signals['supply']['signal']} (점수: {ml_signals['supply']['score']})")
+            print(f"✓ 변동성: {ml_signals['volatility']['signal']} (점수: {ml_signals['volatility']['score']})")
+            print(f"✓ DART: {ml_signals['dart']['signal']} (점수: {ml_signals['dart']['score']})")
+            print(f"✓ 지수: {ml_signals['index']['signal']} (점수: {ml_signals['index']['score']})")
+
+            # AI 의사결정 결과
+            print(f"\n[AI] 의사결정")
+            print(f"✓ ML 점수: {ai_result['ml_score']['total']}")
+            print(f"✓ 승률: {ai_result['win_rate']['win_rate']*100:.1f}%")
+            print(f"✓ 추천 스타일: {ai_result['trading_style']}")
+
+            # 통합 점수 결과
+            print(f"\n[통합] 최종 점수")
+            print(f"✓ CREON 점수: {final_decision['creon_score']['total']}")
+            print(f"✓ ML 점수: {final_decision['ml_score']['total']}")
+            print(f"✓ AI 점수: {final_decision['ai_score']}")
+            print(f"✓ 총합 점수: {final_decision['total_score']}")
+            print(f"✓ 매매 모드: {final_decision['trading_mode']}")
+            print(f"✓ 최종 신호: {final_decision['final_signal']['action']}")
+            print(f"✓ 노드 시간: {_format_timings(run.timings)}")
 
         return {
             'code': code,
@@ -152,7 +246,7 @@ class PIONASystem:
         매매 실행
 
         Parameters:
-            analysis_result: analyze_stock() 결과
+            analysis_result: analyze_stock() 결과 또는 AnalysisRecord (매수 후보의 'record')
 
         Returns:
             dict: 실행 결과
@@ -160,33 +254,30 @@ class PIONASystem:
         if analysis_result is None:
             return None
 
-        code = analysis_result['code']
-        df = analysis_result['df']
-        final_decision = analysis_result['final_decision']
-        ml_signals = analysis_result['ml_signals']
+        record = analysis_result
+        if not isinstance(record, AnalysisRecord):
+            record = AnalysisRecord.from_analysis(analysis_result)
+        code = record.code
 
         # 현재가 및 손절/목표가
-        current_price = df['close'].iloc[-1]
-        stop_loss = ml_signals['volatility'].get('stop_loss', current_price * 0.95)
-        targets = ml_signals['volatility'].get('targets', {})
-
+        current_price = record.close
         stock_info = {
             'current_price': current_price,
-            'stop_loss': stop_loss,
-            'target_1': targets.get('target_1', current_price * 1.05),
-            'target_2': targets.get('target_2', current_price * 1.10)
+            'stop_loss': record.stop_loss,
+            'target_1': record.target_1,
+            'target_2': record.target_2
         }
 
         print(f"\n{'='*60}")
         print(f"[매매 실행] {code}")
         print(f"{'='*60}")
         print(f"현재가: {current_price:,}")
-        print(f"손절가: {stop_loss:,}")
+        print(f"손절가: {stock_info['stop_loss']:,}")
         print(f"목표가1: {stock_info['target_1']:,}")
         print(f"목표가2: {stock_info['target_2']:,}")
 
         # 매매 실행
-        result = self.trader.execute_signal(code, final_decision, stock_info)
+        result = self.trader.execute_signal(code, record.decision(), stock_info)
 
         print(f"\n실행 결과: {result['status']}")
         print(f"액션: {result.get('action', 'NONE')}")
@@ -197,67 +288,241 @@ class PIONASystem:
 
         return result
 
-    def scan_universe(self, codes=None):
+    def scan_universe(self, codes=None, workers=None, screen=False, bounded=False, top_k=None):
         """
-        유니버스 전체 스캔
+        유니버스 스캔 (iter_universe 를 끝까지 실행해 매수 후보 반환)
 
         Parameters:
-            codes: 종목 리스트 (None이면 data 폴더에서 자동 로드)
+            codes: 종목 리스트 (None이면 패널 저장소에서 자동 로드)
+            workers: 작업자 프로세스 수 (None/1 이면 현재 프로세스에서 순차 분석)
+            screen: True 면 1단계 스크린(self.universe_screen)으로 정책상 제외 종목을 빼고 분석
+                    (UniverseScreen 을 주면 그 스크린 사용) — 걸러진 종목은 전체 분석 시 BUY 일 수도 있다
+            bounded: True 면 총점 상한이 매수 기준 미만인 종목은 패턴/지지저항/피보나치 생략
+                     (매수 후보는 같고, 매도 후보는 생략 종목만큼 빠진다)
+            top_k: 보관할 상위 매수 후보 수 (None 이면 전부)
 
         Returns:
-            list: 매수 후보 리스트
+            list: 점수순 매수 후보 (최대 top_k 개, 'record' = AnalysisRecord)
+                  전 종목 레코드는 self.last_records (RecordTable)
         """
-        if codes is None:
-            codes = self._get_all_codes()
+        ranking = CandidateRanking(top_k=top_k)
+        self.last_records = RecordTable()
+        sell_candidates = []
+
+        for result in self.iter_universe(codes, workers, screen, bounded, ranking, self.last_records):
+            if result['rank'] is not None:
+                print(f"✓ 매수 후보 추가: {result['code']} ({result['signal']}, "
+                      f"점수: {result['score']}, 현재 {result['rank']}위)")
+            elif result['signal'] in ['STRONG_SELL', 'SELL']:
+                sell_candidates.append(result)
 
         print(f"\n{'='*60}")
-        print(f"유니버스 스캔 시작: {len(codes)}개 종목")
+        print(f"스캔 완료")
         print(f"{'='*60}")
+        if top_k is None:
+            print(f"매수 후보: {ranking.count}개")
+        else:
+            print(f"매수 후보: {ranking.count}개 (상위 {len(ranking)}개 보관)")
+        print(f"매도 후보: {len(sell_candidates)}개")
 
-        buy_candidates = []
-        sell_candidates = []
+        return ranking.top()
 
-        for i, code in enumerate(codes, 1):
-            print(f"\n[{i}/{len(codes)}] {code} 분석 중...")
+    def iter_universe(self, codes=None, workers=None, screen=False, bounded=False, ranking=None, table=None):
+        """
+        유니버스 스캔 (제너레이터) — 종목 분석이 끝나는 대로 요약 결과를 내보낸다
 
-            try:
-                analysis = self.analyze_stock(code)
-                if analysis is None:
-                    continue
-
-                final_signal = analysis['final_decision']['final_signal']['action']
-                total_score = analysis['final_decision']['total_score']
-
-                if final_signal in ['STRONG_BUY', 'BUY']:
-                    buy_candidates.append({
-                        'code': code,
-                        'signal': final_signal,
-                        'score': total_score,
-                        'analysis': analysis
-                    })
-                    print(f"✓ 매수 후보 추가: {code} ({final_signal}, 점수: {total_score})")
-
-                elif final_signal in ['STRONG_SELL', 'SELL']:
-                    sell_candidates.append({
-                        'code': code,
-                        'signal': final_signal,
-                        'score': total_score
-                    })
+        순차 분석은 SCAN_CHUNK 종목 덩어리마다, 병렬 분석은 작업자 덩어리가 끝나는 대로 내보내므로
+        호출 쪽은 스캔 도중에도 ranking.top() 으로 현재 상위 후보를 쓸 수 있다.
+        종목별 분석 결과는 AnalysisRecord 로 줄여 넘기고 df/엔진 결과 dict 는 덩어리마다 해제한다.
+        제너레이터가 끝나거나 닫힐 때까지 로더는 스캔 시작 시점 스냅샷에 고정된다.
+
+        Parameters:
+            codes/workers/screen/bounded: scan_universe 와 같음
+            ranking: trading_system.candidate_ranking.CandidateRanking (None 이면 순위 없이 요약만)
+            table: trading_system.analysis_record.RecordTable (주면 모든 종목 레코드 추가)
+
+        Yields:
+            dict: {'code', 'signal', 'score', 'rank'} — rank 는 추가 시점 매수 후보 순위
+                  (후보가 아니거나 상위 K 밖이면 None), 분석 실패 종목은 내보내지 않는다
+        """
+        # 스캔 도중 수집기가 커밋해도 모든 종목을 같은 시점 데이터로 분석
+        with self.loader.pinned() as snapshot:
+            if codes is None:
+                codes = self._get_all_codes()
+
+            print(f"\n{'='*60}")
+            print(f"유니버스 스캔 시작: {len(codes)}개 종목")
+            print(f"{'='*60}")
+
+            # 데이터 부족 종목을 뺀 나머지를 패널로 분석
+            ready = []
+            for code in codes:
+                if snapshot.count(code) < 60:
+                    print(f"✗ 데이터 부족: {code}")
+                else:
+                    ready.append(code)
+            panel = self.loader.load_panel(ready)
+            if screen:
+                panel = self._screen_universe(panel, self.universe_screen if screen is True else screen)
+            parallel = workers and workers > 1
+            if parallel:
+                chunks = self._iter_parallel(panel, workers, bounded)
+            else:
+                chunks = self._iter_serial(panel, bounded)
+
+            skipped = 0
+            for start, analyses in chunks:
+                for offset, analysis in enumerate(analyses):
+                    if analysis is None:
+                        continue
+                    skipped += analysis['ai_result'] is None
+                    if analysis['df'] is None:
+                        analysis['df'] = panel.frame(analysis['code'])
+                    record = AnalysisRecord.from_analysis(analysis)
+                    rank = None if ranking is None else ranking.add(record, order=start + offset)
+                    if table is not None:
+                        table.append(record)
+                    yield {
+                        'code': record.code,
+                        'signal': record.signal,
+                        'score': record.total_score,
+                        'rank': rank
+                    }
+                # 분석이 끝난 종목의 DataFrame 은 덩어리마다 해제
+                panel.release(panel.codes[start:start + len(analyses)])
+
+            if not parallel:
+                print(f"[노드 시간] {_format_timings(self.last_timings)}")
+            if bounded:
+                print(f"[상한 생략] {skipped}개 종목 패턴/지지저항/피보나치 생략")
+
+    def _screen_universe(self, panel, screen):
+        """1단계 스크린: 정책상 제외 종목을 뺀 통과 종목 패널 반환 (규칙별 제외 수 출력)"""
+        report = screen.screen(panel)
+        self.last_screen = report
+
+        print(f"[1단계 스크린] {report['total']}개 → {len(report['survivors'])}개 통과")
+        for rule, count in report['pruned'].items():
+            print(f"  - {rule}: {count}개 제외")
+
+        if len(report['survivors']) == panel.n_symbols:
+            return panel
+        return panel.take(np.flatnonzero(report['keep']))
+
+    def analyze_panel(self, panel, bounded=False):
+        """
+        여러 종목 일괄 분석 (엔진별 analyze_panel 로 지표를 종목 축으로 한 번에 계산한 뒤
+        종목별 AI 의사결정/통합 점수만 따로 실행)
 
+        Parameters:
+            panel: piona_data.bar_panel.BarPanel
+            bounded: True 면 변곡/PIONA_ML 먼저 실행 후 총점 상한이 매수 기준 미만인 종목은
+                     패턴/지지저항/피보나치/AI 를 생략 (final_decision = ScoreCalculator.bounded_decision)
+
+        Returns:
+            list: 종목별 analyze_frame 결과 (panel.codes 순서, 실패 종목은 None)
+        """
+        run = self.panel_pipelines[bounded].run(panel=panel, fingerprints=panel.snapshot.fingerprints(panel.codes))
+        self.last_timings = run.timings
+        creon, ml, skipped = run['creon_signals'], run['ml_signals'], run['skipped']
+
+        results = []
+        for j, code in enumerate(panel.codes):
+            if j in skipped:
+                results.append({
+                    'code': code,
+                    'df': panel.frame(code),
+                    'creon_signals': {'inflection': creon['inflection'][j]},
+                    'ml_signals': {name: values[j] for name, values in ml.items()},
+                    'ai_result': None,
+                    'final_decision': self.score_calculator.bounded_decision(*skipped[j])
+                })
+                continue
+            try:
+                creon_signals = {name: values[j] for name, values in creon.items()}
+                ml_signals = {name: values[j] for name, values in ml.items()}
+                ai_result = self.ai_engine.analyze(code, creon_signals, ml_signals)
+                final_decision = self.score_calculator.calculate(creon_signals, ml_signals, ai_result)
+                results.append({
+                    'code': code,
+                    'df': panel.frame(code),
+                    'creon_signals': creon_signals,
+                    'ml_signals': ml_signals,
+                    'ai_result': ai_result,
+                    'final_decision': final_decision
+                })
             except Exception as e:
                 print(f"✗ 분석 실패: {code} - {str(e)}")
+                results.append(None)
+        return results
+
+    def _bounded_symbols(self, panel, inflection, ml):
+        """
+        총점 상한이 매수 기준 미만인 종목 (변곡/PIONA_ML 결과 + 남은 엔진과 AI 점수 범위)
+
+        Returns:
+            dict: {열 번호: (하한, 상한)} — 범위 계산에 실패한 종목은 빠진다 (전체 분석)
+        """
+        skipped = {}
+        for j, code in enumerate(panel.codes):
+            try:
+                creon_signals = {'inflection': inflection[j]}
+                ml_signals = {name: values[j] for name, values in ml.items()}
+                ai_bounds = self.ai_engine.score_bounds(code, creon_signals)
+                lower, upper = self.score_calculator.score_bounds(creon_signals, ml_signals, ai_bounds)
+            except Exception:
                 continue
+            if not self.score_calculator.can_reach_buy(upper):
+                skipped[j] = (lower, upper)
+        return skipped
 
-        # 점수순 정렬
-        buy_candidates = sorted(buy_candidates, key=lambda x: x['score'], reverse=True)
+    def analyze_parallel(self, panel, workers, bounded=False):
+        """
+        여러 종목 병렬 분석 (프로세스 풀)
 
-        print(f"\n{'='*60}")
-        print(f"스캔 완료")
-        print(f"{'='*60}")
-        print(f"매수 후보: {len(buy_candidates)}개")
-        print(f"매도 후보: {len(sell_candidates)}개")
+        패널 배열은 공유 메모리에 한 번만 올리고, 엔진을 미리 만들어 둔 작업자들이
+        종목 열 덩어리별로 analyze_panel 을 실행해 끝나는 대로 결과를 돌려준다.
+
+        Parameters:
+            panel: piona_data.bar_panel.BarPanel
+            workers: 작업자 프로세스 수
+            bounded: analyze_panel 의 bounded
 
-        return buy_candidates
+        Returns:
+            list: analyze_panel(panel, bounded) 와 같은 결과 (panel.codes 순서, 실패 종목은 None)
+        """
+        results = [None] * panel.n_symbols
+        for start, chunk in self._iter_parallel(panel, workers, bounded):
+            for offset, analysis in enumerate(chunk):
+                if analysis is not None:
+                    analysis['df'] = panel.frame(analysis['code'])
+                results[start + offset] = analysis
+        return results
+
+    def _iter_parallel(self, panel, workers, bounded):
+        """병렬 분석 덩어리 (시작 열, 결과) — 끝나는 순서대로, 결과 df 는 None"""
+        n = panel.n_symbols
+        if n == 0:
+            return
+        size = max(2, -(-n // (workers * CHUNKS_PER_WORKER)))
+        chunks = [(start, stop, bounded) for start, stop in _column_chunks(n, size)]
+
+        with SharedPanel(panel) as shared:
+            initargs = (shared.spec, self.loader.data_path, self.cache is not None, self.lean)
+            with multiprocessing.Pool(workers, _init_scan_worker, initargs) as pool:
+                for done, (start, chunk) in enumerate(pool.imap_unordered(_scan_chunk, chunks), 1):
+                    print(f"  - 병렬 분석 {done}/{len(chunks)}", flush=True)
+                    yield start, chunk
+
+    def _iter_serial(self, panel, bounded):
+        """순차 분석 덩어리 (시작 열, 결과) — 덩어리별 노드 시간은 합쳐 self.last_timings 에"""
+        timings = {}
+        for start, stop in _column_chunks(panel.n_symbols, SCAN_CHUNK):
+            results = self.analyze_panel(panel.columns(start, stop), bounded)
+            for name, seconds in self.last_timings.items():
+                timings[name] = timings.get(name, 0.0) + seconds
+            yield start, results
+        self.last_timings = timings
 
     def run_auto_trading(self, codes=None):
         """
@@ -275,7 +540,7 @@ class PIONASystem:
         self._check_positions()
 
         # 2) 유니버스 스캔
-        buy_candidates = self.scan_universe(codes)
+        buy_candidates = self.scan_universe(codes, bounded=True, top_k=MAX_BUYS)  # 매수 후보만 쓰므로 상한 생략
 
         # 3) 상위 후보 매수
         if buy_candidates:
@@ -283,12 +548,11 @@ class PIONASystem:
             print(f"매수 실행")
             print(f"{'='*60}")
 
-            for candidate in buy_candidates[:5]:  # 상위 5개만
+            for candidate in buy_candidates:
                 code = candidate['code']
-                analysis = candidate['analysis']
 
                 print(f"\n[매수] {code} (점수: {candidate['score']})")
-                result = self.execute_trading(analysis)
+                result = self.execute_trading(candidate['record'])
 
                 if result and result.get('status') == 'SUCCESS':
                     print(f"✓ 매수 완료: {code}")
@@ -300,51 +564,185 @@ class PIONASystem:
         print(f"자동매매 완료")
         print(f"{'='*60}")
 
-    def _run_creon_analysis(self, df):
-        """PIONA_CREON 4대 기술분석 실행"""
-        return {
-            'inflection': self.inflection_engine.analyze(df),
-            'pattern': self.pattern_engine.analyze(df),
-            'support_resistance': self.sr_engine.analyze(df),
-            'fibonacci': self.fibo_engine.analyze(df)
-        }
+    def explainer(self):
+        """
+        근거 문자열까지 만드는 시스템 (lean 이 아니면 자기 자신)
 
-    def _run_ml_analysis(self, code, df):
-        """PIONA_ML 6대 시장분석 실행"""
-        return {
-            'macro': self.macro_engine.analyze(df),
-            'psychology': self.psychology_engine.analyze(df),
-            'supply': self.supply_engine.analyze(df),
-            'volatility': self.volatility_engine.analyze(df),
-            'dart': self.dart_engine.analyze(code),
-            'index': self.index_engine.analyze(code, df)
-        }
+        lean 모드면 처음 호출할 때 사본을 만든다: 로더/결과 캐시/AI 학습 상태는 공유하고
+        LEAN_ENGINES 만 lean=False 로 바꾼다 (엔진 결과 캐시 키도 lean 과 따로).
+        """
+        if not self.lean:
+            return self
+        if self._explainer is None:
+            full = copy.copy(self)
+            full.lean = False
+            for attr in LEAN_ENGINES:
+                engine = copy.copy(getattr(self, attr))
+                engine.lean = False
+                setattr(full, attr, engine)
+            full.frame_pipeline = full._build_frame_pipeline()
+            full.panel_pipelines = {bounded: full._build_panel_pipeline(bounded) for bounded in (False, True)}
+            self._explainer = full
+        return self._explainer
+
+    def _build_frame_pipeline(self):
+        """
+        종목 하나 분석 DAG
 
-    def _load_data(self, code):
-        """데이터 로드"""
-        file_path = os.path.join(self.data_path, f"{code}_100days.pkl")
+        소스 code/df/fingerprint → 공용 중간 결과(지표 저장소, 피벗 인덱스, 지수 지문)
+        → ENGINE_NODES 엔진 (스레드에서 동시에) → AI 의사결정 → 통합 점수
+        """
+        pipeline = Pipeline(self.threads)
+        # 엔진 스레드가 나눠 쓰기 전에 한 번만 생성
+        pipeline.add('features', features, ('df',))
+        pipeline.add('pivots', pivot_index, ('df',))
+        pipeline.add('index_fingerprint',
+                     lambda fp: fp and f"{fp}:{self._index_fingerprint(self.loader.snapshot())}", ('fingerprint',))
+
+        for name, group, attr, args, key in ENGINE_NODES:
+            inputs = ('code',) + (('df', 'features', 'pivots') if 'df' in args else ())
+            if key:
+                inputs += (FINGERPRINT_INPUTS[key],)
+            pipeline.add(name, self._frame_node(attr, args, inputs), inputs, threaded=True)
+
+        self._add_signal_nodes(pipeline)
+        pipeline.add('ai_result', lambda code, creon, ml: self.ai_engine.analyze(code, creon, ml),
+                     ('code', 'creon_signals', 'ml_signals'))
+        pipeline.add('final_decision', lambda creon, ml, ai: self.score_calculator.calculate(creon, ml, ai),
+                     ('creon_signals', 'ml_signals', 'ai_result'))
+        return pipeline
+
+    def _build_panel_pipeline(self, bounded):
+        """
+        패널 분석 DAG (종목별 AI 의사결정/통합 점수는 analyze_panel 에서)
 
-        if not os.path.exists(file_path):
-            return None
+        bounded: CREON_RANGES 엔진(패턴/지지저항/피보나치)은 변곡/PIONA_ML 결과로 총점 상한을 본 뒤
+                 매수 기준에 닿을 수 있는 종목만 실행 (아니면 다른 엔진과 동시에 전 종목 실행)
+        """
+        pipeline = Pipeline(self.threads)
+        pipeline.add('features', features, ('panel',))
+        pipeline.add('index_fingerprints', self._index_fingerprints, ('panel', 'fingerprints'))
+
+        for name, group, attr, args, key in ENGINE_NODES:
+            if name in CREON_RANGES:
+                pipeline.add(name, self._chart_node(attr), ('chart_panel',), threaded=True)
+                continue
+            inputs = ('panel', 'features') + ((PANEL_FINGERPRINT_INPUTS[key],) if key else ())
+            pipeline.add(name, lambda panel, _, fingerprints=None, attr=attr:
+                         self._cached_panel(getattr(self, attr), panel, fingerprints), inputs, threaded=True)
+
+        self._add_signal_nodes(pipeline)
+        if bounded:
+            pipeline.add('skipped', self._bounded_symbols, ('panel', 'inflection', 'ml_signals'))
+        else:
+            pipeline.add('skipped', dict)
+        pipeline.add('chart_panel', self._chart_panel, ('panel', 'fingerprints', 'skipped'))
+        return pipeline
+
+    def _add_signal_nodes(self, pipeline):
+        """엔진 결과 → creon_signals / ml_signals (ENGINE_NODES 그룹별, 표 순서)"""
+        for group in ('creon', 'ml'):
+            names = tuple(name for name, g, *_ in ENGINE_NODES if g == group)
+            pipeline.add(f'{group}_signals', lambda *results, names=names: dict(zip(names, results)), names)
+
+    def _frame_node(self, attr, args, inputs):
+        """ENGINE_NODES 항목 → 종목 하나 분석 노드 함수 (캐시 조회 포함)"""
+        fingerprint_input = next((i for i in inputs if i.endswith('fingerprint')), None)
+
+        def run(*values):
+            v = dict(zip(inputs, values))
+            engine, code, df = getattr(self, attr), v['code'], v.get('df')
+            calls = {
+                'df': lambda: engine.analyze(df),
+                'code_df': lambda: engine.analyze(code, df),
+                'code': lambda: engine.analyze(code)
+            }
+            if fingerprint_input is None:
+                return calls[args]()
+            return self._cached(engine, code, v[fingerprint_input], compute=calls[args])
+        return run
+
+    def _chart_node(self, attr):
+        """패턴/지지저항/피보나치 패널 노드 함수 (생략 종목 자리는 None)"""
+        def run(chart):
+            panel, fingerprints, active, n = chart
+            if active is None:
+                return self._cached_panel(getattr(self, attr), panel, fingerprints)
+            full = [None] * n
+            if active:
+                for j, result in zip(active, self._cached_panel(getattr(self, attr), panel, fingerprints)):
+                    full[j] = result
+            return full
+        return run
+
+    def _chart_panel(self, panel, fingerprints, skipped):
+        """
+        패턴/지지저항/피보나치 입력 (생략 종목을 뺀 패널, 지문, 원래 열 번호 — 생략 없으면 None, 전체 종목 수)
 
-        try:
-            df = pd.read_pickle(file_path)
-            return df
-        except:
+        세 엔진 스레드가 같은 종목 DataFrame/피벗 인덱스를 쓰도록 미리 만들어 둔다.
+        """
+        n, active = panel.n_symbols, None
+        if skipped:
+            active = [j for j in range(n) if j not in skipped]
+            panel = panel.take(active)
+            fingerprints = None if fingerprints is None else [fingerprints[j] for j in active]
+        for code in panel.codes:
+            pivot_index(panel.frame(code))
+        return panel, fingerprints, active, n
+
+    def _index_fingerprints(self, panel, fingerprints):
+        """종목 지문 + 지수 지문 (지수 엔진 캐시 키)"""
+        if fingerprints is None:
             return None
+        indexes = self._index_fingerprint(panel.snapshot)
+        return [fp and f"{fp}:{indexes}" for fp in fingerprints]
 
-    def _get_all_codes(self):
-        """data 폴더에서 모든 종목코드 추출"""
-        if not os.path.exists(self.data_path):
-            return []
+    def _cached(self, engine, code, fingerprint, df=None, compute=None):
+        """엔진 결과 캐시 조회 (없으면 engine.analyze(df) 또는 compute() 실행 후 저장)"""
+        compute = compute or (lambda: engine.analyze(df))
+        if self.cache is None:
+            return compute()
+        return self.cache.fetch(engine, code, fingerprint, compute)
+
+    def _cached_panel(self, engine, panel, fingerprints):
+        """
+        엔진 결과 캐시 조회 (패널) — 캐시에 없는 종목만 모아 analyze_panel 한 번 실행
+
+        패널 결과는 'analyze_panel' 키에 따로 저장해 종목 경로(analyze_stock/analyze_backdata)에는 내주지 않는다.
+        반대로 종목 경로 결과('analyze' 키)는 기준 결과이므로 패널 스캔이 먼저 찾아 쓴다 (보유 종목 → 스캔 재사용).
 
-        files = [f for f in os.listdir(self.data_path) if f.endswith('.pkl')]
-        codes = [f.split('_')[0] for f in files]
+        Returns:
+            list: panel.codes 순서 결과
+        """
+        if self.cache is None or fingerprints is None:
+            return engine.analyze_panel(panel)
+
+        keys = [None if fp is None else (self.cache.key(engine, code, fp),
+                                          self.cache.key(engine, code, fp, method="analyze_panel"))
+                for code, fp in zip(panel.codes, fingerprints)]
+        results = [None if key is None else self.cache.get_first(key) for key in keys]
+        missing = [j for j, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+
+        subset = panel if len(missing) == len(results) else panel.take(missing)
+        for j, result in zip(missing, engine.analyze_panel(subset)):
+            results[j] = result
+            if keys[j] is not None:
+                self.cache.put(keys[j][1], result)
+        return results
+
+    def _index_fingerprint(self, snapshot):
+        """지수(코스피/코스닥) 데이터 지문 — 지수 엔진 캐시 키에 종목 지문과 함께 사용"""
+        return f"{snapshot.fingerprint('U001')}:{snapshot.fingerprint('U201')}"
 
-        # 지수 제외
-        codes = [c for c in codes if not c.startswith('U')]
+    def _load_data(self, code):
+        """데이터 로드 (패널 저장소)"""
+        return self.loader.load(code)
 
-        return codes
+    def _get_all_codes(self):
+        """패널 저장소의 모든 종목코드 (지수 제외)"""
+        return self.loader.get_codes(include_index=False)
 
     def _check_positions(self):
         """보유 종목 손절/익절 체크"""
@@ -374,7 +772,11 @@ class PIONASystem:
                 print(f"{code}: {result.get('status')} - {result.get('action')}")
 
     def _update_learning(self, analysis_result, trade_result):
-        """학습 시스템 업데이트"""
+        """학습 시스템 업데이트 (레코드면 엔진 근거를 다시 만들어 사용)"""
+        if isinstance(analysis_result, AnalysisRecord):
+            analysis_result = analysis_result.explain(self)
+            if analysis_result is None:
+                return
         creon_signals = analysis_result['creon_signals']
 
         # 사용된 패턴 추출
@@ -407,6 +809,58 @@ class PIONASystem:
         print(f"최근 20회 평균 수익률: {performance.get('recent_20_avg_return', 0)}%")
 
 
+# ========================================
+# 병렬 스캔 작업자 (프로세스 풀)
+# ========================================
+_worker = {}
+
+
+def _format_timings(timings, top=5):
+    """노드별 실행 시간 → 느린 순 상위 top 개 문자열"""
+    slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[:top]
+    return ", ".join(f"{name} {seconds * 1000:.1f}ms" for name, seconds in slowest)
+
+
+def _column_chunks(n, size):
+    """
+    종목 열 덩어리 [(start, stop)]
+
+    종목 1개짜리 열은 봉 축 합계가 pairwise 합으로 바뀌어 전체 패널 결과와 마지막 자리가 달라지므로
+    1개짜리 마지막 덩어리는 앞 덩어리에 합친다.
+    """
+    chunks = [(start, min(start + size, n)) for start in range(0, n, size)]
+    if len(chunks) > 1 and chunks[-1][1] - chunks[-1][0] == 1:
+        chunks[-2:] = [(chunks[-2][0], n)]
+    return chunks
+
+
+def _init_scan_worker(spec, data_path, use_cache, lean):
+    """작업자 초기화: 공유 패널에 붙고 분석 엔진을 한 번만 생성 (디스크 캐시는 부모와 공유)"""
+    panel, shm = attach(spec)
+    _worker['panel'] = panel
+    _worker['shm'] = shm
+    # 작업자 프로세스끼리 이미 병렬이므로 DAG 는 작업자 안에서 순서대로
+    _worker['system'] = PIONASystem(data_path=data_path, analysis_only=True, use_cache=use_cache, threads=0,
+                                    lean=lean)
+
+
+def _scan_chunk(chunk):
+    """
+    종목 열 [start, stop) 분석 (부모와 같은 스냅샷으로 고정)
+
+    Returns:
+        (start, list): df 는 부모가 자기 패널에서 다시 붙인다 (큰 DataFrame 전송 생략)
+    """
+    start, stop, bounded = chunk
+    system, panel = _worker['system'], _worker['panel']
+    with system.loader.pinned(panel.snapshot):
+        results = system.analyze_panel(panel.columns(start, stop), bounded)
+    for analysis in results:
+        if analysis is not None:
+            analysis['df'] = None
+    return start, results
+
+
 def main():
     """메인 함수"""
     # PIONA 시스템 초기화
@@ -416,8 +870,8 @@ def main():
     # analysis = piona.analyze_stock('005930')
     # result = piona.execute_trading(analysis)
 
-    # 사용 예시 2: 전체 유니버스 스캔
-    # buy_candidates = piona.scan_universe()
+    # 사용 예시 2: 전체 유니버스 스캔 (상위 10개만 보관)
+    # buy_candidates = piona.scan_universe(top_k=10)
 
     # 사용 예시 3: 자동매매 실행
     piona.run_auto_trading()
@@ -9,6 +9,7 @@ from .volatility_engine import VolatilityEngine
 from .dart_engine import DartEngine
 from .index_engine import IndexEngine
 from .ai_decision_engine import AIDecisionEngine
+from .indicator_state import IndicatorState
 
 __all__ = [
     'MacroEngine',
@@ -17,5 +18,6 @@ __all__ = [
     'VolatilityEngine',
     'DartEngine',
     'IndexEngine',
-    'AIDecisionEngine'
+    'AIDecisionEngine',
+    'IndicatorState'
 ]
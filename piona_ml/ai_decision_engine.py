@@ -12,6 +12,11 @@ import json
 from datetime import datetime
 
 
+# 패턴/지지저항/피보나치 결과에서 나오는 유사 패턴 (_analyze_pattern_similarity)
+CHART_PATTERNS = ['double_bottom', 'triple_bottom', 'inverse_head_shoulders']
+EXPENSIVE_PATTERNS = CHART_PATTERNS + ['support_bounce', 'fibo_support']
+
+
 class AIDecisionEngine:
     """AI 의사결정 엔진"""
 
@@ -124,6 +129,33 @@ class AIDecisionEngine:
         except:
             return {}
 
+    def score_bounds(self, code, creon_signals):
+        """
+        패턴/지지저항/피보나치 실행 전 ML 점수 범위 (유사 패턴 평균 승률만 미정)
+
+        Parameters:
+            code: 종목코드
+            creon_signals: 변곡 엔진 결과만 있는 CREON 신호
+
+        Returns:
+            tuple: (하한, 상한) — analyze(...)['ml_score']['total'] 가 항상 이 안에 든다
+        """
+        win_rate = self._calculate_win_rate(code)
+        recent_performance = self._analyze_recent_performance(code, limit=20)
+        risk_factor = self._calculate_risk_factor(code)
+
+        # 가능한 유사 패턴 조합의 평균 승률은 포함될 수 있는 패턴 승률의 최소~최대 사이
+        rates = [self.pattern_stats.get(p, {}).get('win_rate', 0.5) for p in EXPENSIVE_PATTERNS]
+        if creon_signals.get('inflection', {}).get('trinity', {}).get('trinity_count', 0) >= 3:
+            rates.append(self.pattern_stats.get('trinity_complete', {}).get('win_rate', 0.5))
+        else:
+            rates.append(0.5)  # 패턴이 하나도 없을 때
+
+        return tuple(
+            self._calculate_ml_score(win_rate, recent_performance, {'avg_win_rate': rate}, risk_factor)['total']
+            for rate in (min(rates), max(rates))
+        )
+
     def _calculate_win_rate(self, code):
         """종목별 과거 승률 계산"""
         if not self.trading_history:
@@ -221,7 +253,7 @@ class AIDecisionEngine:
         pattern_result = creon_signals.get('pattern', {})
         if pattern_result.get('final_signal') in ['BUY', 'STRONG_BUY']:
             for p in pattern_result.get('detected_patterns', []):
-                if p['pattern'] in ['double_bottom', 'triple_bottom', 'inverse_head_shoulders']:
+                if p['pattern'] in CHART_PATTERNS:
                     patterns_detected.append(p['pattern'])
 
         # 지지/저항 신호
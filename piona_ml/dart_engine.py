@@ -36,6 +36,10 @@ class DartEngine:
             "reason": "DART API 미연동 (향후 구현 예정)"
         }
 
+    def analyze_panel(self, panel, days=7):
+        """여러 종목 공시 분석 (panel.codes 순서, 종목별 analyze 와 동일)"""
+        return [self.analyze(code, days) for code in panel.codes]
+
     def _mock_disclosure_check(self, code):
         """
         목업 공시 체크 (실제 구현 시 DART API 사용)
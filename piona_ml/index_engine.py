@@ -7,13 +7,23 @@ import pandas as pd
 import numpy as np
 import os
 
+from piona_data.market_data import MarketDataLoader
+from piona_data.feature_store import features
+from engine.reasons import Reasons
+
 
 class IndexEngine:
     """지수 방향 분석 엔진"""
 
-    def __init__(self):
+    def __init__(self, lean=False):
+        """
+        Parameters:
+            lean: True 면 근거 문자열(reasons) 생략 — 점수/신호만 (백테스트/대량 스캔)
+        """
         self.name = "Index Direction Analysis Engine"
+        self.lean = lean
         self.data_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
+        self.loader = MarketDataLoader(self.data_path)
 
     def analyze(self, code, df):
         """
@@ -28,39 +38,15 @@ class IndexEngine:
         """
         # 종목이 코스피인지 코스닥인지 판단
         if code.startswith('U'):
-            return {
-                "signal": "INDEX_ITSELF",
-                "score": 0,
-                "index_direction": "none",
-                "reason": "지수 자체는 분석 대상 아님"
-            }
+            return self._index_itself()
 
-        # 코스피/코스닥 판단 (간단히 코드로 구분)
-        # A로 시작하고 숫자가 000000~099999 -> 코스피
-        # A로 시작하고 숫자가 100000~ -> 코스닥
-        try:
-            code_num = int(code.replace('A', ''))
-            if code_num < 100000:
-                index_code = 'U001'  # 코스피
-                index_name = '코스피'
-            else:
-                index_code = 'U201'  # 코스닥
-                index_name = '코스닥'
-        except:
-            # 판단 불가 시 기본 코스피
-            index_code = 'U001'
-            index_name = '코스피'
+        index_code, index_name = self._index_of(code)
 
         # 지수 데이터 로드
         index_df = self._load_index_data(index_code)
 
         if index_df is None:
-            return {
-                "signal": "NO_INDEX_DATA",
-                "score": 0,
-                "index_direction": "unknown",
-                "reason": f"{index_name} 지수 데이터 없음"
-            }
+            return self._no_index_data(index_name)
 
         # 지수 방향 분석
         index_analysis = self._analyze_index_direction(index_df, index_name)
@@ -73,18 +59,82 @@ class IndexEngine:
 
         return result
 
-    def _load_index_data(self, index_code):
-        """지수 데이터 로드"""
-        file_path = os.path.join(self.data_path, f"{index_code}_100days.pkl")
+    def analyze_panel(self, panel):
+        """
+        여러 종목 지수 분석 (지수 방향은 지수별 한 번, 20일 상대 수익률은 종목 축으로 한 번에)
 
-        if not os.path.exists(file_path):
-            return None
+        Parameters:
+            panel: piona_data.bar_panel.BarPanel
 
+        Returns:
+            list: 종목별 analyze(code, df) 결과 (panel.codes 순서)
+        """
+        stock_ret = features(panel).change_pct(20)
+
+        indexes = {}
+        results = []
+        for j, code in enumerate(panel.codes):
+            if code.startswith('U'):
+                results.append(self._index_itself())
+                continue
+
+            index_code, index_name = self._index_of(code)
+            if index_code not in indexes:
+                index_df = self._load_index_data(index_code)
+                indexes[index_code] = index_df, (
+                    None if index_df is None else self._analyze_index_direction(index_df, index_name))
+            index_df, index_analysis = indexes[index_code]
+            if index_df is None:
+                results.append(self._no_index_data(index_name))
+                continue
+
+            if panel.counts[j] < 20 or len(index_df) < 20:
+                relative_strength = {'relative_strength': 0, 'outperformance': False}
+            else:
+                index_ret = features(index_df).change_pct(20)
+                relative = stock_ret[j] - index_ret
+                relative_strength = {
+                    'relative_strength': relative,
+                    'stock_ret': stock_ret[j],
+                    'index_ret': index_ret,
+                    'outperformance': relative > 0
+                }
+            results.append(self._generate_signal(index_analysis, relative_strength, index_name))
+        return results
+
+    def _index_of(self, code):
+        """종목코드 → (지수코드, 지수명)"""
+        # 코스피/코스닥 판단 (간단히 코드로 구분)
+        # A로 시작하고 숫자가 000000~099999 -> 코스피
+        # A로 시작하고 숫자가 100000~ -> 코스닥
         try:
-            df = pd.read_pickle(file_path)
-            return df
+            code_num = int(code.replace('A', ''))
+            if code_num < 100000:
+                return 'U001', '코스피'
+            return 'U201', '코스닥'
         except:
-            return None
+            # 판단 불가 시 기본 코스피
+            return 'U001', '코스피'
+
+    def _index_itself(self):
+        return {
+            "signal": "INDEX_ITSELF",
+            "score": 0,
+            "index_direction": "none",
+            "reason": "지수 자체는 분석 대상 아님"
+        }
+
+    def _no_index_data(self, index_name):
+        return {
+            "signal": "NO_INDEX_DATA",
+            "score": 0,
+            "index_direction": "unknown",
+            "reason": f"{index_name} 지수 데이터 없음"
+        }
+
+    def _load_index_data(self, index_code):
+        """지수 데이터 로드 (패널 저장소)"""
+        return self.loader.load(index_code)
 
     def _analyze_index_direction(self, index_df, index_name):
         """지수 방향 분석"""
@@ -98,9 +148,10 @@ class IndexEngine:
                 'ret_20d': 0
             }
 
-        # 수익률 계산
-        ret_5d = (close.iloc[-1] / close.iloc[-5] - 1) * 100 if len(close) >= 5 else 0
-        ret_20d = (close.iloc[-1] / close.iloc[-20] - 1) * 100 if len(close) >= 20 else 0
+        # 수익률 계산 (공용 지표 저장소)
+        f = features(index_df)
+        ret_5d = f.change_pct(5) or 0
+        ret_20d = f.change_pct(20) or 0
 
         # 방향 판단
         if ret_5d > 2 and ret_20d > 5:
@@ -136,8 +187,8 @@ class IndexEngine:
                 'outperformance': False
             }
 
-        stock_ret = (stock_df['close'].iloc[-1] / stock_df['close'].iloc[-20] - 1) * 100
-        index_ret = (index_df['close'].iloc[-1] / index_df['close'].iloc[-20] - 1) * 100
+        stock_ret = features(stock_df).change_pct(20)
+        index_ret = features(index_df).change_pct(20)
 
         relative_strength = stock_ret - index_ret
         outperformance = relative_strength > 0
@@ -153,7 +204,7 @@ class IndexEngine:
         """최종 신호 생성"""
         score = 0
         signal = "NEUTRAL"
-        reasons = []
+        reasons = Reasons(self.lean)
 
         direction = index_analysis['direction']
         strength = index_analysis['strength']
@@ -163,37 +214,37 @@ class IndexEngine:
         if direction == 'strong_uptrend':
             score += 10
             signal = "INDEX_STRONG_UP"
-            reasons.append(f"{index_name} 강한 상승 {ret_5d:.1f}% (+10점)")
+            reasons.add("{} 강한 상승 {:.1f}% (+10점)", index_name, ret_5d)
         elif direction == 'uptrend':
             score += 5
             signal = "INDEX_UP"
-            reasons.append(f"{index_name} 상승 {ret_5d:.1f}% (+5점)")
+            reasons.add("{} 상승 {:.1f}% (+5점)", index_name, ret_5d)
         elif direction == 'strong_downtrend':
             score -= 10
             signal = "INDEX_STRONG_DOWN"
-            reasons.append(f"{index_name} 강한 하락 {ret_5d:.1f}% (-10점)")
+            reasons.add("{} 강한 하락 {:.1f}% (-10점)", index_name, ret_5d)
         elif direction == 'downtrend':
             score -= 5
             signal = "INDEX_DOWN"
-            reasons.append(f"{index_name} 하락 {ret_5d:.1f}% (-5점)")
+            reasons.add("{} 하락 {:.1f}% (-5점)", index_name, ret_5d)
         else:
             signal = "INDEX_SIDEWAYS"
-            reasons.append(f"{index_name} 횡보 {ret_5d:.1f}% (0점)")
+            reasons.add("{} 횡보 {:.1f}% (0점)", index_name, ret_5d)
 
         # 2) 상대 강도
         rs = relative_strength.get('relative_strength', 0)
         if rs > 5:
             score += 3
-            reasons.append(f"지수 대비 강세 +{rs:.1f}%p (+3점)")
+            reasons.add("지수 대비 강세 +{:.1f}%p (+3점)", rs)
         elif rs > 2:
             score += 2
-            reasons.append(f"지수 대비 우세 +{rs:.1f}%p (+2점)")
+            reasons.add("지수 대비 우세 +{:.1f}%p (+2점)", rs)
         elif rs < -5:
             score -= 3
-            reasons.append(f"지수 대비 약세 {rs:.1f}%p (-3점)")
+            reasons.add("지수 대비 약세 {:.1f}%p (-3점)", rs)
         elif rs < -2:
             score -= 2
-            reasons.append(f"지수 대비 열세 {rs:.1f}%p (-2점)")
+            reasons.add("지수 대비 열세 {:.1f}%p (-2점)", rs)
 
         return {
             "signal": signal,
@@ -201,5 +252,5 @@ class IndexEngine:
             "index_direction": direction,
             "index_analysis": index_analysis,
             "relative_strength": relative_strength,
-            "reasons": reasons
+            "reasons": reasons.items
         }
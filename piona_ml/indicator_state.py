@@ -0,0 +1,417 @@
+"""
+스트리밍 지표 상태 (종목별)
+- 봉 하나가 들어올 때마다 update(bar) 로 지표를 O(1) (분할 상환) 갱신
+- 이동평균/ATR/수익률 표준편차: 고정 창 누적합
+- RSI/스토캐스틱 %D: 창(14개 이하) 값을 오래된 것부터 더한 평균 — 종목/패널 경로와 같은 값
+- 스토캐스틱/일목균형표 구간 최고·최저: 단조 덱 (monotonic deque)
+- snapshot()/restore() 로 저장·복원 → 장중 재채점 시 전체 이력 재계산 없음
+
+MacroEngine / VolatilityEngine / PsychologyEngine 의 analyze_state(state) 는
+analyze(df) 와 같은 결과를 상태만으로 계산한다.
+"""
+import json
+import math
+import os
+from collections import deque
+
+import numpy as np
+
+try:
+    from engine.ichimoku import CONVERSION_PERIOD, BASE_PERIOD, LEAD2_PERIOD, ichimoku_at
+except ImportError:
+    # engine 디렉토리가 sys.path 에 직접 있는 경우
+    from ichimoku import CONVERSION_PERIOD, BASE_PERIOD, LEAD2_PERIOD, ichimoku_at
+
+from .psychology_engine import ordered_mean
+
+
+MA_PERIODS = (5, 20, 60, 120, 200, 300)
+ATR_PERIOD = 14
+ATR_AVG_PERIOD = 20
+RSI_PERIOD = 14
+STOCH_PERIOD = 14
+STOCH_D_PERIOD = 3
+RETURN_PERIOD = 20
+SLOPE_LAG = 5          # MA20 기울기: 5개 값 전 대비
+STATE_VERSION = 1
+
+
+def _finite(value):
+    return value is not None and math.isfinite(value)
+
+
+def _divide(a, b):
+    """numpy 와 같은 0 나눗셈 결과 (x/0 → ±inf, 0/0 → NaN)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return float(np.float64(a) / np.float64(b))
+
+
+class RollingSum:
+    """
+    고정 창 누적합
+
+    NaN/inf 는 합에서 빼고 개수만 센다 (pandas rolling(min_periods=window) 와 같이
+    창 안에 하나라도 있으면 mean() 은 NaN). 창 안 값이 모두 0 이면 합을 정확히 0 으로 둔다.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self.squares = 0.0
+        self.invalid = 0
+        self.nonzero = 0
+
+    def push(self, value):
+        if len(self.values) == self.window:
+            self._remove(self.values[0])
+        self.values.append(value)
+        if _finite(value):
+            self.total += value
+            self.squares += value * value
+            self.nonzero += value != 0
+        else:
+            self.invalid += 1
+        if not self.nonzero:
+            self.total = self.squares = 0.0
+
+    def _remove(self, value):
+        if _finite(value):
+            self.total -= value
+            self.squares -= value * value
+            self.nonzero -= value != 0
+        else:
+            self.invalid -= 1
+
+    @property
+    def valid(self):
+        return len(self.values) - self.invalid
+
+    def mean(self):
+        """창이 찼고 NaN 이 없을 때 평균 (아니면 NaN)"""
+        if len(self.values) < self.window or self.invalid:
+            return float("nan")
+        return self.total / self.window
+
+    def ordered_mean(self):
+        """창이 찼을 때 값을 오래된 것부터 차례로 더한 평균 (psychology_engine.ordered_mean 과 같은 값)"""
+        if len(self.values) < self.window:
+            return float("nan")
+        return ordered_mean(list(self.values))
+
+    def nanmean(self):
+        """창 안 유효 값 평균 (pandas Series.mean)"""
+        return self.total / self.valid if self.valid else float("nan")
+
+    def nanstd(self):
+        """창 안 유효 값 표본 표준편차 (pandas Series.std, ddof=1)"""
+        n = self.valid
+        if n < 2:
+            return float("nan")
+        var = (self.squares - self.total * self.total / n) / (n - 1)
+        return math.sqrt(max(var, 0.0))
+
+    def ago(self, k):
+        """k 개 전 값 (0 = 최신), 없으면 NaN"""
+        return self.values[-1 - k] if k < len(self.values) else float("nan")
+
+    def state(self):
+        return list(self.values)
+
+    @classmethod
+    def from_state(cls, window, values):
+        obj = cls(window)
+        for v in values:
+            obj.push(v)
+        return obj
+
+
+class RollingExtreme:
+    """
+    고정 창 최고/최저 (단조 덱)
+
+    덱에는 (순번, 값) 을 값이 단조가 되도록 유지한다. 새 값보다 못한 뒤쪽 원소는
+    다시 극값이 될 수 없으므로 버리고, 창을 벗어난 앞쪽 원소는 빼낸다.
+    원소마다 한 번 들어가고 한 번 나오므로 분할 상환 O(1).
+    """
+
+    def __init__(self, window, highest=True):
+        self.window = window
+        self.highest = highest
+        self.items = deque()
+        self.count = 0
+
+    def push(self, value):
+        items = self.items
+        if self.highest:
+            while items and items[-1][1] <= value:
+                items.pop()
+        else:
+            while items and items[-1][1] >= value:
+                items.pop()
+        items.append((self.count, value))
+        self.count += 1
+        while items[0][0] <= self.count - 1 - self.window:
+            items.popleft()
+
+    @property
+    def value(self):
+        """창이 찼을 때 극값 (아니면 NaN)"""
+        if self.count < self.window:
+            return float("nan")
+        return self.items[0][1]
+
+    def state(self):
+        return {"count": self.count, "items": [list(item) for item in self.items]}
+
+    @classmethod
+    def from_state(cls, window, highest, state):
+        obj = cls(window, highest)
+        obj.count = state["count"]
+        obj.items = deque(tuple(item) for item in state["items"])
+        return obj
+
+
+class IndicatorState:
+    """
+    종목 하나의 스트리밍 지표 상태
+
+    사용법:
+        state = IndicatorState.from_frame(df)          # 이력으로 초기화
+        state.update(bar)                              # 일봉 확정
+        state.update(bar, final=False)                 # 장중 임시 봉 (다음 update 에서 되돌림)
+        MacroEngine().analyze_state(state)             # analyze(df) 와 같은 결과
+    """
+
+    def __init__(self, code=None):
+        self.code = code
+        self.count = 0
+        self.date = None
+        self.last = {"high": float("nan"), "low": float("nan"), "close": float("nan")}
+
+        self.closes = {p: RollingSum(p) for p in MA_PERIODS}
+        self.ma20 = deque(maxlen=SLOPE_LAG)
+        self.tr = RollingSum(ATR_PERIOD)
+        self.atr_avg = RollingSum(ATR_AVG_PERIOD)
+        self.gain = RollingSum(RSI_PERIOD)
+        self.loss = RollingSum(RSI_PERIOD)
+        self.stoch_high = RollingExtreme(STOCH_PERIOD, highest=True)
+        self.stoch_low = RollingExtreme(STOCH_PERIOD, highest=False)
+        self.stoch_k = RollingSum(STOCH_D_PERIOD)
+        self.returns = RollingSum(RETURN_PERIOD)
+        self.highs = {p: RollingExtreme(p, highest=True)
+                      for p in (CONVERSION_PERIOD, BASE_PERIOD, LEAD2_PERIOD)}
+        self.lows = {p: RollingExtreme(p, highest=False)
+                     for p in (CONVERSION_PERIOD, BASE_PERIOD, LEAD2_PERIOD)}
+
+        # 장중 임시 봉 반영 전 상태
+        self._pending = None
+
+    # ========================================
+    # 갱신
+    # ========================================
+    @classmethod
+    def from_frame(cls, df, code=None):
+        """OHLCV DataFrame 전체로 상태 초기화 (O(N))"""
+        state = cls(code)
+        dates = df['date'].to_numpy() if 'date' in df.columns else [None] * len(df)
+        for d, h, l, c in zip(dates, df['high'].to_numpy(), df['low'].to_numpy(),
+                              df['close'].to_numpy()):
+            state._push(float(h), float(l), float(c), d)
+        return state
+
+    def update(self, bar, final=True):
+        """
+        봉 1개 반영
+
+        Parameters:
+            bar: high/low/close (선택: date) 를 가진 dict 또는 Series
+            final: False 면 장중 임시 봉 — 다음 update 전에 되돌린 뒤 새 봉을 반영한다
+        """
+        if self._pending is not None:
+            self._load(self._pending)
+            self._pending = None
+        if not final:
+            self._pending = self.snapshot()
+        date = bar.get('date') if hasattr(bar, 'get') else None
+        self._push(float(bar['high']), float(bar['low']), float(bar['close']), date)
+        return self
+
+    def _push(self, high, low, close, date=None):
+        prev = self.last["close"]
+        if math.isnan(prev):
+            tr = high - low
+            delta = ret = float("nan")
+        else:
+            tr = max(high - low, abs(high - prev), abs(low - prev))
+            delta = close - prev
+            ret = _divide(close, prev) - 1
+
+        for window in self.closes.values():
+            window.push(close)
+        self.ma20.append(self.closes[20].mean())
+
+        self.tr.push(tr)
+        self.atr_avg.push(self.tr.mean())
+
+        self.gain.push(delta if delta > 0 else 0.0)
+        self.loss.push(-delta if delta < 0 else 0.0)
+
+        self.stoch_high.push(high)
+        self.stoch_low.push(low)
+        lowest = self.stoch_low.value
+        self.stoch_k.push(_divide(100 * (close - lowest), self.stoch_high.value - lowest))
+
+        self.returns.push(ret)
+        for p in self.highs:
+            self.highs[p].push(high)
+            self.lows[p].push(low)
+
+        self.count += 1
+        self.date = date
+        self.last = {"high": high, "low": low, "close": close}
+
+    # ========================================
+    # 지표 값
+    # ========================================
+    @property
+    def close(self):
+        return self.last["close"]
+
+    def moving_averages(self):
+        """MacroEngine._calculate_moving_averages 형식"""
+        ma = {f"ma{p}": (self.closes[p].mean() if self.count >= p else None) for p in MA_PERIODS}
+        ma["current"] = self.close
+        return ma
+
+    def trend_strength(self):
+        """MacroEngine._analyze_trend_strength 형식"""
+        close = self.closes[300]
+        ret_20 = (self.close / close.ago(19) - 1) * 100 if self.count >= 20 else 0
+        ret_60 = (self.close / close.ago(59) - 1) * 100 if self.count >= 60 else 0
+        if self.count >= 25:
+            ma20_slope = (self.ma20[-1] / self.ma20[0] - 1) * 100
+        else:
+            ma20_slope = 0
+        return {'ret_20d': ret_20, 'ret_60d': ret_60, 'ma20_slope': ma20_slope}
+
+    def atr(self):
+        """VolatilityEngine._calculate_atr 형식 (시계열 제외)"""
+        return {'current': self.tr.mean(), 'avg_20d': self.atr_avg.nanmean()}
+
+    def rsi(self):
+        """PsychologyEngine._calculate_rsi"""
+        if self.count < RSI_PERIOD:
+            return float("nan")
+        rs = _divide(self.gain.ordered_mean(), self.loss.ordered_mean())
+        return 100 - _divide(100, 1 + rs)
+
+    def stochastic(self):
+        """PsychologyEngine._calculate_stochastic 형식"""
+        return {'k': self.stoch_k.ago(0), 'd': self.stoch_k.ordered_mean()}
+
+    def fear_greed(self):
+        """PsychologyEngine._calculate_fear_greed 형식"""
+        if self.count >= RETURN_PERIOD:
+            volatility = self.returns.nanstd() * 100
+            volatility_score = min(volatility * 2, 20)
+        else:
+            volatility, volatility_score = 0, 10
+        index = self.rsi() * 0.5 + self.stochastic()['k'] * 0.3 + volatility_score * 0.2
+        return {'index': index, 'volatility': volatility}
+
+    def ichimoku(self):
+        """ShinInflectionEngine._calc_ichimoku 형식"""
+        def mid(p):
+            return (self.highs[p].value + self.lows[p].value) / 2
+
+        conv, base, lead2 = mid(CONVERSION_PERIOD), mid(BASE_PERIOD), mid(LEAD2_PERIOD)
+        lead1 = (conv + base) / 2 if conv and base else float("nan")
+        cloud_red = bool(lead1 != 0 and lead2 != 0 and lead1 > lead2)
+        lagging_position = self.closes[300].ago(BASE_PERIOD - 1)
+        series = {
+            "conversion": conv, "base": base, "lead1": lead1, "lead2": lead2,
+            "lagging": self.close, "lagging_position": lagging_position, "cloud_red": cloud_red
+        }
+        return ichimoku_at({k: np.array([v]) for k, v in series.items()})
+
+    # ========================================
+    # 저장 / 복원
+    # ========================================
+    def snapshot(self):
+        """JSON 으로 저장 가능한 상태 dict (임시 봉은 되돌린 상태로 저장)"""
+        if self._pending is not None:
+            return self._pending
+        return {
+            "version": STATE_VERSION,
+            "code": self.code,
+            "count": self.count,
+            "date": None if self.date is None else str(self.date),
+            "last": dict(self.last),
+            "closes": self.closes[max(MA_PERIODS)].state(),
+            "ma20": list(self.ma20),
+            "tr": self.tr.state(),
+            "atr_avg": self.atr_avg.state(),
+            "gain": self.gain.state(),
+            "loss": self.loss.state(),
+            "stoch_high": self.stoch_high.state(),
+            "stoch_low": self.stoch_low.state(),
+            "stoch_k": self.stoch_k.state(),
+            "returns": self.returns.state(),
+            "highs": {str(p): e.state() for p, e in self.highs.items()},
+            "lows": {str(p): e.state() for p, e in self.lows.items()},
+        }
+
+    @classmethod
+    def restore(cls, snapshot):
+        """snapshot() 결과로 상태 복원"""
+        state = cls(snapshot.get("code"))
+        state._load(snapshot)
+        return state
+
+    def _load(self, snap):
+        if snap.get("version") != STATE_VERSION:
+            raise ValueError(f"지원하지 않는 지표 상태 버전: {snap.get('version')}")
+        self.count = snap["count"]
+        self.date = snap["date"]
+        self.last = dict(snap["last"])
+
+        closes = snap["closes"]
+        self.closes = {p: RollingSum.from_state(p, closes[-p:]) for p in MA_PERIODS}
+        self.ma20 = deque(snap["ma20"], maxlen=SLOPE_LAG)
+        self.tr = RollingSum.from_state(ATR_PERIOD, snap["tr"])
+        self.atr_avg = RollingSum.from_state(ATR_AVG_PERIOD, snap["atr_avg"])
+        self.gain = RollingSum.from_state(RSI_PERIOD, snap["gain"])
+        self.loss = RollingSum.from_state(RSI_PERIOD, snap["loss"])
+        self.stoch_high = RollingExtreme.from_state(STOCH_PERIOD, True, snap["stoch_high"])
+        self.stoch_low = RollingExtreme.from_state(STOCH_PERIOD, False, snap["stoch_low"])
+        self.stoch_k = RollingSum.from_state(STOCH_D_PERIOD, snap["stoch_k"])
+        self.returns = RollingSum.from_state(RETURN_PERIOD, snap["returns"])
+        self.highs = {int(p): RollingExtreme.from_state(int(p), True, s)
+                      for p, s in snap["highs"].items()}
+        self.lows = {int(p): RollingExtreme.from_state(int(p), False, s)
+                     for p, s in snap["lows"].items()}
+
+
+def save_states(path, states):
+    """
+    종목별 상태 저장 (원자적 교체)
+
+    Parameters:
+        path: JSON 파일 경로
+        states: {종목코드: IndicatorState}
+    """
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({code: state.snapshot() for code, state in states.items()}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_states(path):
+    """save_states 로 저장한 파일 → {종목코드: IndicatorState} (없으면 빈 dict)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return {code: IndicatorState.restore(snap) for code, snap in json.load(f).items()}
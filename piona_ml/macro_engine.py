@@ -7,12 +7,23 @@
 import pandas as pd
 import numpy as np
 
+from piona_data.feature_store import features
+from engine.reasons import Reasons
+
+
+MA_PERIODS = (5, 20, 60, 120, 200, 300)
+
 
 class MacroEngine:
     """거시 경제 및 시장 추세 분석 엔진"""
 
-    def __init__(self):
+    def __init__(self, lean=False):
+        """
+        Parameters:
+            lean: True 면 근거 문자열(reasons) 생략 — 점수/신호만 (백테스트/대량 스캔)
+        """
         self.name = "Macro Analysis Engine"
+        self.lean = lean
 
     def analyze(self, df):
         """
@@ -25,12 +36,7 @@ class MacroEngine:
             dict: 거시 분석 결과
         """
         if len(df) < 60:
-            return {
-                "signal": "INSUFFICIENT_DATA",
-                "score": 0,
-                "trend": "unknown",
-                "reason": "데이터 부족 (최소 60일 필요)"
-            }
+            return self._insufficient_data()
 
         # 이동평균선 계산
         ma_dict = self._calculate_moving_averages(df)
@@ -46,20 +52,69 @@ class MacroEngine:
 
         return result
 
-    def _calculate_moving_averages(self, df):
-        """이동평균선 계산"""
-        close = df['close']
-
-        ma_dict = {
-            'ma5': close.rolling(5).mean().iloc[-1] if len(df) >= 5 else None,
-            'ma20': close.rolling(20).mean().iloc[-1] if len(df) >= 20 else None,
-            'ma60': close.rolling(60).mean().iloc[-1] if len(df) >= 60 else None,
-            'ma120': close.rolling(120).mean().iloc[-1] if len(df) >= 120 else None,
-            'ma200': close.rolling(200).mean().iloc[-1] if len(df) >= 200 else None,
-            'ma300': close.rolling(300).mean().iloc[-1] if len(df) >= 300 else None,
-            'current': close.iloc[-1]
+    def analyze_state(self, state):
+        """
+        스트리밍 지표 상태로 거시 분석 (analyze(df) 와 같은 결과, 봉당 O(1))
+
+        Parameters:
+            state: piona_ml.indicator_state.IndicatorState
+        """
+        if state.count < 60:
+            return self._insufficient_data()
+
+        ma_dict = state.moving_averages()
+        alignment = self._check_alignment(ma_dict)
+        return self._generate_signal(alignment, state.trend_strength(), ma_dict)
+
+    def analyze_panel(self, panel):
+        """
+        여러 종목 거시 분석 (이동평균/수익률을 종목 축으로 한 번에 계산)
+
+        Parameters:
+            panel: piona_data.bar_panel.BarPanel
+
+        Returns:
+            list: 종목별 analyze(df) 결과 (panel.codes 순서)
+        """
+        f = features(panel)
+        ma = {p: f.ma(p) for p in MA_PERIODS}
+        ma20_prev = f.ma(20, lag=4)
+        current = panel.close[-1]
+        ret_20 = f.change_pct(20)
+        ret_60 = f.change_pct(60)
+        ma20_slope = (ma[20] / ma20_prev - 1) * 100
+
+        results = []
+        for j, count in enumerate(panel.counts):
+            if count < 60:
+                results.append(self._insufficient_data())
+                continue
+            ma_dict = {f'ma{p}': (ma[p][j] if count >= p else None) for p in MA_PERIODS}
+            ma_dict['current'] = current[j]
+            trend_strength = {
+                'ret_20d': ret_20[j] if count >= 20 else 0,
+                'ret_60d': ret_60[j] if count >= 60 else 0,
+                'ma20_slope': ma20_slope[j] if count >= 25 else 0
+            }
+            alignment = self._check_alignment(ma_dict)
+            results.append(self._generate_signal(alignment, trend_strength, ma_dict))
+        return results
+
+    def _insufficient_data(self):
+        return {
+            "signal": "INSUFFICIENT_DATA",
+            "score": 0,
+            "trend": "unknown",
+            "reason": "데이터 부족 (최소 60일 필요)"
         }
 
+    def _calculate_moving_averages(self, df):
+        """이동평균선 계산 (공용 지표 저장소)"""
+        f = features(df)
+
+        ma_dict = {f'ma{p}': (f.ma(p).iloc[-1] if len(df) >= p else None) for p in MA_PERIODS}
+        ma_dict['current'] = df['close'].iloc[-1]
+
         return ma_dict
 
     def _check_alignment(self, ma_dict):
@@ -96,23 +151,15 @@ class MacroEngine:
 
     def _analyze_trend_strength(self, df, ma_dict):
         """추세 강도 분석"""
-        close = df['close']
+        f = features(df)
 
-        # 최근 20일 수익률
-        if len(df) >= 20:
-            ret_20 = (close.iloc[-1] / close.iloc[-20] - 1) * 100
-        else:
-            ret_20 = 0
-
-        # 최근 60일 수익률
-        if len(df) >= 60:
-            ret_60 = (close.iloc[-1] / close.iloc[-60] - 1) * 100
-        else:
-            ret_60 = 0
+        # 최근 20일 / 60일 수익률 (봉 수 부족 시 0)
+        ret_20 = f.change_pct(20) or 0
+        ret_60 = f.change_pct(60) or 0
 
         # MA20 기울기
         if len(df) >= 25 and ma_dict['ma20'] is not None:
-            ma20_series = close.rolling(20).mean()
+            ma20_series = f.ma(20)
             ma20_slope = (ma20_series.iloc[-1] / ma20_series.iloc[-5] - 1) * 100
         else:
             ma20_slope = 0
@@ -128,34 +175,34 @@ class MacroEngine:
         score = 0
         signal = "NEUTRAL"
         trend = "sideways"
-        reasons = []
+        reasons = Reasons(self.lean)
 
         # 1) 정배열/역배열 점수
         if alignment == "perfect_upward":
             score += 8
             signal = "BULL_MARKET"
             trend = "strong_uptrend"
-            reasons.append("완벽한 정배열 (+8점)")
+            reasons.add("완벽한 정배열 (+8점)")
         elif alignment == "upward":
             score += 5
             signal = "BULL_MARKET"
             trend = "uptrend"
-            reasons.append("정배열 (+5점)")
+            reasons.add("정배열 (+5점)")
         elif alignment == "neutral":
             score += 3
             signal = "SIDEWAYS"
             trend = "sideways"
-            reasons.append("혼조장 (+3점)")
+            reasons.add("혼조장 (+3점)")
         elif alignment == "downward":
             score -= 5
             signal = "BEAR_MARKET"
             trend = "downtrend"
-            reasons.append("역배열 (-5점)")
+            reasons.add("역배열 (-5점)")
         elif alignment == "perfect_downward":
             score -= 10
             signal = "BEAR_MARKET"
             trend = "strong_downtrend"
-            reasons.append("완벽한 역배열 (-10점)")
+            reasons.add("완벽한 역배열 (-10점)")
 
         # 2) 추세 강도 점수
         ret_20 = trend_strength['ret_20d']
@@ -163,23 +210,23 @@ class MacroEngine:
 
         if ret_20 > 10:
             score += 3
-            reasons.append(f"20일 수익률 강세 {ret_20:.1f}% (+3점)")
+            reasons.add("20일 수익률 강세 {:.1f}% (+3점)", ret_20)
         elif ret_20 > 5:
             score += 2
-            reasons.append(f"20일 수익률 상승 {ret_20:.1f}% (+2점)")
+            reasons.add("20일 수익률 상승 {:.1f}% (+2점)", ret_20)
         elif ret_20 < -10:
             score -= 3
-            reasons.append(f"20일 수익률 약세 {ret_20:.1f}% (-3점)")
+            reasons.add("20일 수익률 약세 {:.1f}% (-3점)", ret_20)
         elif ret_20 < -5:
             score -= 2
-            reasons.append(f"20일 수익률 하락 {ret_20:.1f}% (-2점)")
+            reasons.add("20일 수익률 하락 {:.1f}% (-2점)", ret_20)
 
         # 3) 300일선 규칙
         if ma_dict.get('ma300') is not None:
             if ma_dict['current'] > ma_dict['ma300']:
-                reasons.append("300일선 위 (안전)")
+                reasons.add("300일선 위 (안전)")
             else:
-                reasons.append("300일선 아래 (주의)")
+                reasons.add("300일선 아래 (주의)")
 
         return {
             "signal": signal,
@@ -188,5 +235,5 @@ class MacroEngine:
             "alignment": alignment,
             "trend_strength": trend_strength,
             "ma_values": ma_dict,
-            "reasons": reasons
+            "reasons": reasons.items
         }
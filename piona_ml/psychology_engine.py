@@ -4,15 +4,71 @@
 - RSI, Stochastic 기반 과매수/과매도 분석
 - 매매 타이밍 추천
 """
+import warnings
+
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from piona_data.bar_panel import window, shifted
+from engine.reasons import Reasons
+
+
+def ordered_mean(rows):
+    """
+    첫 축 평균 — 행을 앞(오래된 봉)에서부터 차례로 더한다
+
+    numpy/pandas 평균은 배열 모양이나 이전 이력에 따라 더하는 순서가 달라 마지막 자리가 어긋날 수 있다.
+    %K 와 %D 처럼 수학적으로 같은 값을 비교하는 신호가 경로마다 뒤집히지 않도록
+    종목(analyze) / 패널(analyze_panel) / 스트리밍(analyze_state) 경로가 모두 이 순서로 평균을 낸다.
+    """
+    total = rows[0]
+    for row in rows[1:]:
+        total = total + row
+    return total / len(rows)
+
+
+def oscillators(close, high, low, period=14):
+    """
+    마지막 봉 RSI / 스토캐스틱 / 20일 수익률 변동성 (봉, 종목) 배열에서 종목별로 계산
+
+    Parameters:
+        close/high/low: (봉, 종목) 실수 배열 (앞쪽 빈칸 NaN)
+
+    Returns:
+        (rsi, stoch_k, stoch_d, volatility) — stoch_k 는 최근 3개 (3, 종목), 나머지는 (종목,)
+    """
+    close_w = window(close, period + 2)
+    delta = close_w - shifted(close_w)
+    gain = ordered_mean(np.where(delta > 0, delta, 0)[-period:])
+    loss = ordered_mean(np.where(delta < 0, -delta, 0)[-period:])
+
+    # %K 최근 3개 (%D = 평균)
+    lowest = sliding_window_view(window(low, period + 2), period, axis=0).min(axis=-1)
+    highest = sliding_window_view(window(high, period + 2), period, axis=0).max(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - (100 / (1 + gain / loss))
+        stoch_k = 100 * (close_w[-3:] - lowest) / (highest - lowest)
+        stoch_d = ordered_mean(stoch_k)
+
+        recent = window(close, 21)
+        returns = recent[1:] / recent[:-1] - 1
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        volatility = np.nanstd(returns, axis=0, ddof=1) * 100
+    return rsi, stoch_k, stoch_d, volatility
 
 
 class PsychologyEngine:
     """시장 심리 분석 엔진"""
 
-    def __init__(self):
+    def __init__(self, lean=False):
+        """
+        Parameters:
+            lean: True 면 근거 문자열(reasons) 생략 — 점수/신호만 (백테스트/대량 스캔)
+        """
         self.name = "Psychology Analysis Engine"
+        self.lean = lean
 
     def analyze(self, df):
         """
@@ -25,58 +81,64 @@ class PsychologyEngine:
             dict: 심리 분석 결과
         """
         if len(df) < 14:
-            return {
-                "signal": "INSUFFICIENT_DATA",
-                "score": 0,
-                "psychology": "unknown",
-                "reason": "데이터 부족 (최소 14일 필요)"
-            }
-
-        # RSI 계산
-        rsi = self._calculate_rsi(df)
+            return self._insufficient_data()
 
-        # Stochastic 계산
-        stoch = self._calculate_stochastic(df)
+        # RSI / Stochastic / 변동성 (패널 경로와 같은 연산)
+        columns = {name: df[name].to_numpy(dtype=float)[:, None] for name in ('close', 'high', 'low')}
+        rsi, stoch_k, stoch_d, volatility = oscillators(columns['close'], columns['high'], columns['low'])
+        rsi = rsi[0]
+        stoch = {'k': stoch_k[-1, 0], 'd': stoch_d[0]}
 
         # 공포/탐욕 지수
-        fear_greed = self._calculate_fear_greed(rsi, stoch, df)
+        fear_greed = self._calculate_fear_greed(rsi, stoch, len(df), volatility[0])
 
         # 최종 신호
         result = self._generate_signal(rsi, stoch, fear_greed)
 
         return result
 
-    def _calculate_rsi(self, df, period=14):
-        """RSI (Relative Strength Index) 계산"""
-        close = df['close']
-        delta = close.diff()
-
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-
-        return rsi.iloc[-1]
+    def analyze_state(self, state):
+        """
+        스트리밍 지표 상태로 심리 분석 (analyze(df) 와 같은 결과, 봉당 O(1))
 
-    def _calculate_stochastic(self, df, period=14):
-        """Stochastic Oscillator 계산"""
-        high = df['high']
-        low = df['low']
-        close = df['close']
+        Parameters:
+            state: piona_ml.indicator_state.IndicatorState
+        """
+        if state.count < 14:
+            return self._insufficient_data()
+        return self._generate_signal(state.rsi(), state.stochastic(), state.fear_greed())
 
-        lowest_low = low.rolling(window=period).min()
-        highest_high = high.rolling(window=period).max()
+    def analyze_panel(self, panel, period=14):
+        """
+        여러 종목 심리 분석 (RSI/스토캐스틱/수익률 변동성을 종목 축으로 한 번에 계산)
 
-        stoch_k = 100 * (close - lowest_low) / (highest_high - lowest_low)
-        stoch_d = stoch_k.rolling(window=3).mean()
+        Parameters:
+            panel: piona_data.bar_panel.BarPanel
 
+        Returns:
+            list: 종목별 analyze(df) 결과 (panel.codes 순서)
+        """
+        rsi, stoch_k, stoch_d, volatility = oscillators(panel.close, panel.high, panel.low, period)
+
+        results = []
+        for j, count in enumerate(panel.counts):
+            if count < 14:
+                results.append(self._insufficient_data())
+                continue
+            stoch = {'k': stoch_k[-1, j], 'd': stoch_d[j]}
+            fear_greed = self._calculate_fear_greed(rsi[j], stoch, count, volatility[j])
+            results.append(self._generate_signal(rsi[j], stoch, fear_greed))
+        return results
+
+    def _insufficient_data(self):
         return {
-            'k': stoch_k.iloc[-1],
-            'd': stoch_d.iloc[-1]
+            "signal": "INSUFFICIENT_DATA",
+            "score": 0,
+            "psychology": "unknown",
+            "reason": "데이터 부족 (최소 14일 필요)"
         }
 
-    def _calculate_fear_greed(self, rsi, stoch, df):
+    def _calculate_fear_greed(self, rsi, stoch, count, volatility):
         """공포/탐욕 지수 계산 (0~100)"""
         # RSI 기여도
         rsi_score = rsi
@@ -84,10 +146,8 @@ class PsychologyEngine:
         # Stochastic 기여도
         stoch_score = stoch['k']
 
-        # 최근 변동성
-        if len(df) >= 20:
-            returns = df['close'].pct_change().iloc[-20:]
-            volatility = returns.std() * 100
+        # 최근 변동성 (최근 20일 수익률 표준편차, %)
+        if count >= 20:
             volatility_score = min(volatility * 2, 20)  # 변동성이 높으면 공포
         else:
             volatility_score = 10
@@ -97,7 +157,7 @@ class PsychologyEngine:
 
         return {
             'index': fear_greed_index,
-            'volatility': volatility if len(df) >= 20 else 0
+            'volatility': volatility if count >= 20 else 0
         }
 
     def _generate_signal(self, rsi, stoch, fear_greed):
@@ -105,7 +165,7 @@ class PsychologyEngine:
         score = 0
         signal = "NEUTRAL"
         psychology = "neutral"
-        reasons = []
+        reasons = Reasons(self.lean)
         trading_style = "swing"  # 기본: 스윙
 
         fg_index = fear_greed['index']
@@ -115,42 +175,42 @@ class PsychologyEngine:
             psychology = "extreme_fear"
             score += 5
             trading_style = "long_term"
-            reasons.append(f"극단적 공포 지수 {fg_index:.1f} → 장기 매수 유리 (+5점)")
+            reasons.add("극단적 공포 지수 {:.1f} → 장기 매수 유리 (+5점)", fg_index)
         elif fg_index < 40:
             psychology = "fear"
             score += 3
             trading_style = "swing"
-            reasons.append(f"공포 지수 {fg_index:.1f} → 스윙 매수 유리 (+3점)")
+            reasons.add("공포 지수 {:.1f} → 스윙 매수 유리 (+3점)", fg_index)
         elif fg_index > 80:
             psychology = "extreme_greed"
             score -= 5
             trading_style = "scalp"
-            reasons.append(f"극단적 탐욕 지수 {fg_index:.1f} → 단타만 권장 (-5점)")
+            reasons.add("극단적 탐욕 지수 {:.1f} → 단타만 권장 (-5점)", fg_index)
         elif fg_index > 60:
             psychology = "greed"
             score -= 2
             trading_style = "scalp"
-            reasons.append(f"탐욕 지수 {fg_index:.1f} → 단타 유리 (-2점)")
+            reasons.add("탐욕 지수 {:.1f} → 단타 유리 (-2점)", fg_index)
         else:
             psychology = "neutral"
             trading_style = "swing"
-            reasons.append(f"중립 지수 {fg_index:.1f} → 스윙 적합 (0점)")
+            reasons.add("중립 지수 {:.1f} → 스윙 적합 (0점)", fg_index)
 
         # 2) RSI 분석
         if rsi < 30:
             score += 8
             signal = "OVERSOLD"
-            reasons.append(f"RSI 과매도 {rsi:.1f} → 강력 매수 (+8점)")
+            reasons.add("RSI 과매도 {:.1f} → 강력 매수 (+8점)", rsi)
         elif rsi < 40:
             score += 3
-            reasons.append(f"RSI 매수 구간 {rsi:.1f} (+3점)")
+            reasons.add("RSI 매수 구간 {:.1f} (+3점)", rsi)
         elif rsi > 70:
             score -= 8
             signal = "OVERBOUGHT"
-            reasons.append(f"RSI 과매수 {rsi:.1f} → 매도/관망 (-8점)")
+            reasons.add("RSI 과매수 {:.1f} → 매도/관망 (-8점)", rsi)
         elif rsi > 60:
             score -= 3
-            reasons.append(f"RSI 매도 구간 {rsi:.1f} (-3점)")
+            reasons.add("RSI 매도 구간 {:.1f} (-3점)", rsi)
 
         # 3) Stochastic 분석
         stoch_k = stoch['k']
@@ -158,16 +218,16 @@ class PsychologyEngine:
 
         if stoch_k < 20 and stoch_d < 20:
             score += 5
-            reasons.append(f"Stochastic 과매도 K:{stoch_k:.1f} D:{stoch_d:.1f} (+5점)")
+            reasons.add("Stochastic 과매도 K:{:.1f} D:{:.1f} (+5점)", stoch_k, stoch_d)
         elif stoch_k > stoch_d and stoch_k < 50:
             score += 3
-            reasons.append(f"Stochastic 골든크로스 K:{stoch_k:.1f} (+3점)")
+            reasons.add("Stochastic 골든크로스 K:{:.1f} (+3점)", stoch_k)
         elif stoch_k > 80 and stoch_d > 80:
             score -= 5
-            reasons.append(f"Stochastic 과매수 K:{stoch_k:.1f} D:{stoch_d:.1f} (-5점)")
+            reasons.add("Stochastic 과매수 K:{:.1f} D:{:.1f} (-5점)", stoch_k, stoch_d)
         elif stoch_k < stoch_d and stoch_k > 50:
             score -= 3
-            reasons.append(f"Stochastic 데드크로스 K:{stoch_k:.1f} (-3점)")
+            reasons.add("Stochastic 데드크로스 K:{:.1f} (-3점)", stoch_k)
 
         return {
             "signal": signal if signal != "NEUTRAL" else ("BUY" if score > 5 else "SELL" if score < -5 else "NEUTRAL"),
@@ -177,5 +237,5 @@ class PsychologyEngine:
             "rsi": rsi,
             "stochastic": stoch,
             "trading_style": trading_style,
-            "reasons": reasons
+            "reasons": reasons.items
         }
@@ -7,12 +7,20 @@
 import pandas as pd
 import numpy as np
 
+from piona_data.bar_panel import window
+from engine.reasons import Reasons
+
 
 class SupplyEngine:
     """수급 분석 엔진"""
 
-    def __init__(self):
+    def __init__(self, lean=False):
+        """
+        Parameters:
+            lean: True 면 근거 문자열(reasons) 생략 — 점수/신호만 (백테스트/대량 스캔)
+        """
         self.name = "Supply Analysis Engine"
+        self.lean = lean
 
     def analyze(self, df):
         """
@@ -33,12 +41,7 @@ class SupplyEngine:
             }
 
         if len(df) < 5:
-            return {
-                "signal": "INSUFFICIENT_DATA",
-                "score": 0,
-                "supply_trend": "unknown",
-                "reason": "데이터 부족 (최소 5일 필요)"
-            }
+            return self._insufficient_data()
 
         # 외국인 수급 분석
         frgn_analysis = self._analyze_investor(df, 'frgn_net_buy', '외국인')
@@ -54,6 +57,44 @@ class SupplyEngine:
 
         return result
 
+    def analyze_panel(self, panel):
+        """
+        여러 종목 수급 분석 (5일/20일 순매수 합을 종목 축으로 한 번에 계산)
+
+        Parameters:
+            panel: piona_data.bar_panel.BarPanel
+
+        Returns:
+            list: 종목별 analyze(df) 결과 (panel.codes 순서)
+        """
+        flows = {}
+        for column in ('frgn_net_buy', 'inst_net_buy'):
+            data = getattr(panel, column)
+            flows[column] = (data[-1], window(data, 5).sum(axis=0), window(data, 20).sum(axis=0))
+        volume_5d = window(panel.volume, 5).sum(axis=0)
+
+        results = []
+        for j, count in enumerate(panel.counts):
+            if count < 5:
+                results.append(self._insufficient_data())
+                continue
+            frgn = [int(v[j]) for v in flows['frgn_net_buy']]
+            inst = [int(v[j]) for v in flows['inst_net_buy']]
+            results.append(self._generate_signal(
+                self._investor_summary('외국인', *frgn),
+                self._investor_summary('기관', *inst),
+                self._strength(frgn[1], inst[1], volume_5d[j])
+            ))
+        return results
+
+    def _insufficient_data(self):
+        return {
+            "signal": "INSUFFICIENT_DATA",
+            "score": 0,
+            "supply_trend": "unknown",
+            "reason": "데이터 부족 (최소 5일 필요)"
+        }
+
     def _analyze_investor(self, df, column, investor_name):
         """투자자별 수급 분석"""
         data = df[column].fillna(0)
@@ -71,6 +112,10 @@ class SupplyEngine:
         recent_5d = data.iloc[-5:].sum() if len(data) >= 5 else data.sum()
         recent_20d = data.iloc[-20:].sum() if len(data) >= 20 else data.sum()
 
+        return self._investor_summary(investor_name, total, recent_5d, recent_20d)
+
+    def _investor_summary(self, investor_name, total, recent_5d, recent_20d):
+        """당일/5일/20일 순매수 → 추세 판단"""
         # 추세 판단
         if recent_5d > 0 and recent_20d > 0:
             trend = 'strong_buy'
@@ -102,12 +147,14 @@ class SupplyEngine:
             frgn_5d = frgn.iloc[-5:].sum()
             inst_5d = inst.iloc[-5:].sum()
             volume_5d = volume.iloc[-5:].sum()
+            return self._strength(frgn_5d, inst_5d, volume_5d)
 
-            frgn_ratio = (frgn_5d / volume_5d * 100) if volume_5d > 0 else 0
-            inst_ratio = (inst_5d / volume_5d * 100) if volume_5d > 0 else 0
-        else:
-            frgn_ratio = 0
-            inst_ratio = 0
+        return self._strength(0, 0, 0)
+
+    def _strength(self, frgn_5d, inst_5d, volume_5d):
+        """5일 순매수 / 5일 거래량 비율"""
+        frgn_ratio = (frgn_5d / volume_5d * 100) if volume_5d > 0 else 0
+        inst_ratio = (inst_5d / volume_5d * 100) if volume_5d > 0 else 0
 
         return {
             'frgn_ratio': frgn_ratio,
@@ -120,7 +167,7 @@ class SupplyEngine:
         score = 0
         signal = "NEUTRAL"
         supply_trend = "neutral"
-        reasons = []
+        reasons = Reasons(self.lean)
 
         # 1) 외국인 수급
         frgn_trend = frgn_analysis['trend']
@@ -128,16 +175,16 @@ class SupplyEngine:
 
         if frgn_trend == 'strong_buy':
             score += 5
-            reasons.append(f"외국인 강력 순매수 5일:{frgn_5d:,} (+5점)")
+            reasons.add("외국인 강력 순매수 5일:{:,} (+5점)", frgn_5d)
         elif frgn_trend == 'buy':
             score += 3
-            reasons.append(f"외국인 순매수 5일:{frgn_5d:,} (+3점)")
+            reasons.add("외국인 순매수 5일:{:,} (+3점)", frgn_5d)
         elif frgn_trend == 'strong_sell':
             score -= 5
-            reasons.append(f"외국인 강력 순매도 5일:{frgn_5d:,} (-5점)")
+            reasons.add("외국인 강력 순매도 5일:{:,} (-5점)", frgn_5d)
         elif frgn_trend == 'sell':
             score -= 3
-            reasons.append(f"외국인 순매도 5일:{frgn_5d:,} (-3점)")
+            reasons.add("외국인 순매도 5일:{:,} (-3점)", frgn_5d)
 
         # 2) 기관 수급
         inst_trend = inst_analysis['trend']
@@ -145,27 +192,27 @@ class SupplyEngine:
 
         if inst_trend == 'strong_buy':
             score += 5
-            reasons.append(f"기관 강력 순매수 5일:{inst_5d:,} (+5점)")
+            reasons.add("기관 강력 순매수 5일:{:,} (+5점)", inst_5d)
         elif inst_trend == 'buy':
             score += 3
-            reasons.append(f"기관 순매수 5일:{inst_5d:,} (+3점)")
+            reasons.add("기관 순매수 5일:{:,} (+3점)", inst_5d)
         elif inst_trend == 'strong_sell':
             score -= 5
-            reasons.append(f"기관 강력 순매도 5일:{inst_5d:,} (-5점)")
+            reasons.add("기관 강력 순매도 5일:{:,} (-5점)", inst_5d)
         elif inst_trend == 'sell':
             score -= 3
-            reasons.append(f"기관 순매도 5일:{inst_5d:,} (-3점)")
+            reasons.add("기관 순매도 5일:{:,} (-3점)", inst_5d)
 
         # 3) 수급 강도
         combined = supply_strength['combined']
         if abs(combined) > 10:
             if combined > 0:
                 score += 2
-                reasons.append(f"외인+기관 강한 순매수 비율 {combined:.1f}% (+2점)")
+                reasons.add("외인+기관 강한 순매수 비율 {:.1f}% (+2점)", combined)
                 supply_trend = "strong_buying"
             else:
                 score -= 2
-                reasons.append(f"외인+기관 강한 순매도 비율 {combined:.1f}% (-2점)")
+                reasons.add("외인+기관 강한 순매도 비율 {:.1f}% (-2점)", combined)
                 supply_trend = "strong_selling"
 
         # 최종 신호
@@ -192,5 +239,5 @@ class SupplyEngine:
             "frgn_analysis": frgn_analysis,
             "inst_analysis": inst_analysis,
             "supply_strength": supply_strength,
-            "reasons": reasons
+            "reasons": reasons.items
         }
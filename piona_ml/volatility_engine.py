@@ -4,15 +4,27 @@
 - 변동성 기반 매매 타이밍 및 스타일 추천
 - 손절가/목표가 계산
 """
+import warnings
+
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from piona_data.bar_panel import window, shifted
+from piona_data.feature_store import features
+from engine.reasons import Reasons
 
 
 class VolatilityEngine:
     """변동성 분석 엔진"""
 
-    def __init__(self):
+    def __init__(self, lean=False):
+        """
+        Parameters:
+            lean: True 면 근거 문자열(reasons) 생략 — 점수/신호만 (백테스트/대량 스캔)
+        """
         self.name = "Volatility Analysis Engine"
+        self.lean = lean
 
     def analyze(self, df, period=14):
         """
@@ -26,25 +38,80 @@ class VolatilityEngine:
             dict: 변동성 분석 결과
         """
         if len(df) < period:
-            return {
-                "signal": "INSUFFICIENT_DATA",
-                "score": 0,
-                "volatility_level": "unknown",
-                "trading_style": "swing",
-                "reason": f"데이터 부족 (최소 {period}일 필요)"
-            }
+            return self._insufficient_data(period)
 
         # ATR 계산
         atr = self._calculate_atr(df, period)
 
+        return self._analyze_atr(df['close'].iloc[-1], atr)
+
+    def analyze_state(self, state):
+        """
+        스트리밍 지표 상태로 변동성 분석 (analyze(df) 와 같은 결과, 봉당 O(1))
+
+        ATR 기간은 상태의 ATR_PERIOD(14일)이며 결과 atr 에 시계열(series)은 없다.
+
+        Parameters:
+            state: piona_ml.indicator_state.IndicatorState
+        """
+        from .indicator_state import ATR_PERIOD
+
+        if state.count < ATR_PERIOD:
+            return self._insufficient_data(ATR_PERIOD)
+        return self._analyze_atr(state.close, state.atr())
+
+    def analyze_panel(self, panel, period=14):
+        """
+        여러 종목 변동성 분석 (TR/ATR 을 종목 축으로 한 번에 계산)
+
+        Parameters:
+            panel: piona_data.bar_panel.BarPanel
+            period: ATR 계산 기간
+
+        Returns:
+            list: 종목별 analyze(df) 결과 (panel.codes 순서, 결과 atr 에 시계열 없음)
+        """
+        # 최근 20개 ATR 에 필요한 봉만
+        rows = period + 19
+        high = window(panel.high, rows + 1)
+        low = window(panel.low, rows + 1)
+        prev = shifted(window(panel.close, rows + 1))
+        with np.errstate(invalid="ignore"):
+            tr = np.fmax(high - low, np.fmax(np.abs(high - prev), np.abs(low - prev)))[1:]
+            atr = sliding_window_view(tr, period, axis=0).mean(axis=-1)
+        with np.errstate(invalid="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            avg_atr = np.nanmean(atr, axis=0)
+        current_price = panel.close[-1]
+
+        results = []
+        for j, count in enumerate(panel.counts):
+            if count < period:
+                results.append(self._insufficient_data(period))
+                continue
+            atr_j = {'current': atr[-1, j], 'avg_20d': avg_atr[j]}
+            results.append(self._analyze_atr(current_price[j], atr_j))
+        return results
+
+    def _insufficient_data(self, period):
+        return {
+            "signal": "INSUFFICIENT_DATA",
+            "score": 0,
+            "volatility_level": "unknown",
+            "trading_style": "swing",
+            "reason": f"데이터 부족 (최소 {period}일 필요)"
+        }
+
+    def _analyze_atr(self, current_price, atr):
+        """현재가 + ATR → 변동성 레벨/매매 스타일/손절·목표가"""
         # 변동성 레벨 분석
-        volatility_level = self._analyze_volatility_level(df, atr)
+        volatility_level = self._analyze_volatility_level(current_price, atr)
 
         # 매매 스타일 추천
         trading_style = self._recommend_trading_style(volatility_level)
 
         # 손절가/목표가 계산
-        stop_loss, targets = self._calculate_levels(df, atr)
+        stop_loss, targets = self._calculate_levels(current_price, atr)
 
         # 최종 신호
         result = self._generate_signal(atr, volatility_level, trading_style, stop_loss, targets)
@@ -52,20 +119,8 @@ class VolatilityEngine:
         return result
 
     def _calculate_atr(self, df, period):
-        """ATR (Average True Range) 계산"""
-        high = df['high']
-        low = df['low']
-        close = df['close']
-
-        # True Range 계산
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-
-        # ATR = TR의 이동평균
-        atr = tr.rolling(window=period).mean()
+        """ATR (Average True Range) 계산 (공용 지표 저장소)"""
+        atr = features(df).atr(period)
 
         return {
             'current': atr.iloc[-1],
@@ -73,11 +128,10 @@ class VolatilityEngine:
             'series': atr
         }
 
-    def _analyze_volatility_level(self, df, atr):
+    def _analyze_volatility_level(self, current_price, atr):
         """변동성 레벨 분석"""
         current_atr = atr['current']
         avg_atr = atr['avg_20d']
-        current_price = df['close'].iloc[-1]
 
         # ATR 비율 (%)
         atr_pct = (current_atr / current_price) * 100
@@ -125,9 +179,8 @@ class VolatilityEngine:
         else:  # very_low
             return "long_term"  # 장기
 
-    def _calculate_levels(self, df, atr):
+    def _calculate_levels(self, current_price, atr):
         """손절가/목표가 계산"""
-        current_price = df['close'].iloc[-1]
         current_atr = atr['current']
 
         # 손절가: 현재가 - 2*ATR
@@ -146,7 +199,7 @@ class VolatilityEngine:
         """최종 신호 생성"""
         score = 0
         signal = "NEUTRAL"
-        reasons = []
+        reasons = Reasons(self.lean)
 
         level = volatility_level['level']
         atr_pct = volatility_level['atr_pct']
@@ -156,31 +209,31 @@ class VolatilityEngine:
         if level == "very_high":
             score = 0  # 중립 (위험하지만 기회도 있음)
             signal = "HIGH_VOLATILITY"
-            reasons.append(f"매우 높은 변동성 {atr_pct:.2f}% → 단타 전용 (0점)")
+            reasons.add("매우 높은 변동성 {:.2f}% → 단타 전용 (0점)", atr_pct)
         elif level == "high":
             score = 0
             signal = "HIGH_VOLATILITY"
-            reasons.append(f"높은 변동성 {atr_pct:.2f}% → 단타 권장 (0점)")
+            reasons.add("높은 변동성 {:.2f}% → 단타 권장 (0점)", atr_pct)
         elif level == "normal":
             score = 5
             signal = "OPTIMAL_VOLATILITY"
-            reasons.append(f"적정 변동성 {atr_pct:.2f}% → 스윙 최적 (+5점)")
+            reasons.add("적정 변동성 {:.2f}% → 스윙 최적 (+5점)", atr_pct)
         elif level == "low":
             score = 3
             signal = "LOW_VOLATILITY"
-            reasons.append(f"낮은 변동성 {atr_pct:.2f}% → 스윙/장기 적합 (+3점)")
+            reasons.add("낮은 변동성 {:.2f}% → 스윙/장기 적합 (+3점)", atr_pct)
         else:  # very_low
             score = 2
             signal = "VERY_LOW_VOLATILITY"
-            reasons.append(f"매우 낮은 변동성 {atr_pct:.2f}% → 장기 보유 적합 (+2점)")
+            reasons.add("매우 낮은 변동성 {:.2f}% → 장기 보유 적합 (+2점)", atr_pct)
 
         # 2) ATR 추세
         if trend == "expanding":
-            reasons.append("변동성 확대 중 → 돌발 변수 주의")
+            reasons.add("변동성 확대 중 → 돌발 변수 주의")
         elif trend == "contracting":
-            reasons.append("변동성 축소 중 → 안정적 흐름")
+            reasons.add("변동성 축소 중 → 안정적 흐름")
         else:
-            reasons.append("변동성 안정적")
+            reasons.add("변동성 안정적")
 
         return {
             "signal": signal,
@@ -191,5 +244,5 @@ class VolatilityEngine:
             "volatility_analysis": volatility_level,
             "stop_loss": stop_loss,
             "targets": targets,
-            "reasons": reasons
+            "reasons": reasons.items
         }
@@ -0,0 +1,192 @@
+# pipeline_daily.py — 수집 + 분석 파이프라인 (일일 실행)
+# 수집(CREON 한도 대기)과 엔진 분석(CPU)을 겹쳐 실행:
+#   수집 스레드(메인) → 큐 → 분석 작업자 풀 → 후보 순위 즉시 갱신
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from piona_data.request_scheduler import get_scheduler
+from piona_data.trading_calendar import KRXCalendar
+from trading_system.candidate_ranking import CandidateRanking
+
+MIN_DAYS = 60  # 분석 최소 거래일 (PIONASystem.analyze_stock 과 동일)
+
+
+class DailyPipeline:
+    """
+    수집과 분석을 겹쳐 실행하는 일일 파이프라인
+
+    - 수집: 메인 스레드 (CREON COM 객체는 생성 스레드에서만 사용)
+    - 분석: 작업자 풀에서 PIONASystem.analyze_frame 실행
+    - 지수는 먼저 수집해 곧바로 저장소에 반영 (지수 엔진이 당일 지수 사용)
+    - 종목 신규 거래일은 마지막에 한 번에 저장 (manifest 교체로 원자적 반영)
+    """
+
+    def __init__(self, piona, merger, loader=None, workers=4, init_days=100):
+        """
+        Parameters:
+            piona: PIONASystem
+            merger: DataMerger (get_range 제공)
+            loader: MarketDataLoader (None 이면 piona.loader — 다른 로더는 ValueError:
+                    지수 엔진/결과 캐시가 piona.loader 저장소를 보므로 수집과 분석이 어긋남)
+            workers: 분석 작업자 수
+            init_days: 저장 이력이 없는 종목의 수집 거래일 수
+        """
+        self.name = "Daily Pipeline"
+        self.piona = piona
+        self.merger = merger
+        if loader is not None and loader is not piona.loader:
+            raise ValueError("DailyPipeline loader 는 piona.loader 와 같아야 함 "
+                             "(다른 저장소는 PIONASystem(data_path=...) 로 지정)")
+        self.loader = piona.loader
+        self.workers = workers
+        self.init_days = init_days
+
+        self.ranking = CandidateRanking()
+        self.sell_candidates = []
+        self.stats = {}
+
+    def run(self, codes, positions=None, until=None):
+        """
+        파이프라인 실행
+
+        Parameters:
+            codes: 종목 리스트 (지수 포함 가능)
+            positions: 보유 종목코드 집합 (먼저 수집)
+            until: 마지막 거래일 YYYYMMDD (기본: 장 마감이 끝난 최근 거래일)
+
+        Returns:
+            list: 점수순 매수 후보
+        """
+        scheduler = get_scheduler()
+        codes = scheduler.prioritize(codes, positions)
+        snapshot = self.loader.snapshot()
+        calendar = KRXCalendar.from_snapshot(snapshot)
+        until = int(until) if until is not None else calendar.last_closed_trading_day()
+
+        updates = {}
+        futures = []
+        collect_seconds = 0.0
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for i, code in enumerate(codes, 1):
+                t0 = time.perf_counter()
+                df, new_rows = self._collect(code, snapshot, calendar, until,
+                                              scheduler.lane_for(code, positions))
+                collect_seconds += time.perf_counter() - t0
+
+                if new_rows is not None and len(new_rows):
+                    if code.startswith("U"):
+                        self.loader.store.write_frames({code: new_rows})
+                    else:
+                        updates[code] = new_rows
+
+                if code.startswith("U") or df is None or len(df) < MIN_DAYS:
+                    continue
+
+                print(f"[{i}/{len(codes)}] {code} 수집 완료 → 분석 대기열", flush=True)
+                futures.append(pool.submit(self._analyze, code, df))
+
+            # 작업자별 분석 시간은 메인 스레드에서 합산
+            analyze_seconds = sum(f.result() for f in futures)
+
+        if updates:
+            self.loader.store.write_frames(updates)
+
+        self.stats = {
+            "symbols": len(codes),
+            "analyzed": len(futures),
+            "updated": len(updates),
+            "collect_seconds": round(collect_seconds, 2),
+            "analyze_seconds": round(analyze_seconds, 2),
+            "wall_seconds": round(time.perf_counter() - start, 2)
+        }
+        return self.ranking.top()
+
+    def _collect(self, code, snapshot, calendar, until, lane):
+        """저장 이력 + 빠진 거래일 → (분석용 전체 데이터, 신규 행)"""
+        last_date = snapshot.last_date(code)
+        stored = snapshot.frame(code)
+        if last_date is None:
+            start = calendar.sessions_back(until, self.init_days)
+        else:
+            missing = calendar.missing_days(last_date, until)
+            if len(missing) == 0:
+                return stored, None
+            start = int(missing[0])
+
+        try:
+            df_new = self.merger.get_range(code, start, until, lane=lane)
+        except Exception as e:
+            print(f"✗ 수집 실패: {code} - {str(e)}", flush=True)
+            return stored, None
+
+        if df_new is None or df_new.empty:
+            return stored, None
+        if stored is None:
+            return df_new, df_new
+
+        new_rows = df_new[df_new["date"] > pd.Timestamp(str(last_date))]
+        if len(new_rows) == 0:
+            return stored, None
+
+        df = pd.concat([stored, new_rows], ignore_index=True)
+        return df, new_rows
+
+    def _analyze(self, code, df):
+        """종목 분석 + 후보 순위 갱신 (작업자 스레드) → 분석 소요 시간(초)"""
+        t0 = time.perf_counter()
+        try:
+            analysis = self.piona.analyze_frame(code, df, verbose=False)
+        except Exception as e:
+            print(f"✗ 분석 실패: {code} - {str(e)}", flush=True)
+            return time.perf_counter() - t0
+        seconds = time.perf_counter() - t0
+
+        rank = self.ranking.add(analysis)
+        decision = analysis["final_decision"]
+        if rank is not None:
+            print(f"✓ 매수 후보: {code} ({decision['final_signal']['action']}, "
+                  f"점수: {decision['total_score']}, 현재 {rank}위)", flush=True)
+        elif decision["final_signal"]["action"] in ("STRONG_SELL", "SELL"):
+            self.sell_candidates.append({
+                "code": code,
+                "signal": decision["final_signal"]["action"],
+                "score": decision["total_score"]
+            })
+        return seconds
+
+
+def main():
+    from data_merger import DataMerger
+    from universe import UniverseManager
+    from piona_main import PIONASystem
+
+    print("PIONA_CREON - Daily Pipeline (수집 + 분석 동시 실행)")
+
+    symbols = UniverseManager().get_symbols_only()
+    piona = PIONASystem(mode="simulation")
+    merger = DataMerger()
+
+    pipeline = DailyPipeline(piona, merger)
+    held = set(piona.trader.get_open_positions())
+    buy_candidates = pipeline.run(symbols, positions=held)
+
+    stats = pipeline.stats
+    print(f"\n{'='*60}")
+    print(f"파이프라인 완료: {stats['symbols']}종목 수집, {stats['analyzed']}종목 분석")
+    print(f"수집 {stats['collect_seconds']}초 / 분석 {stats['analyze_seconds']}초 / 전체 {stats['wall_seconds']}초")
+    print(f"매수 후보: {len(buy_candidates)}개, 매도 후보: {len(pipeline.sell_candidates)}개")
+    print(f"{'='*60}")
+
+    for candidate in buy_candidates[:5]:  # 상위 5개만
+        print(f"\n[매수] {candidate['code']} (점수: {candidate['score']})")
+        piona.execute_trading(candidate["record"])
+
+    input("엔터 누르면 종료...")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,34 +13,1736 @@ def test_data_loading():
     print("\n[테스트 1] 데이터 로딩")
     print("=" * 60)
 
+    from piona_data.market_data import MarketDataLoader
+
     data_path = os.path.join(os.path.dirname(__file__), 'data')
 
     if not os.path.exists(data_path):
         print("✗ data 폴더가 없습니다.")
         return False
 
-    files = [f for f in os.listdir(data_path) if f.endswith('.pkl')]
+    loader = MarketDataLoader(data_path)
+    codes = loader.get_codes(include_index=True)
 
-    if not files:
-        print("✗ PKL 파일이 없습니다.")
+    if not codes:
+        print("✗ 저장된 종목이 없습니다.")
         print("  먼저 collector_init_100days.py를 실행하세요.")
         return False
 
-    print(f"✓ {len(files)}개 파일 발견")
+    print(f"✓ {len(codes)}개 종목 발견")
 
-    # 샘플 파일 로드
-    sample_file = files[0]
+    # 샘플 종목 로드
+    sample_code = codes[0]
     try:
-        df = pd.read_pickle(os.path.join(data_path, sample_file))
-        print(f"✓ 샘플 파일 로드 성공: {sample_file}")
+        df = loader.load(sample_code)
+        print(f"✓ 샘플 종목 로드 성공: {sample_code}")
         print(f"  - 데이터 길이: {len(df)}일")
         print(f"  - 컬럼: {list(df.columns)}")
         return True
     except Exception as e:
-        print(f"✗ 파일 로드 실패: {str(e)}")
+        print(f"✗ 종목 로드 실패: {str(e)}")
         return False
 
 
+def test_panel_store():
+    """패널 저장소 테스트"""
+    print("\n[테스트 7] 패널 저장소")
+    print("=" * 60)
+
+    import tempfile
+    from piona_data.panel_store import PanelStore
+
+    dates = pd.bdate_range(end='2025-11-21', periods=30)
+    frames = {}
+    for code in ['005930', '000660']:
+        close = np.random.randint(50000, 60000, 30)
+        frames[code] = pd.DataFrame({
+            'date': dates,
+            'code': code,
+            'open': close - 100,
+            'high': close + 500,
+            'low': close - 500,
+            'close': close,
+            'volume': np.random.randint(1000000, 2000000, 30),
+            'amount': np.random.randint(1000000000, 2000000000, 30),
+            'frgn_net_buy': np.random.randint(-100000, 100000, 30),
+            'inst_net_buy': np.random.randint(-100000, 100000, 30)
+        })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PanelStore(tmp)
+        store.write_frames({c: f.iloc[:29] for c, f in frames.items()})
+
+        # 하루 추가 (append 경로)
+        store.write_frames({c: f.iloc[29:] for c, f in frames.items()})
+        snap = store.open()
+        assert snap.n_days == 30 and snap.n_symbols == 2
+
+        df = snap.frame('005930')
+        assert list(df['close']) == list(frames['005930']['close'])
+        assert df['gap'].iloc[1] == df['open'].iloc[1] - df['close'].iloc[0]
+        print(f"✓ 저장/로드 일치: {len(df)}일, {len(df.columns)}컬럼")
+
+        # 복사 없는 컬럼 뷰
+        view = snap.column('close', '000660')
+        assert np.shares_memory(view, snap.field('close'))
+        print("✓ mmap 컬럼 뷰")
+
+        # 스냅샷은 이후 추가된 거래일을 보지 않음
+        store.append_day(20251124, {'005930': {'open': 1, 'high': 2, 'low': 1, 'close': 2}})
+        assert snap.n_days == 30 and store.open().n_days == 31
+        assert store.open().count('000660') == 30
+        print("✓ 원자적 거래일 추가")
+
+    return True
+
+
+def test_request_scheduler():
+    """CREON 요청 스케줄러 테스트 (가짜 CpCybos)"""
+    print("\n[테스트 8] CREON 요청 스케줄러")
+    print("=" * 60)
+
+    from piona_data.fake_creon import FakeClock, FakeCpCybos
+    from piona_data.request_scheduler import (
+        CreonRequestScheduler, LANE_POSITION, LANE_INDEX, LANE_UNIVERSE
+    )
+
+    clock = FakeClock()
+    cybos = FakeCpCybos(clock, limit=60, window=15.0)
+    scheduler = CreonRequestScheduler(cybos, clock=clock.time, sleep=clock.sleep)
+
+    # 150건: 60건씩 연속 요청, 한도 소진 시에만 대기 (한도 초과 시 예외)
+    for _ in range(150):
+        with scheduler.slot():
+            cybos.request()
+    assert cybos.total_requests == 150
+    assert clock.time() == 30.0 and scheduler.stats['waits'] == 2
+    print(f"✓ 150건 {clock.time():.0f}초 (고정 대기 {149 * 1.1:.0f}초)")
+
+    # 여러 레인이 동시에 요청해도 한도 확인 ~ BlockRequest 사이에 끼어들지 않음
+    import threading
+    import time
+    clock = FakeClock()
+    cybos = FakeCpCybos(clock, limit=5, window=15.0)
+    scheduler = CreonRequestScheduler(cybos, clock=clock.time, sleep=clock.sleep)
+    errors = []
+
+    def worker(lane):
+        try:
+            for _ in range(3):
+                with scheduler.slot(lane):
+                    time.sleep(0.002)  # BlockRequest 응답 지연
+                    cybos.request()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(lane,))
+               for lane in (LANE_POSITION, LANE_INDEX, LANE_UNIVERSE, LANE_UNIVERSE)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors and cybos.total_requests == 12
+    assert scheduler.stats['waits'] == 2
+    print(f"✓ 동시 4레인 12건 한도 초과 없음 (대기 {scheduler.stats['waits']}회)")
+
+    # 레인 순서: 보유 종목 → 지수 → 유니버스
+    held = {'000660'}
+    codes = scheduler.prioritize(['005930', 'U001', '000660', 'U201'], held)
+    assert codes == ['000660', 'U001', 'U201', '005930']
+    assert scheduler.lane_for('U001') == LANE_INDEX
+
+    order = []
+    tasks = [(LANE_UNIVERSE, 'a', lambda: order.append('a')),
+             (LANE_POSITION, 'b', lambda: order.append('b')),
+             (LANE_INDEX, 'c', lambda: order.append('c'))]
+    scheduler.run(tasks)
+    assert order == ['b', 'c', 'a']
+    print(f"✓ 우선순위 레인: {codes}")
+
+    return True
+
+
+def test_daily_pipeline():
+    """수집 + 분석 파이프라인 테스트"""
+    print("\n[테스트 9] 수집 + 분석 파이프라인")
+    print("=" * 60)
+
+    import tempfile
+    import time
+    from piona_main import PIONASystem
+    from piona_data.market_data import MarketDataLoader
+    from pipeline_daily import DailyPipeline
+
+    class SlowMerger:
+        """CREON 대신 일정 시간 뒤 데이터를 돌려주는 수집기"""
+        def get_range(self, code, start, end, lane=None):
+            time.sleep(0.01)
+            dates = pd.bdate_range(str(start), str(end))
+            days = len(dates)
+            close = 50000 + np.cumsum(np.random.randint(-500, 600, days))
+            return pd.DataFrame({
+                'date': dates, 'code': code,
+                'open': close - 100, 'high': close + 400, 'low': close - 400, 'close': close,
+                'volume': np.random.randint(1000000, 2000000, days),
+                'amount': np.random.randint(1000000000, 2000000000, days),
+                'frgn_net_buy': np.random.randint(-100000, 100000, days),
+                'inst_net_buy': np.random.randint(-100000, 100000, days)
+            })
+
+    codes = ['U001', '005930', '000660', '035420', '035720']
+    with tempfile.TemporaryDirectory() as tmp:
+        piona = PIONASystem(mode='simulation', data_path=tmp)
+        loader = piona.loader
+        try:
+            DailyPipeline(piona, SlowMerger(), loader=MarketDataLoader(tmp))
+            assert False, "piona.loader 와 다른 로더는 거부"
+        except ValueError:
+            pass
+        pipeline = DailyPipeline(piona, SlowMerger(), workers=2, init_days=80)
+        candidates = pipeline.run(codes, until=20251121)
+
+        stats = pipeline.stats
+        assert stats['analyzed'] == 4 and stats['updated'] == 4
+        assert sorted(loader.get_codes(include_index=True)) == sorted(codes)
+        assert piona.index_engine.loader is loader
+        index = piona.index_engine.analyze('005930', loader.load('005930'))
+        assert index['signal'] != 'NO_INDEX_DATA'
+        print("✓ 수집 저장소 = 분석/지수 엔진 저장소 (다른 로더는 거부)")
+        scores = [c['score'] for c in candidates]
+        assert scores == sorted(scores, reverse=True)
+        print(f"✓ {stats['analyzed']}종목 분석, 매수 후보 {len(candidates)}개")
+        print(f"  - 수집 {stats['collect_seconds']}초 / 분석 {stats['analyze_seconds']}초 / 전체 {stats['wall_seconds']}초")
+
+    return True
+
+
+def test_marketeye_update():
+    """MarketEye 일괄 갱신 테스트 (가짜 MarketEye)"""
+    print("\n[테스트 10] MarketEye 일괄 갱신")
+    print("=" * 60)
+
+    import tempfile
+    from piona_data.fake_creon import FakeClock, FakeCpCybos, FakeMarketEye
+    from piona_data.request_scheduler import CreonRequestScheduler
+    from piona_data.market_data import MarketDataLoader
+    from piona_data.marketeye import MarketEyeClient, BulkDailyUpdater
+
+    def make_frame(code, dates):
+        close = np.arange(len(dates)) * 10 + 10000
+        return pd.DataFrame({
+            'date': dates, 'code': code,
+            'open': close, 'high': close + 50, 'low': close - 50, 'close': close,
+            'volume': 1000, 'amount': 1000 * close
+        })
+
+    class CountingMerger:
+        """종목별 기간 조회 호출 기록"""
+        def __init__(self):
+            self.calls = []
+
+        def get_range(self, code, start, end, lane=None):
+            self.calls.append(code)
+            return make_frame(code, pd.bdate_range(str(start), str(end)))
+
+    history = pd.bdate_range(end='2025-11-20', periods=30)
+    stocks = ['%06d' % i for i in range(1, 251)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        loader = MarketDataLoader(tmp)
+        frames = {c: make_frame(c, history) for c in stocks + ['U001']}
+        frames['000250'] = make_frame('000250', history[:-2])  # 이틀 공백
+        loader.store.write_frames(frames)
+
+        # 000249 는 거래정지 (MarketEye 응답 없음)
+        bars = {'A' + c: {4: 20100, 5: 20000, 6: 20200, 7: 19900, 10: 5000, 11: 100000000}
+                for c in stocks if c != '000249'}
+        clock = FakeClock()
+        cybos = FakeCpCybos(clock)
+        eye = FakeMarketEye(bars, cybos)
+        scheduler = CreonRequestScheduler(cybos, clock=clock.time, sleep=clock.sleep)
+        client = MarketEyeClient(dispatch=lambda progid: eye, scheduler=scheduler)
+
+        merger = CountingMerger()
+        updater = BulkDailyUpdater(loader, merger, client=client)
+        result = updater.run(stocks + ['U001'], trade_date='2025-11-21')
+
+        assert eye.requests == 2  # 249종목 → 200 + 49
+        assert result['bulk'] == 248
+        assert sorted(merger.calls) == ['000249', '000250', 'U001']
+
+        snap = loader.snapshot()
+        assert snap.last_date('000001') == 20251121
+        assert snap.frame('000001')['close'].iloc[-1] == 20100
+        assert snap.count('000250') == 31  # 공백 2일 + 당일 보충
+        print(f"✓ MarketEye {eye.requests}회로 {result['bulk']}종목 갱신")
+        print(f"✓ 종목별 보충: {sorted(merger.calls)}")
+
+        # 재실행 시 이미 최신이면 요청 없음
+        result = updater.run(stocks + ['U001'], trade_date='2025-11-21')
+        assert result['updated'] == 0 and eye.requests == 2
+        print("✓ 최신 종목 재요청 없음")
+
+    return True
+
+
+def test_history_sync():
+    """거래일 달력 기반 이력 동기화 테스트"""
+    print("\n[테스트 11] 이력 동기화")
+    print("=" * 60)
+
+    import tempfile
+    from piona_data.market_data import MarketDataLoader
+    from piona_data.history_sync import HistorySync
+    from piona_data.trading_calendar import KRXCalendar
+
+    calendar = KRXCalendar()
+    # 개천절(10/3), 추석 연휴(10/6~8), 한글날(10/9) 휴장
+    expected = [20251001, 20251002, 20251010, 20251013, 20251014]
+    assert list(calendar.missing_days(20250930, 20251014)) == expected
+    assert calendar.previous_trading_day(20251010) == 20251002
+    print(f"✓ 휴장일 반영: {expected}")
+
+    # 2027 설 연휴(2/6~8) + 대체공휴일(2/9), 표가 없는 해는 경고
+    import warnings
+    assert list(calendar.missing_days(20270205, 20270211)) == [20270210, 20270211]
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        calendar.trading_days(20271228, 20271231)
+        assert not caught
+        assert len(calendar.trading_days(20271230, 20280104)) == 3
+        calendar.trading_days(20280103, 20280105)
+    assert [w.category for w in caught] == [RuntimeWarning]
+    print("✓ 2027년 휴장일 반영, 표 밖 연도 경고 (연 1회)")
+
+    def make_frame(code, dates):
+        close = np.arange(len(dates)) * 10 + 10000
+        return pd.DataFrame({
+            'date': dates, 'code': code,
+            'open': close, 'high': close + 50, 'low': close - 50, 'close': close,
+            'volume': 1000, 'amount': 1000 * close
+        })
+
+    class RangeFetcher:
+        """기간 조회 (주말만 제외, 000660 은 10/13 누락)"""
+        def __init__(self):
+            self.calls = []
+
+        def get_range(self, code, start, end, lane=None):
+            self.calls.append((code, start, end))
+            df = make_frame(code, pd.bdate_range(str(start), str(end)))
+            if code == '000660':
+                df = df[df['date'] != pd.Timestamp('2025-10-13')]
+            return df
+
+    with tempfile.TemporaryDirectory() as tmp:
+        loader = MarketDataLoader(tmp)
+        history = [d for d in pd.bdate_range('2025-08-01', '2025-09-30')
+                   if int(d.strftime('%Y%m%d')) not in calendar.holidays]
+        loader.store.write_frames({c: make_frame(c, history) for c in ['005930', '000660']})
+
+        fetcher = RangeFetcher()
+        sync = HistorySync(loader, fetcher, calendar)
+        frames, report = sync.sync(['005930', '000660', '035420'], until=20251014)
+
+        # 종목당 1회 요청, 빠진 구간만
+        assert ('005930', 20251001, 20251014) in fetcher.calls
+        assert len(fetcher.calls) == 3
+        assert report['005930']['complete'] and report['005930']['received'] == 5
+        assert report['000660']['missing'] == [20251013]
+        assert report['035420']['expected'] == 100  # 신규 종목은 100거래일
+
+        snap = loader.snapshot()
+        assert snap.last_date('005930') == 20251014
+        assert snap.count('005930') == len(history) + 5
+        complete, incomplete = sync.summary(report)
+        print(f"✓ 완결 {complete}종목, 미완결 {incomplete}")
+
+    return True
+
+
+def test_backfill():
+    """페이지 단위 백필 + 체크포인트 재개 테스트"""
+    print("\n[테스트 12] 장기 이력 백필")
+    print("=" * 60)
+
+    import tempfile
+    from piona_data.fake_creon import FakeClock, FakeCpCybos, FakeStockChart, FakeCpSvr7254
+    from piona_data.request_scheduler import CreonRequestScheduler
+    from piona_data.market_data import MarketDataLoader
+    from piona_data.backfill import Backfill
+
+    dates = pd.bdate_range('2023-01-02', periods=700)
+    date_int = (dates.year * 10000 + dates.month * 100 + dates.day).to_numpy()
+    close = np.arange(700) + 10000
+    codes = ['005930', '000660']
+    chart = {'A' + c: pd.DataFrame({
+        'date': date_int, 'open': close, 'high': close + 5, 'low': close - 5, 'close': close,
+        'volume': 1000, 'amount': close * 1000
+    }) for c in codes}
+    investor = {'A' + c: pd.DataFrame({
+        'date': date_int, 'inst_net_buy': np.arange(700), 'frgn_net_buy': -np.arange(700)
+    }) for c in codes}
+
+    clock = FakeClock()
+    cybos = FakeCpCybos(clock)
+    stock_chart = FakeStockChart(chart, page_size=300, cybos=cybos)
+    cpsvr = FakeCpSvr7254(investor, page_size=200, cybos=cybos)
+    objects = {'CpSysDib.StockChart': stock_chart, 'CpSysDib.CpSvr7254': cpsvr}
+    scheduler = CreonRequestScheduler(cybos, clock=clock.time, sleep=clock.sleep)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        loader = MarketDataLoader(tmp)
+        start, end = int(date_int[0]), int(date_int[-1])
+
+        # 두 번째 종목 첫 페이지 뒤 통신 장애
+        stock_chart.fail_after = 4
+        try:
+            Backfill(loader, dispatch=objects.get, scheduler=scheduler).run(codes, start, end)
+            assert False, "장애가 발생해야 함"
+        except RuntimeError:
+            pass
+        print("✓ 중단 (체크포인트 저장)")
+
+        # 재실행: 남은 400일만 이어서 조회 (300 + 100)
+        stock_chart.fail_after = None
+        before = stock_chart.requests
+        merged = Backfill(loader, dispatch=objects.get, scheduler=scheduler).run(codes, start, end)
+        assert stock_chart.requests - before == 2
+        assert merged == {'005930': 700, '000660': 700}
+
+        df = loader.load('000660')
+        assert len(df) == 700 and df['close'].iloc[-1] == close[-1]
+        assert df['inst_net_buy'].iloc[-1] == 699
+        print(f"✓ 재개 후 완료: {merged}")
+
+        # 완료 후 재실행 시 요청 없음
+        before = stock_chart.requests
+        Backfill(loader, dispatch=objects.get, scheduler=scheduler).run(codes, start, end)
+        assert stock_chart.requests == before
+        print("✓ 완료 종목 재요청 없음")
+
+    return True
+
+
+def test_com_decoder():
+    """COM 응답 컬럼 디코더 테스트 (가짜 StockChart)"""
+    print("\n[테스트 13] COM 응답 컬럼 디코더")
+    print("=" * 60)
+
+    from piona_data.fake_creon import FakeStockChart
+    from piona_data.com_decoder import (
+        CHART_FIELDS, CHART_COLUMNS, decode_columns, concat_pages, chart_frame
+    )
+
+    dates = pd.bdate_range('2024-01-02', periods=500)
+    close = np.random.randint(50000, 60000, 500)
+    history = {'A005930': pd.DataFrame({
+        'date': (dates.year * 10000 + dates.month * 100 + dates.day).to_numpy(),
+        'open': close - 100, 'high': close + 300, 'low': close - 300, 'close': close,
+        'volume': np.random.randint(1000000, 2000000, 500),
+        'amount': np.random.randint(10 ** 10, 10 ** 11, 500)
+    })}
+    chart = FakeStockChart(history, page_size=200)
+    chart.SetInputValue(0, 'A005930')
+    chart.SetInputValue(1, ord('2'))
+    chart.SetInputValue(4, 500)
+    chart.SetInputValue(5, CHART_FIELDS)
+
+    pages = []
+    while True:
+        chart.BlockRequest()
+        pages.append(decode_columns(chart, chart.GetHeaderValue(3), CHART_COLUMNS))
+        if not chart.Continue:
+            break
+    df = chart_frame('005930', concat_pages(pages))
+    assert len(pages) == 3
+
+    # 기존 행 단위 디코딩 결과와 동일
+    expected = history['A005930'].copy()
+    expected['date'] = pd.to_datetime(expected['date'].astype(str), format='%Y%m%d')
+    expected['range'] = expected['high'] - expected['low']
+    expected['gap'] = (expected['open'] - expected['close'].shift(1)).fillna(0).astype(int)
+    for col in ['date', 'open', 'high', 'low', 'close', 'volume', 'amount', 'range', 'gap']:
+        assert (df[col].to_numpy() == expected[col].to_numpy()).all(), col
+    assert df['close'].dtype == np.int32 and df['date'].is_monotonic_increasing
+    print(f"✓ {len(pages)}페이지 {len(df)}행 디코딩 (날짜 오름차순, range/gap 일치)")
+
+    return True
+
+
+def test_compact_schema():
+    """표준 정수 스키마 테스트 (마스크, 메모리 절감)"""
+    print("\n[테스트 14] 표준 정수 스키마")
+    print("=" * 60)
+
+    import tempfile
+    from piona_data.panel_store import PanelStore
+    from piona_data.schema import legacy_memory_bytes
+
+    n_symbols, n_days = 300, 750
+    dates = pd.bdate_range('2022-01-03', periods=n_days)
+    frames = {}
+    for i in range(n_symbols):
+        close = np.random.randint(1000, 900000, n_days)
+        frgn = pd.Series(np.random.randint(-10 ** 6, 10 ** 6, n_days), dtype=object)
+        frgn[:5] = None  # 투자자 데이터 없는 날
+        frames[f"{i:06d}"] = pd.DataFrame({
+            'date': dates, 'code': f"{i:06d}",
+            'open': close, 'high': close + 100, 'low': close - 100, 'close': close,
+            'volume': np.random.randint(10 ** 5, 10 ** 8, n_days),
+            'amount': np.random.randint(10 ** 9, 10 ** 12, n_days, dtype=np.int64),
+            'frgn_net_buy': frgn, 'inst_net_buy': frgn
+        })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PanelStore(tmp)
+        store.write_frames(frames)
+        snap = store.open()
+
+        df = snap.frame('000007')
+        assert df['close'].dtype == np.int32 and df['volume'].dtype == np.int64
+        assert str(df['code'].dtype) == 'category' and str(df['frgn_net_buy'].dtype) == 'Int32'
+        assert df['frgn_net_buy'].isna().sum() == 5
+        assert list(df['close']) == list(frames['000007']['close'])
+        assert df['amount'].iloc[-1] == frames['000007']['amount'].iloc[-1]
+        print("✓ int32 가격 / int64 거래량 / nullable 순매수 / category 종목코드")
+
+        compact = snap.nbytes()
+        legacy = legacy_memory_bytes(n_symbols, n_days)
+        assert legacy / compact >= 4
+        print(f"✓ 메모리 {legacy / 1e6:.1f}MB → {compact / 1e6:.1f}MB ({legacy / compact:.1f}배 절감)")
+
+    # 지수 가격은 소수 둘째 자리까지 보존 (×100 정수 저장)
+    import json
+    from piona_data.bar_panel import bar_panel
+    from piona_data.schema import to_bar_frame
+
+    closes = [2655.77, 2668.49, 2679.93]
+    index = pd.DataFrame({
+        'date': pd.bdate_range('2025-11-19', periods=3), 'code': 'U001',
+        'open': [2650.01, 2660.10, 2670.55], 'high': [2660.32, 2671.00, 2685.99],
+        'low': [2640.50, 2655.05, 2666.61], 'close': closes,
+        'volume': [450000, 470000, 430000], 'amount': [9 * 10 ** 12] * 3
+    })
+    assert list(to_bar_frame(index)['close']) == closes
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PanelStore(tmp)
+        store.write_frames({'U001': index, '005930': frames['000007'].assign(code='005930')})
+        store.append_day(20251124, {'U001': {'open': 2680.12, 'high': 2690.4, 'low': 2677.0,
+                                             'close': 2688.88, 'volume': 1}})
+        snap = store.open()
+        df = snap.frame('U001')
+        assert list(df['close']) == closes + [2688.88]
+        assert df['volume'].iloc[0] == 450000
+        assert df['range'].iloc[0] == 2660.32 - 2640.50
+        assert df['gap'].iloc[1] == 2660.10 - 2655.77
+        assert snap.frame('005930')['close'].dtype == np.int32
+        panel = bar_panel(snap, ['U001', '005930'], depth=4)
+        assert list(panel.close[:, 0]) == closes + [2688.88] and panel.volume[0, 0] == 450000
+        assert panel.close[-1, 1] == frames['000007']['close'].iloc[-1]
+        print("✓ 지수 소수점 가격 저장/로드 (2655.77 그대로, 종목은 int32 유지)")
+
+        # schema 2 패널 (지수 가격 배율 없이 잘린 정수) → 배율 적용 변환
+        path = store._manifest_path(store.version())
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        col = manifest['codes'].index('U001')
+        for name in ('open', 'high', 'low', 'close'):
+            raw = np.memmap(store._path(manifest['segment'], name), dtype=np.int32, mode='r+',
+                            shape=(len(manifest['dates']), len(manifest['codes'])))
+            raw[:, col] //= 100
+            raw.flush()
+            del raw
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(dict(manifest, schema=2), f)
+        assert store.needs_upgrade() and store.upgrade()
+        assert list(store.open().frame('U001')['close']) == [2655.0, 2668.0, 2679.0, 2688.0]
+        assert list(store.open().frame('005930')['close']) == list(frames['000007']['close'])
+        print("✓ schema 2 패널 → 지수 가격 배율 변환")
+
+    return True
+
+
+def _concurrent_writer(root, n_commits):
+    """별도 프로세스 writer: 거래일 추가와 신규 종목(전체 재작성)을 번갈아 커밋"""
+    from piona_data.panel_store import PanelStore
+
+    store = PanelStore(root)
+    for i in range(n_commits):
+        date = int((pd.Timestamp('2025-01-02') + pd.offsets.BDay(30 + i)).strftime('%Y%m%d'))
+        rows = {code: {'open': date % 10000, 'high': date % 10000, 'low': date % 10000,
+                       'close': date % 10000, 'volume': 1}
+                for code in store.open().codes}
+        store.append_day(date, rows)
+        if i % 5 == 4:
+            store.write_frames({f"9{i:05d}": pd.DataFrame({
+                'date': [pd.Timestamp(str(date))], 'open': [1], 'high': [1], 'low': [1], 'close': [1]
+            })})
+
+
+def test_concurrent_store():
+    """수집기/분석기 동시 실행 테스트 (버전 manifest + 세그먼트)"""
+    print("\n[테스트 15] 동시 읽기/쓰기")
+    print("=" * 60)
+
+    import multiprocessing
+    import tempfile
+    from piona_data.panel_store import PanelStore
+    from piona_data.market_data import MarketDataLoader
+
+    dates = pd.bdate_range('2025-01-02', periods=30)
+    frames = {
+        code: pd.DataFrame({'date': dates, 'open': 1, 'high': 1, 'low': 1,
+                            'close': dates.strftime('%Y%m%d').astype(int) % 10000, 'volume': 1})
+        for code in ['005930', '000660']
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'panel')
+        store = PanelStore(root)
+        store.write_frames(frames)
+        first = store.open()
+
+        writer = multiprocessing.get_context('spawn').Process(target=_concurrent_writer, args=(root, 20))
+        writer.start()
+
+        # 읽는 쪽: 매 스냅샷이 manifest 와 일치하고 종목 간 거래일이 같아야 함
+        reads = 0
+        while writer.is_alive() or reads == 0:
+            snap = store.open()
+            a, b = snap.frame('005930'), snap.frame('000660')
+            assert len(a) == snap.n_days == len(b)
+            assert list(a['close']) == list(pd.to_datetime(a['date']).dt.strftime('%Y%m%d').astype(int) % 10000)
+            reads += 1
+        writer.join()
+        assert writer.exitcode == 0
+        print(f"✓ writer 20커밋 동안 스냅샷 {reads}회 일관 읽기")
+
+        final = store.open()
+        assert final.n_days == 50 and final.n_symbols == 6
+        # 처음 연 스냅샷은 이후 재작성/정리와 무관하게 그대로
+        assert first.n_days == 30 and first.frame('005930')['close'].iloc[-1] == frames['005930']['close'].iloc[-1]
+        print(f"✓ 최신 버전 {final.version}: {final.n_days}일 × {final.n_symbols}종목, 이전 스냅샷 유지")
+
+        # 스캔 중 고정 스냅샷
+        loader = MarketDataLoader(tmp)
+        with loader.pinned():
+            before = len(loader.load('005930'))
+            store.append_day(20260105, {'005930': {'open': 1, 'high': 1, 'low': 1, 'close': 1}})
+            assert len(loader.load('005930')) == before
+        assert len(loader.load('005930')) == before + 1
+        print("✓ 스캔 중 스냅샷 고정")
+
+    return True
+
+
+def test_fake_creon():
+    """가짜 CREON 세션으로 수집기 전체 경로 테스트 (win32com 없이)"""
+    print("\n[테스트 16] 가짜 CREON 세션")
+    print("=" * 60)
+
+    import tempfile
+    from piona_data import creon_com
+    from piona_data.fake_creon import FakeClock, FakeCreon
+    from piona_data.market_data import MarketDataLoader
+    from piona_data.marketeye import MarketEyeClient
+    from piona_data.request_scheduler import get_scheduler, set_scheduler
+
+    clock = FakeClock()
+    session = FakeCreon.synthetic(['U001', '005930', '000660'], 20251121, days=200,
+                                  clock=clock, latency=0.05)
+    creon_com.configure(session=session)
+    set_scheduler(None)
+    try:
+        from data_merger import DataMerger
+        merger = DataMerger()
+        assert merger.ohlcv.connected
+
+        df = merger.get_full_data('005930', 100)
+        assert len(df) == 100 and df['date'].iloc[-1] == pd.Timestamp('2025-11-21')
+        assert df['frgn_net_buy'].notna().all()
+        index = merger.get_range('U001', 20251101, 20251121)
+        assert len(index) == 15 and index['frgn_net_buy'].isna().all()
+        print(f"✓ StockChart/CpSvr7254 응답: {len(df)}일, 지수 {len(index)}일")
+
+        bars = MarketEyeClient().get_bars(['005930', '000660'])
+        assert list(bars['close']) == [df['close'].iloc[-1], session.chart['A000660']['close'].iloc[-1]]
+        print("✓ MarketEye 응답")
+
+        # 한도 60건/15초 + 요청당 0.05초 → 100건이면 한 번 대기
+        for _ in range(96):
+            merger.ohlcv.get_data('000660', 10)
+        assert session.total_requests == 100 and get_scheduler().stats['waits'] == 1
+        assert clock.time() >= 15.0 + 40 * 0.05
+        print(f"✓ 조회 한도/응답 지연: 100건 가상 {clock.time():.1f}초")
+
+        # 기록 데이터 재생: 저장소 스냅샷 → 같은 응답
+        with tempfile.TemporaryDirectory() as tmp:
+            loader = MarketDataLoader(tmp)
+            loader.store.write_frames({'005930': df})
+            replay = FakeCreon.from_snapshot(loader.snapshot())
+            creon_com.configure(session=replay)
+            set_scheduler(None)
+            again = DataMerger().get_full_data('005930', 100)
+            assert list(again['close']) == list(df['close'])
+            assert list(again['inst_net_buy']) == list(df['inst_net_buy'])
+            print("✓ 기록 데이터 재생")
+    finally:
+        set_scheduler(None)
+        creon_com.configure()
+
+    return True
+
+
+def test_pivot_index():
+    """공용 피벗 인덱스 테스트 (패턴/지지저항/피보나치 공유)"""
+    print("\n[테스트 17] 공용 피벗 인덱스")
+    print("=" * 60)
+
+    from engine.pivot_index import PivotIndex, pivot_index
+    from engine.pattern_engine import PatternEngine
+    from engine.support_resistance_engine import SupportResistanceEngine
+    from engine.fibonacci_engine import FibonacciEngine
+
+    n = 300
+    close = (50000 + np.cumsum(np.random.randint(-500, 500, n)) // 100 * 100).astype(np.int32)
+    df = pd.DataFrame({'code': '005930', 'open': close, 'high': close + 200, 'low': close - 200,
+                       'close': close, 'volume': np.random.randint(1000, 5000, n)})
+
+    # 기존 루프와 동일 (동률 포함)
+    high, low = df['high'].tolist(), df['low'].tolist()
+    for w in (5, 10):
+        loop_highs = [(i, high[i]) for i in range(w, n - w) if high[i] == max(high[i - w:i + w + 1])]
+        loop_lows = [(i, low[i]) for i in range(w, n - w) if low[i] == min(low[i - w:i + w + 1])]
+        index = PivotIndex(high, low)
+        assert index.highs(w) == loop_highs and index.lows(w) == loop_lows
+    assert PivotIndex(high[:8], low[:8]).highs(5) == []
+    print("✓ 슬라이딩 창 극값 = 기존 루프 결과")
+
+    # 같은 DataFrame 은 한 번만 계산
+    index = pivot_index(df)
+    PatternEngine().analyze(df)
+    SupportResistanceEngine().analyze(df)
+    FibonacciEngine().analyze(df)
+    assert pivot_index(df) is index and sorted(index._highs) == [5, 10]
+    assert pivot_index(df.copy()) is not index
+    print("✓ 세 엔진이 한 인덱스 공유 (창 5/10 각 1회 계산)")
+
+    return True
+
+
+def test_volume_profile():
+    """벡터화 + 증분 매물대 테스트"""
+    print("\n[테스트 18] 매물대 (Volume Profile)")
+    print("=" * 60)
+
+    from engine.support_resistance_engine import SupportResistanceEngine
+
+    n = 1200
+    close = (50000 + np.cumsum(np.random.randint(-500, 500, n))).astype(np.int32)
+    df = pd.DataFrame({'date': pd.bdate_range('2021-01-04', periods=n), 'code': '005930',
+                       'open': close, 'high': close + 300, 'low': close - 300, 'close': close,
+                       'volume': np.random.randint(1000, 5000, n)})
+    df.loc[0, 'high'] = df['high'].max() + 5000  # 가격 범위 고정
+    df.loc[0, 'low'] = df['low'].min() - 5000
+
+    # 기존 봉 단위 루프와 동일
+    engine = SupportResistanceEngine(price_bins=300)
+    high, low, volume = df['high'].tolist(), df['low'].tolist(), df['volume'].tolist()
+    prices = np.linspace(min(low), max(high), 300)
+    loop = np.zeros(300)
+    for h, l, v in zip(high, low, volume):
+        i = max(0, np.searchsorted(prices, l, side='right') - 1)
+        j = min(299, np.searchsorted(prices, h, side='right') - 1)
+        loop[i:j + 1] += v / max(1, j - i + 1)
+    assert np.allclose(engine._accumulate(prices, high, low, volume), loop)
+    print("✓ 차분 배열 누적합 = 봉 단위 루프")
+
+    # 증분: 하루 추가 / 장중 마지막 봉 변경 → 전체 재계산과 동일
+    def full(frame):
+        return SupportResistanceEngine(price_bins=300)._build_volume_profile(
+            frame['high'].to_numpy(), frame['low'].to_numpy(), None, frame['volume'].to_numpy())
+
+    engine._volume_profile(df.iloc[:-1])
+    assert engine._volume_profile(df) == full(df)
+    live = df.copy()
+    live.loc[n - 1, 'volume'] += 100000
+    assert engine._volume_profile(live) == full(live)
+    assert engine._profiles['005930']['n'] == n
+    print(f"✓ 증분 갱신 = 전체 재계산 ({n}봉, 300구간)")
+
+    # 여러 번 추가 / 장중 갱신을 반복해도 누적 오차 없이 전체 재계산과 비트 단위로 같음
+    engine = SupportResistanceEngine(price_bins=300)
+    start = n - 20
+    engine._volume_profile(df.iloc[:start])
+    for end in range(start + 1, n + 1):
+        frame = df.iloc[:end].copy()
+        engine._volume_profile(frame)
+        frame.loc[end - 1, 'volume'] += 777
+        engine._volume_profile(frame)
+        state = engine._profiles['005930']
+        assert np.array_equal(state['profile'], engine._accumulate(
+            state['prices'], frame['high'], frame['low'], frame['volume']))
+    print("✓ 20회 추가 + 장중 갱신 후 전체 재계산과 동일 (오차 0)")
+
+    # 공유 엔진을 여러 스레드가 동시에 호출
+    from concurrent.futures import ThreadPoolExecutor
+    frames = {}
+    for k in range(8):
+        code = '%06d' % k
+        frames[code] = df.assign(code=code, volume=df['volume'] + k)
+    shared = SupportResistanceEngine(price_bins=300)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for _ in range(3):
+            list(pool.map(lambda c: shared._volume_profile(frames[c].iloc[:-1]), frames))
+            results = dict(zip(frames, pool.map(lambda c: shared._volume_profile(frames[c]), frames)))
+    assert all(results[c] == full(frames[c]) for c in frames)
+    assert all(shared._profiles[c]['n'] == n for c in frames)
+    print("✓ 8스레드 동시 갱신 = 종목별 전체 재계산")
+
+    return True
+
+
+def test_ichimoku_series():
+    """일목균형표 전 구간 시계열 테스트 (종목 / 패널)"""
+    print("\n[테스트 19] 일목균형표 시계열")
+    print("=" * 60)
+
+    from engine.inflection_engine import InflectionEngine
+    from engine.ichimoku import ichimoku_series, ichimoku_at
+
+    n = 200
+    close = (50000 + np.cumsum(np.random.randint(-500, 500, n))).astype(np.int32)
+    df = pd.DataFrame({'date': pd.bdate_range('2025-01-02', periods=n), 'code': '005930',
+                       'open': close, 'high': close + 300, 'low': close - 300, 'close': close,
+                       'volume': 1000})
+    engine = InflectionEngine()
+
+    # 각 행 = 그 날까지의 데이터로 계산한 단일 시점 값
+    frame = engine.ichimoku_series(df)
+    series = ichimoku_series(df['high'], df['low'], df['close'])
+    for k in (1, 9, 26, 52, 120, n):
+        head = df.iloc[:k]
+        assert ichimoku_at(series, k - 1) == engine._calc_ichimoku(
+            head['high'].tolist(), head['low'].tolist(), head['close'].tolist())
+    assert frame['conversion'].iloc[:8].isna().all() and frame['lead2'].iloc[51] > 0
+    assert engine.analyze(df)['ichimoku'] == ichimoku_at(series)
+    print(f"✓ {n}일 시계열 = 거래일별 단일 계산 (양운 {int(frame['cloud_red'].sum())}일)")
+
+    # 패널 (거래일 × 종목) 한 번에
+    panel = np.column_stack([close, close[::-1], close // 2]).astype(float)
+    result = ichimoku_series(panel + 300, panel - 300, panel)
+    assert result['base'].shape == (n, 3)
+    single = ichimoku_series(panel[:, 1] + 300, panel[:, 1] - 300, panel[:, 1])
+    assert np.array_equal(result['lead1'][:, 1], single['lead1'], equal_nan=True)
+    print("✓ 패널 계산 = 종목별 계산")
+
+    return True
+
+
+def test_indicator_state():
+    """스트리밍 지표 상태 테스트 (봉 단위 갱신 = 전체 재계산, 저장/복원, 장중 임시 봉)"""
+    print("\n[테스트 20] 스트리밍 지표 상태")
+    print("=" * 60)
+
+    import json
+    from piona_ml import MacroEngine, PsychologyEngine, VolatilityEngine, IndicatorState
+    from engine.inflection_engine import InflectionEngine
+
+    n = 320
+    close = (50000 + np.cumsum(np.random.randint(-800, 800, n))).astype(np.int32)
+    df = pd.DataFrame({'date': pd.bdate_range('2024-01-02', periods=n), 'code': '005930',
+                       'open': close, 'high': close + np.random.randint(0, 500, n),
+                       'low': close - np.random.randint(0, 500, n), 'close': close,
+                       'volume': 1000})
+
+    # 신호/점수는 정확히 같아야 함 (지표 값만 마지막 자리 오차 허용)
+    def close_enough(a, b, exact=False):
+        if isinstance(a, dict):
+            return all(close_enough(v, b[k], k in ('signal', 'score')) for k, v in a.items() if k != 'series')
+        if isinstance(a, list):
+            return len(a) == len(b) and all(close_enough(x, y, exact) for x, y in zip(a, b))
+        if exact or a is None or isinstance(a, (str, bool)):
+            return a == b
+        return bool(np.isclose(a, b, rtol=1e-9, equal_nan=True))
+
+    engines = [MacroEngine(), PsychologyEngine(), VolatilityEngine()]
+    state = IndicatorState.from_frame(df.iloc[:10], code='005930')
+    for i in range(10, n):
+        state.update(df.iloc[i])
+        if i in (13, 19, 59, 120, 299, n - 1):
+            head = df.iloc[:i + 1]
+            for engine in engines:
+                assert close_enough(engine.analyze(head), engine.analyze_state(state)), (engine.name, i)
+            assert state.ichimoku() == InflectionEngine()._calc_ichimoku(
+                head['high'].tolist(), head['low'].tolist(), head['close'].tolist())
+    print(f"✓ {n}봉 순차 갱신 = 전체 재계산 (거시/심리/변동성/일목)")
+
+    # 저장 → 복원, 장중 임시 봉은 다음 갱신에서 되돌림
+    restored = IndicatorState.restore(json.loads(json.dumps(state.snapshot())))
+    bar = {'high': 60000, 'low': 45000, 'close': 58000}
+    state.update(dict(bar, close=46000), final=False)
+    state.update(bar, final=False)
+    assert state.snapshot() == restored.snapshot()
+    state.update(bar)
+    restored.update(bar)
+    assert state.snapshot() == restored.snapshot()
+    print("✓ 스냅샷 복원 / 장중 임시 봉 되돌림")
+
+    return True
+
+
+def test_pattern_scanner():
+    """패턴 전 구간 스캐너 테스트 (거래일별 run_all_patterns 와 동일)"""
+    print("\n[테스트 21] 패턴 전 구간 스캐너")
+    print("=" * 60)
+
+    from engine.pattern_engine import PatternEngine
+    from engine.pattern_scanner import PATTERN_NAMES
+
+    n = 200
+    close = 20000 + np.cumsum(np.random.randint(-300, 300, n))
+    open_p = close + np.random.randint(-200, 200, n)
+    df = pd.DataFrame({'date': pd.bdate_range('2025-01-02', periods=n), 'code': '005930',
+                       'open': open_p, 'close': close,
+                       'high': np.maximum(open_p, close) + np.random.randint(0, 300, n),
+                       'low': np.minimum(open_p, close) - np.random.randint(0, 300, n),
+                       'volume': np.random.randint(1000, 5000, n) * np.where(np.arange(n) % 17, 1, 5)})
+    engine = PatternEngine()
+
+    events = engine.scan_history(df)
+    assert list(events.columns) == ['date'] + list(PATTERN_NAMES) and len(events) == n
+    matrix = events[list(PATTERN_NAMES)].to_numpy()
+    for i in range(n):
+        detected = {p['pattern'] for p in engine.run_all_patterns(df.iloc[:i + 1])['detected_patterns']}
+        assert detected == {PATTERN_NAMES[k] for k in np.flatnonzero(matrix[i])}, i
+    print(f"✓ {n}일 이벤트 행렬 = 거래일별 run_all_patterns (이벤트 {int(matrix.sum())}건)")
+
+    return True
+
+
+def test_panel_engines():
+    """패널 모드 엔진 테스트 (analyze_panel = 종목별 analyze)"""
+    print("\n[테스트 22] 패널 모드 엔진")
+    print("=" * 60)
+
+    import tempfile
+    from piona_data.market_data import MarketDataLoader
+    from engine.inflection_engine import InflectionEngine
+    from engine.pattern_engine import PatternEngine
+    from engine.support_resistance_engine import SupportResistanceEngine
+    from engine.fibonacci_engine import FibonacciEngine
+    from piona_ml import (MacroEngine, PsychologyEngine, SupplyEngine, VolatilityEngine,
+                          DartEngine, IndexEngine)
+
+    # 신호/점수/행동은 정확히 같아야 함 (지표 값만 마지막 자리 오차 허용)
+    exact_keys = {'signal', 'score', 'action'}
+
+    def close_enough(a, b, exact=False):
+        if isinstance(a, dict):
+            keys = set(a) - {'series', 'timestamp'}
+            return keys == set(b) - {'series', 'timestamp'} and all(
+                close_enough(a[k], b[k], k in exact_keys) for k in keys)
+        if isinstance(a, list):
+            return len(a) == len(b) and all(close_enough(x, y, exact) for x, y in zip(a, b))
+        if exact or a is None or isinstance(a, (str, bool, np.bool_)):
+            return a == b
+        return bool(np.isclose(float(a), float(b), rtol=1e-9, equal_nan=True))
+
+    # 이력 길이가 다른 종목 + 거래정지 구간 + 순매수 결측 + 최근 봉 횡보(%K = %D)
+    days = 360
+    dates = pd.bdate_range(end='2025-11-21', periods=days)
+    lengths = {'005930': 360, '000660': 310, '035720': 140, '247540': 99, '068270': 70, 'U001': 360}
+    frames = {}
+    for code, n in lengths.items():
+        close = 30000 + np.cumsum(np.random.randint(-400, 400, n))
+        open_p = close + np.random.randint(-200, 200, n)
+        frames[code] = pd.DataFrame({
+            'date': dates[days - n:], 'code': code, 'open': open_p, 'close': close,
+            'high': np.maximum(open_p, close) + np.random.randint(0, 300, n),
+            'low': np.minimum(open_p, close) - np.random.randint(0, 300, n),
+            'volume': np.random.randint(1000, 9000, n), 'amount': np.random.randint(10**6, 10**7, n),
+            'frgn_net_buy': np.where(np.arange(n) == n - 3, np.nan, np.random.randint(-500, 500, n)),
+            'inst_net_buy': np.random.randint(-500, 500, n)
+        })
+    frames['000660'] = frames['000660'].drop(frames['000660'].index[-10:-5])
+
+    # 최근 6봉 횡보: %K 가 일정해 %D 와 수학적으로 같음 (평균 연산 순서가 다르면 데드크로스가 뒤집히던 종목)
+    rng = np.random.RandomState(128)
+    n = 200
+    close = 30000 + np.cumsum(rng.randint(-400, 400, n))
+    open_p = close + rng.randint(-200, 200, n)
+    flat = pd.DataFrame({
+        'date': dates[days - n:], 'code': '000150', 'open': open_p, 'close': close,
+        'high': np.maximum(open_p, close) + rng.randint(0, 300, n),
+        'low': np.minimum(open_p, close) - rng.randint(0, 300, n),
+        'volume': rng.randint(1000, 9000, n), 'amount': rng.randint(10**6, 10**7, n),
+        'frgn_net_buy': rng.randint(-500, 500, n), 'inst_net_buy': rng.randint(-500, 500, n)
+    })
+    for field in ('open', 'high', 'low', 'close'):
+        flat.loc[flat.index[-6:], field] = flat[field].iloc[-7]
+    frames['000150'] = flat
+    lengths['000150'] = n
+
+    with tempfile.TemporaryDirectory() as tmp:
+        loader = MarketDataLoader(tmp)
+        loader.store.write_frames(frames)
+        codes = [c for c in lengths if c != 'U001']
+        panel = loader.load_panel(codes)
+        assert list(panel.counts) == [loader.snapshot().count(c) for c in codes]
+
+        index_engine = IndexEngine()
+        index_engine.loader = loader
+        engines = [InflectionEngine(), PatternEngine(), SupportResistanceEngine(), FibonacciEngine(),
+                   MacroEngine(), PsychologyEngine(), SupplyEngine(), VolatilityEngine()]
+        for engine in engines:
+            for code, result in zip(codes, engine.analyze_panel(panel)):
+                assert close_enough(engine.analyze(loader.load(code)), result), (type(engine).__name__, code)
+        for code, result in zip(codes, index_engine.analyze_panel(panel)):
+            assert close_enough(index_engine.analyze(code, loader.load(code)), result), code
+        assert DartEngine().analyze_panel(panel) == [DartEngine().analyze(c) for c in codes]
+        print(f"✓ 10개 엔진 analyze_panel = 종목별 analyze ({len(codes)}종목, 깊이 {panel.depth})")
+
+    return True
+
+
+def test_parallel_scan():
+    """병렬 스캔 테스트 (공유 메모리 패널 + 프로세스 풀 = 순차 결과)"""
+    print("\n[테스트 23] 병렬 스캔")
+    print("=" * 60)
+
+    import tempfile
+    from piona_main import PIONASystem
+
+    def same(a, b):
+        if isinstance(a, dict):
+            keys = set(a) - {'df', 'timestamp'}
+            return keys == set(b) - {'df', 'timestamp'} and all(same(a[k], b[k]) for k in keys)
+        if isinstance(a, (list, tuple)):
+            return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+        if isinstance(a, float) and np.isnan(a):
+            return np.isnan(b)
+        if isinstance(a, (pd.DataFrame, pd.Series)):
+            return a.equals(b)
+        return a == b
+
+    days = 320
+    dates = pd.bdate_range(end='2025-11-21', periods=days)
+    codes = [f"{k:06d}" for k in range(100, 111)]
+    frames = {}
+    for i, code in enumerate(codes + ['U001', 'U201']):
+        n = days - 20 * (i % 5)
+        close = 30000 + np.cumsum(np.random.randint(-400, 420, n))
+        open_p = close + np.random.randint(-200, 200, n)
+        frames[code] = pd.DataFrame({
+            'date': dates[days - n:], 'code': code, 'open': open_p, 'close': close,
+            'high': np.maximum(open_p, close) + np.random.randint(0, 300, n),
+            'low': np.minimum(open_p, close) - np.random.randint(0, 300, n),
+            'volume': np.random.randint(1000, 9000, n), 'amount': np.random.randint(10**9, 10**10, n),
+            'frgn_net_buy': np.random.randint(-500, 500, n), 'inst_net_buy': np.random.randint(-500, 500, n)
+        })
+    frames[codes[0]] = frames[codes[0]].iloc[-40:]  # 데이터 부족 종목
+
+    with tempfile.TemporaryDirectory() as tmp:
+        piona = PIONASystem(mode='simulation', data_path=tmp, use_cache=False)
+        piona.loader.store.write_frames(frames)
+
+        panel = piona.loader.load_panel(codes[1:])
+        serial = piona.analyze_panel(panel)
+        parallel = piona.analyze_parallel(panel, workers=2)
+        assert same(serial, parallel)
+        assert all(a['df'].equals(panel.frame(a['code'])) for a in parallel)
+        print(f"✓ 병렬 분석 = 순차 분석 ({len(parallel)}종목, 작업자 2)")
+
+        serial = piona.scan_universe()
+        parallel = piona.scan_universe(workers=2)
+        assert [c['code'] for c in serial] == [c['code'] for c in parallel]
+        assert same(serial, parallel)
+        print(f"✓ scan_universe(workers=2) = 순차 스캔 (매수 후보 {len(parallel)}개)")
+
+    return True
+
+
+def test_analysis_cache():
+    """엔진 결과 캐시 테스트 (메모리 LRU + 디스크, 봉 추가 시 무효화)"""
+    print("\n[테스트 24] 엔진 결과 캐시")
+    print("=" * 60)
+
+    import os
+    import pickle
+    import tempfile
+    from piona_main import PIONASystem
+    from piona_data.analysis_cache import AnalysisCache
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 메모리는 바이트 상한 LRU, 디스크는 용량 초과 시 오래 안 쓴 파일부터 삭제
+        blobs = {f"k{i}": {'values': list(range(40)), 'i': i} for i in range(6)}
+        size = len(pickle.dumps(blobs['k0'], protocol=pickle.HIGHEST_PROTOCOL))
+        cache = AnalysisCache(os.path.join(tmp, 'c'), memory_bytes=3 * size, disk_bytes=4 * size)
+        for key, value in blobs.items():
+            cache.put(key, value)
+        assert list(cache._memory) == ['k3', 'k4', 'k5']
+        assert len(cache._scan()) <= 4
+        assert cache.get('k5') == blobs['k5']
+        got = cache.get('k5')
+        got['i'] = -1
+        assert cache.get('k5')['i'] == 5
+        print(f"✓ 메모리 {len(cache._memory)}개 / 디스크 {len(cache._scan())}개 (상한 정리)")
+
+    days = 320
+    dates = pd.bdate_range(end='2025-11-20', periods=days)
+    codes = ['005930', '000660', '035720', 'U001', 'U201']
+    frames = {}
+    for code in codes:
+        close = 30000 + np.cumsum(np.random.randint(-400, 420, days))
+        frames[code] = pd.DataFrame({
+            'date': dates, 'code': code, 'open': close, 'close': close,
+            'high': close + 200, 'low': close - 200,
+            'volume': np.random.randint(1000, 9000, days), 'amount': np.random.randint(10**6, 10**7, days),
+            'frgn_net_buy': np.random.randint(-500, 500, days), 'inst_net_buy': np.random.randint(-500, 500, days)
+        })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        piona = PIONASystem(mode='simulation', data_path=tmp)
+        piona.loader.store.write_frames(frames)
+        stocks = codes[:3]
+        engines = 9  # 공시 엔진은 캐시 제외
+
+        first = piona.analyze_stock(stocks[0])
+        assert piona.cache.stats['misses'] == engines
+        results = piona.analyze_panel(piona.loader.load_panel(stocks))
+        assert piona.cache.stats['memory_hits'] == engines
+        assert results[0]['final_decision'] == first['final_decision']
+        assert piona.cache.stats['misses'] == engines * 3
+        print(f"✓ 보유 종목 분석 결과를 스캔에서 재사용 (메모리 적중 {piona.cache.stats['memory_hits']})")
+
+        # 새 프로세스 = 디스크 적중, 결과 동일
+        again = PIONASystem(mode='simulation', data_path=tmp)
+        cached = again.analyze_panel(again.loader.load_panel(stocks))
+        assert again.cache.stats == {'memory_hits': 0, 'disk_hits': engines * 3, 'misses': 0}
+        assert [r['final_decision'] for r in cached] == [r['final_decision'] for r in results]
+        print(f"✓ 재실행 시 디스크 적중 {again.cache.stats['disk_hits']}, 결과 동일")
+
+        # 패널 결과는 종목 경로(analyze_stock)에 내주지 않음 — 종목 경로는 자기 결과만 사용
+        single = PIONASystem(mode='simulation', data_path=tmp, analysis_only=True)
+        single.analyze_stock(stocks[1])
+        assert single.cache.stats == {'memory_hits': 0, 'disk_hits': 0, 'misses': engines}
+        single.analyze_stock(stocks[1])
+        assert single.cache.stats['memory_hits'] == engines
+        print("✓ 패널 스캔 결과는 종목 분석 캐시와 분리")
+
+        # 한 종목에 봉 추가 → 그 종목만 다시 계산 / 지수 봉 추가 → 지수 엔진만 다시 계산
+        bar = frames[stocks[1]].iloc[[-1]].assign(date=pd.Timestamp('2025-11-21'), close=31000)
+        again.loader.store.write_frames({stocks[1]: bar})
+        again.analyze_panel(again.loader.load_panel(stocks))
+        assert again.cache.stats['misses'] == engines
+        index_bar = frames['U001'].iloc[[-1]].assign(date=pd.Timestamp('2025-11-21'))
+        again.loader.store.write_frames({'U001': index_bar})
+        again.analyze_panel(again.loader.load_panel(stocks))
+        assert again.cache.stats['misses'] == engines + 3
+        print("✓ 봉 추가 시 해당 종목(지수 봉은 지수 엔진)만 재계산")
+
+    # 엔진 모듈이 아닌 공용 헬퍼(engine/ichimoku.py 등) 소스가 바뀌어도 키가 바뀜
+    import shutil
+    from piona_data import analysis_cache
+    with tempfile.TemporaryDirectory() as tmp:
+        for package in analysis_cache.SOURCE_PACKAGES:
+            shutil.copytree(os.path.join(analysis_cache.SOURCE_ROOT, package), os.path.join(tmp, package))
+        before = analysis_cache.source_hash(tmp)
+        assert before == analysis_cache.source_hash()
+        with open(os.path.join(tmp, 'engine', 'ichimoku.py'), 'ab') as f:
+            f.write(b'\n# changed\n')
+        after = analysis_cache.source_hash(tmp)
+        assert after != before
+
+    engine = piona.psychology_engine
+    key = AnalysisCache.key(engine, '005930', 'fp')
+    saved, analysis_cache._PACKAGE_HASH = analysis_cache._PACKAGE_HASH, after
+    try:
+        assert AnalysisCache.key(engine, '005930', 'fp') != key
+    finally:
+        analysis_cache._PACKAGE_HASH = saved
+    assert AnalysisCache.key(engine, '005930', 'fp') == key
+    print("✓ 공용 헬퍼 소스 변경 → 캐시 키 변경")
+
+    return True
+
+
+def test_universe_screen():
+    """1단계 유니버스 스크린 테스트 (벡터 규칙 = 엔진 판정, 통과 종목 결과 동일, 기본은 꺼짐)"""
+    print("\n[테스트 25] 1단계 유니버스 스크린")
+    print("=" * 60)
+
+    import tempfile
+    from piona_main import PIONASystem
+    from piona_ml import MacroEngine
+    from engine.inflection_engine import InflectionEngine
+    from trading_system.universe_screen import UniverseScreen, LIQUIDITY_PERIOD
+
+    min_amount = 10 ** 9
+
+    days = 360
+    dates = pd.bdate_range(end='2025-11-21', periods=days)
+    codes = [f"{k:06d}" for k in range(200, 224)]
+    frames = {}
+    for i, code in enumerate(codes + ['U001', 'U201']):
+        n = (360, 250, 120, 70)[i % 4]
+        drift = (-60, -20, 0, 25, 60, -90)[i % 6]
+        close = 40000 + np.cumsum(np.random.randint(-300, 300, n) + drift)
+        open_p = close + np.random.randint(-200, 200, n)
+        amount = 10 ** 9 * (3 if i % 5 else 0.5)
+        frames[code] = pd.DataFrame({
+            'date': dates[days - n:], 'code': code, 'open': open_p, 'close': close,
+            'high': np.maximum(open_p, close) + np.random.randint(0, 300, n),
+            'low': np.minimum(open_p, close) - np.random.randint(0, 300, n),
+            'volume': np.random.randint(1000, 9000, n), 'amount': (amount * np.random.uniform(0.8, 1.2, n)).astype(int),
+            'frgn_net_buy': np.random.randint(-500, 500, n), 'inst_net_buy': np.random.randint(-500, 500, n)
+        })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        piona = PIONASystem(mode='simulation', data_path=tmp, use_cache=False)
+        piona.loader.store.write_frames(frames)
+        panel = piona.loader.load_panel(codes)
+
+        # 규칙을 하나씩 적용해 엔진 단독 판정과 비교
+        macro, inflection = MacroEngine(), InflectionEngine()
+        expected = {
+            'illiquid': lambda df: df['amount'].tail(LIQUIDITY_PERIOD).mean() < min_amount,
+            'perfect_downward': lambda df: macro.analyze(df)['trend'] == 'strong_downtrend',
+            'absolute_no_buy': lambda df: inflection.analyze(df).get('final_signal') == 'ABSOLUTE_NO_BUY'
+        }
+        for rule, check in expected.items():
+            report = UniverseScreen(rules=(rule,), min_amount=min_amount).screen(panel)
+            hits = sorted(report['reasons'])
+            assert hits == sorted(c for c in codes if check(piona.loader.load(c))), rule
+            print(f"✓ {rule}: {len(hits)}개 = 엔진 판정")
+
+        # 거래대금 하한은 지정했을 때만 적용
+        assert 'illiquid' not in piona.universe_screen.screen(panel)['pruned']
+        screen = UniverseScreen(min_amount=min_amount)
+        report = screen.screen(panel)
+        assert sum(report['pruned'].values()) + len(report['survivors']) == len(codes)
+
+        # 기본 스캔은 스크린 없이 전 종목 분석 (스크린은 정책 거부권이라 선택 사항)
+        full = piona.scan_universe(codes)
+        assert piona.last_screen is None
+
+        # 통과 종목의 매수 후보/점수는 스크린 없이 전체 분석한 결과와 같다
+        screened = piona.scan_universe(codes, screen=screen)
+        assert piona.last_screen['pruned'] == report['pruned']
+        survivors = set(report['survivors'])
+        assert [(c['code'], c['score']) for c in screened] == \
+            [(c['code'], c['score']) for c in full if c['code'] in survivors]
+        print(f"✓ {len(codes)}개 → {len(survivors)}개 통과 {report['pruned']}, 매수 후보 {len(screened)}/{len(full)}")
+
+    return True
+
+
+def test_score_bounds():
+    """총점 상한 생략 테스트 (생략 종목은 매수 불가, 매수 후보는 전체 분석과 동일)"""
+    print("\n[테스트 26] 총점 상한 생략")
+    print("=" * 60)
+
+    import tempfile
+    from piona_main import PIONASystem
+    from trading_system.score_calculator import BUY_THRESHOLD
+
+    days = 360
+    dates = pd.bdate_range(end='2025-11-21', periods=days)
+    codes = [f"{k:06d}" for k in range(300, 324)]
+    frames = {}
+    for i, code in enumerate(codes + ['U001', 'U201']):
+        drift = -150 if i % 2 == 0 else (-30, 0, 30, 80, 120)[i % 5]
+        close = 60000 + np.cumsum(np.random.randint(-300, 300, days) + drift)
+        open_p = close + np.random.randint(-200, 200, days)
+        flow = (-900, 100) if i % 2 == 0 else (-500, 500)  # 하락 종목은 외국인/기관 순매도
+        frames[code] = pd.DataFrame({
+            'date': dates, 'code': code, 'open': open_p, 'close': close,
+            'high': np.maximum(open_p, close) + np.random.randint(0, 300, days),
+            'low': np.minimum(open_p, close) - np.random.randint(0, 300, days),
+            'volume': np.random.randint(1000, 9000, days), 'amount': np.random.randint(10 ** 9, 10 ** 10, days),
+            'frgn_net_buy': np.random.randint(*flow, days), 'inst_net_buy': np.random.randint(*flow, days)
+        })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        piona = PIONASystem(mode='simulation', data_path=tmp, use_cache=False)
+        piona.loader.store.write_frames(frames)
+
+        # 손실 이력이 많은 고위험 종목 (절반) → AI 점수가 낮아 상한 생략이 일어나도록
+        ai = piona.ai_engine
+        ai.trading_history = [{'code': c, 'profit_pct': -5.0} for c in codes[::2] for _ in range(3)]
+        ai.stock_profile = {c: {'max_loss_pct': -30, 'avg_volatility': 8} for c in codes[::2]}
+        ai.pattern_stats = {p: {'win_rate': 0.3} for p in ('double_bottom', 'support_bounce', 'trinity_complete')}
+
+        panel = piona.loader.load_panel(codes)
+        full = piona.analyze_panel(panel)
+        bounded = piona.analyze_panel(panel, bounded=True)
+        skipped = [b for b in bounded if b['ai_result'] is None]
+        assert skipped, "상한 생략 종목 없음"
+
+        for f, b in zip(full, bounded):
+            total = f['final_decision']['total_score']
+            if b['ai_result'] is None:
+                lower, upper = b['final_decision']['score_bounds']
+                assert upper < BUY_THRESHOLD and lower <= total <= upper, (b['code'], lower, total, upper)
+                assert f['final_decision']['final_signal']['action'] not in ('BUY', 'STRONG_BUY')
+            else:
+                assert b['final_decision']['total_score'] == total
+        print(f"✓ {len(codes)}개 중 {len(skipped)}개 생략, 전체 분석 총점은 모두 범위 안")
+
+        # AI 점수 범위 (패턴 결과 전) 는 실제 AI 점수를 포함
+        for f in full:
+            low, high = ai.score_bounds(f['code'], {'inflection': f['creon_signals']['inflection']})
+            assert low <= f['ai_result']['ml_score']['total'] <= high
+        print("✓ AI 점수 범위 포함")
+
+        # 매수 후보 (순위/점수) 는 전체 분석과 같다
+        expected = piona.scan_universe(codes, screen=False)
+        assert [(c['code'], c['score']) for c in piona.scan_universe(codes, screen=False, bounded=True)] == \
+            [(c['code'], c['score']) for c in expected]
+        print(f"✓ 매수 후보 {len(expected)}개 동일")
+
+    return True
+
+
+def test_feature_store():
+    """공용 지표 저장소 테스트 (엔진 간 지표 공유, 기존 계산과 동일)"""
+    print("\n[테스트 27] 공용 지표 저장소")
+    print("=" * 60)
+
+    import tempfile
+    from piona_data.market_data import MarketDataLoader
+    from piona_data.bar_panel import window
+    from piona_data.feature_store import features
+    from engine.inflection_engine import InflectionEngine
+    from engine.support_resistance_engine import SupportResistanceEngine
+    from engine.fibonacci_engine import FibonacciEngine
+    from piona_ml import MacroEngine, VolatilityEngine
+    from trading_system.universe_screen import UniverseScreen
+
+    n = 320
+    close = 50000 + np.cumsum(np.random.randint(-500, 500, n))
+    open_p = close + np.random.randint(-200, 200, n)
+    df = pd.DataFrame({'date': pd.bdate_range('2024-01-02', periods=n), 'code': '005930',
+                       'open': open_p, 'close': close,
+                       'high': np.maximum(open_p, close) + np.random.randint(0, 300, n),
+                       'low': np.minimum(open_p, close) - np.random.randint(0, 300, n),
+                       'volume': np.random.randint(1000, 5000, n)})
+
+    # 기존 엔진 계산식과 같은 값
+    f = features(df)
+    high, low, close_s = df['high'], df['low'], df['close']
+    tr = pd.concat([high - low, abs(high - close_s.shift()), abs(low - close_s.shift())], axis=1).max(axis=1)
+    assert f.true_range().equals(tr)
+    assert f.atr(14).equals(tr.rolling(14).mean())
+    assert np.isclose(f.atr(14).iloc[-1], np.mean(tr.tolist()[-14:]), rtol=1e-12)
+    assert f.ma(20).equals(close_s.rolling(20).mean())
+    assert f.change_pct(20) == (close[-1] / close[-20] - 1) * 100 and features(df.iloc[:10]).change_pct(20) is None
+    print("✓ MA/TR/ATR/수익률 = 기존 엔진 계산식")
+
+    # 같은 DataFrame 을 분석하는 엔진은 한 저장소를 공유 (지표별 1회 계산)
+    ma20 = f.ma(20)
+    engines = (InflectionEngine(), SupportResistanceEngine(), FibonacciEngine(),
+               MacroEngine(), VolatilityEngine())
+    for engine in engines:
+        engine.analyze(df)
+    assert features(df) is f and f.ma(20) is ma20
+    assert {('ma', 10), ('ma', 50), ('ma', 300), ('atr', 14), ('change_pct', 60)} <= set(f._memo)
+    assert not any(key[0] == 'rsi' for key in f._memo)
+    assert features(df.copy()) is not f
+    print(f"✓ {len(engines)}개 엔진이 한 저장소 공유 (지표 {len(f._memo)}종 각 1회 계산)")
+
+    # 패널: 스크린/거시/변곡 엔진이 같은 종목 벡터 공유
+    with tempfile.TemporaryDirectory() as tmp:
+        loader = MarketDataLoader(tmp)
+        loader.store.write_frames({code: df.assign(code=code, amount=10 ** 9) for code in ('005930', '000660')})
+        panel = loader.load_panel(['005930', '000660'])
+        pf = features(panel)
+        UniverseScreen().screen(panel)
+        ma300 = pf.ma(300)
+        MacroEngine().analyze_panel(panel)
+        InflectionEngine().analyze_panel(panel)
+        assert features(panel) is pf and pf.ma(300) is ma300
+        assert np.array_equal(ma300, window(panel.close, 300).mean(axis=0))
+        assert np.allclose(pf.change_pct(20), (panel.close[-1] / panel.close[-20] - 1) * 100)
+        print(f"✓ 패널 지표 {len(pf._memo)}종 공유 (스크린/거시/변곡)")
+
+    return True
+
+
+def test_pipeline():
+    """엔진 DAG 파이프라인 테스트 (의존 순서, 동시 실행, 대체값, 스레드 수와 무관한 결과)"""
+    print("\n[테스트 28] 엔진 DAG 파이프라인")
+    print("=" * 60)
+
+    import tempfile
+    import threading
+    import time
+    from engine.pipeline import Pipeline
+    from engine.compound_signal import PIONA_CompoundSignal
+    from piona_main import PIONASystem, ENGINE_NODES
+
+    def same(a, b):
+        if isinstance(a, dict):
+            keys = set(a) - {'df', 'timestamp'}
+            return keys == set(b) - {'df', 'timestamp'} and all(same(a[k], b[k]) for k in keys)
+        if isinstance(a, (list, tuple)):
+            return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+        if isinstance(a, float) and np.isnan(a):
+            return np.isnan(b)
+        if isinstance(a, (pd.DataFrame, pd.Series)):
+            return a.equals(b)
+        return a == b
+
+    # 의존 순서 + threaded 노드 동시 실행 + 노드별 시간
+    barrier = threading.Barrier(3, timeout=5)
+    pipeline = Pipeline(3)
+    pipeline.add('double', lambda x: x * 2, ('x',))
+    for name in ('a', 'b', 'c'):
+        pipeline.add(name, lambda d, name=name: (barrier.wait(), time.sleep(0.01), f"{name}{d}")[-1],
+                     ('double',), threaded=True)
+    pipeline.add('joined', lambda a, b, c: a + b + c, ('a', 'b', 'c'))
+    run = pipeline.run(x=3)
+    assert run['joined'] == 'a6b6c6' and run['x'] == 3
+    assert set(run.timings) == {'double', 'a', 'b', 'c', 'joined'} and run.timings['a'] >= 0.01
+    print("✓ 의존 순서대로 실행, 독립 노드 3개 동시 실행, 노드별 시간 기록")
+
+    # targets: 필요한 노드만 / 예외 대체값 / 없는 입력, 순환
+    assert set(pipeline.run(['double'], x=1)) == {'x', 'double'}
+    pipeline.add('broken', lambda d: 1 / 0, ('double',), threaded=True, fallback=lambda e: {"error": str(e)})
+    assert 'division' in pipeline.run(['broken'], x=1)['broken']['error']
+    try:
+        pipeline.run(['joined'])
+        assert False, "없는 입력 통과"
+    except KeyError:
+        pass
+    loop = Pipeline(0).add('p', lambda q: q, ('q',)).add('q', lambda p: p, ('p',))
+    try:
+        loop.run()
+        assert False, "순환 통과"
+    except ValueError:
+        pass
+    print("✓ targets 선행 노드만 실행, 예외 대체값, 없는 입력/순환 검출")
+
+    # 종합 신호 엔진: 네 엔진을 DAG 로 실행
+    n = 200
+    close = 50000 + np.cumsum(np.random.randint(-500, 500, n))
+    df = pd.DataFrame({'date': pd.bdate_range('2024-01-02', periods=n), 'open': close,
+                       'high': close + np.random.randint(0, 300, n), 'low': close - np.random.randint(0, 300, n),
+                       'close': close, 'volume': np.random.randint(1000, 5000, n)})
+    compound = PIONA_CompoundSignal()
+    signal = compound.analyze(df)
+    assert {'pattern', 'fibonacci', 'support_resistance', 'inflection'} <= set(compound.last_timings)
+    assert same(signal, PIONA_CompoundSignal(threads=0).analyze(df))
+    print("✓ 종합 신호 엔진 DAG (스레드/순차 결과 동일)")
+
+    # PIONASystem: 스레드 DAG 와 순차 실행 결과 동일 (종목 하나 / 패널)
+    days = 320
+    dates = pd.bdate_range(end='2025-11-21', periods=days)
+    frames = {}
+    for code in ['005930', '000660', '035420', 'U001', 'U201']:
+        close = 60000 + np.cumsum(np.random.randint(-300, 320, days))
+        open_p = close + np.random.randint(-200, 200, days)
+        frames[code] = pd.DataFrame({
+            'date': dates, 'code': code, 'open': open_p, 'close': close,
+            'high': np.maximum(open_p, close) + np.random.randint(0, 300, days),
+            'low': np.minimum(open_p, close) - np.random.randint(0, 300, days),
+            'volume': np.random.randint(1000, 9000, days), 'amount': np.random.randint(10 ** 9, 10 ** 10, days),
+            'frgn_net_buy': np.random.randint(-500, 500, days), 'inst_net_buy': np.random.randint(-500, 500, days)
+        })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        threaded = PIONASystem(mode='simulation', data_path=tmp, use_cache=False)
+        serial = PIONASystem(mode='simulation', data_path=tmp, use_cache=False, threads=0)
+        threaded.loader.store.write_frames(frames)
+
+        df = threaded.loader.load('005930')
+        one = threaded.analyze_frame('005930', df, verbose=False)
+        assert same(one, serial.analyze_frame('005930', df, verbose=False))
+
+        panel = threaded.loader.load_panel(['005930', '000660', '035420'])
+        for bounded in (False, True):
+            assert same(threaded.analyze_panel(panel, bounded), serial.analyze_panel(panel, bounded))
+        assert {name for name, *_ in ENGINE_NODES} <= set(threaded.last_timings)
+        print(f"✓ analyze_frame / analyze_panel 스레드 {threaded.threads}개 = 순차 결과 "
+              f"(노드 {len(threaded.last_timings)}개 시간 기록)")
+
+    return True
+
+
+def test_streaming_scan():
+    """스트리밍 스캔 테스트 (덩어리별 결과, 상위 K 매수 후보 = 전체 정렬 앞부분)"""
+    print("\n[테스트 29] 스트리밍 스캔 + 상위 K")
+    print("=" * 60)
+
+    import tempfile
+    import piona_main
+    from piona_main import PIONASystem
+    from trading_system.candidate_ranking import CandidateRanking
+    from trading_system.analysis_record import AnalysisRecord, FIELDS, ACTION_CODES
+
+    # 순위: 상위 K 만 보관, 같은 점수는 order 순
+    def fake(code, score, action='BUY'):
+        values = dict.fromkeys(FIELDS, 0)
+        values.update(code=code, total_score=score, action=ACTION_CODES[action])
+        return AnalysisRecord(**values)
+
+    ranking = CandidateRanking(top_k=2)
+    assert ranking.add(fake('A', 50), order=3) == 1
+    assert ranking.add(fake('B', 50), order=1) == 1
+    assert ranking.add(fake('C', 10), order=0) is None
+    assert ranking.add(fake('D', 90, 'SELL')) is None
+    assert ranking.add(fake('E', 70), order=5) == 1
+    assert [c['code'] for c in ranking.top()] == ['E', 'B'] and ranking.count == 4
+    print("✓ CandidateRanking 상위 2개 보관 (같은 점수는 종목 순서)")
+
+    days = 320
+    dates = pd.bdate_range(end='2025-11-21', periods=days)
+    codes = [f"{k:06d}" for k in range(500, 520)]
+    frames = {}
+    for i, code in enumerate(codes + ['U001', 'U201']):
+        drift = (-100, 40, 90, 140)[i % 4]
+        close = 40000 + np.cumsum(np.random.randint(-300, 300, days) + drift)
+        open_p = close + np.random.randint(-200, 200, days)
+        flow = (-500, 500) if i % 4 == 0 else (-200, 900)  # 상승 종목은 외국인/기관 순매수 → 매수 후보
+        frames[code] = pd.DataFrame({
+            'date': dates, 'code': code, 'open': open_p, 'close': close,
+            'high': np.maximum(open_p, close) + np.random.randint(0, 300, days),
+            'low': np.minimum(open_p, close) - np.random.randint(0, 300, days),
+            'volume': np.random.randint(1000, 9000, days), 'amount': np.random.randint(10 ** 9, 10 ** 10, days),
+            'frgn_net_buy': np.random.randint(*flow, days), 'inst_net_buy': np.random.randint(*flow, days)
+        })
+
+    def ranked(candidates):
+        return [(c['code'], c['score']) for c in candidates]
+
+    chunk = piona_main.SCAN_CHUNK
+    with tempfile.TemporaryDirectory() as tmp:
+        piona = PIONASystem(mode='simulation', data_path=tmp, use_cache=False)
+        piona.loader.store.write_frames(frames)
+        full = piona.scan_universe(codes, screen=False)
+        assert len(full) > 5, f"매수 후보 부족: {len(full)}"
+
+        try:
+            piona_main.SCAN_CHUNK = 6
+            # 덩어리 분석 = 패널 한 번 분석
+            assert ranked(piona.scan_universe(codes, screen=False)) == ranked(full)
+
+            # 첫 덩어리가 끝나면 바로 결과가 나온다
+            calls = []
+            analyze_panel = piona.analyze_panel
+            piona.analyze_panel = lambda panel, bounded=False: calls.append(panel.n_symbols) or \
+                analyze_panel(panel, bounded)
+            ranking = CandidateRanking(top_k=3)
+            stream = piona.iter_universe(codes, screen=False, ranking=ranking)
+            first = next(stream)
+            assert calls == [6] and set(first) == {'code', 'signal', 'score', 'rank'}
+            results = [first] + list(stream)
+            del piona.analyze_panel
+            assert calls == [6, 6, 6, 2] and len(results) == len(codes)
+            assert ranked(ranking.top()) == ranked(full[:3]) and ranking.count == len(full)
+            assert all(isinstance(c['record'], AnalysisRecord) for c in ranking.top())
+            print(f"✓ 덩어리 {len(calls)}개마다 결과 ({len(results)}종목), 상위 3개만 보관")
+        finally:
+            piona_main.SCAN_CHUNK = chunk
+
+        top = piona.scan_universe(codes, screen=False, top_k=5)
+        assert ranked(top) == ranked(full[:5])
+        parallel = piona.scan_universe(codes, workers=2, screen=False, top_k=5)
+        assert ranked(parallel) == ranked(full[:5])
+        assert [c['record'] for c in parallel] == [c['record'] for c in top]
+        print(f"✓ scan_universe(top_k=5) 순차/병렬 = 전체 매수 후보 {len(full)}개 중 상위 5개")
+
+    return True
+
+
+def test_analysis_record():
+    """분석 결과 레코드 테스트 (숫자 필드, 열 저장, 근거 다시 만들기)"""
+    print("\n[테스트 30] 분석 결과 레코드")
+    print("=" * 60)
+
+    import pickle
+    import tempfile
+    from piona_main import PIONASystem
+    from trading_system.analysis_record import AnalysisRecord, RecordTable, FIELDS
+
+    def same(a, b):
+        if isinstance(a, dict):
+            keys = set(a) - {'df', 'timestamp'}
+            return keys == set(b) - {'df', 'timestamp'} and all(same(a[k], b[k]) for k in keys)
+        if isinstance(a, (list, tuple)):
+            return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+        if isinstance(a, float) and np.isnan(a):
+            return np.isnan(b)
+        return a == b
+
+    days = 320
+    dates = pd.bdate_range(end='2025-11-21', periods=days)
+    codes = [f"{k:06d}" for k in range(600, 612)]
+    frames = {}
+    for i, code in enumerate(codes + ['U001', 'U201']):
+        drift = (-120, 40, 140)[i % 3]
+        close = 40000 + np.cumsum(np.random.randint(-300, 300, days) + drift)
+        open_p = close + np.random.randint(-200, 200, days)
+        frames[code] = pd.DataFrame({
+            'date': dates, 'code': code, 'open': open_p, 'close': close,
+            'high': np.maximum(open_p, close) + np.random.randint(0, 300, days),
+            'low': np.minimum(open_p, close) - np.random.randint(0, 300, days),
+            'volume': np.random.randint(1000, 9000, days), 'amount': np.random.randint(10 ** 9, 10 ** 10, days),
+            'frgn_net_buy': np.random.randint(-500, 700, days), 'inst_net_buy': np.random.randint(-500, 700, days)
+        })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        piona = PIONASystem(mode='simulation', data_path=tmp)
+        piona.loader.store.write_frames(frames)
+
+        # 분석 dict → 레코드 (신호 코드, 점수, 손절/목표가)
+        panel = piona.loader.load_panel(codes)
+        analyses = piona.analyze_panel(panel)
+        records = [AnalysisRecord.from_analysis(a) for a in analyses]
+        for a, r in zip(analyses, records):
+            decision = a['final_decision']
+            assert r.code == a['code'] and r.date == 20251121 and r.close == a['df']['close'].iloc[-1]
+            assert r.signal == decision['final_signal']['action'] and r.mode == decision['trading_mode']
+            assert r.total_score == decision['total_score'] and r.ai_score == decision['ai_score']
+            assert r.supply_score == a['ml_signals']['supply']['score']
+            assert r.decision()['final_signal']['action'] == r.signal
+        assert not hasattr(records[0], '__dict__')
+        size = len(pickle.dumps(records[0])), len(pickle.dumps(analyses[0]))
+        print(f"✓ 레코드 {len(records)}건 (pickle {size[0]} 바이트, 분석 dict {size[1]} 바이트)")
+
+        # 총점 상한 생략 종목 → NaN 점수 / NO_BUY
+        for a in piona.analyze_panel(panel, bounded=True):
+            r = AnalysisRecord.from_analysis(a)
+            if a['ai_result'] is None:
+                assert r.signal == 'NO_BUY' and np.isnan(r.total_score) and r.mode is None
+                assert r.decision()['total_score'] is None
+
+        # 열 저장: 메모리/디스크 왕복
+        table = RecordTable()
+        for _ in range(3):
+            table.extend(records)
+        assert len(table) == 3 * len(records) and list(table)[:len(records)] == records
+        row_bytes = sum(table.column(name).itemsize for name in FIELDS)
+        path = os.path.join(tmp, 'records')
+        table.save(path)
+        loaded = RecordTable.load(path)
+        assert list(loaded) == list(table) and loaded[-1] == records[-1]
+        frame = loaded.to_frame()
+        assert list(frame['code'][:len(codes)]) == codes
+        assert list(frame['signal'][:len(codes)]) == [r.signal for r in records]
+        loaded.append(records[0])
+        assert len(loaded) == len(table) + 1 and loaded[-1] == records[0]
+        print(f"✓ RecordTable {len(table)}건 저장/mmap 읽기 (행당 {row_bytes} 바이트)")
+
+        # 근거는 필요할 때 다시 만든다 (최신 봉 = 종목 분석, 지난 날짜 = 그날까지 데이터로)
+        explained = records[0].explain(piona)
+        assert AnalysisRecord.from_analysis(explained) == records[0]
+        assert same(explained['final_decision'], analyses[0]['final_decision'])
+        assert explained['df'].equals(analyses[0]['df'])
+        df = piona.loader.load(codes[0])
+        past = AnalysisRecord.from_analysis(piona.analyze_frame(codes[0], df.iloc[:-5], verbose=False))
+        again = past.explain(piona)
+        assert again['df'].equals(df.iloc[:-5]) and AnalysisRecord.from_analysis(again) == past
+        print("✓ explain: 최신/지난 날짜 레코드 → 같은 분석 결과")
+
+        # 스캔: 매수 후보는 레코드, 전 종목 레코드 표
+        candidates = piona.scan_universe(codes, screen=False)
+        assert len(piona.last_records) == len(codes)
+        assert all(isinstance(c['record'], AnalysisRecord) and 'analysis' not in c for c in candidates)
+        print(f"✓ scan_universe: 매수 후보 {len(candidates)}개 레코드, 전 종목 {len(piona.last_records)}건 표")
+
+    return True
+
+
+def test_lean_mode():
+    """lean 모드 테스트 (근거 문자열 생략, 점수/신호 동일, 근거는 필요할 때 다시)"""
+    print("\n[테스트 31] lean 모드")
+    print("=" * 60)
+
+    import tempfile
+    from piona_main import PIONASystem, LEAN_ENGINES
+    from engine.reasons import Reasons
+    from piona_data.analysis_cache import AnalysisCache
+    from piona_ml import MacroEngine
+    from trading_system.analysis_record import AnalysisRecord
+
+    reasons = Reasons(lean=True)
+    reasons.add("RSI {:.1f}", object())  # lean 이면 포맷하지 않는다
+    assert reasons.items == []
+    reasons = Reasons()
+    reasons.add("RSI {:.1f} (+3점)", 25.04)
+    reasons.add("정배열 (+5점)")
+    assert reasons.items == ["RSI 25.0 (+3점)", "정배열 (+5점)"]
+    print("✓ Reasons: lean 이면 포맷/추가 생략")
+
+    days = 320
+    dates = pd.bdate_range(end='2025-11-21', periods=days)
+    codes = [f"{k:06d}" for k in range(700, 710)]
+    frames = {}
+    for i, code in enumerate(codes + ['U001', 'U201']):
+        drift = (-120, 40, 140)[i % 3]
+        close = 40000 + np.cumsum(np.random.randint(-300, 300, days) + drift)
+        open_p = close + np.random.randint(-200, 200, days)
+        frames[code] = pd.DataFrame({
+            'date': dates, 'code': code, 'open': open_p, 'close': close,
+            'high': np.maximum(open_p, close) + np.random.randint(0, 300, days),
+            'low': np.minimum(open_p, close) - np.random.randint(0, 300, days),
+            'volume': np.random.randint(1000, 9000, days), 'amount': np.random.randint(10 ** 9, 10 ** 10, days),
+            'frgn_net_buy': np.random.randint(-500, 700, days), 'inst_net_buy': np.random.randint(-500, 700, days)
+        })
+
+    with tempfile.TemporaryDirectory() as tmp:
+        full = PIONASystem(mode='simulation', data_path=tmp)
+        lean = PIONASystem(mode='simulation', data_path=tmp, lean=True)
+        full.loader.store.write_frames(frames)
+
+        # 점수/신호는 같고 근거 문자열만 빠진다
+        panel = full.loader.load_panel(codes)
+        for bounded in (False, True):
+            expected = full.analyze_panel(panel, bounded)
+            actual = lean.analyze_panel(panel, bounded)
+            assert [AnalysisRecord.from_analysis(a) for a in actual] == \
+                [AnalysisRecord.from_analysis(a) for a in expected]
+        df = full.loader.load(codes[2])
+        one = lean.analyze_frame(codes[2], df, verbose=False)
+        assert AnalysisRecord.from_analysis(one) == \
+            AnalysisRecord.from_analysis(full.analyze_frame(codes[2], df, verbose=False))
+        for a in actual + [one]:
+            if a['ai_result'] is None:
+                assert a['final_decision']['recommendation']['message'] is None
+                continue
+            assert all(a['ml_signals'][name]['reasons'] == []
+                       for name in ('macro', 'psychology', 'supply', 'volatility', 'index'))
+            assert a['final_decision']['creon_score']['details'] == [] and a['final_decision']['ml_score']['details'] == []
+            assert a['final_decision']['recommendation']['message'] is None
+            assert all('date' not in inf and 'description' not in inf for inf in a['creon_signals']['inflection']['inflections'])
+        assert any(a['ml_signals']['macro']['reasons'] for a in expected)
+        print(f"✓ lean 분석 = 일반 분석 점수/신호 ({len(codes)}종목, 근거 문자열 없음)")
+
+        # 엔진 결과 캐시는 lean 과 일반 모드를 따로 저장
+        assert AnalysisCache.key(MacroEngine(lean=True), codes[0], 'fp') != AnalysisCache.key(MacroEngine(), codes[0], 'fp')
+
+        # 근거는 보고할 종목만 일반 모드 사본으로 다시 분석
+        explainer = lean.explainer()
+        assert explainer is lean.explainer() and full.explainer() is full
+        assert not explainer.lean and explainer.ai_engine is lean.ai_engine and explainer.cache is lean.cache
+        assert all(getattr(lean, attr).lean and not getattr(explainer, attr).lean for attr in LEAN_ENGINES)
+        record = AnalysisRecord.from_analysis(one)
+        explained = record.explain(lean)
+        assert explained['ml_signals']['macro']['reasons'] and explained['final_decision']['recommendation']['message']
+        assert AnalysisRecord.from_analysis(explained) == record
+        print("✓ explainer: 레코드 근거를 일반 모드로 다시 생성 (AI 상태/캐시 공유)")
+
+        # 병렬 스캔 작업자도 lean
+        assert [c['record'] for c in lean.scan_universe(codes, workers=2, screen=False)] == \
+            [c['record'] for c in full.scan_universe(codes, screen=False)]
+        print("✓ scan_universe(workers=2) lean = 일반 모드 매수 후보")
+
+    return True
+
+
 def test_creon_engines():
     """PIONA_CREON 4대 엔진 테스트"""
     print("\n[테스트 2] PIONA_CREON 4대 기술분석 엔진")
@@ -276,7 +1978,32 @@ def run_all_tests():
         ("ML 엔진", test_ml_engines),
         ("AI 엔진", test_ai_engine),
         ("점수 계산", test_score_calculator),
-        ("매매 시스템", test_trading_system)
+        ("매매 시스템", test_trading_system),
+        ("패널 저장소", test_panel_store),
+        ("요청 스케줄러", test_request_scheduler),
+        ("일일 파이프라인", test_daily_pipeline),
+        ("MarketEye 갱신", test_marketeye_update),
+        ("이력 동기화", test_history_sync),
+        ("장기 백필", test_backfill),
+        ("COM 디코더", test_com_decoder),
+        ("정수 스키마", test_compact_schema),
+        ("동시 읽기/쓰기", test_concurrent_store),
+        ("가짜 CREON", test_fake_creon),
+        ("공용 피벗 인덱스", test_pivot_index),
+        ("매물대", test_volume_profile),
+        ("일목균형표 시계열", test_ichimoku_series),
+        ("스트리밍 지표 상태", test_indicator_state),
+        ("패턴 스캐너", test_pattern_scanner),
+        ("패널 모드 엔진", test_panel_engines),
+        ("병렬 스캔", test_parallel_scan),
+        ("엔진 결과 캐시", test_analysis_cache),
+        ("1단계 유니버스 스크린", test_universe_screen),
+        ("총점 상한 생략", test_score_bounds),
+        ("공용 지표 저장소", test_feature_store),
+        ("엔진 DAG 파이프라인", test_pipeline),
+        ("스트리밍 스캔", test_streaming_scan),
+        ("분석 결과 레코드", test_analysis_record),
+        ("lean 모드", test_lean_mode)
     ]
 
     results = []
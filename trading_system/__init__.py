@@ -5,9 +5,14 @@ Trading System 패키지
 from .score_calculator import ScoreCalculator
 from .auto_trader import AutoTrader
 from .learning_system import LearningSystem
+from .candidate_ranking import CandidateRanking
+from .analysis_record import AnalysisRecord, RecordTable
 
 __all__ = [
     'ScoreCalculator',
     'AutoTrader',
-    'LearningSystem'
+    'LearningSystem',
+    'CandidateRanking',
+    'AnalysisRecord',
+    'RecordTable'
 ]
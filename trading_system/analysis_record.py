@@ -0,0 +1,238 @@
+"""
+분석 결과 레코드 (AnalysisRecord / RecordTable)
+- analyze_frame / analyze_panel 결과 dict (df, 엔진별 근거 문자열, 일목/변곡 목록 포함) 대신
+  매매와 순위에 쓰는 숫자 필드만 담은 레코드 — 최종 신호/매매 모드는 정수 코드
+- 사람이 읽는 근거(엔진 결과, 점수 내역, 추천 문구)는 explain(system) 으로 필요할 때 다시 만든다
+  (레코드가 최신 봉 기준이면 엔진 결과 캐시에서 바로 나온다)
+- RecordTable: 필드별 numpy 배열 열 저장 (레코드당 약 100 바이트)
+  디스크는 {path}/{필드}.npy — mmap 으로 열어 수년치 백테스트 결과도 필요한 열만 읽는다
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from piona_data.schema import to_date_int
+
+
+# 최종 신호 코드 (ScoreCalculator._generate_final_signal 점수 순서, NO_BUY = 총점 상한 생략)
+ACTIONS = ("STRONG_SELL", "SELL", "WEAK_SELL", "HOLD", "WEAK_BUY", "BUY", "STRONG_BUY", "NO_BUY")
+ACTION_CODES = {name: code for code, name in enumerate(ACTIONS)}
+
+# 매매 모드 코드 (-1 = 없음)
+MODES = ("scalp", "swing", "long_term")
+MODE_CODES = {name: code for code, name in enumerate(MODES)}
+
+# PIONA_ML 엔진 (엔진별 점수 필드 {엔진}_score)
+ML_ENGINES = ("macro", "psychology", "supply", "volatility", "dart", "index")
+
+# 필드 → 열 dtype (총점 상한으로 생략한 종목의 점수는 NaN)
+FIELDS = {
+    "code": "S12",
+    "date": np.int32,
+    "close": np.float64,
+    "action": np.int8,
+    "trading_mode": np.int8,
+    "total_score": np.float64,
+    "creon_score": np.float64,
+    "ml_score": np.float64,
+    "ai_score": np.float64,
+    **{f"{name}_score": np.int16 for name in ML_ENGINES},
+    "trinity_count": np.int8,
+    "stop_loss": np.float64,
+    "target_1": np.float64,
+    "target_2": np.float64
+}
+
+
+def _same(a, b):
+    """필드 값 비교 (NaN 끼리 같음)"""
+    return a == b or (a != a and b != b)
+
+
+def _total(part):
+    """final_decision 점수 항목 → 실수 (None → NaN)"""
+    if part is None:
+        return np.nan
+    return float(part["total"] if isinstance(part, dict) else part)
+
+
+class AnalysisRecord:
+    """
+    분석 결과 한 건 (숫자 필드만)
+
+    사용 예:
+        record = AnalysisRecord.from_analysis(analysis)
+        record.signal, record.total_score
+        record.explain(piona)['creon_signals']
+    """
+
+    __slots__ = tuple(FIELDS)
+
+    def __init__(self, **values):
+        for name in FIELDS:
+            setattr(self, name, values[name])
+
+    @classmethod
+    def from_analysis(cls, analysis):
+        """analyze_frame / analyze_panel 결과 dict → 레코드"""
+        df = analysis["df"]
+        decision = analysis["final_decision"]
+        ml_signals = analysis["ml_signals"]
+        trinity = analysis["creon_signals"]["inflection"].get("trinity", {})
+
+        # 손절/목표가 기본값은 PIONASystem.execute_trading 과 같다
+        close = float(df["close"].iloc[-1])
+        volatility = ml_signals["volatility"]
+        targets = volatility.get("targets", {})
+
+        return cls(
+            code=analysis["code"],
+            date=int(to_date_int(df["date"].iloc[-1:])[0]),
+            close=close,
+            action=ACTION_CODES[decision["final_signal"]["action"]],
+            trading_mode=MODE_CODES.get(decision["trading_mode"], -1),
+            total_score=_total(decision["total_score"]),
+            creon_score=_total(decision["creon_score"]),
+            ml_score=_total(decision["ml_score"]),
+            ai_score=_total(decision["ai_score"]),
+            **{f"{name}_score": int(ml_signals[name].get("score", 0)) for name in ML_ENGINES},
+            trinity_count=int(trinity.get("trinity_count", 0)),
+            stop_loss=float(volatility.get("stop_loss", close * 0.95)),
+            target_1=float(targets.get("target_1", close * 1.05)),
+            target_2=float(targets.get("target_2", close * 1.10))
+        )
+
+    @property
+    def signal(self):
+        """최종 신호 이름"""
+        return ACTIONS[self.action]
+
+    @property
+    def mode(self):
+        """매매 모드 이름 (없으면 None)"""
+        return MODES[self.trading_mode] if self.trading_mode >= 0 else None
+
+    def decision(self):
+        """AutoTrader.execute_signal 에 넘길 최종 결정 (신호/매매 모드/총점만)"""
+        total = None if np.isnan(self.total_score) else self.total_score
+        return {
+            "total_score": total,
+            "trading_mode": self.mode,
+            "final_signal": {"action": self.signal, "score": total}
+        }
+
+    def explain(self, system):
+        """
+        사람이 읽는 근거 — 저장소의 레코드 날짜까지 데이터로 다시 분석
+
+        Parameters:
+            system: PIONASystem (lean 모드여도 system.explainer() 로 근거 포함 분석)
+
+        Returns:
+            dict: analyze_frame 결과 (엔진 결과, 점수 내역, 추천 문구) 또는 None (데이터 없음)
+        """
+        with system.loader.pinned() as snapshot:
+            df = system.loader.load(self.code)
+            if df is None:
+                return None
+            fingerprint = snapshot.fingerprint(self.code)
+            dates = to_date_int(df["date"])
+            if dates[-1] != self.date:
+                # 이후 봉이 추가된 경우 (백테스트/지난 스캔) — 캐시 키 지문이 없으므로 새로 계산
+                df = df[dates <= self.date].reset_index(drop=True)
+                fingerprint = None
+            if len(df) == 0:
+                return None
+            return system.explainer().analyze_frame(self.code, df, verbose=False, fingerprint=fingerprint)
+
+    def __eq__(self, other):
+        if not isinstance(other, AnalysisRecord):
+            return NotImplemented
+        return all(_same(getattr(self, name), getattr(other, name)) for name in FIELDS)
+
+    def __repr__(self):
+        return f"AnalysisRecord({self.code} {self.date} {self.signal} {self.total_score})"
+
+
+class RecordTable:
+    """
+    AnalysisRecord 열 저장 (필드별 numpy 배열, 가득 차면 용량 2배)
+
+    사용 예:
+        table = RecordTable()
+        table.append(record)
+        table.save("data/records/20251121")
+        frame = RecordTable.load("data/records/20251121").to_frame()
+    """
+
+    def __init__(self, columns=None, size=0):
+        """
+        Parameters:
+            columns: 필드 → 배열 (None 이면 빈 표)
+            size: columns 의 유효 행 수
+        """
+        self._columns = columns or {name: np.empty(16, dtype=dtype) for name, dtype in FIELDS.items()}
+        self._size = size
+
+    def __len__(self):
+        return self._size
+
+    def append(self, record):
+        """레코드 한 건 추가"""
+        if self._size == len(self._columns["date"]):
+            self._grow()
+        for name in FIELDS:
+            self._columns[name][self._size] = getattr(record, name)
+        self._size += 1
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def column(self, name):
+        """필드 열 (유효 행만, 복사 없는 뷰 — code 는 ASCII bytes)"""
+        return self._columns[name][:self._size]
+
+    def __getitem__(self, i):
+        if not -self._size <= i < self._size:
+            raise IndexError(i)
+        values = {name: self._columns[name][i % self._size].item() for name in FIELDS}
+        values["code"] = values["code"].decode("ascii")
+        return AnalysisRecord(**values)
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield self[i]
+
+    def to_frame(self):
+        """pandas DataFrame (code 는 문자열, signal 은 최종 신호 이름 열 추가)"""
+        frame = pd.DataFrame({name: self.column(name) for name in FIELDS})
+        frame["code"] = frame["code"].str.decode("ascii")
+        frame["signal"] = pd.Categorical.from_codes(frame["action"], ACTIONS)
+        return frame
+
+    def save(self, path):
+        """디렉토리에 필드별 .npy 저장"""
+        os.makedirs(path, exist_ok=True)
+        for name in FIELDS:
+            np.save(os.path.join(path, f"{name}.npy"), self.column(name))
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        save 한 디렉토리 열기
+
+        Parameters:
+            mmap: True 면 읽기 전용 mmap (append 하면 그때 메모리로 복사)
+        """
+        mode = "r" if mmap else None
+        columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode) for name in FIELDS}
+        return cls(columns, len(columns["date"]))
+
+    def _grow(self):
+        capacity = max(16, 2 * len(self._columns["date"]))
+        for name, values in self._columns.items():
+            grown = np.empty(capacity, dtype=values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._columns[name] = grown
@@ -0,0 +1,76 @@
+"""
+매수 후보 순위 (CandidateRanking)
+- 분석 결과가 도착할 때마다 점수순 정렬을 유지 (수집 파이프라인 / 유니버스 스캔이 함께 사용)
+- top_k 를 주면 상위 K 개만 보관 → 스캔 도중 메모리는 후보 K 개의 레코드뿐
+- 같은 점수는 order(주어지면) 또는 도착 순서 (병렬 스캔도 종목 순서 기준으로 같은 순위)
+- 후보는 분석 결과 dict 대신 AnalysisRecord 로 보관 (df/엔진 근거는 record.explain 으로 필요할 때)
+"""
+import bisect
+import itertools
+import threading
+
+from .analysis_record import AnalysisRecord
+
+
+class CandidateRanking:
+    """분석 결과가 도착할 때마다 점수순 정렬을 유지하는 후보 목록"""
+
+    def __init__(self, actions=("STRONG_BUY", "BUY"), top_k=None):
+        """
+        Parameters:
+            actions: 후보로 받을 최종 신호
+            top_k: 보관할 상위 후보 수 (None 이면 전부)
+        """
+        self.actions = set(actions)
+        self.top_k = top_k
+        self.count = 0      # 지금까지 받은 후보 수 (상위 K 밖으로 밀린 후보 포함)
+        self._keys = []
+        self._items = []
+        self._arrival = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, result, order=None):
+        """
+        분석 결과 추가
+
+        Parameters:
+            result: analyze_frame / analyze_panel 결과 dict 또는 AnalysisRecord
+            order: 같은 점수 정렬 순서 (None 이면 도착 순서)
+
+        Returns:
+            int: 후보면 현재 순위 (1부터), 후보가 아니거나 상위 K 밖이면 None
+        """
+        if isinstance(result, AnalysisRecord):
+            record = result
+        elif result["final_decision"]["final_signal"]["action"] in self.actions:
+            record = AnalysisRecord.from_analysis(result)
+        else:
+            return None
+        if record.signal not in self.actions:
+            return None
+
+        item = {
+            "code": record.code,
+            "signal": record.signal,
+            "score": record.total_score,
+            "record": record
+        }
+        with self._lock:
+            self.count += 1
+            key = (-item["score"], next(self._arrival) if order is None else order)
+            pos = bisect.bisect_right(self._keys, key)
+            if self.top_k is not None and pos >= self.top_k:
+                return None
+            self._keys.insert(pos, key)
+            self._items.insert(pos, item)
+            if self.top_k is not None and len(self._items) > self.top_k:
+                self._keys.pop()
+                self._items.pop()
+        return pos + 1
+
+    def top(self, n=None):
+        with self._lock:
+            return list(self._items[:n] if n else self._items)
+
+    def __len__(self):
+        return len(self._items)
@@ -8,12 +8,30 @@
 import pandas as pd
 import numpy as np
 
+from engine.reasons import Reasons
+
+
+# 매수 후보 기준 총점 (_generate_final_signal 의 BUY 경계)
+BUY_THRESHOLD = 30
+
+# 비싼 CREON 엔진의 총점 기여 범위 (_calculate_creon_score 가감점의 최소, 최대)
+CREON_RANGES = {
+    'pattern': (-20, 20),
+    'support_resistance': (-10, 10),
+    'fibonacci': (-5, 8)
+}
+
 
 class ScoreCalculator:
     """통합 점수 계산기"""
 
-    def __init__(self):
+    def __init__(self, lean=False):
+        """
+        Parameters:
+            lean: True 면 점수 내역(details)/추천 문구(message) 생략 — 점수/신호만
+        """
         self.name = "Integrated Score Calculator"
+        self.lean = lean
 
     def calculate(self, creon_signals, ml_signals, ai_result):
         """
@@ -60,10 +78,62 @@ class ScoreCalculator:
             "recommendation": self._generate_recommendation(final_signal, trading_mode)
         }
 
+    def score_bounds(self, creon_signals, ml_signals, ai_bounds):
+        """
+        일부 CREON 엔진을 아직 실행하지 않았을 때 총점 범위
+
+        Parameters:
+            creon_signals: 실행한 CREON 엔진 결과만 (빠진 엔진은 CREON_RANGES 범위로 계산)
+            ml_signals: PIONA_ML 6대 시장분석 결과
+            ai_bounds: AI 점수 (하한, 상한) — AIDecisionEngine.score_bounds
+
+        Returns:
+            tuple: (하한, 상한)
+        """
+        known = self._calculate_creon_score(creon_signals)['total'] + self._calculate_ml_score(ml_signals)['total']
+        missing = [CREON_RANGES[name] for name in CREON_RANGES if name not in creon_signals]
+        lower = known + sum(low for low, _ in missing) + ai_bounds[0]
+        upper = known + sum(high for _, high in missing) + ai_bounds[1]
+        return lower, upper
+
+    def can_reach_buy(self, upper):
+        """총점 상한이 매수 기준에 닿을 수 있는지 (False 면 남은 엔진 결과와 상관없이 매수 아님)"""
+        return upper >= BUY_THRESHOLD
+
+    def bounded_decision(self, lower, upper):
+        """
+        총점 상한이 매수 기준 미만이라 남은 엔진을 생략한 종목의 결정
+
+        총점/매매 모드는 계산하지 않으며, 최종 신호는 매수가 아님(NO_BUY)만 확정이다.
+        """
+        message = None
+        if not self.lean:
+            message = f"[관망] 총점 상한 {upper:.1f} < {BUY_THRESHOLD} (패턴/지지저항/피보나치 생략)"
+        return {
+            "creon_score": None,
+            "ml_score": None,
+            "ai_score": None,
+            "total_score": None,
+            "score_bounds": (round(lower, 1), round(upper, 1)),
+            "trading_mode": None,
+            "final_signal": {
+                "action": "NO_BUY",
+                "confidence": "bounded",
+                "score": None
+            },
+            "recommendation": {
+                "message": message,
+                "trading_mode": None,
+                "period": None,
+                "action": "NO_BUY",
+                "confidence": "bounded"
+            }
+        }
+
     def _calculate_creon_score(self, creon_signals):
         """PIONA_CREON 점수 계산 (4대 기술분석)"""
         score = 0
-        details = []
+        details = Reasons(self.lean)
 
         # 1) 변곡 이론 점수
         inflection = creon_signals.get('inflection', {})
@@ -72,33 +142,33 @@ class ScoreCalculator:
         # 삼위일체 완성
         if trinity.get('trinity_count', 0) >= 3:
             score += 30
-            details.append("삼위일체 완성 (+30점)")
+            details.add("삼위일체 완성 (+30점)")
 
         # 후행스팬 관통
         if trinity.get('lagging_ok', False):
             score += 10
-            details.append("후행스팬 관통 (+10점)")
+            details.add("후행스팬 관통 (+10점)")
 
         # 양운
         if trinity.get('cloud_ok', False):
             score += 5
-            details.append("양운 형성 (+5점)")
+            details.add("양운 형성 (+5점)")
 
         # SS2 상승
         if trinity.get('ss2_ok', False):
             score += 5
-            details.append("SS2 상승 (+5점)")
+            details.add("SS2 상승 (+5점)")
 
         # 대변곡
         if trinity.get('major_inflection_ok', False):
             score += 5
-            details.append("51/77 대변곡 (+5점)")
+            details.add("51/77 대변곡 (+5점)")
 
         # 300일선 규칙
         ma300_rule = inflection.get('ma300_rule', {})
         if not ma300_rule.get('above_ma300', True):
             score -= 20
-            details.append("300일선 아래 음운 (-20점)")
+            details.add("300일선 아래 음운 (-20점)")
 
         # 2) 패턴 분석 점수
         pattern = creon_signals.get('pattern', {})
@@ -106,16 +176,16 @@ class ScoreCalculator:
 
         if final_signal == 'STRONG_BUY':
             score += 20
-            details.append("강력 매수 패턴 (+20점)")
+            details.add("강력 매수 패턴 (+20점)")
         elif final_signal == 'BUY':
             score += 10
-            details.append("매수 패턴 (+10점)")
+            details.add("매수 패턴 (+10점)")
         elif final_signal == 'STRONG_SELL':
             score -= 20
-            details.append("강력 매도 패턴 (-20점)")
+            details.add("강력 매도 패턴 (-20점)")
         elif final_signal == 'SELL':
             score -= 10
-            details.append("매도 패턴 (-10점)")
+            details.add("매도 패턴 (-10점)")
 
         # 3) 지지/저항 점수
         sr = creon_signals.get('support_resistance', {})
@@ -123,16 +193,16 @@ class ScoreCalculator:
 
         if sr_signal == 'near_support':
             score += 10
-            details.append("강한 지지선 반등 (+10점)")
+            details.add("강한 지지선 반등 (+10점)")
         elif sr_signal == 'near_resistance':
             score -= 10
-            details.append("강한 저항선 아래 (-10점)")
+            details.add("강한 저항선 아래 (-10점)")
         elif sr_signal == 'uptrend_structure':
             score += 5
-            details.append("상승 구조 (+5점)")
+            details.add("상승 구조 (+5점)")
         elif sr_signal == 'downtrend_structure':
             score -= 5
-            details.append("하락 구조 (-5점)")
+            details.add("하락 구조 (-5점)")
 
         # 4) 피보나치 점수
         fibo = creon_signals.get('fibonacci', {})
@@ -140,23 +210,23 @@ class ScoreCalculator:
 
         if 'SUPPORT_STRONG' in fibo_signal:
             score += 8
-            details.append("피보나치 0.618 지지 (+8점)")
+            details.add("피보나치 0.618 지지 (+8점)")
         elif 'SUPPORT' in fibo_signal:
             score += 5
-            details.append("피보나치 되돌림 지지 (+5점)")
+            details.add("피보나치 되돌림 지지 (+5점)")
         elif 'RESISTANCE' in fibo_signal:
             score -= 5
-            details.append("피보나치 저항 (-5점)")
+            details.add("피보나치 저항 (-5점)")
 
         return {
             "total": score,
-            "details": details
+            "details": details.items
         }
 
     def _calculate_ml_score(self, ml_signals):
         """PIONA_ML 점수 계산 (6대 시장분석)"""
         score = 0
-        details = []
+        details = Reasons(self.lean)
 
         # 1) 거시 분석 점수
         if 'macro' in ml_signals:
@@ -164,7 +234,7 @@ class ScoreCalculator:
             macro_score = macro.get('score', 0)
             score += macro_score
             if macro_score != 0:
-                details.append(f"거시 분석 ({macro_score:+d}점)")
+                details.add("거시 분석 ({:+d}점)", macro_score)
 
         # 2) 심리 분석 점수
         if 'psychology' in ml_signals:
@@ -172,7 +242,7 @@ class ScoreCalculator:
             psych_score = psych.get('score', 0)
             score += psych_score
             if psych_score != 0:
-                details.append(f"심리 분석 ({psych_score:+d}점)")
+                details.add("심리 분석 ({:+d}점)", psych_score)
 
         # 3) 수급 분석 점수
         if 'supply' in ml_signals:
@@ -180,7 +250,7 @@ class ScoreCalculator:
             supply_score = supply.get('score', 0)
             score += supply_score
             if supply_score != 0:
-                details.append(f"수급 분석 ({supply_score:+d}점)")
+                details.add("수급 분석 ({:+d}점)", supply_score)
 
         # 4) 변동성 분석 점수
         if 'volatility' in ml_signals:
@@ -188,7 +258,7 @@ class ScoreCalculator:
             vol_score = vol.get('score', 0)
             score += vol_score
             if vol_score != 0:
-                details.append(f"변동성 분석 ({vol_score:+d}점)")
+                details.add("변동성 분석 ({:+d}점)", vol_score)
 
         # 5) DART 공시 점수
         if 'dart' in ml_signals:
@@ -196,7 +266,7 @@ class ScoreCalculator:
             dart_score = dart.get('score', 0)
             score += dart_score
             if dart_score != 0:
-                details.append(f"DART 공시 ({dart_score:+d}점)")
+                details.add("DART 공시 ({:+d}점)", dart_score)
 
         # 6) 지수 방향 점수
         if 'index' in ml_signals:
@@ -204,11 +274,11 @@ class ScoreCalculator:
             index_score = index.get('score', 0)
             score += index_score
             if index_score != 0:
-                details.append(f"지수 방향 ({index_score:+d}점)")
+                details.add("지수 방향 ({:+d}점)", index_score)
 
         return {
             "total": score,
-            "details": details
+            "details": details.items
         }
 
     def _determine_trading_mode(self, creon_signals, ml_signals, ai_result, total_score):
@@ -278,7 +348,7 @@ class ScoreCalculator:
         if total_score >= 50:
             action = "STRONG_BUY"
             confidence = "very_high"
-        elif total_score >= 30:
+        elif total_score >= BUY_THRESHOLD:
             action = "BUY"
             confidence = "high"
         elif total_score >= 10:
@@ -319,8 +389,10 @@ class ScoreCalculator:
             period = "수주~수개월"
             style_desc = "장기"
 
-        # 추천 메시지
-        if action in ['STRONG_BUY', 'BUY']:
+        # 추천 메시지 (lean 이면 생략)
+        if self.lean:
+            message = None
+        elif action in ['STRONG_BUY', 'BUY']:
             message = f"[매수 추천] {style_desc} 매매 ({period}) - 신뢰도: {confidence}"
         elif action == 'WEAK_BUY':
             message = f"[약한 매수] {style_desc} 매매 ({period}) - 신뢰도: {confidence}"
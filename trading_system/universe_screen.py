@@ -0,0 +1,103 @@
+"""
+1단계 유니버스 스크린 (선택 사항 — scan_universe(screen=True) 로 켠다)
+- 매매 정책상 사지 않을 종목을 패널 한 번의 벡터 연산으로 걸러 전체 엔진 분석 대상에서 제외
+- 규칙별 제외 종목 수 보고 (한 종목은 먼저 걸린 규칙 하나로 집계)
+
+규칙은 정책 거부권이지 매수 불가 증명이 아니다. ScoreCalculator 에는 역배열/절대금기에 대한
+거부권이 없어(300일선 아래 음운은 -20점뿐) 전체 분석에서 BUY/STRONG_BUY 가 나오는 종목도 걸러질 수 있다.
+점수로 증명되는 생략은 ScoreCalculator.can_reach_buy (scan_universe(bounded=True)) 를 쓴다.
+
+규칙 (싼 것부터):
+1. illiquid: 최근 20일 평균 거래대금 < min_amount (min_amount 를 지정했을 때만)
+2. perfect_downward: 거시 엔진 완벽한 역배열 (현재가 < MA5 < MA20 < MA60 ...)
+3. absolute_no_buy: 변곡 엔진 절대금기 (300일선 아래 + 음운 → ABSOLUTE_NO_BUY)
+"""
+import numpy as np
+
+from engine.ichimoku import ichimoku_series, LEAD2_PERIOD
+from piona_data.bar_panel import window
+from piona_data.feature_store import features
+
+
+# illiquid 규칙: 최근 LIQUIDITY_PERIOD 일 평균 거래대금 (하한은 UniverseScreen(min_amount=...) 로 지정)
+LIQUIDITY_PERIOD = 20
+
+# MacroEngine._check_alignment 가 보는 이평선 (사용 가능한 것만, 최소 3개)
+ALIGN_PERIODS = (5, 20, 60, 120, 200)
+MA300_PERIOD = 300
+
+RULES = ("illiquid", "perfect_downward", "absolute_no_buy")
+
+
+class UniverseScreen:
+    """1단계 스크린 (BarPanel → 통과 종목 + 규칙별 제외 수)"""
+
+    def __init__(self, rules=RULES, min_amount=None):
+        """
+        Parameters:
+            rules: 적용할 규칙 이름 (RULES 중 선택, 적용 순서 = RULES 순서)
+            min_amount: illiquid 규칙 평균 거래대금 하한 (원, None 이면 illiquid 규칙 생략)
+        """
+        self.name = "Universe Screen"
+        self.min_amount = min_amount
+        self.rules = [rule for rule in RULES
+                      if rule in rules and (rule != "illiquid" or min_amount is not None)]
+
+    def screen(self, panel):
+        """
+        패널 전체 스크린
+
+        Parameters:
+            panel: piona_data.bar_panel.BarPanel
+
+        Returns:
+            dict: keep (종목별 통과 bool 배열), survivors (통과 종목코드),
+                  pruned (규칙별 제외 수), reasons (제외 종목 → 규칙)
+        """
+        counts = np.asarray(panel.counts)
+        keep = np.ones(panel.n_symbols, dtype=bool)
+        pruned = {}
+        reasons = {}
+
+        for rule in self.rules:
+            hit = getattr(self, f"_{rule}")(panel, counts) & keep
+            pruned[rule] = int(hit.sum())
+            for j in np.flatnonzero(hit):
+                reasons[panel.codes[j]] = rule
+            keep &= ~hit
+
+        return {
+            "total": panel.n_symbols,
+            "keep": keep,
+            "survivors": [code for code, ok in zip(panel.codes, keep) if ok],
+            "pruned": pruned,
+            "reasons": reasons
+        }
+
+    # ========================================
+    # 규칙 (종목별 제외 여부 bool 배열)
+    # ========================================
+    def _illiquid(self, panel, counts):
+        """최근 평균 거래대금 < min_amount"""
+        amount = features(panel).ma(LIQUIDITY_PERIOD, field="amount")
+        return (counts >= LIQUIDITY_PERIOD) & (amount < self.min_amount)
+
+    def _perfect_downward(self, panel, counts):
+        """MacroEngine 완벽한 역배열 (이평선 역순 정렬 + 현재가 < 가장 긴 이평선)"""
+        close = panel.close
+        mas = np.stack([features(panel).ma(p) for p in ALIGN_PERIODS])
+        # 종목별 사용 가능한 이평선 수 (봉 수가 기간 이상인 것, 짧은 기간부터 연속)
+        available = (counts[None, :] >= np.array(ALIGN_PERIODS)[:, None]).sum(axis=0)
+        with np.errstate(invalid="ignore"):
+            ordered = (mas[:-1] < mas[1:]) | (np.arange(1, len(ALIGN_PERIODS))[:, None] >= available)
+            longest = mas[np.maximum(available - 1, 0), np.arange(panel.n_symbols)]
+            return (available >= 3) & ordered.all(axis=0) & (close[-1] < longest)
+
+    def _absolute_no_buy(self, panel, counts):
+        """InflectionEngine 절대금기 (현재가 <= 300일선 + 현재 구름 음운)"""
+        high, low, close = panel.high, panel.low, panel.close
+        with np.errstate(invalid="ignore"):
+            cloud_red = ichimoku_series(window(high, LEAD2_PERIOD), window(low, LEAD2_PERIOD),
+                                        window(close, LEAD2_PERIOD))["cloud_red"][-1]
+            below_ma300 = ~(close[-1] > features(panel).ma(MA300_PERIOD))
+        return (counts >= MA300_PERIOD) & below_ma300 & ~cloud_red.astype(bool)